@@ -26,8 +26,8 @@ import logging
 import json
 import subprocess
 from typing import Optional
-from dotenv import load_dotenv
 
+from adw_modules.tracing import traced_phase
 from adw_modules.state import ADWState
 from adw_modules.git_ops import commit_changes, finalize_git_operations, get_current_branch
 from adw_modules.github import fetch_issue, make_issue_comment, get_repo_url, extract_repo_path
@@ -37,17 +37,18 @@ from adw_modules.workflow_ops import (
     format_issue_message,
     AGENT_IMPLEMENTOR,
 )
-from adw_modules.utils import setup_logger, check_env_vars
+from adw_modules.utils import setup_logger, check_env_vars, load_env
 from adw_modules.data_types import GitHubIssue
 from adw_modules.worktree_ops import validate_worktree
 
 
 
 
+@traced_phase
 def main():
     """Main entry point."""
     # Load environment variables
-    load_dotenv()
+    load_env()
     
     # Parse command line args
     # INTENTIONAL: adw-id is REQUIRED - we need it to find the worktree
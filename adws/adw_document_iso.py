@@ -28,8 +28,8 @@ import json
 import subprocess
 from typing import Optional
 from datetime import datetime
-from dotenv import load_dotenv
 
+from adw_modules.tracing import traced_phase
 from adw_modules.state import ADWState
 from adw_modules.git_ops import commit_changes, finalize_git_operations
 from adw_modules.github import (
@@ -43,7 +43,7 @@ from adw_modules.workflow_ops import (
     format_issue_message,
     find_spec_file,
 )
-from adw_modules.utils import setup_logger, check_env_vars
+from adw_modules.utils import setup_logger, check_env_vars, load_env
 from adw_modules.data_types import (
     GitHubIssue,
     GitHubUser,
@@ -285,10 +285,11 @@ def track_agentic_kpis(
         )
 
 
+@traced_phase
 def main():
     """Main entry point."""
     # Load environment variables
-    load_dotenv()
+    load_env()
 
     # Parse command line args
     # INTENTIONAL: adw-id is REQUIRED - we need it to find the worktree
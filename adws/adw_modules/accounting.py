@@ -0,0 +1,167 @@
+"""Cost and latency accounting for Claude Code agent calls.
+
+Every call attempt appends one AgentCallRecord to agents/cost_ledger.jsonl,
+shared by all ADW runs, tagged with the ADW id, phase, agent name, slash
+command and model. The ledger is aggregated on demand into cost totals and
+latency percentiles (see adw_tests/cost_report.py).
+"""
+
+import json
+import os
+import re
+import sys
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from adw_modules.data_types import (
+    AgentCallRecord,
+    AgentPromptRequest,
+    AgentPromptResponse,
+)
+
+LEDGER_FILENAME = "cost_ledger.jsonl"
+
+# Fields a report can be grouped by
+GROUP_FIELDS = ("adw_id", "phase", "agent_name", "slash_command", "model")
+
+
+def get_ledger_path() -> str:
+    """Get path to the shared cost ledger."""
+    project_root = os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    return os.path.join(project_root, "agents", LEDGER_FILENAME)
+
+
+def get_current_phase() -> str:
+    """Name of the running phase: ADW_PHASE, else the entry script name."""
+    phase = os.getenv("ADW_PHASE")
+    if phase:
+        return phase
+    script = os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else ""
+    return os.path.splitext(script)[0] or "unknown"
+
+
+def record_agent_call(
+    request: AgentPromptRequest,
+    response: AgentPromptResponse,
+    attempt: int = 1,
+    wall_ms: Optional[int] = None,
+) -> None:
+    """Append one ledger record for a finished call attempt.
+
+    wall_ms is the attempt's wall-clock time; unlike the result message's
+    duration_ms it is known for attempts that were killed or timed out.
+    Accounting must never break an agent call, so write errors are ignored.
+    """
+    slash_command = request.slash_command
+    if not slash_command:
+        match = re.match(r"^(/\w+)", request.prompt)
+        slash_command = match.group(1) if match else None
+
+    usage = response.usage
+    record = AgentCallRecord(
+        timestamp=datetime.now().isoformat(),
+        adw_id=request.adw_id,
+        phase=get_current_phase(),
+        agent_name=request.agent_name,
+        slash_command=slash_command,
+        model=request.model,
+        input_fingerprint=request.input_fingerprint,
+        attempt=attempt,
+        success=response.success,
+        retry_code=response.retry_code,
+        session_id=response.session_id,
+        total_cost_usd=response.total_cost_usd or 0.0,
+        duration_ms=response.duration_ms,
+        wall_ms=wall_ms,
+        duration_api_ms=response.duration_api_ms,
+        num_turns=response.num_turns,
+        input_tokens=usage.input_tokens if usage else 0,
+        output_tokens=usage.output_tokens if usage else 0,
+        cache_creation_input_tokens=usage.cache_creation_input_tokens if usage else 0,
+        cache_read_input_tokens=usage.cache_read_input_tokens if usage else 0,
+    )
+
+    path = get_ledger_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a") as f:
+            f.write(record.model_dump_json() + "\n")
+    except OSError:
+        pass
+
+
+def load_ledger(
+    adw_id: Optional[str] = None, path: Optional[str] = None
+) -> List[AgentCallRecord]:
+    """Load ledger records, optionally for a single ADW run."""
+    path = path or get_ledger_path()
+    if not os.path.exists(path):
+        return []
+
+    records = []
+    with open(path, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = AgentCallRecord(**json.loads(line))
+            except (json.JSONDecodeError, ValueError):
+                continue
+            if adw_id is None or record.adw_id == adw_id:
+                records.append(record)
+    return records
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Linear-interpolated percentile (pct in 0-100) of values, None if empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize_ledger(
+    records: List[AgentCallRecord], group_by: List[str]
+) -> List[Dict[str, Any]]:
+    """Aggregate records into cost totals and latency percentiles per group.
+
+    Rows are sorted by total cost, most expensive first.
+    """
+    for field in group_by:
+        if field not in GROUP_FIELDS:
+            raise ValueError(f"Cannot group by {field}; choose from {GROUP_FIELDS}")
+
+    groups: Dict[tuple, List[AgentCallRecord]] = {}
+    for record in records:
+        key = tuple(getattr(record, field) for field in group_by)
+        groups.setdefault(key, []).append(record)
+
+    rows = []
+    for key, members in groups.items():
+        # Wall-clock, so hung and killed attempts count toward the tail
+        latencies = [r.latency_ms for r in members if r.latency_ms is not None]
+        total_cost = sum(r.total_cost_usd for r in members)
+        rows.append(
+            {
+                **dict(zip(group_by, key)),
+                "calls": len(members),
+                "failures": sum(1 for r in members if not r.success),
+                "total_cost_usd": round(total_cost, 4),
+                "avg_cost_usd": round(total_cost / len(members), 4),
+                "input_tokens": sum(r.input_tokens for r in members),
+                "output_tokens": sum(r.output_tokens for r in members),
+                "cache_read_input_tokens": sum(r.cache_read_input_tokens for r in members),
+                "num_turns": sum(r.num_turns or 0 for r in members),
+                "p50_ms": percentile(latencies, 50),
+                "p90_ms": percentile(latencies, 90),
+                "p99_ms": percentile(latencies, 99),
+            }
+        )
+
+    rows.sort(key=lambda row: row["total_cost_usd"], reverse=True)
+    return rows
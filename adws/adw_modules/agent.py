@@ -7,8 +7,8 @@ import json
 import re
 import logging
 import time
+from collections import Counter
 from typing import Optional, List, Dict, Any, Tuple, Final
-from dotenv import load_dotenv
 from .data_types import (
     AgentPromptRequest,
     AgentPromptResponse,
@@ -17,13 +17,99 @@ from .data_types import (
     SlashCommand,
     ModelSet,
     RetryCode,
+    TokenUsage,
 )
+from . import metrics
+from .accounting import record_agent_call
+from .agent_backends import get_backend, get_slash_command
+from .retry_policy import (
+    RetryPolicy,
+    classify_failure,
+    circuit_breaker,
+    retry_metrics,
+)
+from .model_router import fingerprint_args, log_routing_decision, route_model
+from .profiling import profile_scope
+from .prompt_transport import open_prompt_transport
+from .recording import get_agent_mode, record_session, replay_session
+from .supervisor import run_supervised
+from .tracing import start_span
+from .transcript import (
+    archive_attempt,
+    extract_session_id,
+    record_lineage,
+    record_prompt,
+    summarize_transcript,
+)
+from .utils import load_env
+
+logger = logging.getLogger(__name__)
+
+# Settings below are read on use, after .env is loaded, not at import.
+
+# Claude Code CLI path; when unset, CLAUDE_CODE_PATH (default "claude") is used
+CLAUDE_PATH: Optional[str] = None
+
+
+def get_claude_path() -> str:
+    """Path of the Claude Code CLI."""
+    load_env()
+    return CLAUDE_PATH or os.getenv("CLAUDE_CODE_PATH", "claude")
+
 
-# Load environment variables
-load_dotenv()
+def resume_sessions_enabled() -> bool:
+    """Whether retries continue the failed session with --resume instead of starting over."""
+    load_env()
+    return os.getenv("ADW_RESUME_SESSIONS", "true").lower() != "false"
 
-# Get Claude Code CLI path from environment
-CLAUDE_PATH = os.getenv("CLAUDE_CODE_PATH", "claude")
+RESUME_PROMPT = (
+    "Your previous session was interrupted before it finished. Continue the "
+    "original task from where you left off without redoing completed work, and "
+    "end with the final output in the format the original task requested."
+)
+
+# Wall-clock limits (seconds) for agent sessions per slash command.
+# ADW_AGENT_TIMEOUT overrides all of them.
+SLASH_COMMAND_TIMEOUT_MAP: Final[Dict[SlashCommand, int]] = {
+    "/classify_issue": 300,
+    "/classify_adw": 300,
+    "/generate_branch_name": 300,
+    "/commit": 600,
+    "/pull_request": 600,
+    "/install_worktree": 900,
+    "/track_agentic_kpis": 900,
+    "/chore": 1800,
+    "/bug": 1800,
+    "/feature": 1800,
+    "/patch": 1800,
+    "/test": 1800,
+    "/test_e2e": 1800,
+    "/resolve_failed_test": 1800,
+    "/resolve_failed_e2e_test": 1800,
+    "/review": 2400,
+    "/document": 2400,
+    "/implement": 3600,
+}
+DEFAULT_AGENT_TIMEOUT = 1800
+
+
+
+def get_idle_timeout() -> int:
+    """Seconds a session may write no JSONL line before it is killed.
+
+    Longer than the CLI's maximum Bash tool timeout, so slow test runs aren't
+    mistaken for hangs.
+    """
+    load_env()
+    return int(os.getenv("ADW_AGENT_IDLE_TIMEOUT", "900"))
+
+
+def get_resource_limits() -> Tuple[Optional[int], Optional[int]]:
+    """Optional (memory MB, CPU seconds) caps for the agent process group."""
+    load_env()
+    memory_mb = int(os.getenv("ADW_AGENT_MEMORY_LIMIT_MB", "0")) or None
+    cpu_seconds = int(os.getenv("ADW_AGENT_CPU_LIMIT_SECONDS", "0")) or None
+    return memory_mb, cpu_seconds
 
 # Model selection mapping for slash commands
 # Maps each command to its model configuration for base and heavy model sets
@@ -49,6 +135,17 @@ SLASH_COMMAND_MODEL_MAP: Final[Dict[SlashCommand, Dict[ModelSet, str]]] = {
 }
 
 
+def get_model_set(adw_id: str) -> ModelSet:
+    """Get the model set (base or heavy) stored in the ADW state."""
+    # Import here to avoid circular imports
+    from .state import ADWState
+
+    state = ADWState.load(adw_id)
+    if state:
+        return state.get("model_set", "base")
+    return "base"
+
+
 def get_model_for_slash_command(
     request: AgentTemplateRequest, default: str = "sonnet"
 ) -> str:
@@ -64,14 +161,7 @@ def get_model_for_slash_command(
     Returns:
         Model name to use (e.g., "sonnet" or "opus")
     """
-    # Import here to avoid circular imports
-    from .state import ADWState
-
-    # Load state to get model_set
-    model_set: ModelSet = "base"  # Default model set
-    state = ADWState.load(request.adw_id)
-    if state:
-        model_set = state.get("model_set", "base")
+    model_set = get_model_set(request.adw_id)
 
     # Get the model configuration for the command
     command_config = SLASH_COMMAND_MODEL_MAP.get(request.slash_command)
@@ -83,6 +173,54 @@ def get_model_for_slash_command(
     return default
 
 
+def select_model(request: AgentTemplateRequest, input_fingerprint: str) -> str:
+    """Select the model for a template request, routing on observed history.
+
+    Starts from the static SLASH_COMMAND_MODEL_MAP choice and lets the model
+    router escalate or pick a model from the cost ledger. The decision is
+    logged to agents/routing_decisions.jsonl.
+    """
+    model_set = get_model_set(request.adw_id)
+    static_model = get_model_for_slash_command(request)
+
+    try:
+        model, reason = route_model(
+            adw_id=request.adw_id,
+            slash_command=request.slash_command,
+            input_fingerprint=input_fingerprint,
+            model_set=model_set,
+            model_config=SLASH_COMMAND_MODEL_MAP.get(request.slash_command),
+            static_model=static_model,
+        )
+    except Exception as e:
+        # Routing is an optimization; never fail a call because of it
+        logger.warning(f"Model routing failed, using static map: {e}")
+        return static_model
+
+    log_routing_decision(
+        {
+            "adw_id": request.adw_id,
+            "agent_name": request.agent_name,
+            "slash_command": request.slash_command,
+            "input_fingerprint": input_fingerprint,
+            "model_set": model_set,
+            "static_model": static_model,
+            "model": model,
+            "reason": reason,
+        }
+    )
+    return model
+
+
+def get_timeout_for_slash_command(slash_command: Optional[str]) -> int:
+    """Get the wall-clock timeout in seconds for an agent session."""
+    load_env()
+    override = os.getenv("ADW_AGENT_TIMEOUT")
+    if override:
+        return int(override)
+    return SLASH_COMMAND_TIMEOUT_MAP.get(slash_command, DEFAULT_AGENT_TIMEOUT)
+
+
 def truncate_output(
     output: str, max_length: int = 500, suffix: str = "... (truncated)"
 ) -> str:
@@ -146,16 +284,17 @@ def truncate_output(
 
 def check_claude_installed() -> Optional[str]:
     """Check if Claude Code CLI is installed. Return error message if not."""
+    claude_path = get_claude_path()
     try:
         result = subprocess.run(
-            [CLAUDE_PATH, "--version"], capture_output=True, text=True
+            [claude_path, "--version"], capture_output=True, text=True
         )
         if result.returncode != 0:
             return (
-                f"Error: Claude Code CLI is not installed. Expected at: {CLAUDE_PATH}"
+                f"Error: Claude Code CLI is not installed. Expected at: {claude_path}"
             )
     except FileNotFoundError:
-        return f"Error: Claude Code CLI is not installed. Expected at: {CLAUDE_PATH}"
+        return f"Error: Claude Code CLI is not installed. Expected at: {claude_path}"
     return None
 
 
@@ -184,6 +323,71 @@ def parse_jsonl_output(
         return [], None
 
 
+def extract_accounting(result_message: Dict[str, Any]) -> Dict[str, Any]:
+    """Pull cost, latency and token usage out of a result message.
+
+    Returns keyword arguments for AgentPromptResponse.
+    """
+    usage = None
+    raw_usage = result_message.get("usage")
+    if isinstance(raw_usage, dict):
+        usage = TokenUsage(
+            **{
+                key: value
+                for key, value in raw_usage.items()
+                if key in TokenUsage.model_fields and isinstance(value, int)
+            }
+        )
+
+    return {
+        "total_cost_usd": result_message.get("total_cost_usd"),
+        "duration_ms": result_message.get("duration_ms"),
+        "duration_api_ms": result_message.get("duration_api_ms"),
+        "num_turns": result_message.get("num_turns"),
+        "usage": usage,
+    }
+
+
+def response_from_result_message(result_message: Dict[str, Any]) -> AgentPromptResponse:
+    """Build the response for a session that ended with a result message."""
+    session_id = result_message.get("session_id")
+
+    # Check if there was an error in the result
+    is_error = result_message.get("is_error", False)
+    subtype = result_message.get("subtype", "")
+
+    # Handle error_during_execution case where there's no result field
+    if subtype == "error_during_execution":
+        error_msg = "Error during execution: Agent encountered an error and did not return a result"
+        return AgentPromptResponse(
+            output=error_msg,
+            success=False,
+            session_id=session_id,
+            retry_code=RetryCode.ERROR_DURING_EXECUTION,
+            **extract_accounting(result_message),
+        )
+
+    result_text = result_message.get("result", "")
+
+    # API errors surface as is_error results; only throttling is retryable
+    retry_code, retry_after = RetryCode.NONE, None
+    if is_error:
+        retry_code, retry_after = classify_failure(result_text, default=RetryCode.NONE)
+
+    # For error cases, truncate the output to prevent JSONL blobs
+    if is_error and len(result_text) > 1000:
+        result_text = truncate_output(result_text, max_length=800)
+
+    return AgentPromptResponse(
+        output=result_text,
+        success=not is_error,
+        session_id=session_id,
+        retry_code=retry_code,
+        retry_after_seconds=retry_after,
+        **extract_accounting(result_message),
+    )
+
+
 def convert_jsonl_to_json(jsonl_file: str) -> str:
     """Convert JSONL file to JSON array file.
 
@@ -222,87 +426,197 @@ def get_claude_env() -> Dict[str, str]:
     return get_safe_subprocess_env()
 
 
-def save_prompt(prompt: str, adw_id: str, agent_name: str = "ops") -> None:
-    """Save a prompt to the appropriate logging directory."""
-    # Extract slash command from prompt
-    match = re.match(r"^(/\w+)", prompt)
-    if not match:
-        return
-
-    slash_command = match.group(1)
-    # Remove leading slash for filename
-    command_name = slash_command[1:]
-
-    # Create directory structure at project root (parent of adws)
-    # __file__ is in adws/adw_modules/, so we need to go up 3 levels to get to project root
-    project_root = os.path.dirname(
-        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    )
-    prompt_dir = os.path.join(project_root, "agents", adw_id, agent_name, "prompts")
-    os.makedirs(prompt_dir, exist_ok=True)
-
-    # Save prompt to file
-    prompt_file = os.path.join(prompt_dir, f"{command_name}.txt")
-    with open(prompt_file, "w") as f:
-        f.write(prompt)
-
-
 def prompt_claude_code_with_retry(
     request: AgentPromptRequest,
     max_retries: int = 3,
-    retry_delays: List[int] = None,
+    retry_delays: Optional[List[int]] = None,
+    policy: Optional[RetryPolicy] = None,
 ) -> AgentPromptResponse:
     """Execute Claude Code with retry logic for certain error types.
 
     Args:
         request: The prompt request configuration
         max_retries: Maximum number of retry attempts (default: 3)
-        retry_delays: List of delays in seconds between retries (default: [1, 3, 5])
+        retry_delays: Optional fixed delays in seconds between retries. When
+            omitted, jittered exponential backoff is used.
+        policy: Optional RetryPolicy; overrides max_retries and retry_delays
 
     Returns:
         AgentPromptResponse with output and retry code
     """
-    if retry_delays is None:
-        retry_delays = [1, 3, 5]
+    if policy is None:
+        policy = RetryPolicy(max_retries=max_retries, fixed_delays=retry_delays)
+
+    class_attempts: Counter = Counter()
+    total_retries = 0
+    retry_number = 0
+    attempt_request = request
+    mode = "initial"
+    archived_transcripts: List[str] = []
+
+    while True:
+        # Fail fast while the API is degraded instead of piling on
+        if not circuit_breaker.allow_request():
+            retry_metrics.record_circuit_rejection()
+            return AgentPromptResponse(
+                output="Claude Code error: circuit breaker open - API degraded, skipping call",
+                success=False,
+                session_id=None,
+                retry_code=RetryCode.OVERLOADED_ERROR,
+            )
+
+        retry_metrics.record_attempt(is_first=retry_number == 0)
+        attempt_start = time.monotonic()
+        response = prompt_claude_code(attempt_request)
+        attempt_seconds = time.monotonic() - attempt_start
+        metrics.AGENT_CALL_DURATION.observe(
+            attempt_seconds,
+            slash_command=request.slash_command or "",
+            model=attempt_request.model,
+        )
+        metrics.dump_process_metrics()
+        circuit_breaker.record_result(response.success, response.retry_code)
+        record_agent_call(
+            attempt_request,
+            response,
+            attempt=retry_number + 1,
+            wall_ms=int(attempt_seconds * 1000),
+        )
 
-    # Ensure we have enough delays for max_retries
-    while len(retry_delays) < max_retries:
-        retry_delays.append(retry_delays[-1] + 2)  # Add incrementing delays
+        lineage = {
+            "attempt": retry_number + 1,
+            "mode": mode,
+            "resumed_from": attempt_request.resume_session_id,
+            "session_id": response.session_id,
+            "retry_code": response.retry_code.value,
+            "success": response.success,
+            "transcript": request.output_file,
+        }
+
+        # Success or non-retryable error
+        if response.success or response.retry_code == RetryCode.NONE:
+            record_lineage(request.output_file, lineage)
+            return response
+
+        class_attempts[response.retry_code] += 1
+        if not policy.should_retry(response.retry_code, class_attempts, total_retries):
+            record_lineage(request.output_file, lineage)
+            retry_metrics.record_give_up(response.retry_code)
+            return response
 
-    last_response = None
+        # Keep the failed transcript; the retry writes a fresh raw_output.jsonl
+        archived = archive_attempt(request.output_file, retry_number + 1)
+        lineage["transcript"] = archived
+        record_lineage(request.output_file, lineage)
+        if archived:
+            archived_transcripts.append(archived)
 
-    for attempt in range(max_retries + 1):  # +1 for initial attempt
-        if attempt > 0:
-            # This is a retry
-            delay = retry_delays[attempt - 1]
+        attempt_request, mode = build_retry_request(
+            request, attempt_request, response, archived_transcripts
+        )
+
+        delay = policy.get_delay(
+            response.retry_code, retry_number, response.retry_after_seconds
+        )
+        logger.info(
+            f"Retrying {request.agent_name} after {response.retry_code.value} "
+            f"in {delay:.1f}s (retry {retry_number + 1}, {mode})"
+        )
+        retry_metrics.record_retry(response.retry_code, delay)
+        metrics.AGENT_RETRIES.inc(retry_code=response.retry_code.value)
+        # Recorded backoff was spent waiting on the API; replays skip it
+        if get_agent_mode() != "replay":
             time.sleep(delay)
 
-        response = prompt_claude_code(request)
-        last_response = response
+        retry_number += 1
+        if response.retry_code not in (
+            RetryCode.RATE_LIMIT_ERROR,
+            RetryCode.OVERLOADED_ERROR,
+        ):
+            total_retries += 1
 
-        # Check if we should retry based on the retry code
-        if response.success or response.retry_code == RetryCode.NONE:
-            # Success or non-retryable error
-            return response
 
-        # Check if this is a retryable error
-        if response.retry_code in [
-            RetryCode.CLAUDE_CODE_ERROR,
-            RetryCode.TIMEOUT_ERROR,
-            RetryCode.EXECUTION_ERROR,
-            RetryCode.ERROR_DURING_EXECUTION,
-        ]:
-            if attempt < max_retries:
-                continue
-            else:
-                return response
+def build_retry_request(
+    original: AgentPromptRequest,
+    failed: AgentPromptRequest,
+    response: AgentPromptResponse,
+    transcripts: List[str],
+) -> Tuple[AgentPromptRequest, str]:
+    """Build the request for the next attempt after a failure.
 
-    # Should not reach here, but return last response just in case
-    return last_response
+    Resumes the failed session when it has a session_id. If it has none, or
+    resuming just failed, the original prompt is re-run with a compact summary
+    of the work found in `transcripts` (archived failed attempts, oldest first).
+
+    Returns:
+        Tuple of (next_request, mode) where mode is "resume", "summary" or "initial"
+    """
+    session_id = response.session_id
+    if not session_id and transcripts:
+        session_id = extract_session_id(transcripts[-1])
+
+    # A resume that never started a session (e.g. unknown session_id) won't
+    # work the second time either
+    resume_failed = failed.resume_session_id is not None and (
+        not session_id or "no conversation found" in response.output.lower()
+    )
+    if resume_sessions_enabled() and session_id and not resume_failed:
+        return (
+            original.model_copy(
+                update={"prompt": RESUME_PROMPT, "resume_session_id": session_id}
+            ),
+            "resume",
+        )
+
+    # Summarize the most recent attempt that actually did some work
+    summary = ""
+    for transcript in reversed(transcripts):
+        summary = summarize_transcript(transcript)
+        if summary:
+            break
+    if not summary:
+        return original, "initial"
+
+    prompt = (
+        f"{original.prompt}\n\n"
+        "NOTE: A previous attempt at this task was interrupted. Work already "
+        "completed is summarized below - verify it rather than redoing it.\n\n"
+        f"{summary}"
+    )
+    return original.model_copy(update={"prompt": prompt}), "summary"
 
 
 def prompt_claude_code(request: AgentPromptRequest) -> AgentPromptResponse:
-    """Execute Claude Code with the given prompt configuration."""
+    """Execute Claude Code with the given prompt configuration.
+
+    The call runs on the backend configured for its slash command (CLI, SDK
+    or fake; see agent_backends.py). ADW_AGENT_MODE=record stores each
+    session for later replay; replay serves recorded sessions instead of
+    calling the agent (see recording.py).
+    """
+    mode = get_agent_mode()
+    if mode == "replay":
+        response = replay_session(request)
+        if os.path.exists(request.output_file):
+            convert_jsonl_to_json(request.output_file)
+        return response
+    backend = get_backend(get_slash_command(request))
+    if mode == "record":
+        return record_session(request, backend.run)
+    return backend.run(request)
+
+
+async def prompt_claude_code_async(request: AgentPromptRequest) -> AgentPromptResponse:
+    """prompt_claude_code for async callers; the SDK backend runs natively on their loop."""
+    import asyncio
+
+    if get_agent_mode() != "live":
+        return await asyncio.to_thread(prompt_claude_code, request)
+    return await get_backend(get_slash_command(request)).run_async(request)
+
+
+def run_claude_code(request: AgentPromptRequest) -> AgentPromptResponse:
+    """Run the Claude Code CLI for one prompt and parse its result."""
 
     # Check if Claude Code CLI is installed
     error_msg = check_claude_installed()
@@ -314,44 +628,69 @@ def prompt_claude_code(request: AgentPromptRequest) -> AgentPromptResponse:
             retry_code=RetryCode.NONE,  # Installation error is not retryable
         )
 
-    # Save prompt before execution
-    save_prompt(request.prompt, request.adw_id, request.agent_name)
+    # Build command - always use stream-json format and verbose. The prompt
+    # follows -p on argv or arrives on stdin, depending on its size
+    flags = ["--model", request.model]
+    flags.extend(["--output-format", "stream-json"])
+    flags.append("--verbose")
 
-    # Create output directory if needed
-    output_dir = os.path.dirname(request.output_file)
-    if output_dir:
-        os.makedirs(output_dir, exist_ok=True)
+    # Continue an interrupted session rather than starting over
+    if request.resume_session_id:
+        flags.extend(["--resume", request.resume_session_id])
 
-    # Build command - always use stream-json format and verbose
-    cmd = [CLAUDE_PATH, "-p", request.prompt]
-    cmd.extend(["--model", request.model])
-    cmd.extend(["--output-format", "stream-json"])
-    cmd.append("--verbose")
-    
     # Check for MCP config in working directory
     if request.working_dir:
         mcp_config_path = os.path.join(request.working_dir, ".mcp.json")
         if os.path.exists(mcp_config_path):
-            cmd.extend(["--mcp-config", mcp_config_path])
+            flags.extend(["--mcp-config", mcp_config_path])
 
     # Add dangerous skip permissions flag if enabled
     if request.dangerously_skip_permissions:
-        cmd.append("--dangerously-skip-permissions")
+        flags.append("--dangerously-skip-permissions")
 
     # Set up environment with only required variables
     env = get_claude_env()
 
+    timeout = request.timeout_seconds
+    if timeout is None:
+        match = re.match(r"^(/\w+)", request.prompt)
+        timeout = get_timeout_for_slash_command(match.group(1) if match else None)
+    idle_timeout = get_idle_timeout()
+
     try:
-        # Open output file for streaming
-        with open(request.output_file, "w") as output_f:
-            # Execute Claude Code and stream output to file
-            result = subprocess.run(
-                cmd,
-                stdout=output_f,  # Stream directly to file
-                stderr=subprocess.PIPE,
-                text=True,
+        with open_prompt_transport(request.prompt) as transport:
+            # The transcript starts with the prompt; the CLI's JSONL follows it
+            record_prompt(request.output_file, request.prompt, transport.name)
+
+            # Stream output to file under the supervisor so a hung CLI can't block the phase
+            memory_limit_mb, cpu_limit_seconds = get_resource_limits()
+            result = run_supervised(
+                [get_claude_path(), "-p", *transport.argv, *flags],
+                request.output_file,
                 env=env,
                 cwd=request.working_dir,  # Use working_dir if provided
+                timeout=timeout,
+                idle_timeout=idle_timeout,
+                memory_limit_mb=memory_limit_mb,
+                cpu_limit_seconds=cpu_limit_seconds,
+                stdin=transport.stdin,
+                input_text=transport.input_text,
+                append=True,
+            )
+
+        if result.killed:
+            if result.kill_reason == "inactivity":
+                error_msg = (
+                    f"Error: Claude Code killed after {idle_timeout}s without output"
+                )
+            else:
+                error_msg = f"Error: Claude Code command timed out after {timeout}s"
+            # Retryable; the partial transcript lets the retry resume the session
+            return AgentPromptResponse(
+                output=error_msg,
+                success=False,
+                session_id=extract_session_id(request.output_file),
+                retry_code=RetryCode.TIMEOUT_ERROR,
             )
 
         if result.returncode == 0:
@@ -363,35 +702,7 @@ def prompt_claude_code(request: AgentPromptRequest) -> AgentPromptResponse:
             json_file = convert_jsonl_to_json(request.output_file)
 
             if result_message:
-                # Extract session_id from result message
-                session_id = result_message.get("session_id")
-
-                # Check if there was an error in the result
-                is_error = result_message.get("is_error", False)
-                subtype = result_message.get("subtype", "")
-
-                # Handle error_during_execution case where there's no result field
-                if subtype == "error_during_execution":
-                    error_msg = "Error during execution: Agent encountered an error and did not return a result"
-                    return AgentPromptResponse(
-                        output=error_msg,
-                        success=False,
-                        session_id=session_id,
-                        retry_code=RetryCode.ERROR_DURING_EXECUTION,
-                    )
-
-                result_text = result_message.get("result", "")
-
-                # For error cases, truncate the output to prevent JSONL blobs
-                if is_error and len(result_text) > 1000:
-                    result_text = truncate_output(result_text, max_length=800)
-
-                return AgentPromptResponse(
-                    output=result_text,
-                    success=not is_error,
-                    session_id=session_id,
-                    retry_code=RetryCode.NONE,  # No retry needed for successful or non-retryable errors
-                )
+                return response_from_result_message(result_message)
             else:
                 # No result message found, try to extract meaningful error
                 error_msg = "No result message found in Claude Code output"
@@ -425,7 +736,7 @@ def prompt_claude_code(request: AgentPromptRequest) -> AgentPromptResponse:
                 return AgentPromptResponse(
                     output=truncate_output(error_msg, max_length=800),
                     success=False,
-                    session_id=None,
+                    session_id=extract_session_id(request.output_file),
                     retry_code=RetryCode.NONE,
                 )
         else:
@@ -435,6 +746,9 @@ def prompt_claude_code(request: AgentPromptRequest) -> AgentPromptResponse:
             # Try to read the output file to check for errors in stdout
             stdout_msg = ""
             error_from_jsonl = None
+            # Only CLI-reported errors drive the retry code; assistant prose
+            # is shown to the user but never classified
+            cli_error = ""
             try:
                 if os.path.exists(request.output_file):
                     # Parse JSONL to find error message
@@ -443,6 +757,7 @@ def prompt_claude_code(request: AgentPromptRequest) -> AgentPromptResponse:
                     if result_message and result_message.get("is_error"):
                         # Found error in result message
                         error_from_jsonl = result_message.get("result", "Unknown error")
+                        cli_error = str(error_from_jsonl)
                     elif messages:
                         # Look for error in last few messages
                         for msg in reversed(messages[-5:]):
@@ -462,7 +777,11 @@ def prompt_claude_code(request: AgentPromptRequest) -> AgentPromptResponse:
                     # If no structured error found, get last line only
                     if not error_from_jsonl:
                         with open(request.output_file, "r") as f:
-                            lines = f.readlines()
+                            # Skip the prompt line recorded before the CLI started
+                            lines = [
+                                line for line in f
+                                if not line.startswith('{"type": "prompt"')
+                            ]
                             if lines:
                                 # Just get the last line instead of entire file
                                 stdout_msg = lines[-1].strip()[
@@ -482,22 +801,21 @@ def prompt_claude_code(request: AgentPromptRequest) -> AgentPromptResponse:
             else:
                 error_msg = f"Claude Code error: Command failed with exit code {result.returncode}"
 
+            # Rate limits / overloads back off longer; bad args are not retried
+            retry_code, retry_after = classify_failure(
+                f"{stderr_msg}\n{cli_error}".strip()
+            )
+
             # Always truncate error messages to prevent huge outputs
+            # The partial transcript still identifies the session for --resume
             return AgentPromptResponse(
                 output=truncate_output(error_msg, max_length=800),
                 success=False,
-                session_id=None,
-                retry_code=RetryCode.CLAUDE_CODE_ERROR,
+                session_id=extract_session_id(request.output_file),
+                retry_code=retry_code,
+                retry_after_seconds=retry_after,
             )
 
-    except subprocess.TimeoutExpired:
-        error_msg = "Error: Claude Code command timed out after 5 minutes"
-        return AgentPromptResponse(
-            output=error_msg,
-            success=False,
-            session_id=None,
-            retry_code=RetryCode.TIMEOUT_ERROR,
-        )
     except Exception as e:
         error_msg = f"Error executing Claude Code: {e}"
         return AgentPromptResponse(
@@ -514,6 +832,7 @@ def execute_template(request: AgentTemplateRequest) -> AgentPromptResponse:
     This function automatically selects the appropriate model based on:
     1. The slash command being executed
     2. The model_set stored in the ADW state (base or heavy)
+    3. For the base set, earlier attempts and cost history (see model_router)
 
     Example:
         request = AgentTemplateRequest(
@@ -527,8 +846,9 @@ def execute_template(request: AgentTemplateRequest) -> AgentPromptResponse:
         response = execute_template(request)
     """
     # Get the appropriate model for this request
-    mapped_model = get_model_for_slash_command(request)
-    request = request.model_copy(update={"model": mapped_model})
+    input_fingerprint = fingerprint_args(request.slash_command, request.args)
+    model = select_model(request, input_fingerprint)
+    request = request.model_copy(update={"model": model})
 
     # Construct prompt from slash command and args
     prompt = f"{request.slash_command} {' '.join(request.args)}"
@@ -555,7 +875,24 @@ def execute_template(request: AgentTemplateRequest) -> AgentPromptResponse:
         dangerously_skip_permissions=True,
         output_file=output_file,
         working_dir=request.working_dir,  # Pass through working_dir
+        # Set explicitly so resumed retries (no slash command) keep the same limit
+        timeout_seconds=get_timeout_for_slash_command(request.slash_command),
+        slash_command=request.slash_command,
+        input_fingerprint=input_fingerprint,
     )
 
     # Execute with retry logic and return response (prompt_claude_code now handles all parsing)
-    return prompt_claude_code_with_retry(prompt_request)
+    with start_span(
+        f"agent:{request.slash_command}",
+        adw_id=request.adw_id,
+        agent_name=request.agent_name,
+        model=request.model,
+    ) as span:
+        with profile_scope(request.adw_id, request.agent_name, scope="agent"):
+            response = prompt_claude_code_with_retry(prompt_request)
+        span.set_attribute("session_id", response.session_id)
+        span.set_attribute("total_cost_usd", response.total_cost_usd)
+        span.set_attribute("num_turns", response.num_turns)
+        if not response.success:
+            span.set_error(response.retry_code.value)
+        return response
@@ -0,0 +1,369 @@
+"""Backends that run one agent prompt for prompt_claude_code.
+
+- cli (default): the `claude` CLI under the supervisor, streaming JSONL to
+  the transcript file (agent.run_claude_code)
+- sdk: the claude-code-sdk package (ai_docs/claude_code_sdk.md). Messages
+  are consumed in-process as they stream, so the response is built without
+  re-reading the transcript, and calls share one event loop. Also usable
+  from async code through run_async. Needs `pip install claude-code-sdk`;
+  without it, calls routed to sdk fall back to the CLI.
+- fake: scripted outputs with no process at all, for tests
+
+Every backend writes the same transcript to request.output_file (the
+prompt, then stream-json messages), so retries, lineage, accounting and
+recording work unchanged.
+
+The backend is chosen per slash command: SLASH_COMMAND_BACKEND_MAP, then
+ADW_AGENT_BACKENDS ("/classify_issue=sdk,/commit=cli"), and ADW_AGENT_BACKEND
+forces one backend for every call.
+"""
+
+import os
+import re
+import json
+import time
+import logging
+import threading
+import dataclasses
+import importlib.util
+from typing import Any, Callable, Dict, Final, List, Optional, Union
+
+from .data_types import AgentPromptRequest, AgentPromptResponse, RetryCode, SlashCommand
+
+logger = logging.getLogger(__name__)
+
+AGENT_BACKEND_ENV = "ADW_AGENT_BACKEND"
+AGENT_BACKENDS_ENV = "ADW_AGENT_BACKENDS"
+# JSON file of {"/slash_command": "output"} served by the fake backend
+FAKE_RESPONSES_ENV = "ADW_FAKE_AGENT_RESPONSES"
+
+# Short, high-frequency commands go in-process first
+SLASH_COMMAND_BACKEND_MAP: Final[Dict[SlashCommand, str]] = {
+    "/classify_issue": "sdk",
+    "/generate_branch_name": "sdk",
+}
+DEFAULT_BACKEND = "cli"
+
+# SDK content block classes -> stream-json block types
+SDK_BLOCK_TYPES = {
+    "TextBlock": "text",
+    "ThinkingBlock": "thinking",
+    "ToolUseBlock": "tool_use",
+    "ToolResultBlock": "tool_result",
+}
+
+
+def get_slash_command(request: AgentPromptRequest) -> Optional[str]:
+    """The request's slash command, or the one its prompt starts with."""
+    if request.slash_command:
+        return request.slash_command
+    match = re.match(r"^(/\w+)", request.prompt)
+    return match.group(1) if match else None
+
+
+def parse_backend_overrides(value: str) -> Dict[str, str]:
+    """Parse "/classify_issue=sdk,/commit=cli" into a command -> backend map."""
+    overrides = {}
+    for item in value.split(","):
+        command, _, backend = item.strip().partition("=")
+        if command and backend:
+            overrides[command.strip()] = backend.strip().lower()
+    return overrides
+
+
+def get_backend_name(slash_command: Optional[str]) -> str:
+    """Backend configured for a slash command (read per call)."""
+    forced = os.getenv(AGENT_BACKEND_ENV, "").lower()
+    if forced:
+        return forced
+    overrides = parse_backend_overrides(os.getenv(AGENT_BACKENDS_ENV, ""))
+    if slash_command in overrides:
+        return overrides[slash_command]
+    return SLASH_COMMAND_BACKEND_MAP.get(slash_command, DEFAULT_BACKEND)
+
+
+class AgentBackend:
+    """Runs one prompt and returns its response; subclasses implement run."""
+
+    name = ""
+
+    def run(self, request: AgentPromptRequest) -> AgentPromptResponse:
+        raise NotImplementedError
+
+    async def run_async(self, request: AgentPromptRequest) -> AgentPromptResponse:
+        """Run without blocking the event loop (on a thread unless overridden)."""
+        import asyncio
+
+        return await asyncio.to_thread(self.run, request)
+
+
+class CLIBackend(AgentBackend):
+    """The `claude` CLI in a supervised subprocess."""
+
+    name = "cli"
+
+    def run(self, request: AgentPromptRequest) -> AgentPromptResponse:
+        # Import here to avoid circular imports
+        from . import agent
+
+        return agent.run_claude_code(request)
+
+
+def sdk_message_to_dict(message: Any, session_id: Optional[str]) -> Dict[str, Any]:
+    """Convert a claude-code-sdk message to its stream-json transcript line."""
+    kind = type(message).__name__
+    fields = dataclasses.asdict(message) if dataclasses.is_dataclass(message) else dict(vars(message))
+    if kind == "SystemMessage":
+        return {"type": "system", "subtype": fields.get("subtype"), **(fields.get("data") or {})}
+    if kind == "ResultMessage":
+        return {"type": "result", **fields}
+
+    content = getattr(message, "content", "")
+    if isinstance(content, list):
+        content = [
+            {
+                "type": SDK_BLOCK_TYPES.get(type(block).__name__, type(block).__name__),
+                **(dataclasses.asdict(block) if dataclasses.is_dataclass(block) else dict(vars(block))),
+            }
+            for block in content
+        ]
+    role = "assistant" if kind == "AssistantMessage" else "user"
+    entry: Dict[str, Any] = {"type": role, "message": {"role": role, "content": content}}
+    if fields.get("model"):
+        entry["message"]["model"] = fields["model"]
+    entry["session_id"] = session_id
+    return entry
+
+
+class SDKBackend(AgentBackend):
+    """claude-code-sdk, streamed in-process on a shared event loop."""
+
+    name = "sdk"
+
+    def __init__(self):
+        self._loop = None
+        self._loop_lock = threading.Lock()
+
+    @staticmethod
+    def available() -> bool:
+        return importlib.util.find_spec("claude_code_sdk") is not None
+
+    def _get_loop(self):
+        """One background event loop for all sync callers."""
+        import asyncio
+
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever, name="agent-sdk", daemon=True
+                ).start()
+        return self._loop
+
+    def run(self, request: AgentPromptRequest) -> AgentPromptResponse:
+        import asyncio
+
+        return asyncio.run_coroutine_threadsafe(
+            self.run_async(request), self._get_loop()
+        ).result()
+
+    def build_options(self, request: AgentPromptRequest):
+        from claude_code_sdk import ClaudeCodeOptions
+
+        # Import here to avoid circular imports
+        from . import agent
+
+        # Launch the same CLI with the same filtered environment as the CLI backend
+        options: Dict[str, Any] = {
+            "model": request.model,
+            "env": agent.get_claude_env(),
+            "cli_path": agent.get_claude_path(),
+        }
+        if request.working_dir:
+            options["cwd"] = request.working_dir
+            mcp_config_path = os.path.join(request.working_dir, ".mcp.json")
+            if os.path.exists(mcp_config_path):
+                options["mcp_servers"] = mcp_config_path
+        if request.dangerously_skip_permissions:
+            options["permission_mode"] = "bypassPermissions"
+        if request.resume_session_id:
+            options["resume"] = request.resume_session_id
+        return ClaudeCodeOptions(**options)
+
+    async def run_async(self, request: AgentPromptRequest) -> AgentPromptResponse:
+        import asyncio
+
+        # Import here to avoid circular imports
+        from . import agent
+        from .retry_policy import classify_failure
+        from .transcript import extract_session_id, record_prompt
+
+        try:
+            from claude_code_sdk import query
+        except ImportError:
+            return AgentPromptResponse(
+                output="Error: claude-code-sdk is not installed (pip install claude-code-sdk)",
+                success=False,
+                retry_code=RetryCode.NONE,
+            )
+
+        record_prompt(request.output_file, request.prompt, self.name)
+        timeout = request.timeout_seconds or agent.get_timeout_for_slash_command(
+            get_slash_command(request)
+        )
+        deadline = time.monotonic() + timeout
+        idle_timeout = agent.get_idle_timeout()
+
+        result_message: Optional[Dict[str, Any]] = None
+        session_id: Optional[str] = None
+        stream = query(prompt=request.prompt, options=self.build_options(request))
+        try:
+            with open(request.output_file, "a") as transcript:
+                while True:
+                    # Same limits as the CLI supervisor: wall clock and silence
+                    wait = min(idle_timeout, deadline - time.monotonic())
+                    try:
+                        message = await asyncio.wait_for(stream.__anext__(), max(wait, 0))
+                    except StopAsyncIteration:
+                        break
+                    entry = sdk_message_to_dict(message, session_id)
+                    session_id = entry.get("session_id") or session_id
+                    transcript.write(json.dumps(entry, default=str) + "\n")
+                    transcript.flush()
+                    if entry["type"] == "result":
+                        result_message = entry
+        except asyncio.TimeoutError:
+            if time.monotonic() >= deadline:
+                error_msg = f"Error: Claude Code command timed out after {timeout}s"
+            else:
+                error_msg = f"Error: Claude Code killed after {idle_timeout}s without output"
+            return AgentPromptResponse(
+                output=error_msg,
+                success=False,
+                session_id=extract_session_id(request.output_file),
+                retry_code=RetryCode.TIMEOUT_ERROR,
+            )
+        except Exception as e:
+            # ProcessError carries the CLI's stderr; classify it like the CLI path
+            detail = f"{e}\n{getattr(e, 'stderr', '') or ''}"
+            retry_code, retry_after = classify_failure(detail)
+            return AgentPromptResponse(
+                output=agent.truncate_output(f"Claude Code error: {e}", max_length=800),
+                success=False,
+                session_id=session_id,
+                retry_code=retry_code,
+                retry_after_seconds=retry_after,
+            )
+        finally:
+            try:
+                await stream.aclose()
+            except Exception:
+                pass
+
+        agent.convert_jsonl_to_json(request.output_file)
+        if result_message is None:
+            return AgentPromptResponse(
+                output="No result message found in Claude Code output",
+                success=False,
+                session_id=session_id,
+                retry_code=RetryCode.NONE,
+            )
+        return agent.response_from_result_message(result_message)
+
+
+FakeResponse = Union[str, AgentPromptResponse, Callable[[AgentPromptRequest], Any]]
+
+
+class FakeBackend(AgentBackend):
+    """Serves scripted outputs per slash command and records the requests.
+
+    responses maps a slash command to an output string, an AgentPromptResponse,
+    or a callable returning either. Unlisted commands get default.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        responses: Optional[Dict[str, FakeResponse]] = None,
+        default: str = "",
+    ):
+        if responses is None and os.getenv(FAKE_RESPONSES_ENV):
+            with open(os.environ[FAKE_RESPONSES_ENV]) as f:
+                responses = json.load(f)
+        self.responses: Dict[str, FakeResponse] = responses or {}
+        self.default = default
+        self.calls: List[AgentPromptRequest] = []
+        self._lock = threading.Lock()
+
+    def run(self, request: AgentPromptRequest) -> AgentPromptResponse:
+        with self._lock:
+            self.calls.append(request)
+            session_id = f"fake-{len(self.calls)}"
+        response = self.responses.get(get_slash_command(request), self.default)
+        if callable(response):
+            response = response(request)
+        if not isinstance(response, AgentPromptResponse):
+            response = AgentPromptResponse(
+                output=str(response),
+                success=True,
+                session_id=session_id,
+                total_cost_usd=0.0,
+                num_turns=1,
+            )
+
+        # Import here to avoid circular imports
+        from .agent import convert_jsonl_to_json
+        from .transcript import record_prompt
+
+        record_prompt(request.output_file, request.prompt, self.name)
+        with open(request.output_file, "a") as f:
+            for entry in (
+                {"type": "system", "subtype": "init", "session_id": response.session_id,
+                 "model": request.model},
+                {"type": "assistant", "session_id": response.session_id,
+                 "message": {"role": "assistant", "content": [{"type": "text", "text": response.output}]}},
+                {"type": "result", "subtype": "success", "is_error": not response.success,
+                 "result": response.output, "session_id": response.session_id,
+                 "num_turns": response.num_turns, "total_cost_usd": response.total_cost_usd},
+            ):
+                f.write(json.dumps(entry) + "\n")
+        convert_jsonl_to_json(request.output_file)
+        return response
+
+
+BACKEND_FACTORIES: Dict[str, Callable[[], AgentBackend]] = {
+    "cli": CLIBackend,
+    "sdk": SDKBackend,
+    "fake": FakeBackend,
+}
+
+# One instance per backend name, so the SDK's event loop is reused
+_backends: Dict[str, AgentBackend] = {}
+_backends_lock = threading.Lock()
+_warned_sdk_missing = False
+
+
+def register_backend(name: str, backend: AgentBackend) -> None:
+    """Use backend for name (e.g. a configured FakeBackend in tests)."""
+    with _backends_lock:
+        _backends[name] = backend
+
+
+def get_backend(slash_command: Optional[str] = None) -> AgentBackend:
+    """Backend for a slash command, falling back to the CLI when the SDK is missing."""
+    global _warned_sdk_missing
+
+    name = get_backend_name(slash_command)
+    if name not in BACKEND_FACTORIES and name not in _backends:
+        logger.warning(f"Unknown agent backend {name!r} for {slash_command}, using {DEFAULT_BACKEND}")
+        name = DEFAULT_BACKEND
+    with _backends_lock:
+        if name == "sdk" and "sdk" not in _backends and not SDKBackend.available():
+            if not _warned_sdk_missing:
+                logger.info("claude-code-sdk is not installed; sdk agent calls use the CLI")
+                _warned_sdk_missing = True
+            name = DEFAULT_BACKEND
+        if name not in _backends:
+            _backends[name] = BACKEND_FACTORIES[name]()
+        return _backends[name]
@@ -1,7 +1,7 @@
 """Data types for GitHub API responses and Claude Code agent."""
 
 from datetime import datetime
-from typing import Optional, List, Literal
+from typing import Any, Dict, Optional, List, Literal
 from pydantic import BaseModel, Field
 from enum import Enum
 
@@ -14,6 +14,8 @@ class RetryCode(str, Enum):
     TIMEOUT_ERROR = "timeout_error"  # Command timed out
     EXECUTION_ERROR = "execution_error"  # Error during execution
     ERROR_DURING_EXECUTION = "error_during_execution"  # Agent encountered an error
+    RATE_LIMIT_ERROR = "rate_limit_error"  # API rate limited the request (429)
+    OVERLOADED_ERROR = "overloaded_error"  # API overloaded or unavailable (529/503)
     NONE = "none"  # No retry needed
 
 
@@ -154,6 +156,19 @@ class AgentPromptRequest(BaseModel):
     dangerously_skip_permissions: bool = False
     output_file: str
     working_dir: Optional[str] = None
+    resume_session_id: Optional[str] = None  # Continue a previous session (--resume)
+    timeout_seconds: Optional[int] = None  # Wall-clock limit; None = command default
+    slash_command: Optional[str] = None  # For accounting; None = parsed from prompt
+    input_fingerprint: Optional[str] = None  # Identifies "the same input" across calls
+
+
+class TokenUsage(BaseModel):
+    """Token counts from a Claude Code result message."""
+
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cache_read_input_tokens: int = 0
 
 
 class AgentPromptResponse(BaseModel):
@@ -163,6 +178,13 @@ class AgentPromptResponse(BaseModel):
     success: bool
     session_id: Optional[str] = None
     retry_code: RetryCode = RetryCode.NONE
+    retry_after_seconds: Optional[float] = None  # Server-provided backoff hint
+    # Accounting from the result message (None when the session produced none)
+    total_cost_usd: Optional[float] = None
+    duration_ms: Optional[int] = None
+    duration_api_ms: Optional[int] = None
+    num_turns: Optional[int] = None
+    usage: Optional[TokenUsage] = None
 
 
 class AgentTemplateRequest(BaseModel):
@@ -188,6 +210,7 @@ class ClaudeCodeResultMessage(BaseModel):
     result: str
     session_id: str
     total_cost_usd: float
+    usage: Optional[TokenUsage] = None
 
 
 class TestResult(BaseModel):
@@ -198,6 +221,8 @@ class TestResult(BaseModel):
     execution_command: str
     test_purpose: str
     error: Optional[str] = None
+    duration_ms: Optional[int] = None
+    quarantined: bool = False  # Failing, but on the quarantine list: reported, not counted
 
 
 class E2ETestResult(BaseModel):
@@ -208,6 +233,8 @@ class E2ETestResult(BaseModel):
     test_path: str  # Path to the test file for re-execution
     screenshots: List[str] = []
     error: Optional[str] = None
+    duration_ms: Optional[int] = None
+    quarantined: bool = False  # Failing, but on the quarantine list: reported, not counted
 
     @property
     def passed(self) -> bool:
@@ -215,6 +242,73 @@ class E2ETestResult(BaseModel):
         return self.status == "passed"
 
 
+class PreparedScreenshot(BaseModel):
+    """A screenshot ready for upload (see screenshot_prep).
+
+    object_key and content_type always describe the file at upload_path:
+    compress() rewrites them when it falls back to the original file.
+    """
+
+    source_path: str
+    digest: str  # SHA-256 of the source file
+    object_key: str
+    content_type: str
+    upload_path: Optional[str] = None  # Set by compress(); temp file or source
+    original_bytes: int = 0
+    upload_bytes: int = 0
+
+
+class TestRunRecord(BaseModel):
+    """Single test outcome stored in the persistent test history.
+
+    Appended to agents/test_history.jsonl on every parsed test run.
+    """
+
+    test_name: str
+    kind: Literal["unit", "e2e"]
+    passed: bool
+    duration_ms: Optional[int] = None
+    commit: Optional[str] = None
+    # Hash of uncommitted changes on top of commit; None for a clean tree
+    tree: Optional[str] = None
+    adw_id: str
+    timestamp: str
+
+
+class AgentCallRecord(BaseModel):
+    """Cost and latency of one agent call attempt.
+
+    Appended to agents/cost_ledger.jsonl by every Claude Code call.
+    """
+
+    timestamp: str
+    adw_id: str
+    phase: str
+    agent_name: str
+    slash_command: Optional[str] = None
+    model: str
+    input_fingerprint: Optional[str] = None
+    attempt: int = 1
+    success: bool
+    retry_code: RetryCode = RetryCode.NONE
+    session_id: Optional[str] = None
+    total_cost_usd: float = 0.0
+    duration_ms: Optional[int] = None  # From the result message; None if killed
+    # Wall-clock time of the attempt, measured by the retry loop
+    wall_ms: Optional[int] = None
+    duration_api_ms: Optional[int] = None
+    num_turns: Optional[int] = None
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cache_read_input_tokens: int = 0
+
+    @property
+    def latency_ms(self) -> Optional[int]:
+        """Wall-clock latency, falling back to duration_ms for older records."""
+        return self.wall_ms if self.wall_ms is not None else self.duration_ms
+
+
 class ADWStateData(BaseModel):
     """Minimal persistent state for ADW workflow.
 
@@ -283,3 +377,51 @@ class ADWExtractionResult(BaseModel):
     def has_workflow(self) -> bool:
         """Check if a workflow command was extracted."""
         return self.workflow_command is not None
+
+
+class CheckResult(BaseModel):
+    """Individual health check result."""
+
+    success: bool
+    error: Optional[str] = None
+    warning: Optional[str] = None
+    details: Dict[str, Any] = {}
+    checked_at: Optional[str] = None  # When the check ran (ISO format)
+    duration_ms: Optional[int] = None
+
+
+class HealthCheckResult(BaseModel):
+    """Structure for health check results."""
+
+    success: bool
+    timestamp: str
+    checks: Dict[str, CheckResult]
+    warnings: List[str] = []
+    errors: List[str] = []
+
+
+class QueuedJob(BaseModel):
+    """A workflow run in the shared job queue (see job_queue.py).
+
+    Times are Unix timestamps; lease_expires_at is pushed forward by the
+    claiming worker's heartbeats.
+    """
+
+    id: int
+    workflow: str
+    issue_number: str
+    adw_id: str
+    args: List[str] = []
+    # ADW state at enqueue time, seeded on the worker that runs the job
+    state: Dict[str, Any] = {}
+    status: Literal["queued", "running", "succeeded", "failed"]
+    attempts: int = 0
+    max_attempts: int = 3
+    worker_id: Optional[str] = None
+    lease_expires_at: Optional[float] = None
+    enqueued_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    returncode: Optional[int] = None
+    error: Optional[str] = None
+    result: Dict[str, Any] = {}
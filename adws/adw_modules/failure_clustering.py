@@ -0,0 +1,156 @@
+"""Group failing tests that likely share a root cause.
+
+One renamed function can break many tests at once. Instead of one resolver
+session per failure, failures are clustered by a normalized error signature,
+the deepest stack frame, and (as a fallback) the test file, and each cluster
+is resolved in a single agent session.
+"""
+
+import re
+from typing import Dict, List, Optional
+
+from adw_modules.data_types import TestResult
+
+# Upper bound on failures handed to one resolver session
+MAX_CLUSTER_SIZE = 10
+
+# Error types too generic to group on by message alone
+WEAK_ERROR_TYPES = ("AssertionError", "assert", "Error: expect(")
+
+# Volatile fragments stripped from error messages before comparison
+_NORMALIZERS = [
+    (re.compile(r"0x[0-9a-fA-F]+"), "0x?"),
+    (re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"), "<uuid>"),
+    (re.compile(r"(/tmp|/var/folders)/\S+"), "<tmp>"),
+    (re.compile(r"line \d+"), "line ?"),
+    (re.compile(r":\d+(:\d+)?\b"), ":?"),
+    (re.compile(r"\b\d+(\.\d+)?m?s\b"), "<duration>"),
+    (re.compile(r"\d{4,}"), "<n>"),
+    (re.compile(r"\s+"), " "),
+]
+
+# Python: File "app/server/core.py", line 12, in load_data
+_PY_FRAME = re.compile(r'File "([^"]+)", line \d+, in (\S+)')
+# pytest short form: app/server/core.py:12: in load_data
+_PYTEST_FRAME = re.compile(r"^(\S+\.py):\d+: in (\S+)", re.MULTILINE)
+# JavaScript: at loadData (src/core.ts:12:5)
+_JS_FRAME = re.compile(r"at (\S+) \(([^():]+):\d+:\d+\)")
+# A file path inside an execution command, e.g. pytest tests/test_x.py::test_y
+_COMMAND_FILE = re.compile(r"([\w./-]+\.(?:py|ts|tsx|js|jsx))")
+
+
+def normalize_error(error: Optional[str]) -> str:
+    """Reduce an error message to its stable signature line.
+
+    Picks the last line that looks like an exception (`SomeError: ...`),
+    falling back to the first non-empty line, and strips volatile details.
+    """
+    if not error:
+        return ""
+
+    lines = [line.strip() for line in error.strip().splitlines() if line.strip()]
+    if not lines:
+        return ""
+
+    signature = lines[0]
+    for line in reversed(lines):
+        if re.match(r"^[\w.]*(Error|Exception)\b", line):
+            signature = line
+            break
+
+    for pattern, replacement in _NORMALIZERS:
+        signature = pattern.sub(replacement, signature)
+    return signature.strip()[:300]
+
+
+def extract_stack_frame(error: Optional[str]) -> Optional[str]:
+    """Return the deepest `file:function` frame found in the error, if any."""
+    if not error:
+        return None
+
+    frames = [f"{path}:{func}" for path, func in _PY_FRAME.findall(error)]
+    frames += [f"{path}:{func}" for path, func in _PYTEST_FRAME.findall(error)]
+    frames += [f"{path}:{func}" for func, path in _JS_FRAME.findall(error)]
+    if not frames:
+        return None
+
+    # Prefer frames outside test files - that's where a shared cause lives
+    non_test_frames = [frame for frame in frames if "test" not in frame.split(":")[0]]
+    return (non_test_frames or frames)[-1]
+
+
+def extract_test_file(test: TestResult) -> Optional[str]:
+    """Return the test file from the execution command, if present."""
+    match = _COMMAND_FILE.search(test.execution_command or "")
+    return match.group(1) if match else None
+
+
+def _is_weak_signature(signature: str) -> bool:
+    """Assertion failures differ per test; their message alone proves nothing."""
+    return not signature or signature.startswith(WEAK_ERROR_TYPES)
+
+
+def cluster_failed_tests(failed_tests: List[TestResult]) -> List[List[TestResult]]:
+    """Group failures that share an error signature, stack frame, or file.
+
+    Two failures land in the same cluster when they share a specific
+    (non-assertion) error signature or the same deepest stack frame. Failures
+    with neither are grouped by test file. Clusters keep the input order and
+    are split at MAX_CLUSTER_SIZE.
+    """
+    # Union-find over test indices
+    parent = list(range(len(failed_tests)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i: int, j: int) -> None:
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    first_index_by_key: Dict[str, int] = {}
+    for idx, test in enumerate(failed_tests):
+        signature = normalize_error(test.error)
+        frame = extract_stack_frame(test.error)
+
+        keys = []
+        if not _is_weak_signature(signature):
+            keys.append(f"sig:{signature}")
+        if frame:
+            keys.append(f"frame:{frame}")
+        if not keys:
+            test_file = extract_test_file(test)
+            if test_file:
+                keys.append(f"file:{test_file}")
+
+        for key in keys:
+            if key in first_index_by_key:
+                union(first_index_by_key[key], idx)
+            else:
+                first_index_by_key[key] = idx
+
+    clusters: Dict[int, List[TestResult]] = {}
+    for idx, test in enumerate(failed_tests):
+        clusters.setdefault(find(idx), []).append(test)
+
+    result = []
+    for root in sorted(clusters):
+        members = clusters[root]
+        for start in range(0, len(members), MAX_CLUSTER_SIZE):
+            result.append(members[start : start + MAX_CLUSTER_SIZE])
+    return result
+
+
+def describe_cluster(cluster: List[TestResult]) -> str:
+    """Short human-readable label for a cluster (its shared signature or frame)."""
+    first = cluster[0]
+    return (
+        normalize_error(first.error)
+        or extract_stack_frame(first.error)
+        or extract_test_file(first)
+        or first.test_name
+    )
@@ -3,18 +3,18 @@
 Provides centralized git operations that build on top of github.py module.
 """
 
-import subprocess
 import json
 import logging
 from typing import Optional, Tuple
 
 # Import GitHub functions from existing module
 from adw_modules.github import get_repo_url, extract_repo_path, make_issue_comment
+from adw_modules.tracing import traced_run
 
 
 def get_current_branch(cwd: Optional[str] = None) -> str:
     """Get current git branch name."""
-    result = subprocess.run(
+    result = traced_run(
         ["git", "rev-parse", "--abbrev-ref", "HEAD"],
         capture_output=True,
         text=True,
@@ -27,7 +27,7 @@ def push_branch(
     branch_name: str, cwd: Optional[str] = None
 ) -> Tuple[bool, Optional[str]]:
     """Push current branch to remote. Returns (success, error_message)."""
-    result = subprocess.run(
+    result = traced_run(
         ["git", "push", "-u", "origin", branch_name],
         capture_output=True,
         text=True,
@@ -47,7 +47,7 @@ def check_pr_exists(branch_name: str) -> Optional[str]:
     except Exception as e:
         return None
 
-    result = subprocess.run(
+    result = traced_run(
         [
             "gh",
             "pr",
@@ -74,14 +74,14 @@ def create_branch(
 ) -> Tuple[bool, Optional[str]]:
     """Create and checkout a new branch. Returns (success, error_message)."""
     # Create branch
-    result = subprocess.run(
+    result = traced_run(
         ["git", "checkout", "-b", branch_name], capture_output=True, text=True, cwd=cwd
     )
     if result.returncode != 0:
         # Check if error is because branch already exists
         if "already exists" in result.stderr:
             # Try to checkout existing branch
-            result = subprocess.run(
+            result = traced_run(
                 ["git", "checkout", branch_name],
                 capture_output=True,
                 text=True,
@@ -99,21 +99,21 @@ def commit_changes(
 ) -> Tuple[bool, Optional[str]]:
     """Stage all changes and commit. Returns (success, error_message)."""
     # Check if there are changes to commit
-    result = subprocess.run(
+    result = traced_run(
         ["git", "status", "--porcelain"], capture_output=True, text=True, cwd=cwd
     )
     if not result.stdout.strip():
         return True, None  # No changes to commit
 
     # Stage all changes
-    result = subprocess.run(
+    result = traced_run(
         ["git", "add", "-A"], capture_output=True, text=True, cwd=cwd
     )
     if result.returncode != 0:
         return False, result.stderr
 
     # Commit
-    result = subprocess.run(
+    result = traced_run(
         ["git", "commit", "-m", message], capture_output=True, text=True, cwd=cwd
     )
     if result.returncode != 0:
@@ -130,7 +130,7 @@ def get_pr_number(branch_name: str) -> Optional[str]:
     except Exception as e:
         return None
 
-    result = subprocess.run(
+    result = traced_run(
         [
             "gh",
             "pr",
@@ -162,7 +162,7 @@ def approve_pr(pr_number: str, logger: logging.Logger) -> Tuple[bool, Optional[s
     except Exception as e:
         return False, f"Failed to get repo info: {e}"
 
-    result = subprocess.run(
+    result = traced_run(
         [
             "gh",
             "pr",
@@ -201,7 +201,7 @@ def merge_pr(
         return False, f"Failed to get repo info: {e}"
 
     # First check if PR is mergeable
-    result = subprocess.run(
+    result = traced_run(
         [
             "gh",
             "pr",
@@ -241,7 +241,7 @@ def merge_pr(
         ["--body", "Merged by ADW Ship workflow after successful validation."]
     )
 
-    result = subprocess.run(merge_cmd, capture_output=True, text=True)
+    result = traced_run(merge_cmd, capture_output=True, text=True)
     if result.returncode != 0:
         return False, result.stderr
 
@@ -19,6 +19,7 @@ import os
 import json
 from typing import Dict, List, Optional
 from .data_types import GitHubIssue, GitHubIssueListItem, GitHubComment
+from .tracing import traced_run
 
 # Bot identifier to prevent webhook loops and filter bot comments
 ADW_BOT_IDENTIFIER = "[ADW-AGENTS]"
@@ -55,7 +56,7 @@ def get_github_env() -> Optional[dict]:
 def get_repo_url() -> str:
     """Get GitHub repository URL from git remote."""
     try:
-        result = subprocess.run(
+        result = traced_run(
             ["git", "remote", "get-url", "origin"],
             capture_output=True,
             text=True,
@@ -94,7 +95,7 @@ def fetch_issue(issue_number: str, repo_path: str) -> GitHubIssue:
     env = get_github_env()
 
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, env=env)
+        result = traced_run(cmd, capture_output=True, text=True, env=env)
 
         if result.returncode == 0:
             # Parse JSON response into Pydantic model
@@ -149,7 +150,7 @@ def make_issue_comment(issue_id: str, comment: str) -> None:
     env = get_github_env()
 
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, env=env)
+        result = traced_run(cmd, capture_output=True, text=True, env=env)
 
         if result.returncode == 0:
             print(f"Successfully posted comment to issue #{issue_id}")
@@ -183,7 +184,7 @@ def mark_issue_in_progress(issue_id: str) -> None:
     env = get_github_env()
 
     # Try to add label (may fail if label doesn't exist)
-    result = subprocess.run(cmd, capture_output=True, text=True, env=env)
+    result = traced_run(cmd, capture_output=True, text=True, env=env)
     if result.returncode != 0:
         print(f"Note: Could not add 'in_progress' label: {result.stderr}")
 
@@ -201,7 +202,7 @@ def mark_issue_in_progress(issue_id: str) -> None:
         "--add-assignee",
         "@me",
     ]
-    result = subprocess.run(cmd, capture_output=True, text=True, env=env)
+    result = traced_run(cmd, capture_output=True, text=True, env=env)
     if result.returncode == 0:
         print(f"Assigned issue #{issue_id} to self")
 
@@ -227,7 +228,7 @@ def fetch_open_issues(repo_path: str) -> List[GitHubIssueListItem]:
         env = get_github_env()
 
         # DEBUG level - not printing command
-        result = subprocess.run(
+        result = traced_run(
             cmd, capture_output=True, text=True, check=True, env=env
         )
 
@@ -261,7 +262,7 @@ def fetch_issue_comments(repo_path: str, issue_number: int) -> List[Dict]:
         # Set up environment with GitHub token if available
         env = get_github_env()
 
-        result = subprocess.run(
+        result = traced_run(
             cmd, capture_output=True, text=True, check=True, env=env
         )
         data = json.loads(result.stdout)
@@ -0,0 +1,470 @@
+"""Health checks for the ADW system.
+
+The individual checks used by adw_tests/health_check.py, plus a
+HealthMonitor that re-runs the cheap checks on a background thread and
+caches their results with per-check TTLs. Servers answer liveness and
+readiness probes from the cache; the expensive Claude Code prompt test only
+runs on demand through HealthMonitor.run_deep().
+"""
+
+import os
+import json
+import time
+import tempfile
+import threading
+import subprocess
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+
+from adw_modules.agent import get_claude_path
+from adw_modules.data_types import CheckResult, HealthCheckResult
+from adw_modules.github import get_repo_url, extract_repo_path
+from adw_modules.utils import get_safe_subprocess_env
+
+# Seconds a cached background check result stays fresh
+CHECK_TTLS = {
+    "environment": 300,
+    "git_repository": 300,
+    "github_cli": 120,
+    "claude_cli": 120,
+}
+
+# Seconds each check may run before it is reported as timed out
+CHECK_TIMEOUTS = {
+    "environment": 5,
+    "git_repository": 15,
+    "github_cli": 20,
+    "claude_cli": 15,
+    "claude_code": 45,
+}
+DEFAULT_CHECK_TIMEOUT = 30
+
+# Seconds between scheduler wake-ups of the background monitor
+MONITOR_INTERVAL = 5.0
+
+# Seconds a deep check result is reused before running it again
+DEEP_CHECK_MAX_AGE = 60.0
+
+
+def check_env_vars() -> CheckResult:
+    """Check required environment variables."""
+    required_vars = {
+        "ANTHROPIC_API_KEY": "Anthropic API Key for Claude Code",
+        "CLAUDE_CODE_PATH": "Path to Claude Code CLI (defaults to 'claude')",
+    }
+
+    optional_vars = {
+        "GITHUB_PAT": "(Optional) GitHub Personal Access Token - only needed if you want ADW to use a different GitHub account than 'gh auth login'",
+        "E2B_API_KEY": "(Optional) E2B API Key for sandbox environments",
+        "CLOUDFLARED_TUNNEL_TOKEN": "(Optional) Cloudflare tunnel token for webhook exposure",
+        "CLOUDFLARE_ACCOUNT_ID": "(Optional) Cloudflare account ID for R2 screenshot uploads",
+        "CLOUDFLARE_R2_ACCESS_KEY_ID": "(Optional) R2 access key ID for screenshot uploads",
+        "CLOUDFLARE_R2_SECRET_ACCESS_KEY": "(Optional) R2 secret access key for screenshot uploads",
+        "CLOUDFLARE_R2_BUCKET_NAME": "(Optional) R2 bucket name for screenshot storage",
+        "CLOUDFLARE_R2_PUBLIC_DOMAIN": "(Optional) Custom domain for public R2 access",
+    }
+
+    missing_required = []
+    missing_optional = []
+
+    # Check required vars
+    for var, desc in required_vars.items():
+        if not os.getenv(var):
+            if var == "CLAUDE_CODE_PATH":
+                # This has a default, so not critical
+                continue
+            missing_required.append(f"{var} ({desc})")
+
+    # Check optional vars
+    for var, desc in optional_vars.items():
+        if not os.getenv(var):
+            missing_optional.append(f"{var} ({desc})")
+
+    success = len(missing_required) == 0
+
+    return CheckResult(
+        success=success,
+        error="Missing required environment variables" if not success else None,
+        details={
+            "missing_required": missing_required,
+            "missing_optional": missing_optional,
+            "claude_code_path": get_claude_path(),
+        },
+    )
+
+
+def check_git_repo() -> CheckResult:
+    """Check git repository configuration using github module."""
+    try:
+        # Get repo URL using the github module function
+        repo_url = get_repo_url()
+        repo_path = extract_repo_path(repo_url)
+
+        # Check if still using disler's repo
+        is_disler_repo = "disler" in repo_path.lower()
+
+        return CheckResult(
+            success=True,
+            warning=(
+                "Repository still points to 'disler'. Please update to your own GitHub repository."
+                if is_disler_repo
+                else None
+            ),
+            details={
+                "repo_url": repo_url,
+                "repo_path": repo_path,
+                "is_disler_repo": is_disler_repo,
+            },
+        )
+    except ValueError as e:
+        return CheckResult(success=False, error=str(e))
+
+
+def check_claude_cli() -> CheckResult:
+    """Check the Claude Code CLI is installed, without sending a prompt."""
+    claude_path = get_claude_path()
+    try:
+        result = subprocess.run(
+            [claude_path, "--version"], capture_output=True, text=True, timeout=10
+        )
+    except FileNotFoundError:
+        return CheckResult(
+            success=False,
+            error=f"Claude Code CLI not found at '{claude_path}'. Please install or set CLAUDE_CODE_PATH correctly.",
+        )
+    except subprocess.TimeoutExpired:
+        return CheckResult(
+            success=False, error=f"Claude Code CLI at '{claude_path}' timed out"
+        )
+
+    if result.returncode != 0:
+        return CheckResult(
+            success=False,
+            error=f"Claude Code CLI not functional at '{claude_path}'",
+        )
+    return CheckResult(
+        success=True,
+        details={"claude_code_path": claude_path, "version": result.stdout.strip()},
+    )
+
+
+def check_claude_code() -> CheckResult:
+    """Test Claude Code CLI functionality."""
+    claude_path = get_claude_path()
+
+    # First check if Claude Code is installed
+    cli_check = check_claude_cli()
+    if not cli_check.success:
+        return cli_check
+
+    # Test with a simple prompt
+    test_prompt = "What is 2+2? Just respond with the number, nothing else."
+
+    # Prepare environment with filtered variables
+    env = get_safe_subprocess_env()
+
+    try:
+        # Create temporary file for output
+        with tempfile.NamedTemporaryFile(
+            mode="w", suffix=".jsonl", delete=False
+        ) as tmp:
+            output_file = tmp.name
+
+        # Run Claude Code
+        cmd = [
+            claude_path,
+            "-p",
+            test_prompt,
+            "--model",
+            "claude-3-5-haiku-20241022",
+            "--output-format",
+            "stream-json",
+            "--verbose",
+            "--dangerously-skip-permissions",
+        ]
+
+        with open(output_file, "w") as f:
+            result = subprocess.run(
+                cmd, stdout=f, stderr=subprocess.PIPE, text=True, env=env, timeout=30
+            )
+
+        if result.returncode != 0:
+            return CheckResult(
+                success=False, error=f"Claude Code test failed: {result.stderr}"
+            )
+
+        # Parse output to verify it worked
+        claude_responded = False
+        response_text = ""
+
+        try:
+            with open(output_file, "r") as f:
+                for line in f:
+                    if line.strip():
+                        msg = json.loads(line)
+                        if msg.get("type") == "result":
+                            claude_responded = True
+                            response_text = msg.get("result", "")
+                            break
+        finally:
+            # Clean up temp file
+            if os.path.exists(output_file):
+                os.unlink(output_file)
+
+        return CheckResult(
+            success=claude_responded,
+            details={
+                "test_passed": "4" in response_text,
+                "response": response_text[:100] if response_text else "No response",
+            },
+        )
+
+    except subprocess.TimeoutExpired:
+        return CheckResult(
+            success=False, error="Claude Code test timed out after 30 seconds"
+        )
+    except Exception as e:
+        return CheckResult(success=False, error=f"Claude Code test error: {str(e)}")
+
+
+def check_github_cli() -> CheckResult:
+    """Check if GitHub CLI is installed and authenticated."""
+    try:
+        # Check if gh is installed
+        result = subprocess.run(
+            ["gh", "--version"], capture_output=True, text=True, timeout=10
+        )
+        if result.returncode != 0:
+            return CheckResult(success=False, error="GitHub CLI (gh) is not installed")
+
+        # Check authentication status with filtered environment
+        env = get_safe_subprocess_env()
+
+        result = subprocess.run(
+            ["gh", "auth", "status"], capture_output=True, text=True, env=env, timeout=15
+        )
+
+        authenticated = result.returncode == 0
+
+        return CheckResult(
+            success=authenticated,
+            error="GitHub CLI not authenticated" if not authenticated else None,
+            details={"installed": True, "authenticated": authenticated},
+        )
+
+    except subprocess.TimeoutExpired:
+        return CheckResult(success=False, error="GitHub CLI (gh) timed out")
+    except FileNotFoundError:
+        return CheckResult(
+            success=False,
+            error="GitHub CLI (gh) is not installed. Install with: brew install gh",
+            details={"installed": False},
+        )
+
+
+def timed_check(check: Callable[[], CheckResult]) -> CheckResult:
+    """Run a check, stamping when it ran and how long it took."""
+    started = time.monotonic()
+    checked_at = datetime.now().isoformat()
+    try:
+        result = check()
+    except Exception as e:
+        result = CheckResult(success=False, error=f"{check.__name__} failed: {e}")
+    result.checked_at = checked_at
+    result.duration_ms = int((time.monotonic() - started) * 1000)
+    return result
+
+
+def aggregate_checks(checks: Dict[str, CheckResult]) -> HealthCheckResult:
+    """Combine individual check results into one HealthCheckResult."""
+    result = HealthCheckResult(
+        success=True, timestamp=datetime.now().isoformat(), checks=dict(checks)
+    )
+    for name, check in checks.items():
+        if check.details.get("skipped"):
+            continue
+        if not check.success:
+            result.success = False
+            if check.error:
+                result.errors.append(check.error)
+            # Add specific missing vars to errors
+            missing_required = check.details.get("missing_required", [])
+            result.errors.extend(
+                [f"Missing required env var: {var}" for var in missing_required]
+            )
+        elif check.warning:
+            # Don't add warnings for optional env vars - they're optional!
+            result.warnings.append(check.warning)
+    return result
+
+
+def run_checks_parallel(
+    checks: Dict[str, Callable[[], CheckResult]],
+    timeouts: Optional[Dict[str, float]] = None,
+) -> Dict[str, CheckResult]:
+    """Run independent checks concurrently, each with its own timeout.
+
+    Every check gets its own thread, so the whole run takes as long as the
+    slowest check (or its timeout). A check that overruns is reported as
+    failed; its thread is abandoned rather than waited for.
+    """
+    timeouts = {**CHECK_TIMEOUTS, **(timeouts or {})}
+    finished: Dict[str, CheckResult] = {}
+
+    def run(name: str, check: Callable[[], CheckResult]) -> None:
+        finished[name] = timed_check(check)
+
+    # Daemon threads, so an overrunning check never holds up interpreter exit
+    started = time.monotonic()
+    threads = {
+        name: threading.Thread(
+            target=run, args=(name, check), name=f"adw-health-{name}", daemon=True
+        )
+        for name, check in checks.items()
+    }
+    for thread in threads.values():
+        thread.start()
+
+    results: Dict[str, CheckResult] = {}
+    for name, thread in threads.items():
+        timeout = timeouts.get(name, DEFAULT_CHECK_TIMEOUT)
+        thread.join(max(started + timeout - time.monotonic(), 0))
+        if name in finished:
+            results[name] = finished[name]
+        else:
+            results[name] = CheckResult(
+                success=False,
+                error=f"{name} check timed out after {timeout:g} seconds",
+                duration_ms=int(timeout * 1000),
+            )
+    return results
+
+
+def run_health_check(
+    timeouts: Optional[Dict[str, float]] = None,
+) -> HealthCheckResult:
+    """Run all health checks concurrently and return results."""
+    checks: Dict[str, Callable[[], CheckResult]] = {
+        "environment": check_env_vars,
+        "git_repository": check_git_repo,
+        "github_cli": check_github_cli,
+    }
+
+    # Check Claude Code - only if we have the API key
+    if os.getenv("ANTHROPIC_API_KEY"):
+        checks["claude_code"] = check_claude_code
+
+    results = run_checks_parallel(checks, timeouts)
+    if "claude_code" not in results:
+        results["claude_code"] = CheckResult(
+            success=False,
+            details={"skipped": True, "reason": "ANTHROPIC_API_KEY not set"},
+        )
+
+    return aggregate_checks(results)
+
+
+DEFAULT_BACKGROUND_CHECKS: Dict[str, Callable[[], CheckResult]] = {
+    "environment": check_env_vars,
+    "git_repository": check_git_repo,
+    "github_cli": check_github_cli,
+    "claude_cli": check_claude_cli,
+}
+
+
+class HealthMonitor:
+    """Runs cheap health checks in the background and caches the results.
+
+    Each check is re-run once its TTL expires. snapshot() and is_ready() only
+    read the cache, so probes never block on git, gh or the Claude CLI.
+    """
+
+    def __init__(
+        self,
+        checks: Optional[Dict[str, Callable[[], CheckResult]]] = None,
+        ttls: Optional[Dict[str, float]] = None,
+        interval: float = MONITOR_INTERVAL,
+        deep_check: Callable[[], HealthCheckResult] = run_health_check,
+    ):
+        self.checks = dict(checks if checks is not None else DEFAULT_BACKGROUND_CHECKS)
+        self.ttls = {**CHECK_TTLS, **(ttls or {})}
+        self.interval = interval
+        self.deep_check = deep_check
+        self.started_at = time.time()
+        # check name -> (monotonic time it ran, result)
+        self._cache: Dict[str, Tuple[float, CheckResult]] = {}
+        self._lock = threading.Lock()
+        self._deep_lock = threading.Lock()
+        self._deep: Optional[Tuple[float, HealthCheckResult]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self, force: bool = False) -> None:
+        """Run every check whose cached result is missing or expired."""
+        now = time.monotonic()
+        due = {}
+        with self._lock:
+            for name, check in self.checks.items():
+                cached = self._cache.get(name)
+                ttl = self.ttls.get(name, MONITOR_INTERVAL)
+                if force or not cached or now - cached[0] >= ttl:
+                    due[name] = check
+        if not due:
+            return
+        results = run_checks_parallel(due)
+        with self._lock:
+            for name, result in results.items():
+                self._cache[name] = (time.monotonic(), result)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        """Start the background refresh thread (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="adw-health-monitor", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background refresh thread."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 1)
+
+    def snapshot(self) -> HealthCheckResult:
+        """Aggregate the cached check results (checks not yet run fail)."""
+        with self._lock:
+            cached = {name: entry[1] for name, entry in self._cache.items()}
+        for name in self.checks:
+            if name not in cached:
+                cached[name] = CheckResult(
+                    success=False, error=f"{name} check has not run yet"
+                )
+        return aggregate_checks(cached)
+
+    def is_ready(self) -> bool:
+        """Whether every background check has run and passed."""
+        return self.snapshot().success
+
+    def uptime(self) -> float:
+        """Seconds since the monitor was created."""
+        return time.time() - self.started_at
+
+    def run_deep(self, max_age: float = DEEP_CHECK_MAX_AGE) -> HealthCheckResult:
+        """Run the full health check, reusing a result younger than max_age.
+
+        Concurrent callers wait for the one run in progress instead of
+        starting their own.
+        """
+        with self._deep_lock:
+            if self._deep and time.monotonic() - self._deep[0] < max_age:
+                return self._deep[1]
+            result = self.deep_check()
+            self._deep = (time.monotonic(), result)
+            return result
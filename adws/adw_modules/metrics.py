@@ -0,0 +1,417 @@
+"""Prometheus metrics for ADW.
+
+A small in-process registry of counters, gauges and histograms rendered in
+the Prometheus text exposition format. Phase scripts are separate processes,
+so each one dumps its counters and histograms to agents/metrics/{pid}.json;
+the webhook server merges those files with its own registry when /metrics is
+scraped. Dumps of processes that have exited are folded into
+agents/metrics/archive.json so totals stay monotonic.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+AGENT_DURATION_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+GH_DURATION_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+ARCHIVE_FILENAME = "archive.json"
+
+# Minimum seconds between dumps of this process' metrics
+DUMP_INTERVAL = 10.0
+
+LabelKey = Tuple[str, ...]
+
+
+class Metric:
+    """Base class for a labelled metric family."""
+
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _format_labels(self, key: LabelKey, extra: str = "") -> str:
+        pairs = [
+            f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)
+        ]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter(Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self.values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            return [
+                f"{self.name}{self._format_labels(key)} {value}"
+                for key, value in sorted(self.values.items())
+            ]
+
+
+class Gauge(Metric):
+    """Value that goes up and down, optionally computed at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        collect: Optional[Callable[[], float]] = None,
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.values: Dict[LabelKey, float] = {}
+        self.collect = collect
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self.values[self._key(labels)] = value
+
+    def samples(self) -> List[str]:
+        if self.collect is not None:
+            try:
+                self.set(self.collect())
+            except Exception:
+                pass
+        with self._lock:
+            return [
+                f"{self.name}{self._format_labels(key)} {value}"
+                for key, value in sorted(self.values.items())
+            ]
+
+
+class Histogram(Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = AGENT_DURATION_BUCKETS,
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> {"buckets": [count per bucket + inf], "sum": float, "count": int}
+        self.values: Dict[LabelKey, Dict] = {}
+
+    def _empty(self) -> Dict:
+        return {"buckets": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            entry = self.values.setdefault(key, self._empty())
+            for idx, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry["buckets"][idx] += 1
+                    break
+            else:
+                entry["buckets"][-1] += 1
+            entry["sum"] += value
+            entry["count"] += 1
+
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, entry in sorted(self.values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), entry["buckets"]):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    labels = self._format_labels(key, f'le="{le}"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                lines.append(f"{self.name}_sum{self._format_labels(key)} {entry['sum']}")
+                lines.append(f"{self.name}_count{self._format_labels(key)} {entry['count']}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        """Counters and histograms as plain data (gauges are process-local)."""
+        data: Dict[str, Dict[str, object]] = {}
+        for metric in self.metrics.values():
+            if isinstance(metric, (Counter, Histogram)):
+                with metric._lock:
+                    data[metric.name] = {
+                        json.dumps(list(key)): value
+                        for key, value in metric.values.items()
+                    }
+        return data
+
+    def merge(self, data: Dict[str, Dict[str, object]]) -> None:
+        """Add a snapshot (from another process) into this registry."""
+        for name, values in data.items():
+            metric = self.metrics.get(name)
+            if metric is None:
+                continue
+            for raw_key, value in values.items():
+                key = tuple(json.loads(raw_key))
+                with metric._lock:
+                    if isinstance(metric, Counter):
+                        metric.values[key] = metric.values.get(key, 0.0) + value
+                    elif isinstance(metric, Histogram):
+                        entry = metric.values.setdefault(key, metric._empty())
+                        if len(value["buckets"]) != len(entry["buckets"]):
+                            continue
+                        entry["buckets"] = [
+                            a + b for a, b in zip(entry["buckets"], value["buckets"])
+                        ]
+                        entry["sum"] += value["sum"]
+                        entry["count"] += value["count"]
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text format."""
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+def get_metrics_dir() -> str:
+    """Get the shared agents/metrics/ directory."""
+    project_root = os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    return os.path.join(project_root, "agents", "metrics")
+
+
+def _build_registry() -> Registry:
+    """Registry with every ADW metric defined (values empty)."""
+    registry = Registry()
+    registry.register(
+        Counter(
+            "adw_webhook_deliveries_total",
+            "GitHub webhook deliveries received",
+            ["event", "action"],
+        )
+    )
+    registry.register(
+        Counter("adw_workflows_launched_total", "ADW workflows launched", ["workflow"])
+    )
+    registry.register(Gauge("adw_workflows_active", "ADW workflow processes still running"))
+    registry.register(Gauge("adw_queue_depth", "ADW jobs waiting to start"))
+    registry.register(
+        Histogram(
+            "adw_agent_call_duration_seconds",
+            "Claude Code agent call attempt latency",
+            ["slash_command", "model"],
+            AGENT_DURATION_BUCKETS,
+        )
+    )
+    registry.register(
+        Counter("adw_agent_retries_total", "Agent call retries", ["retry_code"])
+    )
+    registry.register(
+        Histogram(
+            "adw_gh_request_duration_seconds",
+            "GitHub CLI call latency",
+            ["command"],
+            GH_DURATION_BUCKETS,
+        )
+    )
+    registry.register(Counter("adw_gh_errors_total", "Failed GitHub CLI calls", ["command"]))
+    registry.register(Gauge("adw_worktrees_in_use", "Git worktrees under trees/"))
+    registry.register(Gauge("adw_ports_in_use", "ADW backend/frontend ports in use"))
+    return registry
+
+
+REGISTRY = _build_registry()
+
+WEBHOOK_DELIVERIES: Counter = REGISTRY.metrics["adw_webhook_deliveries_total"]
+WORKFLOWS_LAUNCHED: Counter = REGISTRY.metrics["adw_workflows_launched_total"]
+WORKFLOWS_ACTIVE: Gauge = REGISTRY.metrics["adw_workflows_active"]
+QUEUE_DEPTH: Gauge = REGISTRY.metrics["adw_queue_depth"]
+AGENT_CALL_DURATION: Histogram = REGISTRY.metrics["adw_agent_call_duration_seconds"]
+AGENT_RETRIES: Counter = REGISTRY.metrics["adw_agent_retries_total"]
+GH_REQUEST_DURATION: Histogram = REGISTRY.metrics["adw_gh_request_duration_seconds"]
+GH_ERRORS: Counter = REGISTRY.metrics["adw_gh_errors_total"]
+WORKTREES_IN_USE: Gauge = REGISTRY.metrics["adw_worktrees_in_use"]
+PORTS_IN_USE: Gauge = REGISTRY.metrics["adw_ports_in_use"]
+
+_last_dump = 0.0
+
+
+def dump_process_metrics(force: bool = False) -> None:
+    """Write this process' counters and histograms for the /metrics scraper.
+
+    Throttled to one write per DUMP_INTERVAL unless forced.
+    """
+    global _last_dump
+    now = time.monotonic()
+    if not force and now - _last_dump < DUMP_INTERVAL:
+        return
+    _last_dump = now
+
+    snapshot = REGISTRY.snapshot()
+    if not any(snapshot.values()):
+        return
+    try:
+        metrics_dir = get_metrics_dir()
+        os.makedirs(metrics_dir, exist_ok=True)
+        path = os.path.join(metrics_dir, f"{os.getpid()}.json")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _fold_dead_dumps(metrics_dir: str) -> Tuple[Registry, List[Dict]]:
+    """Fold dumps of exited processes into archive.json.
+
+    Runs under an exclusive flock on the metrics dir, so concurrent scrapes
+    never fold the same dump twice. Each dead dump is first renamed to
+    {pid}.json.folding, so a new process reusing the PID starts a fresh dump
+    instead of having it deleted unfolded. Folding files left by a scrape
+    that died mid-fold are picked up by the next one.
+
+    Returns (archive, dumps of live processes).
+    """
+    import fcntl
+
+    archive_path = os.path.join(metrics_dir, ARCHIVE_FILENAME)
+    archive = _build_registry()
+    live: List[Dict] = []
+    dir_fd = os.open(metrics_dir, os.O_RDONLY)
+    try:
+        fcntl.flock(dir_fd, fcntl.LOCK_EX)
+        if os.path.exists(archive_path):
+            try:
+                with open(archive_path, "r") as f:
+                    archive.merge(json.load(f))
+            except (OSError, json.JSONDecodeError):
+                pass
+
+        folding = []
+        for filename in sorted(os.listdir(metrics_dir)):
+            stem, ext = os.path.splitext(filename)
+            if ext == ".folding":
+                folding.append(os.path.join(metrics_dir, filename))
+                continue
+            if ext != ".json" or not stem.isdigit() or int(stem) == os.getpid():
+                continue
+            path = os.path.join(metrics_dir, filename)
+            if not _pid_alive(int(stem)):
+                try:
+                    os.rename(path, path + ".folding")
+                    folding.append(path + ".folding")
+                except OSError:
+                    pass
+                continue
+            try:
+                with open(path, "r") as f:
+                    live.append(json.load(f))
+            except (OSError, json.JSONDecodeError):
+                continue
+
+        if folding:
+            for path in folding:
+                try:
+                    with open(path, "r") as f:
+                        archive.merge(json.load(f))
+                except (OSError, json.JSONDecodeError):
+                    pass
+            try:
+                tmp_path = archive_path + ".tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(archive.snapshot(), f)
+                os.replace(tmp_path, archive_path)
+            except OSError:
+                # Keep the folding files; the next scrape folds them again
+                return archive, live
+            for path in folding:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+    finally:
+        os.close(dir_fd)
+    return archive, live
+
+
+def collect_all_processes() -> Registry:
+    """Merge this process' metrics with the dumps of all other ADW processes.
+
+    Dumps from processes that have exited are folded into archive.json and
+    removed (see _fold_dead_dumps).
+    """
+    merged = _build_registry()
+    # Keep scrape-time gauges of this process
+    for name, metric in REGISTRY.metrics.items():
+        if isinstance(metric, Gauge):
+            merged.metrics[name] = metric
+    merged.merge(REGISTRY.snapshot())
+
+    metrics_dir = get_metrics_dir()
+    if not os.path.isdir(metrics_dir):
+        return merged
+
+    try:
+        archive, live = _fold_dead_dumps(metrics_dir)
+    except OSError:
+        return merged
+    for data in live:
+        merged.merge(data)
+    merged.merge(archive.snapshot())
+    return merged
+
+
+def render_all() -> str:
+    """Prometheus text for all ADW processes."""
+    return collect_all_processes().render()
+
+
+atexit.register(dump_process_metrics, True)
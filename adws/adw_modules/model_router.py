@@ -0,0 +1,256 @@
+"""Cost- and latency-aware model routing for slash commands.
+
+SLASH_COMMAND_MODEL_MAP gives each command a model per model set. For the
+"base" set, commands whose heavy model differs (sonnet vs opus) are routed
+dynamically from the cost ledger:
+
+1. Escalate to the heavy model once a cheap attempt on the same input failed
+   in this ADW run: the same command is being run again on the same input
+   (e.g. /resolve_failed_test for a test that is still failing).
+2. Otherwise start on the heavy model only if history says the cheap-first
+   strategy costs more on average (cheap attempt + likely escalation) than
+   going straight to the heavy model, with wall time priced in.
+3. Otherwise use the cheap model.
+
+The "heavy" set keeps the static map. Every decision is appended to
+agents/routing_decisions.jsonl for offline evaluation.
+
+The ledger is append-only, so the router keeps the most recent records in
+memory and on each call parses only the lines appended since the last one.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from adw_modules.accounting import get_ledger_path
+from adw_modules.data_types import AgentCallRecord
+from adw_modules.utils import load_env
+
+DECISIONS_FILENAME = "routing_decisions.jsonl"
+
+# Most recent calls per (command, model) used for history stats
+HISTORY_WINDOW = 200
+# Calls per model needed before history can change the starting model
+MIN_SAMPLES = 10
+# Most recent ledger records kept in memory for routing
+LEDGER_TAIL_RECORDS = 5000
+
+
+def router_enabled() -> bool:
+    """Set ADW_MODEL_ROUTER=false to always use the static model map."""
+    load_env()
+    return os.getenv("ADW_MODEL_ROUTER", "true").lower() != "false"
+
+
+def get_latency_cost_per_minute() -> float:
+    """Dollar value of one minute of agent wall time when comparing strategies."""
+    load_env()
+    return float(os.getenv("ADW_ROUTER_LATENCY_COST_PER_MINUTE", "0.05"))
+
+
+def get_decisions_path() -> str:
+    """Get path to the shared routing decision log."""
+    project_root = os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    return os.path.join(project_root, "agents", DECISIONS_FILENAME)
+
+
+_ledger_lock = threading.Lock()
+_ledger_cache: Dict[str, Any] = {"path": None, "inode": None, "offset": 0, "records": []}
+
+
+def load_recent_records(path: Optional[str] = None) -> List[AgentCallRecord]:
+    """The last LEDGER_TAIL_RECORDS ledger records, read incrementally.
+
+    Only bytes appended since the previous call are parsed; a replaced or
+    truncated ledger is re-read from the start.
+    """
+    path = path or get_ledger_path()
+    with _ledger_lock:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            _ledger_cache.update(path=path, inode=None, offset=0, records=[])
+            return []
+
+        cache = _ledger_cache
+        if (
+            cache["path"] != path
+            or cache["inode"] != stat.st_ino
+            or stat.st_size < cache["offset"]
+        ):
+            cache.update(path=path, inode=stat.st_ino, offset=0, records=[])
+        if stat.st_size == cache["offset"]:
+            return list(cache["records"])
+
+        with open(path, "rb") as f:
+            f.seek(cache["offset"])
+            data = f.read()
+        # A writer may be mid-line; leave the partial line for the next call
+        complete = data[: data.rfind(b"\n") + 1]
+        cache["offset"] += len(complete)
+
+        records = cache["records"]
+        for line in complete.splitlines():
+            if not line.strip():
+                continue
+            try:
+                records.append(AgentCallRecord(**json.loads(line)))
+            except (json.JSONDecodeError, ValueError):
+                continue
+        del records[:-LEDGER_TAIL_RECORDS]
+        return list(records)
+
+
+def fingerprint_args(slash_command: str, args: List[str]) -> str:
+    """Identify the input of a call so re-runs on the same input can be matched.
+
+    JSON payloads naming failed tests are keyed by the test names, since the
+    error text changes between attempts; everything else by the raw args.
+    """
+    key_parts = [slash_command]
+    for arg in args:
+        try:
+            payload = json.loads(arg)
+        except (json.JSONDecodeError, TypeError):
+            payload = None
+
+        if isinstance(payload, dict) and "failed_tests" in payload:
+            names = sorted(
+                test.get("test_name", "") for test in payload["failed_tests"]
+            )
+            key_parts.append("tests:" + ",".join(names))
+        elif isinstance(payload, dict) and "test_name" in payload:
+            key_parts.append("tests:" + payload["test_name"])
+        else:
+            key_parts.append(arg)
+
+    return hashlib.sha256("\n".join(key_parts).encode()).hexdigest()[:16]
+
+
+def mark_failed_attempts(
+    records: List[AgentCallRecord],
+) -> List[Tuple[AgentCallRecord, bool]]:
+    """Pair each record with whether it counts as a failed attempt.
+
+    A call failed if it was unsuccessful, or if the same ADW later ran the
+    same command on the same input again (its result didn't hold).
+    """
+    last_index: Dict[tuple, int] = {}
+    for idx, record in enumerate(records):
+        if record.input_fingerprint:
+            key = (record.adw_id, record.slash_command, record.input_fingerprint)
+            last_index[key] = idx
+
+    outcomes = []
+    for idx, record in enumerate(records):
+        key = (record.adw_id, record.slash_command, record.input_fingerprint)
+        rerun_later = record.input_fingerprint is not None and last_index[key] > idx
+        outcomes.append((record, not record.success or rerun_later))
+    return outcomes
+
+
+def model_stats(
+    outcomes: List[Tuple[AgentCallRecord, bool]], slash_command: str, model: str
+) -> Optional[Dict[str, float]]:
+    """Success rate, mean cost and mean latency of a model on a command."""
+    window = [
+        (record, failed)
+        for record, failed in outcomes
+        if record.slash_command == slash_command and record.model == model
+    ][-HISTORY_WINDOW:]
+    if len(window) < MIN_SAMPLES:
+        return None
+
+    latencies = [r.latency_ms for r, _ in window if r.latency_ms is not None]
+    return {
+        "samples": len(window),
+        "success_rate": sum(1 for _, failed in window if not failed) / len(window),
+        "avg_cost_usd": sum(r.total_cost_usd for r, _ in window) / len(window),
+        "avg_minutes": (sum(latencies) / len(latencies) / 60000) if latencies else 0.0,
+    }
+
+
+def _score(cost_usd: float, minutes: float) -> float:
+    return cost_usd + minutes * get_latency_cost_per_minute()
+
+
+def route_model(
+    adw_id: str,
+    slash_command: str,
+    input_fingerprint: str,
+    model_set: str,
+    model_config: Optional[Dict[str, str]],
+    static_model: str,
+    records: Optional[List[AgentCallRecord]] = None,
+) -> Tuple[str, str]:
+    """Pick the model for one call.
+
+    Args:
+        model_config: The command's SLASH_COMMAND_MODEL_MAP entry
+        static_model: Model the static map selects for this model set
+        records: Ledger records (recent agents/cost_ledger.jsonl records if omitted)
+
+    Returns:
+        Tuple of (model, reason)
+    """
+    cheap = model_config.get("base") if model_config else None
+    strong = model_config.get("heavy") if model_config else None
+
+    if not router_enabled():
+        return static_model, "router disabled"
+    if model_set != "base" or not cheap or cheap == strong:
+        return static_model, "static map"
+
+    if records is None:
+        records = load_recent_records()
+
+    # 1. A cheap attempt on this input already ran in this ADW - this call
+    #    being made again means it failed or its result didn't hold
+    failed_here = sum(
+        1
+        for record in records
+        if record.adw_id == adw_id
+        and record.slash_command == slash_command
+        and record.input_fingerprint == input_fingerprint
+        and record.model == cheap
+    )
+    if failed_here:
+        return strong, f"escalated after {failed_here} failed {cheap} attempt(s)"
+
+    outcomes = mark_failed_attempts(records)
+
+    # 2. History says the cheap model rarely succeeds on this command
+    cheap_stats = model_stats(outcomes, slash_command, cheap)
+    strong_stats = model_stats(outcomes, slash_command, strong)
+    if cheap_stats and strong_stats:
+        miss = 1 - cheap_stats["success_rate"]
+        cheap_first = _score(
+            cheap_stats["avg_cost_usd"] + miss * strong_stats["avg_cost_usd"],
+            cheap_stats["avg_minutes"] + miss * strong_stats["avg_minutes"],
+        )
+        strong_first = _score(strong_stats["avg_cost_usd"], strong_stats["avg_minutes"])
+        if strong_first < cheap_first:
+            return strong, (
+                f"history: {cheap} succeeds {cheap_stats['success_rate']:.0%}, "
+                f"{strong}-first scores {strong_first:.2f} vs {cheap_first:.2f}"
+            )
+
+    return cheap, "cheap model first"
+
+
+def log_routing_decision(decision: Dict[str, Any]) -> None:
+    """Append a routing decision to the shared decision log."""
+    path = get_decisions_path()
+    decision = {"timestamp": datetime.now().isoformat(), **decision}
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a") as f:
+            f.write(json.dumps(decision) + "\n")
+    except OSError:
+        pass
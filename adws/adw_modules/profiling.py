@@ -0,0 +1,397 @@
+"""Opt-in profiling of phase scripts and agent calls.
+
+Set ADW_PROFILE to profile every phase's main() (through traced_phase) and
+every execute_template call:
+- cpu  cProfile, written as pstats data (profile.*.prof)
+- wall a sampling profiler over the calling thread's stack, written as
+       collapsed stacks (profile.*.wall.json, flamegraph-compatible keys)
+- mem  tracemalloc allocation sites and peak (profile.*.mem.json)
+
+Profiles land next to the phase or agent output they describe:
+    agents/{adw_id}/{phase_script}/profile.phase.{pid}.{ext}
+    agents/{adw_id}/{agent_name}/profile.agent.{pid}-{seq}.{ext}
+
+Scopes partition time: while an agent call is profiled the enclosing phase
+profiler is paused, so a run's profiles can be summed without double
+counting. summarize_profiles() merges them and splits time into Python
+overhead, subprocess spawning (git, gh, uv) and waiting on agents; see
+adw_tests/profile_summary.py.
+"""
+
+import glob
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+PROFILE_ENV = "ADW_PROFILE"
+PROFILE_INTERVAL_ENV = "ADW_PROFILE_INTERVAL"
+PROFILE_KINDS = ("cpu", "wall", "mem")
+DEFAULT_SAMPLE_INTERVAL = 0.005
+MEM_TOP_SITES = 50
+MEM_TRACE_FRAMES = 25
+
+EXTENSIONS = {"cpu": "prof", "wall": "wall.json", "mem": "mem.json"}
+
+# Time spent in these files (and the builtins they call) is blocked on a child process
+SUBPROCESS_FILES = ("subprocess.py", "selectors.py", "supervisor.py")
+
+_local = threading.local()
+_sequence = 0
+_sequence_lock = threading.Lock()
+_bound_adw_id: Optional[str] = None
+
+
+def get_profile_kind() -> Optional[str]:
+    """Profiler selected by ADW_PROFILE, or None when profiling is off."""
+    kind = os.getenv(PROFILE_ENV, "").strip().lower()
+    return kind if kind in PROFILE_KINDS else None
+
+
+def get_agents_dir() -> str:
+    """Get the project's agents/ directory."""
+    project_root = os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    return os.path.join(project_root, "agents")
+
+
+def bind_adw_id(adw_id: str) -> None:
+    """Name the run for phase profiles started without an adw_id argument.
+
+    Entry-point phases create their ADW ID inside main(); ensure_adw_id()
+    binds it here so the phase profile still lands under agents/{adw_id}/.
+    """
+    global _bound_adw_id
+    _bound_adw_id = adw_id
+
+
+def _next_sequence() -> int:
+    global _sequence
+    with _sequence_lock:
+        _sequence += 1
+        return _sequence
+
+
+def _active() -> List[Any]:
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+class CpuProfiler:
+    """cProfile over the scope (only one cProfile may run per thread)."""
+
+    kind = "cpu"
+
+    def __init__(self):
+        import cProfile
+
+        self.profile = cProfile.Profile()
+
+    def start(self) -> None:
+        self.profile.enable()
+
+    def pause(self) -> None:
+        self.profile.disable()
+
+    def resume(self) -> None:
+        self.profile.enable()
+
+    def stop(self, path: str, metadata: Dict[str, Any]) -> None:
+        self.profile.disable()
+        self.profile.dump_stats(path)
+
+
+class WallProfiler:
+    """Samples the calling thread's stack from a background thread."""
+
+    kind = "wall"
+
+    def __init__(self, interval: Optional[float] = None):
+        self.interval = interval or float(
+            os.getenv(PROFILE_INTERVAL_ENV, DEFAULT_SAMPLE_INTERVAL)
+        )
+        self.thread_id = threading.get_ident()
+        self.stacks: Counter = Counter()
+        self.paused = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self.started = 0.0
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            if self.paused:
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if frames:
+                self.stacks[";".join(reversed(frames))] += 1
+
+    def start(self) -> None:
+        self.started = time.monotonic()
+        self._thread.start()
+
+    def pause(self) -> None:
+        self.paused = True
+
+    def resume(self) -> None:
+        self.paused = False
+
+    def stop(self, path: str, metadata: Dict[str, Any]) -> None:
+        self._stop.set()
+        self._thread.join()
+        with open(path, "w") as f:
+            json.dump({
+                **metadata,
+                "interval": self.interval,
+                "duration_seconds": round(time.monotonic() - self.started, 6),
+                "samples": sum(self.stacks.values()),
+                "stacks": dict(self.stacks),
+            }, f)
+
+
+class MemProfiler:
+    """tracemalloc allocation growth and peak over the scope."""
+
+    kind = "mem"
+
+    def __init__(self):
+        self.owns_tracing = False
+        self.peak = 0
+        self.baseline = None
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(MEM_TRACE_FRAMES)
+            self.owns_tracing = True
+        else:
+            tracemalloc.reset_peak()
+        self.baseline = tracemalloc.take_snapshot()
+
+    def pause(self) -> None:
+        # The nested scope resets the peak; keep ours. Its peak still counts for us.
+        self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+
+    def resume(self) -> None:
+        pass
+
+    def stop(self, path: str, metadata: Dict[str, Any]) -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        if self.owns_tracing:
+            tracemalloc.stop()
+        top = [
+            {
+                "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                "size_bytes": stat.size_diff,
+                "count": stat.count_diff,
+            }
+            for stat in snapshot.compare_to(self.baseline, "lineno")[:MEM_TOP_SITES]
+            if stat.size_diff > 0
+        ]
+        with open(path, "w") as f:
+            json.dump({
+                **metadata,
+                "peak_bytes": max(self.peak, peak),
+                "current_bytes": current,
+                "top": top,
+            }, f)
+
+
+PROFILERS = {"cpu": CpuProfiler, "wall": WallProfiler, "mem": MemProfiler}
+
+
+@contextmanager
+def profile_scope(adw_id: Optional[str], name: str, scope: str = "phase") -> Iterator[None]:
+    """Profile the enclosed block when ADW_PROFILE is set.
+
+    Args:
+        adw_id: Run to file the profile under (None = the ID bound later by
+            bind_adw_id(), for entry-point phases)
+        name: Phase script or agent name; the profile's directory
+        scope: "phase" or "agent"
+    """
+    kind = get_profile_kind()
+    if not kind:
+        yield
+        return
+
+    stack = _active()
+    outer = stack[-1] if stack else None
+    # cProfile can't nest, and pausing keeps scopes from double counting
+    if outer:
+        outer.pause()
+    profiler = PROFILERS[kind]()
+    try:
+        profiler.start()
+    except Exception as e:
+        # Profiling must never fail the phase it observes. On Python >= 3.12
+        # a second cProfile raises while another thread's is enabled.
+        print(f"Skipping {kind} profile of {name}: {e}", file=sys.stderr)
+        if outer:
+            outer.resume()
+        yield
+        return
+    stack.append(profiler)
+    try:
+        yield
+    finally:
+        stack.pop()
+        run_id = adw_id or _bound_adw_id or "unbound"
+        output_dir = os.path.join(get_agents_dir(), run_id, name)
+        os.makedirs(output_dir, exist_ok=True)
+        label = f"{os.getpid()}-{_next_sequence()}" if scope == "agent" else str(os.getpid())
+        path = os.path.join(output_dir, f"profile.{scope}.{label}.{EXTENSIONS[kind]}")
+        try:
+            profiler.stop(path, {"kind": kind, "scope": scope, "name": name, "adw_id": run_id})
+        except Exception as e:
+            # Profiling must never fail the phase it observes
+            print(f"Failed to write {kind} profile {path}: {e}", file=sys.stderr)
+        if outer:
+            outer.resume()
+
+
+# --- Merging ----------------------------------------------------------------
+
+def find_profiles(adw_id: str) -> List[str]:
+    """All profile files written for a run."""
+    return sorted(glob.glob(os.path.join(get_agents_dir(), adw_id, "*", "profile.*")))
+
+
+def _is_subprocess_file(filename: str) -> bool:
+    return os.path.basename(filename) in SUBPROCESS_FILES
+
+
+def cpu_breakdown(stats) -> Dict[str, float]:
+    """Split pstats own-time into subprocess waits and Python overhead.
+
+    Builtins (waitpid, sleep, read, ...) are charged to whoever called them.
+    """
+    breakdown = {"subprocess": 0.0, "python": 0.0}
+    for (filename, _, _), (_, _, tottime, _, callers) in stats.stats.items():
+        if filename != "~":
+            breakdown["subprocess" if _is_subprocess_file(filename) else "python"] += tottime
+            continue
+        caller_time = {key: value[2] for key, value in callers.items()}
+        total = sum(caller_time.values())
+        if not total:
+            breakdown["python"] += tottime
+            continue
+        for (caller_file, _, _), share in caller_time.items():
+            bucket = "subprocess" if _is_subprocess_file(caller_file) else "python"
+            breakdown[bucket] += tottime * share / total
+    return breakdown
+
+
+def wall_breakdown(profile: Dict[str, Any]) -> Dict[str, float]:
+    """Split sampled wall time by whether the stack is inside a subprocess wait."""
+    breakdown = {"subprocess": 0.0, "python": 0.0}
+    for stack, count in profile["stacks"].items():
+        in_subprocess = any(frame.split(":", 1)[0] in SUBPROCESS_FILES for frame in stack.split(";"))
+        breakdown["subprocess" if in_subprocess else "python"] += count * profile["interval"]
+    return breakdown
+
+
+def _scope_of(path: str) -> str:
+    return os.path.basename(path).split(".")[1]
+
+
+def summarize_profiles(adw_id: str, top: int = 15) -> Dict[str, Any]:
+    """Merge a run's profiles into one summary.
+
+    Returns the kinds found, per-directory seconds and peak bytes,
+    a python/subprocess/agent breakdown and the top functions, stacks or
+    allocation sites across the run. Subprocess time inside agent scopes is
+    reported as "agent" (waiting on Claude).
+    """
+    paths = find_profiles(adw_id)
+    summary: Dict[str, Any] = {"adw_id": adw_id, "profiles": len(paths), "kinds": []}
+    if not paths:
+        return summary
+
+    breakdown = {"python": 0.0, "subprocess": 0.0, "agent": 0.0}
+    by_name: Dict[str, float] = {}
+    peaks: Dict[str, int] = {}
+    import pstats
+
+    merged_stats: Optional[pstats.Stats] = None
+    merged_stacks: Counter = Counter()
+    self_frames: Counter = Counter()
+    mem_sites: Counter = Counter()
+    kinds = set()
+
+    for path in paths:
+        name = os.path.basename(os.path.dirname(path))
+        scope = _scope_of(path)
+        if path.endswith(".prof"):
+            kinds.add("cpu")
+            stats = pstats.Stats(path)
+            split = cpu_breakdown(stats)
+            if merged_stats is None:
+                merged_stats = stats
+            else:
+                merged_stats.add(path)
+        elif path.endswith(".wall.json"):
+            kinds.add("wall")
+            with open(path) as f:
+                profile = json.load(f)
+            split = wall_breakdown(profile)
+            for stack, count in profile["stacks"].items():
+                merged_stacks[stack] += count
+                self_frames[stack.rsplit(";", 1)[-1]] += count * profile["interval"]
+        elif path.endswith(".mem.json"):
+            kinds.add("mem")
+            with open(path) as f:
+                profile = json.load(f)
+            peaks[name] = max(peaks.get(name, 0), profile["peak_bytes"])
+            for site in profile["top"]:
+                mem_sites[site["location"]] += site["size_bytes"]
+            continue
+        else:
+            continue
+
+        breakdown["python"] += split["python"]
+        breakdown["agent" if scope == "agent" else "subprocess"] += split["subprocess"]
+        by_name[name] = by_name.get(name, 0.0) + sum(split.values())
+
+    summary["kinds"] = sorted(kinds)
+    summary["seconds_by_name"] = {
+        name: round(value, 3) for name, value in sorted(by_name.items(), key=lambda item: -item[1])
+    }
+    if peaks:
+        summary["peak_bytes_by_name"] = dict(sorted(peaks.items(), key=lambda item: -item[1]))
+    if kinds & {"cpu", "wall"}:
+        summary["breakdown_seconds"] = {key: round(value, 3) for key, value in breakdown.items()}
+    if merged_stats is not None:
+        rows = sorted(merged_stats.stats.items(), key=lambda item: -item[1][2])[:top]
+        summary["top_functions"] = [
+            {
+                "function": f"{os.path.basename(filename)}:{line}({func})",
+                "calls": calls,
+                "tottime": round(tottime, 4),
+                "cumtime": round(cumtime, 4),
+            }
+            for (filename, line, func), (_, calls, tottime, cumtime, _) in rows
+        ]
+    if merged_stacks:
+        summary["top_frames"] = [
+            {"frame": frame, "seconds": round(seconds, 3)}
+            for frame, seconds in self_frames.most_common(top)
+        ]
+        summary["stacks"] = dict(merged_stacks)
+    if mem_sites:
+        summary["top_allocations"] = [
+            {"location": location, "size_bytes": size}
+            for location, size in mem_sites.most_common(top)
+        ]
+    return summary
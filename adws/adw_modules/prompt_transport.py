@@ -0,0 +1,79 @@
+"""How a prompt reaches the Claude Code CLI.
+
+Prompts used to go on the command line (`claude -p <prompt>`). Template
+arguments can be large (/resolve_failed_test carries the failing test JSON,
+/track_agentic_kpis the whole state, /classify_adw a comment body), and on
+argv they count against ARG_MAX and are visible to anyone running `ps`.
+`claude -p` without a prompt argument reads it from stdin instead:
+
+- argv:  short prompts (up to ARGV_MAX_BYTES), as before
+- stdin: written through a pipe (up to PIPE_MAX_BYTES)
+- file:  written to a private temp file that becomes the CLI's stdin, so
+         nothing has to keep a pipe fed for the largest prompts
+
+ADW_PROMPT_TRANSPORT=argv|stdin|file forces one; the default "auto" picks by
+size. The prompt itself is kept as the first line of the transcript (see
+transcript.record_prompt).
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import IO, Iterator, List, Optional
+
+PROMPT_TRANSPORT_ENV = "ADW_PROMPT_TRANSPORT"
+PROMPT_TRANSPORTS = ["auto", "argv", "stdin", "file"]
+
+# Slash commands with a few short arguments stay readable in `ps`
+ARGV_MAX_BYTES = 1024
+# A pipe holds 64 KiB on Linux before the writer blocks
+PIPE_MAX_BYTES = 64 * 1024
+
+
+class PromptTransport:
+    """CLI arguments and stdin that deliver one prompt."""
+
+    def __init__(
+        self,
+        name: str,
+        argv: List[str],
+        stdin: Optional[IO] = None,
+        input_text: Optional[str] = None,
+    ):
+        self.name = name
+        # Goes right after -p
+        self.argv = argv
+        self.stdin = stdin
+        self.input_text = input_text
+
+
+def choose_transport(prompt: str) -> str:
+    """Transport for a prompt: ADW_PROMPT_TRANSPORT, or by size."""
+    transport = os.getenv(PROMPT_TRANSPORT_ENV, "auto").lower()
+    if transport in PROMPT_TRANSPORTS and transport != "auto":
+        return transport
+    size = len(prompt.encode("utf-8"))
+    if size <= ARGV_MAX_BYTES:
+        return "argv"
+    if size <= PIPE_MAX_BYTES:
+        return "stdin"
+    return "file"
+
+
+@contextmanager
+def open_prompt_transport(
+    prompt: str, transport: Optional[str] = None
+) -> Iterator[PromptTransport]:
+    """Prepare the transport for a prompt; a temp file lives until exit."""
+    transport = transport or choose_transport(prompt)
+    if transport == "argv":
+        yield PromptTransport("argv", [prompt])
+    elif transport == "stdin":
+        yield PromptTransport("stdin", [], input_text=prompt)
+    else:
+        # Unnamed where the OS allows it, and only readable by us
+        with tempfile.TemporaryFile("w+", encoding="utf-8", prefix="adw_prompt_") as f:
+            f.write(prompt)
+            f.flush()
+            f.seek(0)
+            yield PromptTransport("file", [], stdin=f)
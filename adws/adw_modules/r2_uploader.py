@@ -1,27 +1,208 @@
-"""Cloudflare R2 uploader for ADW screenshots."""
+"""Cloudflare R2 uploader for ADW screenshots.
+
+Uploads share one boto3 client per process and run on a bounded thread
+pool, so a batch of screenshots takes about as long as the slowest single
+upload. Large files go up as multipart uploads and each file is retried
+with backoff before it is reported as failed.
+
+Screenshots are stored under content-hash keys (see screenshot_prep). A key
+already listed in agents/r2_manifest.jsonl, or found by a HEAD request, is
+not uploaded again. Stand-in backends keep their own manifest
+(r2_manifest.{backend}.jsonl), so keys they store are never taken as
+uploaded to R2.
+"""
 
 import os
+import sys
+import json
+import time
+import random
+import functools
 import logging
-from typing import Optional, Dict, List
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Optional, Dict, List, Set, Tuple
 from pathlib import Path
-import boto3
-from botocore.client import Config
-from botocore.exceptions import ClientError
+
+from adw_modules.screenshot_prep import (
+    IMMUTABLE_CACHE_CONTROL,
+    cleanup,
+    compress,
+    prepare_screenshot,
+)
+from adw_modules.storage_backends import (
+    DEFAULT_LOCAL_BUCKET,
+    LocalStorageClient,
+    MemoryStorageClient,
+    get_storage_backend,
+)
+from adw_modules.tracing import start_span
+
+MANIFEST_FILENAME = "r2_manifest.jsonl"
+
+UPLOAD_RETRY_BASE_DELAY = 0.5
+
+# Files above the threshold are uploaded in parallel parts
+MULTIPART_THRESHOLD = 8 * 1024 * 1024
+MULTIPART_CHUNKSIZE = 8 * 1024 * 1024
+MULTIPART_CONCURRENCY = 4
+
+
+def get_upload_concurrency() -> int:
+    """Files uploaded at the same time by upload_files (ADW_R2_UPLOAD_CONCURRENCY)."""
+    return int(os.getenv("ADW_R2_UPLOAD_CONCURRENCY", "8"))
+
+
+def get_upload_attempts() -> int:
+    """Attempts per file before giving up (ADW_R2_UPLOAD_ATTEMPTS)."""
+    return int(os.getenv("ADW_R2_UPLOAD_ATTEMPTS", "3"))
+
+
+@functools.lru_cache(maxsize=None)
+def get_transfer_config():
+    """Multipart settings for upload_file (boto3 is only imported on first upload)."""
+    from boto3.s3.transfer import TransferConfig
+
+    return TransferConfig(
+        multipart_threshold=MULTIPART_THRESHOLD,
+        multipart_chunksize=MULTIPART_CHUNKSIZE,
+        max_concurrency=MULTIPART_CONCURRENCY,
+        use_threads=True,
+    )
+
+
+# One client per (account, key) for the whole process; boto3 clients are
+# thread-safe once created
+_clients: Dict[Tuple[str, str], object] = {}
+_clients_lock = threading.Lock()
+
+
+def get_r2_client(account_id: str, access_key_id: str, secret_access_key: str):
+    """Return the process-wide R2 client, creating it on first use."""
+    key = (account_id, access_key_id)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            import boto3
+            from botocore.client import Config
+
+            client = boto3.client(
+                's3',
+                endpoint_url=f'https://{account_id}.r2.cloudflarestorage.com',
+                aws_access_key_id=access_key_id,
+                aws_secret_access_key=secret_access_key,
+                config=Config(
+                    signature_version='s3v4',
+                    # Every upload thread may run MULTIPART_CONCURRENCY parts
+                    max_pool_connections=get_upload_concurrency() * MULTIPART_CONCURRENCY,
+                    retries={"max_attempts": 3, "mode": "standard"},
+                ),
+                region_name='us-east-1'
+            )
+            _clients[key] = client
+        return client
+
+
+def get_manifest_path(backend: str = "r2") -> str:
+    """Get the shared agents/r2_manifest.jsonl path, or a stand-in backend's own."""
+    project_root = os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    filename = MANIFEST_FILENAME
+    if backend != "r2":
+        stem, ext = os.path.splitext(MANIFEST_FILENAME)
+        filename = f"{stem}.{backend}{ext}"
+    return os.path.join(project_root, "agents", filename)
+
+
+def load_manifest(bucket: str, path: Optional[str] = None) -> Set[str]:
+    """Object keys recorded as uploaded to a bucket."""
+    path = path or get_manifest_path()
+    keys = set()
+    if not os.path.exists(path):
+        return keys
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if entry.get("bucket") == bucket:
+                keys.add(entry["key"])
+    return keys
+
+
+def record_manifest(bucket: str, key: str, size: int, path: Optional[str] = None) -> None:
+    """Append an uploaded object to the manifest (one line per object)."""
+    path = path or get_manifest_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    entry = {
+        "bucket": bucket,
+        "key": key,
+        "bytes": size,
+        "uploaded_at": datetime.now().isoformat(),
+    }
+    with open(path, "a") as f:
+        f.write(json.dumps(entry) + "\n")
 
 
 class R2Uploader:
     """Handle uploads to Cloudflare R2 public bucket."""
     
-    def __init__(self, logger: logging.Logger):
+    def __init__(
+        self,
+        logger: logging.Logger,
+        client=None,
+        bucket_name: Optional[str] = None,
+    ):
+        """
+        Args:
+            logger: Logger instance
+            client: Optional storage client (see storage_backends); overrides
+                ADW_STORAGE_BACKEND and records uploads in its own manifest
+            bucket_name: Bucket to use with an injected client
+        """
         self.logger = logger
         self.client = None
         self.bucket_name = None
         self.public_domain = None
         self.enabled = False
-        
-        # Initialize if all required env vars exist
-        self._initialize()
-    
+        self.manifest_path = get_manifest_path()
+        self._manifest: Optional[Set[str]] = None
+        self._manifest_lock = threading.Lock()
+
+        if client is not None:
+            self._use_client(client, bucket_name, "custom")
+        elif get_storage_backend() == "local":
+            self._use_client(LocalStorageClient(), bucket_name, "local")
+        elif get_storage_backend() == "memory":
+            self._use_client(MemoryStorageClient(), bucket_name, "memory")
+        else:
+            # Initialize if all required env vars exist
+            self._initialize()
+
+    def _use_client(self, client, bucket_name: Optional[str], backend: str) -> None:
+        """Upload through a stand-in storage client instead of R2."""
+        self.client = client
+        # The bucket may share R2's name; the manifest must not
+        self.manifest_path = get_manifest_path(backend)
+        self.bucket_name = (
+            bucket_name or os.getenv("CLOUDFLARE_R2_BUCKET_NAME") or DEFAULT_LOCAL_BUCKET
+        )
+        self.public_domain = os.getenv("CLOUDFLARE_R2_PUBLIC_DOMAIN", "localhost")
+        self.enabled = True
+        self.logger.info(
+            f"Screenshot uploads use {type(client).__name__} - bucket: {self.bucket_name}"
+        )
+
+    def public_url(self, object_key: str) -> str:
+        """Public URL of an object in this uploader's bucket."""
+        if hasattr(self.client, "public_url"):
+            return self.client.public_url(self.bucket_name, object_key)
+        return f"https://{self.public_domain}/{object_key}"
+
     def _initialize(self) -> None:
         """Initialize R2 client if all required environment variables are set."""
         account_id = os.getenv("CLOUDFLARE_ACCOUNT_ID")
@@ -36,28 +217,27 @@ class R2Uploader:
             return
         
         try:
-            # Create R2 client
-            self.client = boto3.client(
-                's3',
-                endpoint_url=f'https://{account_id}.r2.cloudflarestorage.com',
-                aws_access_key_id=access_key_id,
-                aws_secret_access_key=secret_access_key,
-                config=Config(signature_version='s3v4'),
-                region_name='us-east-1'
-            )
+            # Reuse the process-wide R2 client
+            self.client = get_r2_client(account_id, access_key_id, secret_access_key)
             self.enabled = True
             self.logger.info(f"R2 upload enabled - bucket: {self.bucket_name}, domain: {self.public_domain}")
         except Exception as e:
             self.logger.warning(f"Failed to initialize R2 client: {e}")
             self.enabled = False
     
-    def upload_file(self, file_path: str, object_key: Optional[str] = None) -> Optional[str]:
+    def upload_file(
+        self,
+        file_path: str,
+        object_key: Optional[str] = None,
+        extra_args: Optional[Dict[str, str]] = None,
+    ) -> Optional[str]:
         """
         Upload a file to R2 and return the public URL.
         
         Args:
             file_path: Path to the file to upload (absolute or relative)
             object_key: Optional S3 object key. If not provided, will use default pattern
+            extra_args: Optional S3 ExtraArgs such as ContentType and CacheControl
             
         Returns:
             Public URL if upload successful, None if upload is disabled or fails
@@ -80,47 +260,267 @@ class R2Uploader:
             # Use pattern: adw/{adw_id}/review/{filename}
             object_key = f"adw/review/{Path(file_path).name}"
         
+        size = os.path.getsize(file_path)
+        attempts = get_upload_attempts()
+        for attempt in range(1, attempts + 1):
+            try:
+                # Upload file
+                with start_span(
+                    "r2:upload",
+                    new_trace=False,
+                    object_key=object_key,
+                    bytes=size,
+                    attempt=attempt,
+                ):
+                    self.client.upload_file(
+                        file_path,
+                        self.bucket_name,
+                        object_key,
+                        ExtraArgs=extra_args,
+                        Config=get_transfer_config(),
+                    )
+                self.logger.info(f"Uploaded {file_path} to R2 as {object_key}")
+
+                # Generate public URL
+                public_url = self.public_url(object_key)
+                return public_url
+
+            except Exception as e:
+                if attempt < attempts and _is_retryable(e):
+                    delay = UPLOAD_RETRY_BASE_DELAY * 2 ** (attempt - 1)
+                    delay += random.uniform(0, delay)
+                    self.logger.warning(
+                        f"Upload of {file_path} failed (attempt {attempt}/{attempts}), "
+                        f"retrying in {delay:.1f}s: {e}"
+                    )
+                    time.sleep(delay)
+                    continue
+                if _is_client_error(e):
+                    self.logger.error(f"Failed to upload {file_path} to R2: {e}")
+                else:
+                    self.logger.error(f"Unexpected error uploading to R2: {e}")
+                return None
+        return None
+
+    def upload_files(
+        self, uploads: List[Tuple[str, str]], max_workers: Optional[int] = None
+    ) -> Dict[str, Optional[str]]:
+        """
+        Upload several files concurrently.
+
+        Args:
+            uploads: List of (file_path, object_key) pairs
+            max_workers: Maximum uploads in flight at once (default ADW_R2_UPLOAD_CONCURRENCY)
+
+        Returns:
+            Dict mapping each file path to its public URL, or None if that upload failed
+        """
+        if not self.enabled or not uploads:
+            return {file_path: None for file_path, _ in uploads}
+        jobs = {
+            file_path: functools.partial(self.upload_file, file_path, object_key)
+            for file_path, object_key in uploads
+        }
+        return self._run_concurrently(jobs, max_workers)
+
+    def download_prefix(self, prefix: str, dest_dir: str) -> int:
+        """
+        Download every object under prefix into dest_dir, keeping relative paths.
+
+        Args:
+            prefix: Object key prefix, e.g. "runs/{adw_id}/"
+            dest_dir: Local directory to write into
+
+        Returns:
+            Number of files downloaded (0 if disabled, empty or on error)
+        """
+        if not self.enabled:
+            return 0
+
+        keys = []
+        token = None
         try:
-            # Upload file
-            self.client.upload_file(file_path, self.bucket_name, object_key)
-            self.logger.info(f"Uploaded {file_path} to R2 as {object_key}")
-            
-            # Generate public URL
-            public_url = f"https://{self.public_domain}/{object_key}"
-            return public_url
-            
-        except ClientError as e:
-            self.logger.error(f"Failed to upload {file_path} to R2: {e}")
-            return None
+            while True:
+                kwargs = {"Bucket": self.bucket_name, "Prefix": prefix}
+                if token:
+                    kwargs["ContinuationToken"] = token
+                page = self.client.list_objects_v2(**kwargs)
+                keys.extend(obj["Key"] for obj in page.get("Contents", []))
+                if not page.get("IsTruncated"):
+                    break
+                token = page.get("NextContinuationToken")
         except Exception as e:
-            self.logger.error(f"Unexpected error uploading to R2: {e}")
+            self.logger.error(f"Failed to list {prefix} in R2: {e}")
+            return 0
+
+        dest_root = os.path.abspath(dest_dir)
+        downloaded = 0
+        for key in keys:
+            path = os.path.abspath(os.path.join(dest_root, key[len(prefix):]))
+            if not path.startswith(dest_root + os.sep):
+                self.logger.warning(f"Skipped {key}: escapes {dest_dir}")
+                continue
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            try:
+                with start_span("r2:download", new_trace=False, object_key=key):
+                    self.client.download_file(self.bucket_name, key, path)
+                downloaded += 1
+            except Exception as e:
+                self.logger.error(f"Failed to download {key} from R2: {e}")
+        self.logger.info(f"Downloaded {downloaded}/{len(keys)} files from {prefix}")
+        return downloaded
+
+    def _run_concurrently(
+        self,
+        jobs: Dict[str, Callable[[], Optional[str]]],
+        max_workers: Optional[int] = None,
+    ) -> Dict[str, Optional[str]]:
+        """Run upload jobs (keyed by file path) on a bounded thread pool."""
+        if max_workers is None:
+            max_workers = get_upload_concurrency()
+        workers = max(1, min(max_workers, len(jobs)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="r2-upload") as pool:
+            # Copy the context so upload spans nest under the caller's span
+            futures = {
+                file_path: pool.submit(contextvars.copy_context().run, job)
+                for file_path, job in jobs.items()
+            }
+            return {file_path: future.result() for file_path, future in futures.items()}
+
+    def _is_uploaded(self, object_key: str) -> bool:
+        """Whether an object is in the local manifest or already in the bucket."""
+        with self._manifest_lock:
+            if self._manifest is None:
+                self._manifest = load_manifest(self.bucket_name, self.manifest_path)
+            if object_key in self._manifest:
+                return True
+        try:
+            with start_span("r2:head", new_trace=False, object_key=object_key):
+                self.client.head_object(Bucket=self.bucket_name, Key=object_key)
+        except Exception:
+            # 404, or HEAD failed - upload to be safe
+            return False
+        self._remember(object_key, 0)
+        return True
+
+    def _remember(self, object_key: str, size: int) -> None:
+        with self._manifest_lock:
+            if self._manifest is None:
+                self._manifest = load_manifest(self.bucket_name, self.manifest_path)
+            self._manifest.add(object_key)
+        try:
+            record_manifest(self.bucket_name, object_key, size, self.manifest_path)
+        except OSError as e:
+            self.logger.warning(f"Failed to record {object_key} in R2 manifest: {e}")
+
+    def upload_screenshot(self, file_path: str) -> Optional[str]:
+        """
+        Upload a screenshot under its content-hash key and return the public URL.
+
+        The image is recompressed first, and skipped entirely if the same
+        content was uploaded before.
+
+        Args:
+            file_path: Path to the screenshot (absolute or relative)
+
+        Returns:
+            Public URL if the screenshot is in R2, None if upload is disabled or fails
+        """
+        if not self.enabled:
             return None
-    
+
+        file_path = os.path.abspath(file_path)
+        if not os.path.exists(file_path):
+            self.logger.warning(f"File not found at absolute path: {file_path}")
+            return None
+
+        prepared = prepare_screenshot(file_path)
+        public_url = self.public_url(prepared.object_key)
+        if self._is_uploaded(prepared.object_key):
+            self.logger.info(f"Skipped {file_path}: already in R2 as {prepared.object_key}")
+            return public_url
+
+        planned_key = prepared.object_key
+        upload_path = compress(prepared)
+        # Falling back to the original changes the key to match its format
+        if prepared.object_key != planned_key and self._is_uploaded(prepared.object_key):
+            cleanup(prepared)
+            self.logger.info(f"Skipped {file_path}: already in R2 as {prepared.object_key}")
+            return self.public_url(prepared.object_key)
+        try:
+            url = self.upload_file(
+                upload_path,
+                prepared.object_key,
+                extra_args={
+                    "ContentType": prepared.content_type,
+                    "CacheControl": IMMUTABLE_CACHE_CONTROL,
+                },
+            )
+        finally:
+            cleanup(prepared)
+        if url:
+            self.logger.info(
+                f"Compressed {file_path} {prepared.original_bytes:,} -> "
+                f"{prepared.upload_bytes:,} bytes"
+            )
+            self._remember(prepared.object_key, prepared.upload_bytes)
+        return url
+
+    def upload_screenshot_files(
+        self, file_paths: List[str], max_workers: Optional[int] = None
+    ) -> Dict[str, Optional[str]]:
+        """
+        Upload several screenshots concurrently under content-hash keys.
+
+        Returns:
+            Dict mapping each file path to its public URL, or None if that upload failed
+        """
+        if not self.enabled or not file_paths:
+            return {file_path: None for file_path in file_paths}
+        jobs = {
+            file_path: functools.partial(self.upload_screenshot, file_path)
+            for file_path in file_paths
+        }
+        return self._run_concurrently(jobs, max_workers)
+
     def upload_screenshots(self, screenshots: List[str], adw_id: str) -> Dict[str, str]:
         """
         Upload multiple screenshots and return mapping of local paths to public URLs.
         
         Args:
             screenshots: List of local screenshot file paths
-            adw_id: ADW workflow ID for organizing uploads
+            adw_id: ADW workflow ID (keys are content hashes, shared across workflows)
             
         Returns:
             Dict mapping local paths to public URLs (or original paths if upload disabled/failed)
         """
-        url_mapping = {}
-        
-        for screenshot_path in screenshots:
-            if not screenshot_path:
-                continue
-                
-            # Generate object key with ADW ID for organization
-            filename = Path(screenshot_path).name
-            object_key = f"adw/{adw_id}/review/{filename}"
-            
-            # Upload and get public URL
-            public_url = self.upload_file(screenshot_path, object_key)
-            
-            # Map to public URL if successful, otherwise keep original path
-            url_mapping[screenshot_path] = public_url or screenshot_path
-            
-        return url_mapping
\ No newline at end of file
+        paths = [path for path in screenshots if path]
+        self.logger.info(f"Uploading {len(paths)} screenshots for ADW {adw_id}")
+
+        # Map to public URL if successful, otherwise keep original path
+        results = self.upload_screenshot_files(paths)
+        return {path: results.get(path) or path for path in paths}
+
+
+def _is_client_error(error: Exception) -> bool:
+    """Whether error is a botocore ClientError, without importing botocore up front."""
+    if "botocore" not in sys.modules:
+        return False
+    from botocore.exceptions import ClientError
+
+    return isinstance(error, ClientError)
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Whether an upload error is worth another attempt."""
+    if _is_client_error(error):
+        status = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0)
+        code = error.response.get("Error", {}).get("Code", "")
+        return status >= 500 or status == 429 or code in ("SlowDown", "RequestTimeout")
+    if isinstance(error, (FileNotFoundError, PermissionError)):
+        return False
+    # boto3 wraps transfer errors in S3UploadFailedError; don't retry bad credentials
+    message = str(error)
+    return not any(
+        code in message for code in ("AccessDenied", "InvalidAccessKeyId", "NoSuchBucket")
+    )
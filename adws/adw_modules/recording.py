@@ -0,0 +1,256 @@
+"""Record and replay of Claude Code agent sessions.
+
+ADW_AGENT_MODE selects how prompt_claude_code runs an agent:
+- live (default): call the CLI
+- record: call the CLI and store the session under
+  agents/recordings/{recording}/: the stream-json transcript, the response and
+  the diff the session made to its working directory
+- replay: serve the stored transcript and response and re-apply the diff
+  instead of calling the CLI
+
+The recording name comes from ADW_RECORDING and defaults to the run's adw_id.
+Calls are matched by a fingerprint of the agent name and the prompt with the
+adw_id and working directory normalized out, plus an occurrence number, so a
+recorded run can be replayed under a new adw_id and worktree. The adw_id and
+working directory are substituted back into everything served on replay.
+
+Working directory changes are captured by snapshotting the tree with
+`git write-tree` on a scratch copy of the index before and after the call, so
+the real index and HEAD are never touched.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import logging
+import tempfile
+import subprocess
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from .data_types import AgentPromptRequest, AgentPromptResponse, RetryCode
+
+logger = logging.getLogger(__name__)
+
+AGENT_MODE_ENV = "ADW_AGENT_MODE"
+AGENT_MODES = ["live", "record", "replay"]
+RECORDING_ENV = "ADW_RECORDING"
+INDEX_FILENAME = "index.jsonl"
+
+
+def get_agent_mode() -> str:
+    """Mode selected by ADW_AGENT_MODE (read per call)."""
+    mode = os.getenv(AGENT_MODE_ENV, "live").lower()
+    return mode if mode in AGENT_MODES else "live"
+
+
+def get_recordings_dir() -> str:
+    """Get the shared recordings directory: agents/recordings/."""
+    project_root = os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    return os.getenv(
+        "ADW_RECORDINGS_DIR", os.path.join(project_root, "agents", "recordings")
+    )
+
+
+def get_recording_dir(adw_id: str) -> str:
+    """Directory of the recording used for this run."""
+    return os.path.join(get_recordings_dir(), os.getenv(RECORDING_ENV) or adw_id)
+
+
+def normalize(text: str, adw_id: str, working_dir: Optional[str]) -> str:
+    """Replace run-specific values with placeholders."""
+    if working_dir:
+        text = text.replace(working_dir, "{working_dir}")
+    return text.replace(adw_id, "{adw_id}")
+
+
+def denormalize(text: str, adw_id: str, working_dir: Optional[str]) -> str:
+    """Fill placeholders written by normalize() with this run's values."""
+    if working_dir:
+        text = text.replace("{working_dir}", working_dir)
+    return text.replace("{adw_id}", adw_id)
+
+
+def fingerprint_request(request: AgentPromptRequest) -> str:
+    """Identify a call independently of the run it was made in."""
+    prompt = normalize(request.prompt, request.adw_id, request.working_dir)
+    key = json.dumps([request.agent_name, prompt])
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def load_index(recording_dir: str) -> List[Dict[str, Any]]:
+    """Read the recorded calls, oldest first."""
+    index_path = os.path.join(recording_dir, INDEX_FILENAME)
+    if not os.path.exists(index_path):
+        return []
+    entries = []
+    with open(index_path, "r") as f:
+        for line in f:
+            if line.strip():
+                entries.append(json.loads(line))
+    return entries
+
+
+def _git(args: List[str], cwd: Optional[str], env: Optional[Dict[str, str]] = None) -> str:
+    result = subprocess.run(
+        ["git", *args], capture_output=True, text=True, cwd=cwd, env=env, check=True
+    )
+    return result.stdout.strip()
+
+
+def snapshot_worktree(working_dir: Optional[str]) -> Optional[str]:
+    """Write the working directory's current contents as a git tree.
+
+    Uses a copy of the real index so unchanged files aren't re-hashed.
+    Returns the tree hash, or None outside a git repository.
+    """
+    try:
+        index_path = _git(["rev-parse", "--path-format=absolute", "--git-path", "index"], working_dir)
+        with tempfile.TemporaryDirectory() as tmp:
+            scratch_index = os.path.join(tmp, "index")
+            if os.path.exists(index_path):
+                shutil.copyfile(index_path, scratch_index)
+            env = {**os.environ, "GIT_INDEX_FILE": scratch_index}
+            _git(["add", "-A"], working_dir, env)
+            return _git(["write-tree"], working_dir, env)
+    except (subprocess.CalledProcessError, FileNotFoundError) as e:
+        logger.warning(f"Could not snapshot {working_dir or os.getcwd()}: {e}")
+        return None
+
+
+def diff_trees(before: str, after: str, working_dir: Optional[str]) -> str:
+    """Binary patch between two tree snapshots."""
+    if before == after:
+        return ""
+    result = subprocess.run(
+        ["git", "diff", "--binary", before, after],
+        capture_output=True, text=True, cwd=working_dir, check=True,
+    )
+    return result.stdout
+
+
+def record_session(
+    request: AgentPromptRequest,
+    run: Callable[[AgentPromptRequest], AgentPromptResponse],
+) -> AgentPromptResponse:
+    """Run the call live and store its transcript, response and diff."""
+    before = snapshot_worktree(request.working_dir)
+    response = run(request)
+    after = snapshot_worktree(request.working_dir)
+
+    try:
+        recording_dir = get_recording_dir(request.adw_id)
+        os.makedirs(recording_dir, exist_ok=True)
+        fingerprint = fingerprint_request(request)
+        sequence = sum(
+            1 for entry in load_index(recording_dir) if entry["fingerprint"] == fingerprint
+        )
+        name = f"{fingerprint}-{sequence}"
+
+        transcript = None
+        if os.path.exists(request.output_file):
+            transcript = f"{name}.jsonl"
+            shutil.copyfile(request.output_file, os.path.join(recording_dir, transcript))
+
+        diff_file = None
+        if before and after:
+            diff = diff_trees(before, after, request.working_dir)
+            if diff:
+                diff_file = f"{name}.diff"
+                with open(os.path.join(recording_dir, diff_file), "w") as f:
+                    f.write(diff)
+
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "fingerprint": fingerprint,
+            "sequence": sequence,
+            "agent_name": request.agent_name,
+            "slash_command": request.slash_command,
+            "adw_id": request.adw_id,
+            "working_dir": request.working_dir,
+            "transcript": transcript,
+            "diff": diff_file,
+            "response": response.model_dump(mode="json"),
+        }
+        with open(os.path.join(recording_dir, INDEX_FILENAME), "a") as f:
+            f.write(json.dumps(entry) + "\n")
+    except (OSError, subprocess.CalledProcessError) as e:
+        # Recording is a side channel; never fail the call because of it
+        logger.warning(f"Failed to record {request.agent_name} session: {e}")
+
+    return response
+
+
+def _next_sequence(recording_dir: str, adw_id: str, fingerprint: str) -> int:
+    """Claim the next occurrence of a fingerprint for this replay run."""
+    positions_dir = os.path.join(recording_dir, "replays")
+    os.makedirs(positions_dir, exist_ok=True)
+    positions_path = os.path.join(positions_dir, f"{adw_id}.json")
+    positions: Dict[str, int] = {}
+    if os.path.exists(positions_path):
+        with open(positions_path, "r") as f:
+            positions = json.load(f)
+    sequence = positions.get(fingerprint, 0)
+    positions[fingerprint] = sequence + 1
+    with open(positions_path, "w") as f:
+        json.dump(positions, f)
+    return sequence
+
+
+def replay_error(message: str) -> AgentPromptResponse:
+    return AgentPromptResponse(
+        output=f"Replay error: {message}", success=False, retry_code=RetryCode.NONE
+    )
+
+
+def replay_session(request: AgentPromptRequest) -> AgentPromptResponse:
+    """Serve a recorded call: write its transcript, apply its diff, return its response."""
+    recording_dir = get_recording_dir(request.adw_id)
+    fingerprint = fingerprint_request(request)
+    sequence = _next_sequence(recording_dir, request.adw_id, fingerprint)
+    entry = next(
+        (
+            entry for entry in load_index(recording_dir)
+            if entry["fingerprint"] == fingerprint and entry["sequence"] == sequence
+        ),
+        None,
+    )
+    if entry is None:
+        return replay_error(
+            f"no recording of {request.agent_name} call #{sequence + 1} "
+            f"({fingerprint}) in {recording_dir}"
+        )
+
+    def localize(text: str) -> str:
+        return denormalize(
+            normalize(text, entry["adw_id"], entry["working_dir"]),
+            request.adw_id,
+            request.working_dir,
+        )
+
+    output_dir = os.path.dirname(request.output_file)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    if entry["transcript"]:
+        with open(os.path.join(recording_dir, entry["transcript"]), "r") as f:
+            transcript = f.read()
+        with open(request.output_file, "w") as f:
+            f.write(localize(transcript))
+
+    if entry["diff"]:
+        with open(os.path.join(recording_dir, entry["diff"]), "r") as f:
+            diff = localize(f.read())
+        result = subprocess.run(
+            ["git", "apply", "--binary", "--whitespace=nowarn", "-"],
+            input=diff, capture_output=True, text=True, cwd=request.working_dir,
+        )
+        if result.returncode != 0:
+            return replay_error(
+                f"recorded changes of {request.agent_name} don't apply: {result.stderr.strip()}"
+            )
+
+    response = AgentPromptResponse(**entry["response"])
+    return response.model_copy(update={"output": localize(response.output)})
@@ -0,0 +1,287 @@
+"""Retry policy for Claude Code agent calls.
+
+Provides:
+- Classification of failures from stderr / JSONL error text into RetryCodes,
+  including rate-limit and overload responses and non-transient errors
+- RetryPolicy: jittered exponential backoff with per-error-class budgets
+- CircuitBreaker: fails fast while the API is degraded
+- RetryMetrics: process-wide counters for retries, give-ups and sleep time
+"""
+
+import random
+import re
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from adw_modules.data_types import RetryCode
+
+# Patterns are matched case-insensitively against stderr and JSONL error text.
+# Status codes only count in an error or status context ("API Error: 429",
+# "status code: 503", "HTTP/1.1 529"), not as bare numbers in test output,
+# line numbers or ids.
+_STATUS = r"\b(?:api error|error|status(?:[ _]?code)?|http(?:/[\d.]+)?)[\"']?\s*[:=]?\s*"
+
+
+def _status(code: int) -> str:
+    return rf"{_STATUS}{code}\b"
+
+
+RATE_LIMIT_PATTERNS = [r"rate_limit", r"rate limit", _status(429), r"too many requests"]
+OVERLOADED_PATTERNS = [r"overloaded", _status(529), _status(503), r"service unavailable"]
+# Errors that will fail the same way on every attempt
+NON_TRANSIENT_PATTERNS = [
+    r"unknown option",
+    r"unknown argument",
+    r"invalid value",
+    r"error: option",
+    r"invalid api key",
+    r"authentication_error",
+    r"permission_error",
+    _status(401),
+    _status(403),
+    r"invalid_request_error",
+]
+RETRY_AFTER_PATTERN = re.compile(r"retry[- ]after[\"':\s]*(\d+(?:\.\d+)?)", re.IGNORECASE)
+
+# Retry codes that are caused by the API rather than the agent or the CLI
+THROTTLE_CODES = {RetryCode.RATE_LIMIT_ERROR, RetryCode.OVERLOADED_ERROR}
+# Retry codes that count towards opening the circuit breaker
+DEGRADED_CODES = THROTTLE_CODES | {RetryCode.CLAUDE_CODE_ERROR}
+
+# Maximum retries per error class within one call
+DEFAULT_BUDGETS: Dict[RetryCode, int] = {
+    RetryCode.CLAUDE_CODE_ERROR: 3,
+    RetryCode.TIMEOUT_ERROR: 1,  # Timeouts are expensive, retry once
+    RetryCode.EXECUTION_ERROR: 2,
+    RetryCode.ERROR_DURING_EXECUTION: 2,
+    RetryCode.RATE_LIMIT_ERROR: 6,
+    RetryCode.OVERLOADED_ERROR: 6,
+    RetryCode.NONE: 0,
+}
+
+
+def _matches_any(text: str, patterns: List[str]) -> bool:
+    return any(re.search(pattern, text, re.IGNORECASE) for pattern in patterns)
+
+
+def classify_failure(
+    error_text: str, default: RetryCode = RetryCode.CLAUDE_CODE_ERROR
+) -> Tuple[RetryCode, Optional[float]]:
+    """Classify a failed call from its stderr / JSONL error text.
+
+    Returns (retry_code, retry_after_seconds). retry_after_seconds is the
+    server's backoff hint when one could be parsed, otherwise None.
+    """
+    if not error_text:
+        return default, None
+
+    retry_after = None
+    match = RETRY_AFTER_PATTERN.search(error_text)
+    if match:
+        retry_after = float(match.group(1))
+
+    if _matches_any(error_text, RATE_LIMIT_PATTERNS):
+        return RetryCode.RATE_LIMIT_ERROR, retry_after
+    if _matches_any(error_text, OVERLOADED_PATTERNS):
+        return RetryCode.OVERLOADED_ERROR, retry_after
+    if _matches_any(error_text, NON_TRANSIENT_PATTERNS):
+        return RetryCode.NONE, None
+    return default, retry_after
+
+
+class RetryPolicy:
+    """Decides whether and how long to wait before retrying a failed call.
+
+    Backoff is exponential with equal jitter: half of the computed delay is
+    fixed, the other half random, so concurrent ADWs don't retry in lockstep.
+    Throttling errors (rate limit / overload) use a longer base delay, honour
+    the server's retry-after hint, and don't consume the max_retries budget.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        multiplier: float = 2.0,
+        throttle_base_delay: float = 10.0,
+        throttle_max_delay: float = 120.0,
+        budgets: Optional[Dict[RetryCode, int]] = None,
+        fixed_delays: Optional[List[float]] = None,
+        jitter: bool = True,
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.throttle_base_delay = throttle_base_delay
+        self.throttle_max_delay = throttle_max_delay
+        self.budgets = dict(DEFAULT_BUDGETS)
+        if budgets:
+            self.budgets.update(budgets)
+        # Copy so callers' lists are never mutated
+        self.fixed_delays = list(fixed_delays) if fixed_delays else None
+        self.jitter = jitter
+
+    def should_retry(
+        self, retry_code: RetryCode, class_attempts: Counter, total_retries: int
+    ) -> bool:
+        """Check budgets for a failure that has already been counted.
+
+        Args:
+            retry_code: Code of the failure just observed
+            class_attempts: Failures so far per retry code (including this one)
+            total_retries: Retries already spent on non-throttling errors
+        """
+        budget = self.budgets.get(retry_code, 0)
+        if budget <= 0 or class_attempts[retry_code] > budget:
+            return False
+        if retry_code not in THROTTLE_CODES and total_retries >= self.max_retries:
+            return False
+        return True
+
+    def get_delay(
+        self,
+        retry_code: RetryCode,
+        retry_number: int,
+        retry_after: Optional[float] = None,
+    ) -> float:
+        """Seconds to wait before the given retry (0-based retry_number)."""
+        if retry_code in THROTTLE_CODES:
+            if retry_after is not None:
+                # Server told us when to come back (capped, so a huge hint can't
+                # outlast the agent timeout); add a little spread
+                delay = min(retry_after, self.throttle_max_delay)
+                return delay + (random.uniform(0, 1) if self.jitter else 0)
+            delay = min(
+                self.throttle_max_delay,
+                self.throttle_base_delay * (self.multiplier**retry_number),
+            )
+        elif self.fixed_delays:
+            if retry_number < len(self.fixed_delays):
+                return self.fixed_delays[retry_number]
+            # Extend with incrementing delays without touching the list
+            extra = retry_number - len(self.fixed_delays) + 1
+            return self.fixed_delays[-1] + 2 * extra
+        else:
+            delay = min(self.max_delay, self.base_delay * (self.multiplier**retry_number))
+
+        if not self.jitter:
+            return delay
+        return delay / 2 + random.uniform(0, delay / 2)
+
+
+class CircuitBreaker:
+    """Process-wide breaker that stops calling the API while it is degraded.
+
+    Opens after `failure_threshold` consecutive degraded failures (rate limit,
+    overload, CLI error). While open, calls fail fast. After `reset_timeout`
+    seconds a single trial call is let through (half-open); its outcome
+    closes or re-opens the breaker.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """One of 'closed', 'open' or 'half_open'."""
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow_request(self) -> bool:
+        """Return True if a call may go ahead."""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            return False
+
+    def record_result(self, success: bool, retry_code: RetryCode) -> None:
+        """Update the breaker with the outcome of a call."""
+        with self._lock:
+            self.trial_in_flight = False
+            if success or retry_code not in DEGRADED_CODES:
+                self.consecutive_failures = 0
+                self.opened_at = None
+                return
+            self.consecutive_failures += 1
+            if (
+                self.opened_at is not None
+                or self.consecutive_failures >= self.failure_threshold
+            ):
+                self.opened_at = time.monotonic()
+
+    def reset(self) -> None:
+        """Close the breaker and forget failures."""
+        with self._lock:
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+
+class RetryMetrics:
+    """Thread-safe counters describing retry behaviour in this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all counters."""
+        with self._lock:
+            self.calls = 0
+            self.attempts = 0
+            self.retries: Counter = Counter()
+            self.give_ups: Counter = Counter()
+            self.circuit_rejections = 0
+            self.sleep_seconds = 0.0
+
+    def record_attempt(self, is_first: bool) -> None:
+        with self._lock:
+            self.attempts += 1
+            if is_first:
+                self.calls += 1
+
+    def record_retry(self, retry_code: RetryCode, delay: float) -> None:
+        with self._lock:
+            self.retries[retry_code.value] += 1
+            self.sleep_seconds += delay
+
+    def record_give_up(self, retry_code: RetryCode) -> None:
+        with self._lock:
+            self.give_ups[retry_code.value] += 1
+
+    def record_circuit_rejection(self) -> None:
+        with self._lock:
+            self.circuit_rejections += 1
+
+    def snapshot(self) -> Dict[str, object]:
+        """Return a copy of the counters as plain data."""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "attempts": self.attempts,
+                "retries": dict(self.retries),
+                "give_ups": dict(self.give_ups),
+                "circuit_rejections": self.circuit_rejections,
+                "sleep_seconds": round(self.sleep_seconds, 3),
+            }
+
+
+# Shared by every agent call in this process
+circuit_breaker = CircuitBreaker()
+retry_metrics = RetryMetrics()
@@ -0,0 +1,170 @@
+"""Screenshot preprocessing before upload.
+
+Screenshots are hashed and, when Pillow is available, recompressed:
+- png (default): lossless PNG re-encode with optimize=True
+- webp: WebP at ADW_SCREENSHOT_WEBP_QUALITY (lossless when set to 100)
+- original: uploaded byte-for-byte
+
+The object key is derived from the SHA-256 of the original file, so the same
+screenshot captured on every review attempt maps to one stable, cacheable URL.
+Its extension always matches the bytes uploaded under it, and lossy WebP keys
+carry the quality (`{digest}-q90.webp`), since the content depends on it.
+"""
+
+import os
+import hashlib
+import tempfile
+
+from typing import Optional
+
+from adw_modules.data_types import PreparedScreenshot
+
+# Content-addressed objects never change, so browsers and CDNs may cache forever
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+CONTENT_TYPES = {
+    ".png": "image/png",
+    ".webp": "image/webp",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+}
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".gif", ".bmp"}
+
+
+def get_screenshot_format() -> str:
+    """Recompression format from ADW_SCREENSHOT_FORMAT (png, webp or original)."""
+    return os.getenv("ADW_SCREENSHOT_FORMAT", "png").lower()
+
+
+def get_webp_quality() -> int:
+    """WebP quality from ADW_SCREENSHOT_WEBP_QUALITY."""
+    return int(os.getenv("ADW_SCREENSHOT_WEBP_QUALITY", "90"))
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 hex digest of a file's content."""
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _pillow_available() -> bool:
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def reencodes(source_path: str, fmt: Optional[str] = None) -> bool:
+    """Whether compress() will try to re-encode this file."""
+    fmt = fmt or get_screenshot_format()
+    ext = os.path.splitext(source_path)[1].lower()
+    return fmt != "original" and ext in IMAGE_EXTENSIONS and _pillow_available()
+
+
+def output_extension(source_path: str, fmt: Optional[str] = None) -> str:
+    """Extension the uploaded object will have if re-encoding succeeds."""
+    fmt = fmt or get_screenshot_format()
+    if not reencodes(source_path, fmt):
+        return os.path.splitext(source_path)[1].lower()
+    return ".webp" if fmt == "webp" else ".png"
+
+
+def object_key(prefix: str, digest: str, ext: str, fmt: Optional[str] = None) -> str:
+    """Content-addressed key; WebP re-encodes also name their quality."""
+    fmt = fmt or get_screenshot_format()
+    variant = f"-q{get_webp_quality()}" if ext == ".webp" and fmt == "webp" else ""
+    return f"{prefix}/{digest}{variant}{ext}"
+
+
+def prepare_screenshot(
+    source_path: str, prefix: str = "adw/screenshots", fmt: Optional[str] = None
+) -> PreparedScreenshot:
+    """Hash a screenshot and work out its content-addressed key.
+
+    Cheap: nothing is recompressed until compress() is called, so
+    screenshots that are already uploaded cost one read of the file.
+    """
+    fmt = fmt or get_screenshot_format()
+    digest = file_digest(source_path)
+    ext = output_extension(source_path, fmt)
+    reencoded = reencodes(source_path, fmt)
+    return PreparedScreenshot(
+        source_path=source_path,
+        digest=digest,
+        object_key=object_key(prefix, digest, ext, fmt if reencoded else "original"),
+        content_type=CONTENT_TYPES.get(ext, "application/octet-stream"),
+        original_bytes=os.path.getsize(source_path),
+    )
+
+
+def use_original(prepared: PreparedScreenshot) -> str:
+    """Upload the source file as-is, under a key and content type that match it."""
+    source_ext = os.path.splitext(prepared.source_path)[1].lower()
+    prefix = prepared.object_key.rsplit("/", 1)[0]
+    prepared.upload_path = prepared.source_path
+    prepared.upload_bytes = prepared.original_bytes
+    prepared.object_key = object_key(prefix, prepared.digest, source_ext, "original")
+    prepared.content_type = CONTENT_TYPES.get(source_ext, "application/octet-stream")
+    return prepared.upload_path
+
+
+def cleanup(prepared: PreparedScreenshot) -> None:
+    """Remove the recompressed temp file, if one was written."""
+    if prepared.upload_path and prepared.upload_path != prepared.source_path:
+        try:
+            os.unlink(prepared.upload_path)
+        except OSError:
+            pass
+
+
+def compress(prepared: PreparedScreenshot, fmt: Optional[str] = None) -> str:
+    """Write the recompressed image and return the path to upload.
+
+    Falls back to the source file when Pillow is missing, the file is not an
+    image, or recompression fails or would not make it smaller; the key and
+    content type then switch to the source's extension.
+    """
+    fmt = fmt or get_screenshot_format()
+    source_ext = os.path.splitext(prepared.source_path)[1].lower()
+    target_ext = os.path.splitext(prepared.object_key)[1]
+    if fmt == "original" or source_ext not in IMAGE_EXTENSIONS:
+        return use_original(prepared)
+    try:
+        from PIL import Image
+    except ImportError:
+        return use_original(prepared)
+
+    quality = get_webp_quality()
+    fd, tmp_path = tempfile.mkstemp(suffix=target_ext)
+    os.close(fd)
+    try:
+        with Image.open(prepared.source_path) as image:
+            if target_ext == ".webp":
+                image.save(
+                    tmp_path,
+                    "WEBP",
+                    quality=quality,
+                    lossless=quality >= 100,
+                    method=6,
+                )
+            else:
+                image.save(tmp_path, "PNG", optimize=True)
+    except Exception:
+        os.unlink(tmp_path)
+        return use_original(prepared)
+
+    size = os.path.getsize(tmp_path)
+    # Only a format change forces the re-encoded file; otherwise keep the smaller
+    if size >= prepared.original_bytes and target_ext == source_ext:
+        os.unlink(tmp_path)
+        return use_original(prepared)
+
+    prepared.upload_path = tmp_path
+    prepared.upload_bytes = size
+    return tmp_path
@@ -0,0 +1,200 @@
+"""Storage backends for R2Uploader.
+
+R2Uploader talks to its storage through the subset of the boto3 S3 client it
+uses: upload_file(Filename, Bucket, Key, ExtraArgs, Config),
+head_object(Bucket, Key), which raises a 404 ClientError for missing keys,
+and, for pulling run artifacts back, list_objects_v2(Bucket, Prefix,
+ContinuationToken) and download_file(Bucket, Key, Filename).
+Besides the real R2 client, two stand-ins implement that interface:
+
+- LocalStorageClient: writes objects under a directory; URLs are file:// URLs
+- MemoryStorageClient: keeps objects in memory and can inject latency,
+  bandwidth limits and transient failures, for tests and benchmarks
+
+Select one with ADW_STORAGE_BACKEND=r2|local|memory (default r2).
+"""
+
+import os
+import json
+import time
+import random
+import shutil
+import threading
+from typing import Dict, List, Optional
+
+STORAGE_BACKEND_ENV = "ADW_STORAGE_BACKEND"
+STORAGE_BACKENDS = ["r2", "local", "memory"]
+DEFAULT_LOCAL_BUCKET = "adw-screenshots"
+
+
+def get_storage_backend() -> str:
+    """Backend selected by ADW_STORAGE_BACKEND."""
+    backend = os.getenv(STORAGE_BACKEND_ENV, "r2").lower()
+    return backend if backend in STORAGE_BACKENDS else "r2"
+
+
+def get_local_storage_dir() -> str:
+    """Default root for LocalStorageClient: agents/storage/."""
+    project_root = os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    return os.getenv(
+        "ADW_LOCAL_STORAGE_DIR", os.path.join(project_root, "agents", "storage")
+    )
+
+
+def not_found(operation: str) -> Exception:
+    """The error boto3 raises for a missing object."""
+    from botocore.exceptions import ClientError
+
+    return ClientError(
+        {"Error": {"Code": "404", "Message": "Not Found"},
+         "ResponseMetadata": {"HTTPStatusCode": 404}},
+        operation,
+    )
+
+
+class LocalStorageClient:
+    """S3 stand-in that stores objects as files under root/bucket/key."""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or get_local_storage_dir()
+
+    def _path(self, bucket: str, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, bucket, key))
+        if not path.startswith(os.path.abspath(self.root) + os.sep):
+            raise ValueError(f"Object key escapes storage root: {key}")
+        return path
+
+    def upload_file(self, Filename, Bucket, Key, ExtraArgs=None, Config=None):
+        path = self._path(Bucket, Key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp.{threading.get_ident()}"
+        shutil.copyfile(Filename, tmp_path)
+        os.replace(tmp_path, path)
+        if ExtraArgs:
+            with open(path + ".meta.json", "w") as f:
+                json.dump(ExtraArgs, f)
+
+    def head_object(self, Bucket, Key):
+        path = self._path(Bucket, Key)
+        if not os.path.exists(path):
+            raise not_found("HeadObject")
+        return {"ContentLength": os.path.getsize(path)}
+
+    def list_objects_v2(self, Bucket, Prefix="", ContinuationToken=None):
+        bucket_root = os.path.join(os.path.abspath(self.root), Bucket)
+        # Only walk the directory the prefix points into
+        prefix_dir = Prefix.rsplit("/", 1)[0] if "/" in Prefix else ""
+        top = os.path.join(bucket_root, prefix_dir)
+        contents = []
+        for root, _, files in os.walk(top):
+            for name in files:
+                if name.endswith(".meta.json") or ".tmp." in name:
+                    continue
+                path = os.path.join(root, name)
+                key = os.path.relpath(path, bucket_root).replace(os.sep, "/")
+                if key.startswith(Prefix):
+                    contents.append({"Key": key, "Size": os.path.getsize(path)})
+        contents.sort(key=lambda obj: obj["Key"])
+        return {"Contents": contents, "KeyCount": len(contents), "IsTruncated": False}
+
+    def download_file(self, Bucket, Key, Filename):
+        path = self._path(Bucket, Key)
+        if not os.path.exists(path):
+            raise not_found("GetObject")
+        shutil.copyfile(path, Filename)
+
+    def public_url(self, bucket: str, key: str) -> str:
+        return "file://" + self._path(bucket, key)
+
+
+class MemoryStorageClient:
+    """In-process S3 stand-in with injectable latency and failures.
+
+    Args:
+        latency_ms: Fixed delay added to every request
+        bandwidth_mbps: Upload bandwidth per request in megabits/s (0 = unlimited)
+        failure_rate: Probability that an upload fails with a transient error
+        seed: Seed for the failure injection, for reproducible runs
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        bandwidth_mbps: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.latency_ms = latency_ms
+        self.bandwidth_mbps = bandwidth_mbps
+        self.failure_rate = failure_rate
+        self.objects: Dict[str, Dict[str, object]] = {}
+        self.uploads = 0
+        self.failures = 0
+        self.heads = 0
+        self.upload_seconds: List[float] = []
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _transfer_delay(self, size: int) -> float:
+        delay = self.latency_ms / 1000
+        if self.bandwidth_mbps > 0:
+            delay += size * 8 / (self.bandwidth_mbps * 1_000_000)
+        return delay
+
+    def upload_file(self, Filename, Bucket, Key, ExtraArgs=None, Config=None):
+        started = time.monotonic()
+        with open(Filename, "rb") as f:
+            data = f.read()
+        time.sleep(self._transfer_delay(len(data)))
+
+        with self._lock:
+            self.uploads += 1
+            fail = self._random.random() < self.failure_rate
+            if fail:
+                self.failures += 1
+                kind = self._random.choice(["reset", "slowdown"])
+        if fail:
+            if kind == "reset":
+                raise ConnectionError("Injected failure: connection reset by peer")
+            from botocore.exceptions import ClientError
+
+            raise ClientError(
+                {"Error": {"Code": "SlowDown", "Message": "Injected throttle"},
+                 "ResponseMetadata": {"HTTPStatusCode": 503}},
+                "PutObject",
+            )
+
+        with self._lock:
+            self.objects[f"{Bucket}/{Key}"] = {"data": data, "extra_args": ExtraArgs or {}}
+            self.upload_seconds.append(time.monotonic() - started)
+
+    def head_object(self, Bucket, Key):
+        time.sleep(self.latency_ms / 1000)
+        with self._lock:
+            self.heads += 1
+            obj = self.objects.get(f"{Bucket}/{Key}")
+        if obj is None:
+            raise not_found("HeadObject")
+        return {"ContentLength": len(obj["data"])}
+
+    def list_objects_v2(self, Bucket, Prefix="", ContinuationToken=None):
+        time.sleep(self.latency_ms / 1000)
+        start = f"{Bucket}/{Prefix}"
+        with self._lock:
+            contents = [
+                {"Key": name[len(Bucket) + 1:], "Size": len(obj["data"])}
+                for name, obj in sorted(self.objects.items())
+                if name.startswith(start)
+            ]
+        return {"Contents": contents, "KeyCount": len(contents), "IsTruncated": False}
+
+    def download_file(self, Bucket, Key, Filename):
+        with self._lock:
+            obj = self.objects.get(f"{Bucket}/{Key}")
+        if obj is None:
+            raise not_found("GetObject")
+        time.sleep(self._transfer_delay(len(obj["data"])))
+        with open(Filename, "wb") as f:
+            f.write(obj["data"])
@@ -0,0 +1,264 @@
+"""Supervisor for long-running agent subprocesses.
+
+Runs a command with stdout streamed to a file and enforces:
+- a wall-clock timeout
+- an inactivity watchdog: the process is killed when its output file stops
+  growing (no new JSONL line) for `idle_timeout` seconds
+- optional RLIMIT memory / CPU caps (POSIX only)
+
+The process runs in its own session so that a kill takes down the whole
+process group (the CLI plus any tools it spawned), not just the parent.
+Limits are set by a small exec wrapper rather than a preexec_fn, which is not
+safe when agents are started from several threads (parallel E2E workers).
+"""
+
+import os
+import sys
+import signal
+import subprocess
+import threading
+import time
+from typing import IO, Dict, List, Optional, Union
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Seconds between SIGTERM and SIGKILL when stopping a process group
+KILL_GRACE_PERIOD = 5.0
+
+# Seconds between watchdog checks
+POLL_INTERVAL = 1.0
+
+
+class SupervisedResult:
+    """Outcome of a supervised subprocess."""
+
+    def __init__(
+        self,
+        returncode: int,
+        stderr: str,
+        elapsed: float,
+        kill_reason: Optional[str] = None,
+    ):
+        self.returncode = returncode
+        self.stderr = stderr
+        self.elapsed = elapsed
+        # None, "timeout" (wall clock) or "inactivity" (watchdog)
+        self.kill_reason = kill_reason
+
+    @property
+    def killed(self) -> bool:
+        return self.kill_reason is not None
+
+
+# Sets the limits passed as argv[1:3] (0 = none), then execs the command
+_LIMITS_WRAPPER = """
+import os, resource, sys
+memory, cpu = int(sys.argv[1]), int(sys.argv[2])
+if memory:
+    # RLIMIT_DATA caps heap growth without breaking runtimes (node)
+    # that reserve large virtual address ranges up front
+    rlimit = getattr(resource, "RLIMIT_DATA", resource.RLIMIT_AS)
+    resource.setrlimit(rlimit, (memory, memory))
+if cpu:
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu))
+os.execvp(sys.argv[3], sys.argv[3:])
+"""
+
+
+def _with_limits(
+    cmd: List[str], memory_limit_mb: Optional[int], cpu_limit_seconds: Optional[int]
+) -> List[str]:
+    """Wrap cmd so it starts under the resource limits, if any."""
+    if resource is None or not (memory_limit_mb or cpu_limit_seconds):
+        return cmd
+    memory = (memory_limit_mb or 0) * 1024 * 1024
+    # -I -S: skip site and PYTHON* env vars; the wrapper only needs resource
+    return [
+        sys.executable, "-I", "-S", "-c", _LIMITS_WRAPPER,
+        str(memory), str(cpu_limit_seconds or 0), *cmd,
+    ]
+
+
+def _group_alive(pgid: int) -> bool:
+    """Whether any non-zombie process is left in the process group."""
+    if os.path.isdir("/proc/self"):
+        for pid in os.listdir("/proc"):
+            if not pid.isdigit():
+                continue
+            try:
+                with open(f"/proc/{pid}/stat") as f:
+                    # comm may contain spaces; fields resume after its ")"
+                    fields = f.read().rsplit(")", 1)[1].split()
+            except (OSError, IndexError):
+                continue
+            if int(fields[2]) == pgid and fields[0] != "Z":
+                return True
+        return False
+    try:
+        os.killpg(pgid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+
+def _wait_for_group(process: subprocess.Popen, pgid: int, timeout: float) -> bool:
+    """Reap the leader and wait for the group to empty; False on timeout."""
+    deadline = time.monotonic() + timeout
+    while True:
+        process.poll()
+        if not _group_alive(pgid):
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.05)
+
+
+def kill_process_group(process: subprocess.Popen) -> None:
+    """Terminate the process and all of its children.
+
+    The process must have been started with start_new_session=True, so its
+    pid is the process group id. Sends SIGTERM to the group, then SIGKILL to
+    whatever is left after KILL_GRACE_PERIOD seconds, including children that
+    outlived the leader or ignore SIGTERM.
+    """
+    if not hasattr(os, "killpg"):
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        return
+
+    pgid = process.pid
+    try:
+        os.killpg(pgid, signal.SIGTERM)
+    except ProcessLookupError:
+        process.wait()
+        return
+
+    if not _wait_for_group(process, pgid, KILL_GRACE_PERIOD):
+        deadline = time.monotonic() + KILL_GRACE_PERIOD
+        while time.monotonic() < deadline:
+            try:
+                os.killpg(pgid, signal.SIGKILL)
+            except ProcessLookupError:
+                break
+            if _wait_for_group(process, pgid, 0.2):
+                break
+    process.wait()
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def run_supervised(
+    cmd: List[str],
+    output_file: str,
+    env: Optional[Dict[str, str]] = None,
+    cwd: Optional[str] = None,
+    timeout: Optional[float] = None,
+    idle_timeout: Optional[float] = None,
+    memory_limit_mb: Optional[int] = None,
+    cpu_limit_seconds: Optional[int] = None,
+    stdin: Optional[Union[int, IO]] = None,
+    input_text: Optional[str] = None,
+    append: bool = False,
+) -> SupervisedResult:
+    """Run cmd with stdout streamed to output_file under the supervisor.
+
+    Args:
+        cmd: Command to run
+        output_file: File receiving stdout; its growth is the heartbeat
+        env: Environment for the process
+        cwd: Working directory for the process
+        timeout: Wall-clock limit in seconds (None = unlimited)
+        idle_timeout: Kill after this many seconds without new output
+        memory_limit_mb: Optional memory cap for the process
+        cpu_limit_seconds: Optional CPU time cap for the process
+        stdin: Standard input for the process (e.g. an open file)
+        input_text: Text written to the process's stdin through a pipe
+        append: Append to output_file instead of truncating it
+
+    Returns:
+        SupervisedResult; kill_reason is set if the supervisor stopped the process
+    """
+    start = time.monotonic()
+    stderr_chunks: List[str] = []
+
+    with open(output_file, "a" if append else "w") as output_f:
+        process = subprocess.Popen(
+            _with_limits(cmd, memory_limit_mb, cpu_limit_seconds),
+            stdin=subprocess.PIPE if input_text is not None else stdin,
+            stdout=output_f,
+            stderr=subprocess.PIPE,
+            text=True,
+            env=env,
+            cwd=cwd,
+            start_new_session=True,  # Own process group for killpg
+        )
+
+        # Drain stderr in the background so a chatty process can't block on a full pipe
+        def read_stderr():
+            for chunk in process.stderr:
+                stderr_chunks.append(chunk)
+
+        stderr_thread = threading.Thread(target=read_stderr, daemon=True)
+        stderr_thread.start()
+
+        # Feed stdin from a thread too; input larger than the pipe buffer would block us
+        if input_text is not None:
+            def write_stdin():
+                try:
+                    process.stdin.write(input_text)
+                    process.stdin.close()
+                except (BrokenPipeError, OSError, ValueError):
+                    # Process exited without reading it all
+                    pass
+
+            threading.Thread(target=write_stdin, daemon=True).start()
+
+        kill_reason = None
+        last_size = 0
+        last_activity = start
+        try:
+            while True:
+                try:
+                    process.wait(timeout=POLL_INTERVAL)
+                    break
+                except subprocess.TimeoutExpired:
+                    pass
+
+                now = time.monotonic()
+                size = _file_size(output_file)
+                if size != last_size:
+                    last_size = size
+                    last_activity = now
+
+                if timeout and now - start > timeout:
+                    kill_reason = "timeout"
+                elif idle_timeout and now - last_activity > idle_timeout:
+                    kill_reason = "inactivity"
+
+                if kill_reason:
+                    kill_process_group(process)
+                    break
+        except BaseException:
+            # Never leave an orphaned agent behind (e.g. on Ctrl-C)
+            kill_process_group(process)
+            raise
+
+        stderr_thread.join(timeout=KILL_GRACE_PERIOD)
+
+    return SupervisedResult(
+        returncode=process.returncode,
+        stderr="".join(stderr_chunks),
+        elapsed=time.monotonic() - start,
+        kill_reason=kill_reason,
+    )
@@ -0,0 +1,263 @@
+"""Persistent test history for flaky-test detection and quarantine.
+
+Every parsed test run is appended to agents/test_history.jsonl, shared by all
+ADW runs. From that history we compute a per-test flakiness score (how often
+the outcome flips between runs of the same code), cheaply re-run suspected
+flakes before spending a resolver agent on them, and expose a quarantine list
+that the test phase consults.
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Union
+
+from adw_modules.data_types import TestResult, E2ETestResult, TestRunRecord
+
+HISTORY_FILENAME = "test_history.jsonl"
+# Manually quarantined tests, one test name per entry: {"unit": [...], "e2e": [...]}
+QUARANTINE_FILENAME = "test_quarantine.json"
+
+# Number of most recent runs per test used for scoring
+FLAKY_WINDOW = 20
+# Minimum runs of the same code before a test can be scored at all
+MIN_RUNS_FOR_SCORE = 3
+# Score at which a failing test is retried before resolution
+FLAKY_THRESHOLD = 0.2
+# Score at which a test is quarantined automatically
+QUARANTINE_THRESHOLD = 0.4
+
+# Timeout for the cheap re-run of a suspected flake
+FLAKY_RETRY_TIMEOUT = 300
+
+
+def get_agents_dir() -> str:
+    """Get the shared agents/ directory at the project root."""
+    project_root = os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    return os.path.join(project_root, "agents")
+
+
+def get_history_path() -> str:
+    """Get path to the shared test history file."""
+    return os.path.join(get_agents_dir(), HISTORY_FILENAME)
+
+
+def get_current_commit(cwd: Optional[str] = None) -> Optional[str]:
+    """Get the HEAD commit of the given checkout, or None if unavailable."""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, cwd=cwd
+        )
+    except FileNotFoundError:
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip()
+
+
+def get_tree_state(cwd: Optional[str] = None) -> Optional[str]:
+    """Hash uncommitted changes (tracked diff and untracked files) in a checkout.
+
+    Returns None for a clean tree or when git is unavailable, so runs on the
+    same commit and tree state compare equal.
+    """
+    try:
+        diff = subprocess.run(
+            ["git", "diff", "HEAD", "--binary"], capture_output=True, cwd=cwd
+        )
+        untracked = subprocess.run(
+            ["git", "ls-files", "--others", "--exclude-standard"],
+            capture_output=True,
+            text=True,
+            cwd=cwd,
+        )
+    except FileNotFoundError:
+        return None
+    if diff.returncode != 0 or untracked.returncode != 0:
+        return None
+
+    paths = untracked.stdout.splitlines()
+    blobs = ""
+    if paths:
+        hashed = subprocess.run(
+            ["git", "hash-object", "--stdin-paths"],
+            input="\n".join(paths),
+            capture_output=True,
+            text=True,
+            cwd=cwd,
+        )
+        blobs = hashed.stdout
+    if not diff.stdout and not paths:
+        return None
+
+    digest = hashlib.sha1(diff.stdout)
+    for path, blob in zip(paths, blobs.splitlines()):
+        digest.update(f"{path} {blob}\n".encode())
+    return digest.hexdigest()[:12]
+
+
+def record_test_results(
+    results: List[Union[TestResult, E2ETestResult]],
+    adw_id: str,
+    kind: str,
+    working_dir: Optional[str] = None,
+) -> None:
+    """Append one history record per test result."""
+    if not results:
+        return
+
+    commit = get_current_commit(working_dir)
+    tree = get_tree_state(working_dir)
+    timestamp = datetime.now().isoformat()
+
+    lines = []
+    for result in results:
+        record = TestRunRecord(
+            test_name=result.test_name,
+            kind=kind,
+            passed=result.passed,
+            duration_ms=result.duration_ms,
+            commit=commit,
+            tree=tree,
+            adw_id=adw_id,
+            timestamp=timestamp,
+        )
+        lines.append(record.model_dump_json() + "\n")
+
+    history_path = get_history_path()
+    os.makedirs(os.path.dirname(history_path), exist_ok=True)
+    # Single append so concurrent ADW runs don't interleave partial lines
+    with open(history_path, "a") as f:
+        f.write("".join(lines))
+
+
+def load_history(kind: Optional[str] = None) -> Dict[str, List[TestRunRecord]]:
+    """Load history grouped by test name, oldest first, trimmed to FLAKY_WINDOW."""
+    history: Dict[str, List[TestRunRecord]] = {}
+    history_path = get_history_path()
+    if not os.path.exists(history_path):
+        return history
+
+    with open(history_path, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = TestRunRecord.model_validate_json(line)
+            except ValueError:
+                continue  # Skip partially written or corrupt lines
+            if kind and record.kind != kind:
+                continue
+            history.setdefault(record.test_name, []).append(record)
+
+    return {name: records[-FLAKY_WINDOW:] for name, records in history.items()}
+
+
+def code_state(record: TestRunRecord) -> tuple:
+    """Key for runs of the same code: commit and working tree state.
+
+    Records without a commit (no git) fall back to their ADW run.
+    """
+    if record.commit:
+        return (record.commit, record.tree)
+    return ("adw", record.adw_id)
+
+
+def flakiness_score(records: List[TestRunRecord]) -> float:
+    """Score in [0, 1]: fraction of repeat runs of the same code that flipped.
+
+    Only consecutive runs on the same commit and working tree are compared, so
+    a test that fails, gets fixed and then passes is not flaky; one that
+    alternates without the code changing scores 1. Tests with fewer than
+    MIN_RUNS_FOR_SCORE - 1 such comparisons score 0.
+    """
+    last_outcome: Dict[tuple, bool] = {}
+    comparisons = 0
+    flips = 0
+    for record in records:
+        state = code_state(record)
+        if state in last_outcome:
+            comparisons += 1
+            if last_outcome[state] != record.passed:
+                flips += 1
+        last_outcome[state] = record.passed
+
+    if comparisons < MIN_RUNS_FOR_SCORE - 1:
+        return 0.0
+    return flips / comparisons
+
+
+def get_flakiness_scores(kind: Optional[str] = None) -> Dict[str, float]:
+    """Compute flakiness scores for every test with history."""
+    return {
+        name: flakiness_score(records) for name, records in load_history(kind).items()
+    }
+
+
+def get_quarantined_tests(kind: Optional[str] = None) -> Set[str]:
+    """Return tests that should not block the test phase.
+
+    Combines tests whose flakiness score reaches QUARANTINE_THRESHOLD with the
+    manual list in agents/test_quarantine.json.
+    """
+    quarantined = {
+        name
+        for name, score in get_flakiness_scores(kind).items()
+        if score >= QUARANTINE_THRESHOLD
+    }
+
+    manual_path = os.path.join(get_agents_dir(), QUARANTINE_FILENAME)
+    if os.path.exists(manual_path):
+        try:
+            with open(manual_path, "r") as f:
+                manual = json.load(f)
+            kinds = [kind] if kind else list(manual.keys())
+            for k in kinds:
+                quarantined.update(manual.get(k, []))
+        except (json.JSONDecodeError, AttributeError):
+            pass
+
+    return quarantined
+
+
+def is_suspected_flake(test_name: str, scores: Dict[str, float]) -> bool:
+    """Check whether a test's score makes it worth a cheap retry."""
+    return scores.get(test_name, 0.0) >= FLAKY_THRESHOLD
+
+
+def retry_flaky_test(
+    test: TestResult, working_dir: Optional[str] = None
+) -> TestResult:
+    """Re-run a single unit test with its own execution_command.
+
+    This costs a subprocess instead of an agent session. Returns a new
+    TestResult reflecting the retry outcome.
+    """
+    start = time.time()
+    try:
+        result = subprocess.run(
+            test.execution_command,
+            shell=True,
+            capture_output=True,
+            text=True,
+            cwd=working_dir,
+            timeout=FLAKY_RETRY_TIMEOUT,
+        )
+        passed = result.returncode == 0
+        error = None if passed else (result.stderr or result.stdout)[-1000:]
+    except subprocess.TimeoutExpired:
+        passed = False
+        error = f"Retry timed out after {FLAKY_RETRY_TIMEOUT} seconds"
+
+    return test.model_copy(
+        update={
+            "passed": passed,
+            "error": error,
+            "duration_ms": int((time.time() - start) * 1000),
+        }
+    )
@@ -0,0 +1,491 @@
+"""Lightweight OpenTelemetry-style tracing for ADW runs.
+
+Spans cover trigger receipt, phase scripts, agent calls, git/gh
+subprocesses, worktree creation and R2 uploads. Trace context crosses
+process boundaries (orchestrator -> `uv run` phase -> ...) through the
+ADW_TRACE_PARENT environment variable in W3C traceparent format, so a
+whole run ends up in one trace.
+
+Exporters are selected with ADW_TRACE_EXPORTER (comma-separated):
+- json   (default) append spans to agents/traces/{trace_id}.jsonl
+- chrome also write agents/traces/{trace_id}.chrome.json (Chrome trace
+         format, open in chrome://tracing or Perfetto) when a process'
+         root span ends
+- otlp   POST spans as OTLP/HTTP JSON to OTEL_EXPORTER_OTLP_ENDPOINT
+         (default http://localhost:4318), batched and flushed at exit
+- none   disable tracing
+
+Leaf spans (git/gh subprocesses, R2 requests) are only recorded inside an
+existing trace, so background polling and health checks don't each start
+one. agents/traces/ is pruned to ADW_TRACE_MAX_FILES files and
+ADW_TRACE_RETENTION_DAYS days whenever a new trace is started.
+"""
+
+import atexit
+import functools
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from adw_modules import metrics
+from adw_modules.profiling import profile_scope
+
+TRACE_PARENT_ENV = "ADW_TRACE_PARENT"
+EXPORTER_ENV = "ADW_TRACE_EXPORTER"
+OTLP_ENDPOINT_ENV = "OTEL_EXPORTER_OTLP_ENDPOINT"
+DEFAULT_OTLP_ENDPOINT = "http://localhost:4318"
+SERVICE_NAME = "adw"
+
+# Spans buffered before an OTLP export is sent
+OTLP_BATCH_SIZE = 50
+
+# agents/traces/ retention is applied at most every PRUNE_INTERVAL seconds
+PRUNE_INTERVAL = 300.0
+_last_prune = 0.0
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("adw_current_span", default=None)
+_otlp_buffer: List[Dict[str, Any]] = []
+_export_lock = threading.Lock()
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str],
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.status = "ok"
+        self.error: Optional[str] = None
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.pid = os.getpid()
+        self.tid = threading.get_ident()
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, error: str) -> None:
+        self.status = "error"
+        self.error = error
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "attributes": self.attributes,
+            "status": self.status,
+            "error": self.error,
+            "pid": self.pid,
+            "tid": self.tid,
+        }
+
+
+def get_exporters() -> List[str]:
+    """Exporters configured by ADW_TRACE_EXPORTER."""
+    value = os.getenv(EXPORTER_ENV, "json")
+    return [name.strip() for name in value.split(",") if name.strip() and name.strip() != "none"]
+
+
+def get_trace_max_files() -> int:
+    """Traces kept in agents/traces/ (ADW_TRACE_MAX_FILES)."""
+    return int(os.getenv("ADW_TRACE_MAX_FILES", "2000"))
+
+
+def get_trace_retention_days() -> float:
+    """Days a trace is kept in agents/traces/ (ADW_TRACE_RETENTION_DAYS)."""
+    return float(os.getenv("ADW_TRACE_RETENTION_DAYS", "7"))
+
+
+def get_traces_dir() -> str:
+    """Get the shared agents/traces/ directory."""
+    project_root = os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    return os.path.join(project_root, "agents", "traces")
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str]]:
+    """Parse a W3C traceparent into (trace_id, parent_span_id)."""
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return parts[1], parts[2]
+
+
+# Context this process was started with (traced_phase overwrites the env var
+# for its own children)
+_INHERITED_PARENT = parse_traceparent(os.getenv(TRACE_PARENT_ENV))
+
+
+def inherit_trace_context() -> None:
+    """Re-read ADW_TRACE_PARENT, for processes forked from a preloaded worker."""
+    global _INHERITED_PARENT
+    _INHERITED_PARENT = parse_traceparent(os.getenv(TRACE_PARENT_ENV))
+
+
+def current_traceparent() -> Optional[str]:
+    """Traceparent for child processes: the active span, else the inherited one."""
+    span = _current_span.get()
+    if span is not None:
+        return span.traceparent
+    return os.getenv(TRACE_PARENT_ENV)
+
+
+def _export(span: Span) -> None:
+    exporters = get_exporters()
+    data = span.to_dict()
+
+    if "json" in exporters or "chrome" in exporters:
+        try:
+            traces_dir = get_traces_dir()
+            os.makedirs(traces_dir, exist_ok=True)
+            with open(os.path.join(traces_dir, f"{span.trace_id}.jsonl"), "a") as f:
+                f.write(json.dumps(data, default=str) + "\n")
+        except OSError:
+            pass
+
+    if "chrome" in exporters and (span.parent_id is None or _is_process_root(span)):
+        try:
+            write_chrome_trace(span.trace_id)
+        except OSError:
+            pass
+
+    if "otlp" in exporters:
+        with _export_lock:
+            _otlp_buffer.append(data)
+            should_flush = len(_otlp_buffer) >= OTLP_BATCH_SIZE
+        if should_flush:
+            flush_otlp()
+
+
+def prune_traces(
+    max_files: Optional[int] = None, retention_days: Optional[float] = None
+) -> int:
+    """Delete trace files past the retention age, then the oldest beyond max_files.
+
+    Returns the number of traces removed.
+    """
+    max_files = get_trace_max_files() if max_files is None else max_files
+    retention_days = get_trace_retention_days() if retention_days is None else retention_days
+    traces_dir = get_traces_dir()
+    try:
+        names = os.listdir(traces_dir)
+    except OSError:
+        return 0
+
+    # A trace is its .jsonl plus an optional .chrome.json
+    traces: Dict[str, float] = {}
+    for name in names:
+        if not name.endswith(".jsonl"):
+            continue
+        try:
+            traces[name[: -len(".jsonl")]] = os.path.getmtime(os.path.join(traces_dir, name))
+        except OSError:
+            continue
+
+    cutoff = time.time() - retention_days * 86400
+    newest_first = sorted(traces, key=traces.get, reverse=True)
+    expired = [
+        trace_id
+        for index, trace_id in enumerate(newest_first)
+        if index >= max_files or traces[trace_id] < cutoff
+    ]
+    for trace_id in expired:
+        for suffix in (".jsonl", ".chrome.json"):
+            try:
+                os.unlink(os.path.join(traces_dir, trace_id + suffix))
+            except OSError:
+                pass
+    return len(expired)
+
+
+def _maybe_prune() -> None:
+    global _last_prune
+    now = time.monotonic()
+    if _last_prune and now - _last_prune < PRUNE_INTERVAL:
+        return
+    _last_prune = now
+    prune_traces()
+
+
+def _is_process_root(span: Span) -> bool:
+    """True for the outermost span of this process (its parent is remote)."""
+    return _INHERITED_PARENT is not None and span.parent_id == _INHERITED_PARENT[1]
+
+
+@contextmanager
+def start_span(name: str, new_trace: bool = True, **attributes: Any) -> Iterator[Span]:
+    """Record a span around a block of code.
+
+    The span is a child of the active span, or of the trace context inherited
+    through ADW_TRACE_PARENT, or starts a new trace. Leaf spans pass
+    new_trace=False and are not recorded outside a trace. Exceptions mark the
+    span as failed and are re-raised.
+    """
+    parent = _current_span.get()
+    inherited = None if parent else parse_traceparent(os.getenv(TRACE_PARENT_ENV))
+    if not get_exporters() or (parent is None and inherited is None and not new_trace):
+        # Not recorded: hand out a span that is never exported
+        yield Span(name, "0" * 32, None, attributes)
+        return
+
+    if parent is not None:
+        trace_id, parent_id = parent.trace_id, parent.span_id
+    elif inherited is not None:
+        trace_id, parent_id = inherited
+    else:
+        trace_id, parent_id = os.urandom(16).hex(), None
+        _maybe_prune()
+
+    span = Span(name, trace_id, parent_id, attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            span.set_error(f"exit code {e.code}")
+        raise
+    except BaseException as e:
+        span.set_error(f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end_ns = time.time_ns()
+        _export(span)
+
+
+def traced(name: Optional[str] = None):
+    """Decorator recording a span around each call of the function."""
+
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with start_span(span_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def traced_phase(func):
+    """Decorator for a phase script's main().
+
+    Records a `phase:<script>` span and exports its context through
+    ADW_TRACE_PARENT so `uv run` children started with the inherited
+    environment join the same trace. With ADW_PROFILE set, main() also
+    runs under the selected profiler (see profiling.py).
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        script = os.path.splitext(os.path.basename(sys.argv[0]))[0]
+        attributes = {"argv": " ".join(sys.argv[1:])}
+        if len(sys.argv) > 1:
+            attributes["issue_number"] = sys.argv[1]
+        adw_id = None
+        if len(sys.argv) > 2 and not sys.argv[2].startswith("-"):
+            adw_id = attributes["adw_id"] = sys.argv[2]
+
+        with start_span(f"phase:{script}", **attributes) as span, profile_scope(adw_id, script):
+            previous = os.environ.get(TRACE_PARENT_ENV)
+            if get_exporters():
+                os.environ[TRACE_PARENT_ENV] = span.traceparent
+            try:
+                return func(*args, **kwargs)
+            finally:
+                if previous is None:
+                    os.environ.pop(TRACE_PARENT_ENV, None)
+                else:
+                    os.environ[TRACE_PARENT_ENV] = previous
+
+    return wrapper
+
+
+def traced_run(cmd: List[str], **kwargs) -> subprocess.CompletedProcess:
+    """subprocess.run with a span named after the command (e.g. `git push`).
+
+    The span is only recorded inside a trace. gh calls also feed the gh
+    latency and error metrics either way.
+    """
+    name = " ".join(str(part) for part in cmd[:2])
+    is_gh = bool(cmd) and os.path.basename(str(cmd[0])) == "gh"
+    gh_command = str(cmd[1]) if is_gh and len(cmd) > 1 else ""
+    start = time.monotonic()
+    with start_span(
+        f"exec:{name}", new_trace=False, cwd=kwargs.get("cwd") or os.getcwd()
+    ) as span:
+        try:
+            result = subprocess.run(cmd, **kwargs)
+        except Exception:
+            if is_gh:
+                metrics.GH_ERRORS.inc(command=gh_command)
+            raise
+        finally:
+            if is_gh:
+                metrics.GH_REQUEST_DURATION.observe(
+                    time.monotonic() - start, command=gh_command
+                )
+        span.set_attribute("returncode", result.returncode)
+        if result.returncode != 0:
+            span.set_error(f"exit code {result.returncode}")
+            if is_gh:
+                metrics.GH_ERRORS.inc(command=gh_command)
+        return result
+
+
+def load_trace(trace_id: str) -> List[Dict[str, Any]]:
+    """Load all spans recorded for a trace."""
+    path = os.path.join(get_traces_dir(), f"{trace_id}.jsonl")
+    spans = []
+    if not os.path.exists(path):
+        return spans
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                spans.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return spans
+
+
+def find_traces(adw_id: str) -> List[str]:
+    """Trace ids containing spans for the given ADW id."""
+    traces_dir = get_traces_dir()
+    if not os.path.isdir(traces_dir):
+        return []
+    trace_ids = []
+    for filename in sorted(os.listdir(traces_dir)):
+        if not filename.endswith(".jsonl"):
+            continue
+        trace_id = filename[: -len(".jsonl")]
+        if any(span["attributes"].get("adw_id") == adw_id for span in load_trace(trace_id)):
+            trace_ids.append(trace_id)
+    return trace_ids
+
+
+def to_chrome_trace(spans: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Convert spans to Chrome trace event format (complete events)."""
+    events = []
+    for span in spans:
+        if span.get("end_ns") is None:
+            continue
+        args = dict(span["attributes"])
+        if span.get("error"):
+            args["error"] = span["error"]
+        events.append(
+            {
+                "name": span["name"],
+                "cat": span["name"].split(":")[0],
+                "ph": "X",
+                "ts": span["start_ns"] / 1000,
+                "dur": (span["end_ns"] - span["start_ns"]) / 1000,
+                "pid": span["pid"],
+                "tid": span["tid"],
+                "args": args,
+            }
+        )
+    events.sort(key=lambda event: event["ts"])
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def write_chrome_trace(trace_id: str, output_path: Optional[str] = None) -> str:
+    """Write a trace in Chrome trace format and return the file path."""
+    output_path = output_path or os.path.join(get_traces_dir(), f"{trace_id}.chrome.json")
+    with open(output_path, "w") as f:
+        json.dump(to_chrome_trace(load_trace(trace_id)), f)
+    return output_path
+
+
+def to_otlp(spans: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Convert spans to an OTLP/HTTP JSON export request."""
+    otlp_spans = []
+    for span in spans:
+        attributes = [
+            {"key": key, "value": {"stringValue": str(value)}}
+            for key, value in span["attributes"].items()
+        ]
+        attributes.append({"key": "process.pid", "value": {"intValue": span["pid"]}})
+        otlp_span = {
+            "traceId": span["trace_id"],
+            "spanId": span["span_id"],
+            "name": span["name"],
+            "kind": 1,  # INTERNAL
+            "startTimeUnixNano": str(span["start_ns"]),
+            "endTimeUnixNano": str(span["end_ns"]),
+            "attributes": attributes,
+            "status": {"code": 2, "message": span["error"]}
+            if span["status"] == "error"
+            else {"code": 1},
+        }
+        if span.get("parent_id"):
+            otlp_span["parentSpanId"] = span["parent_id"]
+        otlp_spans.append(otlp_span)
+
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": {"stringValue": SERVICE_NAME}}
+                    ]
+                },
+                "scopeSpans": [{"scope": {"name": "adw_modules.tracing"}, "spans": otlp_spans}],
+            }
+        ]
+    }
+
+
+def flush_otlp() -> None:
+    """Send buffered spans to the OTLP collector; failures are dropped."""
+    with _export_lock:
+        spans = list(_otlp_buffer)
+        _otlp_buffer.clear()
+    if not spans:
+        return
+
+    endpoint = os.getenv(OTLP_ENDPOINT_ENV, DEFAULT_OTLP_ENDPOINT).rstrip("/")
+    # Only processes that export over OTLP pay for urllib's import
+    import urllib.request
+
+    request = urllib.request.Request(
+        f"{endpoint}/v1/traces",
+        data=json.dumps(to_otlp(spans)).encode(),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        urllib.request.urlopen(request, timeout=5).close()
+    except Exception:
+        # Tracing must never break a workflow
+        pass
+
+
+atexit.register(flush_otlp)
@@ -0,0 +1,144 @@
+"""Transcript store for Claude Code agent sessions.
+
+Each agent writes its stream-json transcript to
+agents/{adw_id}/{agent_name}/raw_output.jsonl. This module adds what the
+retry loop needs on top of that file:
+- session_id extraction from partial transcripts (for --resume)
+- a compact summary of completed work when a session can't be resumed
+- archiving of failed attempts and a lineage.jsonl recording how each
+  attempt relates to the previous one
+- the prompt each attempt was given, as the transcript's first line
+  ({"type": "prompt", ...}); the agent's messages are appended after it
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+LINEAGE_FILENAME = "lineage.jsonl"
+
+# Tools whose input identifies a file the agent changed
+FILE_EDIT_TOOLS = {"Edit", "MultiEdit", "Write", "NotebookEdit"}
+
+
+def read_messages(output_file: str) -> List[Dict[str, Any]]:
+    """Read all parseable JSONL messages, skipping a truncated last line."""
+    messages = []
+    if not os.path.exists(output_file):
+        return messages
+    with open(output_file, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                messages.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return messages
+
+
+def record_prompt(output_file: str, prompt: str, transport: str) -> None:
+    """Start a fresh transcript with the prompt the agent is about to get."""
+    output_dir = os.path.dirname(output_file)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    entry = {
+        "type": "prompt",
+        "prompt": prompt,
+        "transport": transport,
+        "bytes": len(prompt.encode("utf-8")),
+        "timestamp": datetime.now().isoformat(),
+    }
+    with open(output_file, "w") as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+def extract_session_id(output_file: str) -> Optional[str]:
+    """Return the session_id of a (possibly partial) transcript.
+
+    The CLI emits the session_id on its first system/init message, so even a
+    session that died early can usually be resumed.
+    """
+    for message in read_messages(output_file):
+        session_id = message.get("session_id")
+        if session_id:
+            return session_id
+    return None
+
+
+def summarize_transcript(output_file: str, max_chars: int = 2000) -> str:
+    """Build a compact summary of the work done in a partial transcript.
+
+    Lists changed files, the most recent shell commands and the last thing the
+    agent said. Returns an empty string if nothing useful was done.
+    """
+    files_changed: List[str] = []
+    commands: List[str] = []
+    last_text = ""
+
+    for message in read_messages(output_file):
+        if message.get("type") != "assistant":
+            continue
+        content = message.get("message", {}).get("content", [])
+        if not isinstance(content, list):
+            continue
+        for block in content:
+            if block.get("type") == "text" and block.get("text"):
+                last_text = block["text"]
+            elif block.get("type") == "tool_use":
+                tool_input = block.get("input", {}) or {}
+                if block.get("name") in FILE_EDIT_TOOLS:
+                    path = tool_input.get("file_path") or tool_input.get("notebook_path")
+                    if path and path not in files_changed:
+                        files_changed.append(path)
+                elif block.get("name") == "Bash" and tool_input.get("command"):
+                    commands.append(tool_input["command"].splitlines()[0][:200])
+
+    parts = []
+    if files_changed:
+        parts.append("Files changed:\n" + "\n".join(f"- {path}" for path in files_changed))
+    if commands:
+        parts.append("Recent commands:\n" + "\n".join(f"- {cmd}" for cmd in commands[-10:]))
+    if last_text:
+        parts.append(f"Last progress note:\n{last_text[:500]}")
+
+    summary = "\n\n".join(parts)
+    if len(summary) > max_chars:
+        summary = summary[: max_chars - 15] + "\n... (truncated)"
+    return summary
+
+
+def archive_attempt(output_file: str, attempt: int) -> Optional[str]:
+    """Move a failed attempt's transcript aside so the retry gets a fresh file.
+
+    raw_output.jsonl becomes raw_output.attempt{N}.jsonl (and the .json
+    conversion, if any, likewise). Returns the archived path, or None if
+    there was no transcript.
+    """
+    if not os.path.exists(output_file):
+        return None
+
+    base, ext = os.path.splitext(output_file)
+    archived = f"{base}.attempt{attempt}{ext}"
+    os.replace(output_file, archived)
+
+    json_file = output_file.replace(".jsonl", ".json")
+    if json_file != output_file and os.path.exists(json_file):
+        os.replace(json_file, f"{base}.attempt{attempt}.json")
+
+    return archived
+
+
+def record_lineage(output_file: str, entry: Dict[str, Any]) -> None:
+    """Append one attempt to lineage.jsonl next to the transcript."""
+    lineage_path = os.path.join(os.path.dirname(output_file) or ".", LINEAGE_FILENAME)
+    entry = {"timestamp": datetime.now().isoformat(), **entry}
+    with open(lineage_path, "a") as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+def load_lineage(output_file: str) -> List[Dict[str, Any]]:
+    """Read the attempt lineage recorded next to a transcript."""
+    lineage_path = os.path.join(os.path.dirname(output_file) or ".", LINEAGE_FILENAME)
+    return read_messages(lineage_path)
@@ -9,8 +9,27 @@ import uuid
 from datetime import datetime
 from typing import Any, TypeVar, Type, Union, Dict, Optional
 
+from adw_modules.tracing import current_traceparent
+
 T = TypeVar('T')
 
+_env_loaded = False
+
+
+def load_env() -> None:
+    """Load .env into os.environ once per process.
+
+    python-dotenv is imported on the first call; later calls are no-ops, so
+    modules and phase mains can all call this without re-reading the file.
+    """
+    global _env_loaded
+    if _env_loaded:
+        return
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    _env_loaded = True
+
 
 def make_adw_id() -> str:
     """Generate a short 8-character UUID for ADW tracking."""
@@ -231,6 +250,15 @@ def get_safe_subprocess_env() -> Dict[str, str]:
         
         # Working directory tracking
         "PWD": os.getcwd(),
+
+        # Tracing: child processes join the current trace
+        "ADW_TRACE_PARENT": current_traceparent(),
+        "ADW_TRACE_EXPORTER": os.getenv("ADW_TRACE_EXPORTER"),
+        "OTEL_EXPORTER_OTLP_ENDPOINT": os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"),
+
+        # Phases launched from here can reach the same adw_worker
+        "ADW_WORKER": os.getenv("ADW_WORKER"),
+        "ADW_WORKER_SOCKET": os.getenv("ADW_WORKER_SOCKET"),
     }
     
     # Add GH_TOKEN as alias for GITHUB_PAT if it exists
@@ -0,0 +1,247 @@
+"""Client for the ADW worker daemon (adw_triggers/adw_worker.py).
+
+The worker preloads adw_modules and forks a child per job, so a phase
+starts without `uv run` environment resolution or interpreter and module
+startup. Jobs are submitted over a Unix socket (ADW_WORKER_SOCKET, default
+agents/adw_worker.sock) as one JSON line:
+
+    {"op": "run", "script": "/abs/path/adw_plan_iso.py", "args": [...],
+     "cwd": "...", "env": {...}}
+
+and the worker answers with JSON lines until the job exits:
+
+    {"event": "started", "job_id": "...", "pid": 1234}
+    {"event": "output", "stream": "stdout", "data": "..."}
+    {"event": "exit", "job_id": "...", "returncode": 0, "seconds": 12.3}
+
+When no worker is listening, run_phase() falls back to running the command
+as before, so orchestrators and triggers work with or without the daemon.
+"""
+
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+WORKER_SOCKET_ENV = "ADW_WORKER_SOCKET"
+# Set to "off" to always spawn phases directly
+WORKER_ENV = "ADW_WORKER"
+CONNECT_TIMEOUT = 2.0
+
+
+class WorkerError(Exception):
+    """The worker rejected a job or the connection broke."""
+
+
+def get_worker_socket_path() -> str:
+    """Socket the worker listens on."""
+    project_root = os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    return os.getenv(
+        WORKER_SOCKET_ENV, os.path.join(project_root, "agents", "adw_worker.sock")
+    )
+
+
+def connect(path: Optional[str] = None) -> Optional[socket.socket]:
+    """Connect to the worker, or None if it isn't running."""
+    if os.getenv(WORKER_ENV, "").lower() == "off":
+        return None
+    path = path or get_worker_socket_path()
+    if not os.path.exists(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(path)
+    except OSError:
+        # Stale socket file from a worker that is gone
+        sock.close()
+        return None
+    sock.settimeout(None)
+    return sock
+
+
+def read_events(sock: socket.socket) -> Iterator[Dict[str, Any]]:
+    """JSON-line events from the worker until it closes the connection."""
+    with sock.makefile("r", encoding="utf-8") as stream:
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+
+
+def ping(path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Worker pid, uptime and preloaded modules, or None if not running."""
+    sock = connect(path)
+    if sock is None:
+        return None
+    with sock:
+        sock.sendall(b'{"op": "ping"}\n')
+        return next(read_events(sock), None)
+
+
+class WorkerJob:
+    """A job running in the worker; polls like subprocess.Popen.
+
+    A background thread consumes the event stream so the job's output
+    keeps flowing after submit returns.
+    """
+
+    def __init__(
+        self,
+        sock: socket.socket,
+        on_output: Optional[Callable[[str, str], None]] = None,
+    ):
+        self.job_id: Optional[str] = None
+        self.pid: Optional[int] = None
+        self.returncode: Optional[int] = None
+        self.seconds: Optional[float] = None
+        self._events = read_events(sock)
+        self._on_output = on_output
+        self._done = threading.Event()
+
+        started = next(self._events, None)
+        if not started or started.get("event") != "started":
+            sock.close()
+            message = (started or {}).get("error", "worker closed the connection")
+            raise WorkerError(message)
+        self.job_id, self.pid = started["job_id"], started["pid"]
+        self._sock = sock
+        self._thread = threading.Thread(target=self._follow, daemon=True)
+        self._thread.start()
+
+    def _follow(self) -> None:
+        try:
+            for event in self._events:
+                if event["event"] == "output" and self._on_output:
+                    self._on_output(event["stream"], event["data"])
+                elif event["event"] == "exit":
+                    self.returncode = event["returncode"]
+                    self.seconds = event.get("seconds")
+        except (OSError, ValueError):
+            pass
+        finally:
+            if self.returncode is None:
+                # Lost the worker mid-job; report like a killed process
+                self.returncode = -1
+            self._sock.close()
+            self._done.set()
+
+    def poll(self) -> Optional[int]:
+        return self.returncode if self._done.is_set() else None
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[int]:
+        self._done.wait(timeout)
+        return self.poll()
+
+    def kill(self) -> None:
+        """SIGKILL the job's process group (the worker starts each job in its own)."""
+        try:
+            os.killpg(self.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+
+def submit_job(
+    script: str,
+    args: List[str],
+    cwd: Optional[str] = None,
+    env: Optional[Dict[str, str]] = None,
+    on_output: Optional[Callable[[str, str], None]] = None,
+    socket_path: Optional[str] = None,
+) -> Optional[WorkerJob]:
+    """Start script in the worker; None if no worker is running.
+
+    Args:
+        script: Path to an adw_*.py script in the worker's scripts directory
+        args: Script arguments (sys.argv[1:])
+        cwd: Working directory for the job (default: ours)
+        env: Complete environment for the job (default: ours)
+        on_output: Called with (stream, text) for each chunk of job output
+        socket_path: Worker socket (default: get_worker_socket_path())
+    """
+    sock = connect(socket_path)
+    if sock is None:
+        return None
+    request = {
+        "op": "run",
+        "script": os.path.abspath(script),
+        "args": [str(arg) for arg in args],
+        "cwd": cwd or os.getcwd(),
+        "env": dict(os.environ) if env is None else env,
+    }
+    try:
+        sock.sendall((json.dumps(request) + "\n").encode())
+    except OSError as e:
+        sock.close()
+        raise WorkerError(f"Failed to submit {script}: {e}")
+    return WorkerJob(sock, on_output)
+
+
+def echo_output(stream: str, data: str) -> None:
+    """on_output that copies job output to our stdout/stderr, like an inherited fd."""
+    target = sys.stdout if stream == "stdout" else sys.stderr
+    target.write(data)
+    target.flush()
+
+
+def _phase_script(cmd: List[str]) -> Optional[int]:
+    """Index of the script in `uv run X.py ...` or `python X.py ...`."""
+    index = 2 if cmd[:2] == ["uv", "run"] else 1
+    if len(cmd) > index and str(cmd[index]).endswith(".py"):
+        return index
+    return None
+
+
+def run_phase(cmd: List[str], **kwargs) -> subprocess.CompletedProcess:
+    """subprocess.run for phase scripts, through the worker when it is running.
+
+    cmd is the usual `["uv", "run", script, *args]` (or `[python, script,
+    *args]`). cwd, env, timeout and capture_output/text are honored either
+    way; without capture_output the job's output is copied to our
+    stdout/stderr. Like subprocess.run, a job that outlives timeout is killed
+    and subprocess.TimeoutExpired is raised. If the worker rejects the job,
+    the script is run directly.
+    """
+    index = _phase_script(cmd)
+    capture = kwargs.get("capture_output", False)
+    captured: Dict[str, List[str]] = {"stdout": [], "stderr": []}
+
+    def on_output(stream: str, data: str) -> None:
+        if capture:
+            captured[stream].append(data)
+        else:
+            echo_output(stream, data)
+
+    job = None
+    if index is not None:
+        try:
+            job = submit_job(
+                cmd[index], cmd[index + 1:], cwd=kwargs.get("cwd"), env=kwargs.get("env"),
+                on_output=on_output,
+            )
+        except WorkerError as e:
+            print(f"WARNING: adw_worker rejected {cmd[index]}, running directly: {e}", file=sys.stderr)
+    if job is None:
+        return subprocess.run(cmd, **kwargs)
+
+    def collected():
+        stdout = "".join(captured["stdout"]) if capture else None
+        stderr = "".join(captured["stderr"]) if capture else None
+        if capture and not kwargs.get("text"):
+            stdout, stderr = stdout.encode(), stderr.encode()
+        return stdout, stderr
+
+    timeout = kwargs.get("timeout")
+    returncode = job.wait(timeout)
+    if returncode is None:
+        job.kill()
+        job.wait(CONNECT_TIMEOUT)
+        stdout, stderr = collected()
+        raise subprocess.TimeoutExpired(cmd, timeout, output=stdout, stderr=stderr)
+    stdout, stderr = collected()
+    return subprocess.CompletedProcess(cmd, returncode, stdout, stderr)
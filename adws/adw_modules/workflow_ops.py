@@ -15,6 +15,7 @@ from adw_modules.data_types import (
     ADWExtractionResult,
 )
 from adw_modules.agent import execute_template
+from adw_modules.profiling import bind_adw_id
 from adw_modules.github import get_repo_url, extract_repo_path, ADW_BOT_IDENTIFIER
 from adw_modules.state import ADWState
 from adw_modules.utils import parse_json
@@ -414,6 +415,8 @@ def ensure_adw_id(
     state = ADWState(new_adw_id)
     state.update(adw_id=new_adw_id, issue_number=issue_number)
     state.save("ensure_adw_id")
+    # The phase profile (if any) was started before this ID existed
+    bind_adw_id(new_adw_id)
     if logger:
         logger.info(f"Created new ADW ID and state: {new_adw_id}")
     else:
@@ -5,13 +5,27 @@ and allocating unique ports for each isolated instance.
 """
 
 import os
-import subprocess
+import time
 import logging
 import socket
-from typing import Tuple, Optional
+import subprocess
+from typing import List, Tuple, Optional
 from adw_modules.state import ADWState
+from adw_modules.supervisor import kill_process_group
+from adw_modules.tracing import traced, traced_run
+
+# Parallel E2E workers get ports outside the worktree range, in a block of
+# WORKER_PORTS_PER_SLOT pairs per worktree slot (see allocate_worker_ports)
+WORKER_BACKEND_PORT_BASE = 9300
+WORKER_FRONTEND_PORT_BASE = 9400
+WORKER_PORTS_PER_SLOT = 4
 
+# Script (relative to the worktree) that starts the app on .ports.env ports
+WORKER_APP_START_SCRIPT = os.path.join("scripts", "start.sh")
+WORKER_APP_START_TIMEOUT = 90
 
+
+@traced("worktree:create")
 def create_worktree(adw_id: str, branch_name: str, logger: logging.Logger) -> Tuple[str, Optional[str]]:
     """Create a git worktree for isolated ADW execution.
     
@@ -43,7 +57,7 @@ def create_worktree(adw_id: str, branch_name: str, logger: logging.Logger) -> Tu
     
     # First, fetch latest changes from origin
     logger.info("Fetching latest changes from origin")
-    fetch_result = subprocess.run(
+    fetch_result = traced_run(
         ["git", "fetch", "origin"], 
         capture_output=True, 
         text=True, 
@@ -55,13 +69,13 @@ def create_worktree(adw_id: str, branch_name: str, logger: logging.Logger) -> Tu
     # Create the worktree using git, branching from origin/main
     # Use -b to create the branch as part of worktree creation
     cmd = ["git", "worktree", "add", "-b", branch_name, worktree_path, "origin/main"]
-    result = subprocess.run(cmd, capture_output=True, text=True, cwd=project_root)
+    result = traced_run(cmd, capture_output=True, text=True, cwd=project_root)
     
     if result.returncode != 0:
         # If branch already exists, try without -b
         if "already exists" in result.stderr:
             cmd = ["git", "worktree", "add", worktree_path, branch_name]
-            result = subprocess.run(cmd, capture_output=True, text=True, cwd=project_root)
+            result = traced_run(cmd, capture_output=True, text=True, cwd=project_root)
             
         if result.returncode != 0:
             error_msg = f"Failed to create worktree: {result.stderr}"
@@ -97,7 +111,7 @@ def validate_worktree(adw_id: str, state: ADWState) -> Tuple[bool, Optional[str]
         return False, f"Worktree directory not found: {worktree_path}"
     
     # Check git knows about it
-    result = subprocess.run(["git", "worktree", "list"], capture_output=True, text=True)
+    result = traced_run(["git", "worktree", "list"], capture_output=True, text=True)
     if worktree_path not in result.stdout:
         return False, "Worktree not registered with git"
     
@@ -133,7 +147,7 @@ def remove_worktree(adw_id: str, logger: logging.Logger) -> Tuple[bool, Optional
     
     # First remove via git
     cmd = ["git", "worktree", "remove", worktree_path, "--force"]
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    result = traced_run(cmd, capture_output=True, text=True)
     
     if result.returncode != 0:
         # Try to clean up manually if git command failed
@@ -240,4 +254,122 @@ def find_next_available_ports(adw_id: str, max_attempts: int = 15) -> Tuple[int,
         if is_port_available(backend_port) and is_port_available(frontend_port):
             return backend_port, frontend_port
     
-    raise RuntimeError("No available ports in the allocated range")
\ No newline at end of file
+    raise RuntimeError("No available ports in the allocated range")
+
+def allocate_worker_ports(ports: Tuple[int, int], count: int) -> List[Tuple[int, int]]:
+    """Allocate port pairs for parallel workers within one worktree.
+
+    Worker ports come from a separate range (backend 9300-9359, frontend
+    9400-9459) split into one block of WORKER_PORTS_PER_SLOT pairs per slot
+    of the 15-slot worktree range. A worktree's block follows from its own
+    ports, so workers never use another ADW's app ports or workers. Bound
+    ports in the block (a stray app from an earlier run) are skipped.
+
+    Args:
+        ports: The worktree's own (backend_port, frontend_port)
+        count: Number of port pairs wanted
+
+    Returns:
+        List of (backend_port, frontend_port) tuples, possibly shorter than count
+    """
+    slot = ports[0] - 9100
+    if not 0 <= slot < 15:
+        return []
+
+    pairs = []
+    for offset in range(WORKER_PORTS_PER_SLOT):
+        if len(pairs) >= count:
+            break
+        index = slot * WORKER_PORTS_PER_SLOT + offset
+        backend_port = WORKER_BACKEND_PORT_BASE + index
+        frontend_port = WORKER_FRONTEND_PORT_BASE + index
+        if is_port_available(backend_port) and is_port_available(frontend_port):
+            pairs.append((backend_port, frontend_port))
+
+    return pairs
+
+
+def is_port_listening(port: int) -> bool:
+    """Check if something accepts connections on a local port."""
+    try:
+        with socket.create_connection(("localhost", port), timeout=1):
+            return True
+    except OSError:
+        return False
+
+
+def start_worker_app(
+    worktree_path: str,
+    ports: Tuple[int, int],
+    run_dir: str,
+    logger: logging.Logger,
+    timeout: float = WORKER_APP_START_TIMEOUT,
+) -> Optional[subprocess.Popen]:
+    """Start the worktree's app on a worker's ports and wait until it listens.
+
+    Runs the worktree's scripts/start.sh from run_dir, which gets its own
+    .ports.env (start.sh reads it from the current directory). Output goes to
+    run_dir/app.log.
+
+    Returns:
+        The running app's process (stop it with stop_worker_app), or None if
+        there is no start script or the app did not listen within timeout
+    """
+    start_script = os.path.join(worktree_path, WORKER_APP_START_SCRIPT)
+    if not os.path.isfile(start_script):
+        logger.warning(f"No {WORKER_APP_START_SCRIPT} in worktree, cannot start worker apps")
+        return None
+
+    backend_port, frontend_port = ports
+    os.makedirs(run_dir, exist_ok=True)
+    setup_worktree_environment(run_dir, backend_port, frontend_port, logger)
+    env = dict(os.environ, BACKEND_PORT=str(backend_port), FRONTEND_PORT=str(frontend_port))
+    with open(os.path.join(run_dir, "app.log"), "w") as log:
+        process = subprocess.Popen(
+            ["bash", start_script],
+            cwd=run_dir,
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,  # Own process group so the whole app stops
+        )
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            logger.error(f"Worker app on {backend_port}/{frontend_port} exited with {process.returncode}")
+            return None
+        if is_port_listening(backend_port) and is_port_listening(frontend_port):
+            logger.info(f"Worker app listening on {backend_port}/{frontend_port}")
+            return process
+        time.sleep(0.5)
+
+    logger.error(f"Worker app on {backend_port}/{frontend_port} did not start within {timeout}s")
+    stop_worker_app(process)
+    return None
+
+
+def stop_worker_app(process: subprocess.Popen) -> None:
+    """Stop a worker app started by start_worker_app, children included."""
+    kill_process_group(process)
+
+
+def count_worktrees() -> int:
+    """Number of ADW worktrees present under trees/."""
+    trees_dir = os.path.dirname(get_worktree_path("_"))
+    if not os.path.isdir(trees_dir):
+        return 0
+    return sum(
+        1 for name in os.listdir(trees_dir) if os.path.isdir(os.path.join(trees_dir, name))
+    )
+
+
+def count_ports_in_use() -> int:
+    """Number of ports in the ADW backend/frontend ranges that are bound."""
+    return sum(
+        1
+        for index in range(15)
+        for port in (9100 + index, 9200 + index)
+        if not is_port_available(port)
+    )
@@ -36,8 +36,8 @@ import logging
 import json
 import subprocess
 from typing import Optional
-from dotenv import load_dotenv
 
+from adw_modules.tracing import traced_phase
 from adw_modules.state import ADWState
 from adw_modules.git_ops import commit_changes, finalize_git_operations
 from adw_modules.github import (
@@ -63,7 +63,7 @@ from adw_modules.worktree_ops import (
     find_next_available_ports,
     setup_worktree_environment,
 )
-from adw_modules.utils import setup_logger, check_env_vars
+from adw_modules.utils import setup_logger, check_env_vars, load_env
 from adw_modules.data_types import (
     GitHubIssue,
     AgentTemplateRequest,
@@ -138,10 +138,11 @@ def get_patch_content(
         sys.exit(1)
 
 
+@traced_phase
 def main():
     """Main entry point."""
     # Load environment variables
-    load_dotenv()
+    load_env()
 
     # Parse command line args
     if len(sys.argv) < 2:
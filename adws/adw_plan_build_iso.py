@@ -15,15 +15,17 @@ This script runs:
 The scripts are chained together via persistent state (adw_state.json).
 """
 
-import subprocess
 import sys
 import os
 
 # Add the parent directory to Python path to import modules
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from adw_modules.tracing import traced_phase
+from adw_modules.worker_client import run_phase
 from adw_modules.workflow_ops import ensure_adw_id
 
 
+@traced_phase
 def main():
     """Main entry point."""
     if len(sys.argv) < 2:
@@ -53,7 +55,7 @@ def main():
     ]
     print(f"\n=== ISOLATED PLAN PHASE ===")
     print(f"Running: {' '.join(plan_cmd)}")
-    plan = subprocess.run(plan_cmd)
+    plan = run_phase(plan_cmd)
     if plan.returncode != 0:
         print("Isolated plan phase failed")
         sys.exit(1)
@@ -68,7 +70,7 @@ def main():
     ]
     print(f"\n=== ISOLATED BUILD PHASE ===")
     print(f"Running: {' '.join(build_cmd)}")
-    build = subprocess.run(build_cmd)
+    build = run_phase(build_cmd)
     if build.returncode != 0:
         print("Isolated build phase failed")
         sys.exit(1)
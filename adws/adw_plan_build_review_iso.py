@@ -16,15 +16,17 @@ This script runs:
 The scripts are chained together via persistent state (adw_state.json).
 """
 
-import subprocess
 import sys
 import os
 
 # Add the parent directory to Python path to import modules
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from adw_modules.tracing import traced_phase
+from adw_modules.worker_client import run_phase
 from adw_modules.workflow_ops import ensure_adw_id
 
 
+@traced_phase
 def main():
     """Main entry point."""
     # Check for --skip-resolution flag
@@ -60,7 +62,7 @@ def main():
     ]
     print(f"\n=== ISOLATED PLAN PHASE ===")
     print(f"Running: {' '.join(plan_cmd)}")
-    plan = subprocess.run(plan_cmd)
+    plan = run_phase(plan_cmd)
     if plan.returncode != 0:
         print("Isolated plan phase failed")
         sys.exit(1)
@@ -75,7 +77,7 @@ def main():
     ]
     print(f"\n=== ISOLATED BUILD PHASE ===")
     print(f"Running: {' '.join(build_cmd)}")
-    build = subprocess.run(build_cmd)
+    build = run_phase(build_cmd)
     if build.returncode != 0:
         print("Isolated build phase failed")
         sys.exit(1)
@@ -93,7 +95,7 @@ def main():
     
     print(f"\n=== ISOLATED REVIEW PHASE ===")
     print(f"Running: {' '.join(review_cmd)}")
-    review = subprocess.run(review_cmd)
+    review = run_phase(review_cmd)
     if review.returncode != 0:
         print("Isolated review phase failed")
         sys.exit(1)
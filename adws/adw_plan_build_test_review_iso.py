@@ -17,15 +17,17 @@ This script runs:
 The scripts are chained together via persistent state (adw_state.json).
 """
 
-import subprocess
 import sys
 import os
 
 # Add the parent directory to Python path to import modules
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from adw_modules.tracing import traced_phase
+from adw_modules.worker_client import run_phase
 from adw_modules.workflow_ops import ensure_adw_id
 
 
+@traced_phase
 def main():
     """Main entry point."""
     # Check for flags
@@ -67,7 +69,7 @@ def main():
     ]
     print(f"\n=== ISOLATED PLAN PHASE ===")
     print(f"Running: {' '.join(plan_cmd)}")
-    plan = subprocess.run(plan_cmd)
+    plan = run_phase(plan_cmd)
     if plan.returncode != 0:
         print("Isolated plan phase failed")
         sys.exit(1)
@@ -82,7 +84,7 @@ def main():
     ]
     print(f"\n=== ISOLATED BUILD PHASE ===")
     print(f"Running: {' '.join(build_cmd)}")
-    build = subprocess.run(build_cmd)
+    build = run_phase(build_cmd)
     if build.returncode != 0:
         print("Isolated build phase failed")
         sys.exit(1)
@@ -100,7 +102,7 @@ def main():
     
     print(f"\n=== ISOLATED TEST PHASE ===")
     print(f"Running: {' '.join(test_cmd)}")
-    test = subprocess.run(test_cmd)
+    test = run_phase(test_cmd)
     if test.returncode != 0:
         print("Isolated test phase failed")
         sys.exit(1)
@@ -118,7 +120,7 @@ def main():
     
     print(f"\n=== ISOLATED REVIEW PHASE ===")
     print(f"Running: {' '.join(review_cmd)}")
-    review = subprocess.run(review_cmd)
+    review = run_phase(review_cmd)
     if review.returncode != 0:
         print("Isolated review phase failed")
         sys.exit(1)
@@ -29,8 +29,8 @@ import os
 import logging
 import json
 from typing import Optional
-from dotenv import load_dotenv
 
+from adw_modules.tracing import traced_phase
 from adw_modules.state import ADWState
 from adw_modules.git_ops import commit_changes, finalize_git_operations
 from adw_modules.github import (
@@ -48,7 +48,7 @@ from adw_modules.workflow_ops import (
     ensure_adw_id,
     AGENT_PLANNER,
 )
-from adw_modules.utils import setup_logger, check_env_vars
+from adw_modules.utils import setup_logger, check_env_vars, load_env
 from adw_modules.data_types import GitHubIssue, IssueClassSlashCommand, AgentTemplateRequest
 from adw_modules.agent import execute_template
 from adw_modules.worktree_ops import (
@@ -63,10 +63,11 @@ from adw_modules.worktree_ops import (
 
 
 
+@traced_phase
 def main():
     """Main entry point."""
     # Load environment variables
-    load_dotenv()
+    load_env()
 
     # Parse command line args
     if len(sys.argv) < 2:
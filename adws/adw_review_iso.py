@@ -1,6 +1,6 @@
 #!/usr/bin/env -S uv run
 # /// script
-# dependencies = ["python-dotenv", "pydantic", "boto3>=1.26.0"]
+# dependencies = ["python-dotenv", "pydantic", "boto3>=1.26.0", "pillow"]
 # ///
 
 """
@@ -30,8 +30,8 @@ import os
 import logging
 import json
 from typing import Optional, List
-from dotenv import load_dotenv
 
+from adw_modules.tracing import traced_phase
 from adw_modules.state import ADWState
 from adw_modules.git_ops import commit_changes, finalize_git_operations
 from adw_modules.github import (
@@ -46,7 +46,7 @@ from adw_modules.workflow_ops import (
     implement_plan,
     find_spec_file,
 )
-from adw_modules.utils import setup_logger, parse_json, check_env_vars
+from adw_modules.utils import setup_logger, parse_json, check_env_vars, load_env
 from adw_modules.data_types import (
     AgentTemplateRequest,
     ReviewResult,
@@ -165,38 +165,40 @@ def upload_review_screenshots(
     logger.info(f"Uploading {len(review_result.screenshots)} screenshots")
     uploader = R2Uploader(logger)
     
-    screenshot_urls = []
+    # Upload every screenshot that exists in one concurrent batch
+    uploads = []
     for local_path in review_result.screenshots:
         # Convert relative path to absolute path within worktree
         abs_path = os.path.join(worktree_path, local_path)
-        
+
         if not os.path.exists(abs_path):
             logger.warning(f"Screenshot not found: {abs_path}")
             continue
-        
-        # Upload with a nice path
-        remote_path = f"adw/{adw_id}/review/{os.path.basename(local_path)}"
-        url = uploader.upload_file(abs_path, remote_path)
-        
+
+        uploads.append((local_path, abs_path))
+
+    # Keys are content hashes, so unchanged screenshots from earlier review
+    # attempts are not uploaded again
+    results = uploader.upload_screenshot_files([abs_path for _, abs_path in uploads])
+
+    url_by_path = {}
+    for local_path, abs_path in uploads:
+        url = results.get(abs_path)
         if url:
-            screenshot_urls.append(url)
             logger.info(f"Uploaded screenshot to: {url}")
         else:
             logger.error(f"Failed to upload screenshot: {local_path}")
             # Fallback to local path if upload fails
-            screenshot_urls.append(local_path)
-    
+            url = local_path
+        url_by_path[local_path] = url
+
     # Update review result with URLs
-    review_result.screenshot_urls = screenshot_urls
-    
+    review_result.screenshot_urls = list(url_by_path.values())
+
     # Update issues with their screenshot URLs
     for issue in review_result.review_issues:
-        if issue.screenshot_path:
-            # Find corresponding URL
-            for i, local_path in enumerate(review_result.screenshots):
-                if local_path == issue.screenshot_path and i < len(screenshot_urls):
-                    issue.screenshot_url = screenshot_urls[i]
-                    break
+        if issue.screenshot_path in url_by_path:
+            issue.screenshot_url = url_by_path[issue.screenshot_path]
 
 
 def resolve_blocker_issues(
@@ -312,10 +314,11 @@ def build_review_summary(review_result: ReviewResult) -> str:
     return "\n".join(summary_parts)
 
 
+@traced_phase
 def main():
     """Main entry point."""
     # Load environment variables
-    load_dotenv()
+    load_env()
     
     # Check for --skip-resolution flag
     skip_resolution = "--skip-resolution" in sys.argv
@@ -19,15 +19,17 @@ The scripts are chained together via persistent state (adw_state.json).
 Each phase runs in its own git worktree with dedicated ports.
 """
 
-import subprocess
 import sys
 import os
 
 # Add the parent directory to Python path to import modules
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from adw_modules.tracing import traced_phase
+from adw_modules.worker_client import run_phase
 from adw_modules.workflow_ops import ensure_adw_id
 
 
+@traced_phase
 def main():
     """Main entry point."""
     # Check for flags
@@ -70,7 +72,7 @@ def main():
     ]
     print(f"\n=== ISOLATED PLAN PHASE ===")
     print(f"Running: {' '.join(plan_cmd)}")
-    plan = subprocess.run(plan_cmd)
+    plan = run_phase(plan_cmd)
     if plan.returncode != 0:
         print("Isolated plan phase failed")
         sys.exit(1)
@@ -85,7 +87,7 @@ def main():
     ]
     print(f"\n=== ISOLATED BUILD PHASE ===")
     print(f"Running: {' '.join(build_cmd)}")
-    build = subprocess.run(build_cmd)
+    build = run_phase(build_cmd)
     if build.returncode != 0:
         print("Isolated build phase failed")
         sys.exit(1)
@@ -102,7 +104,7 @@ def main():
     
     print(f"\n=== ISOLATED TEST PHASE ===")
     print(f"Running: {' '.join(test_cmd)}")
-    test = subprocess.run(test_cmd)
+    test = run_phase(test_cmd)
     if test.returncode != 0:
         print("Isolated test phase failed")
         # Note: Continue anyway as some tests might be flaky
@@ -121,7 +123,7 @@ def main():
     
     print(f"\n=== ISOLATED REVIEW PHASE ===")
     print(f"Running: {' '.join(review_cmd)}")
-    review = subprocess.run(review_cmd)
+    review = run_phase(review_cmd)
     if review.returncode != 0:
         print("Isolated review phase failed")
         sys.exit(1)
@@ -136,7 +138,7 @@ def main():
     ]
     print(f"\n=== ISOLATED DOCUMENTATION PHASE ===")
     print(f"Running: {' '.join(document_cmd)}")
-    document = subprocess.run(document_cmd)
+    document = run_phase(document_cmd)
     if document.returncode != 0:
         print("Isolated documentation phase failed")
         sys.exit(1)
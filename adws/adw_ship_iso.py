@@ -32,8 +32,8 @@ import logging
 import json
 import subprocess
 from typing import Optional, Dict, Any, Tuple
-from dotenv import load_dotenv
 
+from adw_modules.tracing import traced_phase
 from adw_modules.state import ADWState
 from adw_modules.github import (
     make_issue_comment,
@@ -41,7 +41,7 @@ from adw_modules.github import (
     extract_repo_path,
 )
 from adw_modules.workflow_ops import format_issue_message
-from adw_modules.utils import setup_logger, check_env_vars
+from adw_modules.utils import setup_logger, check_env_vars, load_env
 from adw_modules.worktree_ops import validate_worktree
 from adw_modules.data_types import ADWStateData
 
@@ -178,10 +178,11 @@ def validate_state_completeness(state: ADWState, logger: logging.Logger) -> tupl
     return len(missing_fields) == 0, missing_fields
 
 
+@traced_phase
 def main():
     """Main entry point."""
     # Load environment variables
-    load_dotenv()
+    load_env()
     
     # Parse command line args
     # INTENTIONAL: adw-id is REQUIRED - we need it to find the worktree and state
@@ -20,13 +20,15 @@ This workflow REQUIRES that adw_plan_iso.py or adw_patch_iso.py has been run fir
 to create the worktree. It cannot create worktrees itself.
 """
 
+import glob
 import json
 import subprocess
 import sys
 import os
 import logging
-from typing import Tuple, Optional, List
-from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple, Optional, List, Set, TypeVar
+from adw_modules.tracing import traced_phase
 from adw_modules.data_types import (
     AgentTemplateRequest,
     GitHubIssue,
@@ -42,7 +44,7 @@ from adw_modules.github import (
     make_issue_comment,
     get_repo_url,
 )
-from adw_modules.utils import make_adw_id, setup_logger, parse_json, check_env_vars
+from adw_modules.utils import make_adw_id, setup_logger, parse_json, check_env_vars, load_env
 from adw_modules.state import ADWState
 from adw_modules.git_ops import commit_changes, finalize_git_operations
 from adw_modules.workflow_ops import (
@@ -51,17 +53,36 @@ from adw_modules.workflow_ops import (
     ensure_adw_id,
     classify_issue,
 )
-from adw_modules.worktree_ops import validate_worktree
+from adw_modules.failure_clustering import cluster_failed_tests, describe_cluster
+from adw_modules.test_history import (
+    record_test_results,
+    get_flakiness_scores,
+    get_quarantined_tests,
+    is_suspected_flake,
+    retry_flaky_test,
+)
+from adw_modules.worktree_ops import (
+    validate_worktree,
+    allocate_worker_ports,
+    get_ports_for_adw,
+    start_worker_app,
+    stop_worker_app,
+)
 
 # Agent name constants
 AGENT_TESTER = "test_runner"
 AGENT_E2E_TESTER = "e2e_test_runner"
+AGENT_E2E_FLAKE_RETRIER = "e2e_flake_retry"
 AGENT_BRANCH_GENERATOR = "branch_generator"
 
 # Maximum number of test retry attempts after resolution
 MAX_TEST_RETRY_ATTEMPTS = 4
 MAX_E2E_TEST_RETRY_ATTEMPTS = 2  # E2E ui tests
 
+E2E_TEST_GLOB = os.path.join(".claude", "commands", "e2e", "*.md")
+
+# Unit or E2E result; both carry passed and quarantined
+ResultT = TypeVar("ResultT", TestResult, E2ETestResult)
 
 
 
@@ -89,21 +110,108 @@ def run_tests(adw_id: str, logger: logging.Logger, working_dir: Optional[str] =
 
 
 def parse_test_results(
-    output: str, logger: logging.Logger
+    output: str,
+    logger: logging.Logger,
+    adw_id: Optional[str] = None,
+    working_dir: Optional[str] = None,
 ) -> Tuple[List[TestResult], int, int]:
-    """Parse test results JSON and return (results, passed_count, failed_count)."""
+    """Parse test results JSON and return (results, passed_count, failed_count).
+
+    When adw_id is given, the results are also appended to the test history.
+    """
     try:
         # Use parse_json to handle markdown-wrapped JSON
         results = parse_json(output, List[TestResult])
 
         passed_count = sum(1 for test in results if test.passed)
         failed_count = len(results) - passed_count
-
-        return results, passed_count, failed_count
     except Exception as e:
         logger.error(f"Error parsing test results: {e}")
         return [], 0, 0
 
+    if adw_id:
+        try:
+            record_test_results(results, adw_id, "unit", working_dir)
+        except OSError as e:
+            logger.warning(f"Failed to record test history: {e}")
+
+    return results, passed_count, failed_count
+
+
+def triage_failed_tests(
+    results: List[TestResult],
+    adw_id: str,
+    logger: logging.Logger,
+    worktree_path: str,
+) -> Tuple[List[TestResult], List[str]]:
+    """Separate flakes from real failures before spending resolver agents.
+
+    Suspected flakes (by historical flakiness score) are re-run once with
+    their own execution_command; those that pass are marked as passed.
+    Quarantined failures are flagged (see mark_quarantined) and never sent to
+    resolution.
+
+    Returns (updated_results, quarantined_test_names).
+    """
+    failed = [test for test in results if not test.passed]
+    if not failed:
+        return results, []
+
+    scores = get_flakiness_scores("unit")
+    quarantine = get_quarantined_tests("unit")
+
+    retried = []
+    updated = []
+    for test in results:
+        if (
+            not test.passed
+            and test.test_name not in quarantine
+            and is_suspected_flake(test.test_name, scores)
+        ):
+            logger.info(
+                f"Retrying suspected flake {test.test_name} (score {scores[test.test_name]:.2f})"
+            )
+            test = retry_flaky_test(test, worktree_path)
+            retried.append(test)
+            if test.passed:
+                logger.info(f"Suspected flake passed on retry: {test.test_name}")
+        updated.append(test)
+
+    if retried:
+        try:
+            record_test_results(retried, adw_id, "unit", worktree_path)
+        except OSError as e:
+            logger.warning(f"Failed to record test history: {e}")
+
+    return mark_quarantined(updated, quarantine, logger)
+
+
+def mark_quarantined(
+    results: List[ResultT], quarantine: Set[str], logger: logging.Logger
+) -> Tuple[List[ResultT], List[str]]:
+    """Flag failing tests on the quarantine list.
+
+    Flagged results keep passed=False but count as neither passed nor failed
+    (see count_test_results). Returns (results, quarantined_test_names).
+    """
+    marked = [
+        test.model_copy(update={"quarantined": True})
+        if not test.passed and test.test_name in quarantine
+        else test
+        for test in results
+    ]
+    quarantined = [test.test_name for test in marked if test.quarantined]
+    if quarantined:
+        logger.warning(f"Quarantined tests failing (not resolved): {quarantined}")
+    return marked, quarantined
+
+
+def count_test_results(results: List[ResultT]) -> Tuple[int, int, int]:
+    """Return (passed, failed, quarantined) counts; quarantined tests aren't failures."""
+    passed_count = sum(1 for test in results if test.passed)
+    quarantined_count = sum(1 for test in results if test.quarantined)
+    return passed_count, len(results) - passed_count - quarantined_count, quarantined_count
+
 
 def format_test_results_comment(
     results: List[TestResult], passed_count: int, failed_count: int
@@ -112,8 +220,9 @@ def format_test_results_comment(
     if not results:
         return "❌ No test results found"
 
-    # Separate failed and passed tests
-    failed_tests = [test for test in results if not test.passed]
+    # Separate failed, quarantined and passed tests
+    failed_tests = [test for test in results if not test.passed and not test.quarantined]
+    quarantined_tests = [test for test in results if test.quarantined]
     passed_tests = [test for test in results if test.passed]
 
     # Build comment
@@ -134,6 +243,19 @@ def format_test_results_comment(
             comment_parts.append("```")
             comment_parts.append("")
 
+    # Quarantined tests header
+    if quarantined_tests:
+        comment_parts.append("## ⚠️ Quarantined Tests (failing, not counted)")
+        comment_parts.append("")
+
+        for test in quarantined_tests:
+            comment_parts.append(f"### {test.test_name}")
+            comment_parts.append("")
+            comment_parts.append("```json")
+            comment_parts.append(json.dumps(test.model_dump(), indent=2))
+            comment_parts.append("```")
+            comment_parts.append("")
+
     # Passed tests header
     if passed_tests:
         comment_parts.append("## ✅ Passed Tests")
@@ -152,27 +274,41 @@ def format_test_results_comment(
     comment_parts.append("## Summary")
     comment_parts.append(f"- **Passed**: {passed_count}")
     comment_parts.append(f"- **Failed**: {failed_count}")
+    if quarantined_tests:
+        comment_parts.append(f"- **Quarantined**: {len(quarantined_tests)}")
     comment_parts.append(f"- **Total**: {len(results)}")
 
     return "\n".join(comment_parts)
 
 
 def parse_e2e_test_results(
-    output: str, logger: logging.Logger
+    output: str,
+    logger: logging.Logger,
+    adw_id: Optional[str] = None,
+    working_dir: Optional[str] = None,
 ) -> Tuple[List[E2ETestResult], int, int]:
-    """Parse E2E test results JSON and return (results, passed_count, failed_count)."""
+    """Parse E2E test results JSON and return (results, passed_count, failed_count).
+
+    When adw_id is given, the results are also appended to the test history.
+    """
     try:
         # Use parse_json to handle markdown-wrapped JSON
         results = parse_json(output, List[E2ETestResult])
 
         passed_count = sum(1 for test in results if test.passed)
         failed_count = len(results) - passed_count
-
-        return results, passed_count, failed_count
     except Exception as e:
         logger.error(f"Error parsing E2E test results: {e}")
         return [], 0, 0
 
+    if adw_id:
+        try:
+            record_test_results(results, adw_id, "e2e", working_dir)
+        except OSError as e:
+            logger.warning(f"Failed to record test history: {e}")
+
+    return results, passed_count, failed_count
+
 
 def post_comprehensive_test_summary(
     issue_number: str,
@@ -186,34 +322,49 @@ def post_comprehensive_test_summary(
 
     # Unit test section
     if results:
-        passed_count = sum(1 for test in results if test.passed)
-        failed_count = len(results) - passed_count
+        passed_count, failed_count, quarantined_count = count_test_results(results)
 
         summary += "## Unit Tests\n\n"
         summary += f"- **Total**: {len(results)}\n"
         summary += f"- **Passed**: {passed_count} ✅\n"
-        summary += f"- **Failed**: {failed_count} ❌\n\n"
+        summary += f"- **Failed**: {failed_count} ❌\n"
+        if quarantined_count:
+            summary += f"- **Quarantined**: {quarantined_count} ⚠️\n"
+        summary += "\n"
 
         # List failures first
-        failed_tests = [test for test in results if not test.passed]
+        failed_tests = [test for test in results if not test.passed and not test.quarantined]
         if failed_tests:
             summary += "### Failed Unit Tests:\n"
             for test in failed_tests:
                 summary += f"- ❌ {test.test_name}\n"
             summary += "\n"
 
+        quarantined_tests = [test for test in results if test.quarantined]
+        if quarantined_tests:
+            summary += "### Quarantined Unit Tests (failing, not counted):\n"
+            for test in quarantined_tests:
+                summary += f"- ⚠️ {test.test_name}\n"
+            summary += "\n"
+
     # E2E test section
     if e2e_results:
-        e2e_passed_count = sum(1 for test in e2e_results if test.passed)
-        e2e_failed_count = len(e2e_results) - e2e_passed_count
+        e2e_passed_count, e2e_failed_count, e2e_quarantined_count = count_test_results(
+            e2e_results
+        )
 
         summary += "## E2E Tests\n\n"
         summary += f"- **Total**: {len(e2e_results)}\n"
         summary += f"- **Passed**: {e2e_passed_count} ✅\n"
-        summary += f"- **Failed**: {e2e_failed_count} ❌\n\n"
+        summary += f"- **Failed**: {e2e_failed_count} ❌\n"
+        if e2e_quarantined_count:
+            summary += f"- **Quarantined**: {e2e_quarantined_count} ⚠️\n"
+        summary += "\n"
 
         # List E2E failures
-        e2e_failed_tests = [test for test in e2e_results if not test.passed]
+        e2e_failed_tests = [
+            test for test in e2e_results if not test.passed and not test.quarantined
+        ]
         if e2e_failed_tests:
             summary += "### Failed E2E Tests:\n"
             for result in e2e_failed_tests:
@@ -221,6 +372,12 @@ def post_comprehensive_test_summary(
                 if result.screenshots:
                     summary += f"  - Screenshots: {', '.join(result.screenshots)}\n"
 
+        e2e_quarantined_tests = [test for test in e2e_results if test.quarantined]
+        if e2e_quarantined_tests:
+            summary += "### Quarantined E2E Tests (failing, not counted):\n"
+            for result in e2e_quarantined_tests:
+                summary += f"- ⚠️ {result.test_name}\n"
+
     # Overall status
     total_failures = (
         (failed_count if results else 0) + 
@@ -269,6 +426,256 @@ def run_e2e_tests(adw_id: str, logger: logging.Logger, working_dir: Optional[str
     return test_response
 
 
+def get_max_e2e_workers() -> int:
+    """Parallel E2E workers from ADW_E2E_WORKERS (default 4).
+
+    Specs are sharded across this many workers (at most 4, the worker ports
+    per worktree), each with its own port pair, app instance and a single
+    reused browser session.
+    """
+    return int(os.getenv("ADW_E2E_WORKERS", "4"))
+
+
+def discover_e2e_test_files(worktree_path: str) -> List[str]:
+    """Find E2E spec files in the worktree, as paths relative to it (sorted)."""
+    pattern = os.path.join(worktree_path, E2E_TEST_GLOB)
+    return sorted(os.path.relpath(path, worktree_path) for path in glob.glob(pattern))
+
+
+def shard_e2e_tests(test_paths: List[str], num_workers: int) -> List[List[str]]:
+    """Split spec paths round-robin into at most num_workers non-empty shards."""
+    num_workers = max(1, min(num_workers, len(test_paths)))
+    shards = [[] for _ in range(num_workers)]
+    for idx, test_path in enumerate(test_paths):
+        shards[idx % num_workers].append(test_path)
+    return [shard for shard in shards if shard]
+
+
+def run_e2e_worker(
+    shard: List[str],
+    worker_idx: int,
+    ports: Tuple[int, int],
+    adw_id: str,
+    logger: logging.Logger,
+    worktree_path: str,
+    iteration: int = 1,
+    agent_prefix: str = AGENT_E2E_TESTER,
+) -> List[E2ETestResult]:
+    """Run one shard of E2E specs in a single /test_e2e session.
+
+    The whole shard goes into one agent session so the browser is launched once
+    and reused for every spec in it. The worker's port pair is passed in the
+    payload so it never collides with other workers or the worktree's own app.
+    """
+    backend_port, frontend_port = ports
+    agent_name = f"{agent_prefix}_iter{iteration}_w{worker_idx}"
+    payload = json.dumps(
+        {
+            "test_files": shard,
+            "backend_port": backend_port,
+            "frontend_port": frontend_port,
+            "application_url": f"http://localhost:{frontend_port}",
+            "reuse_browser": True,
+        },
+        indent=2,
+    )
+
+    request = AgentTemplateRequest(
+        agent_name=agent_name,
+        slash_command="/test_e2e",
+        args=[payload],
+        adw_id=adw_id,
+        working_dir=worktree_path,
+    )
+
+    logger.info(
+        f"E2E worker {worker_idx} running {len(shard)} specs on ports {backend_port}/{frontend_port}"
+    )
+    response = execute_template(request)
+
+    if not response.success:
+        logger.error(f"E2E worker {worker_idx} failed: {response.output}")
+        return [
+            E2ETestResult(
+                test_name=os.path.basename(test_path),
+                status="failed",
+                test_path=test_path,
+                error=f"E2E worker {worker_idx} failed: {response.output}",
+            )
+            for test_path in shard
+        ]
+
+    results, _, _ = parse_e2e_test_results(
+        response.output, logger, adw_id, worktree_path
+    )
+    return results
+
+
+def get_worker_app_dir(adw_id: str, worker_idx: int) -> str:
+    """Directory for a worker app's .ports.env and app.log: agents/{adw_id}/e2e_app_w{idx}."""
+    run_dir = os.path.dirname(ADWState(adw_id).get_state_path())
+    return os.path.join(run_dir, f"e2e_app_w{worker_idx}")
+
+
+def start_worker_apps(
+    worker_ports: List[Tuple[int, int]],
+    adw_id: str,
+    logger: logging.Logger,
+    worktree_path: str,
+) -> List[Tuple[Tuple[int, int], subprocess.Popen]]:
+    """Start one app per worker port pair concurrently; returns those that came up."""
+    with ThreadPoolExecutor(max_workers=len(worker_ports)) as executor:
+        futures = [
+            executor.submit(
+                start_worker_app,
+                worktree_path,
+                pair,
+                get_worker_app_dir(adw_id, worker_idx),
+                logger,
+            )
+            for worker_idx, pair in enumerate(worker_ports)
+        ]
+        apps = [(pair, future.result()) for pair, future in zip(worker_ports, futures)]
+    return [(pair, process) for pair, process in apps if process is not None]
+
+
+def normalize_test_path(test_path: str, worktree_path: str) -> str:
+    """A spec path relative to the worktree, whether given absolute, `./` or relative."""
+    if os.path.isabs(test_path):
+        test_path = os.path.relpath(os.path.realpath(test_path), os.path.realpath(worktree_path))
+    return os.path.normpath(test_path)
+
+
+def run_e2e_tests_parallel(
+    test_paths: List[str],
+    adw_id: str,
+    logger: logging.Logger,
+    worktree_path: str,
+    ports: Tuple[int, int],
+    iteration: int = 1,
+    max_workers: Optional[int] = None,
+    agent_prefix: str = AGENT_E2E_TESTER,
+) -> List[E2ETestResult]:
+    """Shard E2E specs across workers and aggregate results in input order.
+
+    Each worker gets its own port pair from the worktree's block of worker
+    ports and its own app instance started on them. Workers whose app does
+    not come up are dropped; if none do, all specs run in one session on the
+    worktree's own ports. Specs a worker did not report on are marked as failed.
+    """
+    if max_workers is None:
+        max_workers = get_max_e2e_workers()
+    worker_ports = allocate_worker_ports(ports, min(max_workers, len(test_paths)))
+    apps = start_worker_apps(worker_ports, adw_id, logger, worktree_path) if worker_ports else []
+    if apps:
+        worker_ports = [pair for pair, _ in apps]
+    else:
+        logger.warning("No worker apps running, running E2E specs on worktree ports")
+        worker_ports = [ports]
+
+    shards = shard_e2e_tests(test_paths, len(worker_ports))
+    logger.info(
+        f"Running {len(test_paths)} E2E specs across {len(shards)} parallel workers"
+    )
+
+    results_by_path = {}
+    try:
+        with ThreadPoolExecutor(max_workers=len(shards)) as executor:
+            futures = [
+                executor.submit(
+                    run_e2e_worker,
+                    shard,
+                    worker_idx,
+                    worker_ports[worker_idx],
+                    adw_id,
+                    logger,
+                    worktree_path,
+                    iteration,
+                    agent_prefix,
+                )
+                for worker_idx, shard in enumerate(shards)
+            ]
+            for future in futures:
+                for result in future.result():
+                    key = normalize_test_path(result.test_path, worktree_path)
+                    results_by_path[key] = result
+    finally:
+        for _, process in apps:
+            stop_worker_app(process)
+
+    # Aggregate in input order so reports and screenshots are deterministic
+    aggregated = []
+    for test_path in test_paths:
+        result = results_by_path.get(normalize_test_path(test_path, worktree_path))
+        if result is not None:
+            result = result.model_copy(update={"test_path": test_path})
+        else:
+            result = E2ETestResult(
+                test_name=os.path.basename(test_path),
+                status="failed",
+                test_path=test_path,
+                error="No result reported for this spec",
+            )
+        aggregated.append(result)
+
+    return aggregated
+
+
+def triage_failed_e2e_tests(
+    results: List[E2ETestResult],
+    adw_id: str,
+    logger: logging.Logger,
+    worktree_path: str,
+    ports: Tuple[int, int],
+    iteration: int = 1,
+) -> Tuple[List[E2ETestResult], List[str]]:
+    """E2E counterpart of triage_failed_tests.
+
+    Suspected flakes are re-run once, each spec on its own, through
+    run_e2e_tests_parallel; a /test_e2e session per spec is far cheaper than
+    a resolver. Specs that pass on retry are marked as passed; the retry run
+    is recorded in the test history like any other.
+
+    Returns (updated_results, quarantined_test_names).
+    """
+    failed = [test for test in results if not test.passed]
+    if not failed:
+        return results, []
+
+    scores = get_flakiness_scores("e2e")
+    quarantine = get_quarantined_tests("e2e")
+
+    suspects = [
+        test.test_path
+        for test in failed
+        if test.test_name not in quarantine and is_suspected_flake(test.test_name, scores)
+    ]
+    if suspects:
+        logger.info(f"Retrying {len(suspects)} suspected flaky E2E specs: {suspects}")
+        retried = run_e2e_tests_parallel(
+            suspects,
+            adw_id,
+            logger,
+            worktree_path,
+            ports,
+            iteration=iteration,
+            max_workers=len(suspects),
+            agent_prefix=AGENT_E2E_FLAKE_RETRIER,
+        )
+        passed_paths = {test.test_path for test in retried if test.passed}
+        for test_path in passed_paths:
+            logger.info(f"Suspected flaky E2E spec passed on retry: {test_path}")
+        retried_by_path = {test.test_path: test for test in retried}
+        results = [
+            retried_by_path[test.test_path]
+            if not test.passed and test.test_path in passed_paths
+            else test
+            for test in results
+        ]
+
+    return mark_quarantined(results, quarantine, logger)
+
+
 def resolve_failed_tests(
     failed_tests: List[TestResult],
     adw_id: str,
@@ -279,18 +686,38 @@ def resolve_failed_tests(
 ) -> Tuple[int, int]:
     """
     Attempt to resolve failed tests using the resolve_failed_test command.
-    Returns (resolved_count, unresolved_count).
+
+    Failures are first clustered by shared root cause (error signature, stack
+    frame, file) and each cluster is resolved in one agent session. A single
+    failure keeps the original single-test payload; a cluster sends
+    {"shared_signature": ..., "failed_tests": [...]}.
+    Returns (resolved_count, unresolved_count) counted per test.
     """
     resolved_count = 0
     unresolved_count = 0
 
-    for idx, test in enumerate(failed_tests):
+    clusters = cluster_failed_tests(failed_tests)
+    logger.info(
+        f"Grouped {len(failed_tests)} failed tests into {len(clusters)} resolution clusters"
+    )
+
+    for idx, cluster in enumerate(clusters):
+        test_names = ", ".join(test.test_name for test in cluster)
         logger.info(
-            f"\n=== Resolving failed test {idx + 1}/{len(failed_tests)}: {test.test_name} ==="
+            f"\n=== Resolving failure cluster {idx + 1}/{len(clusters)}: {test_names} ==="
         )
 
         # Create payload for the resolve command
-        test_payload = test.model_dump_json(indent=2)
+        if len(cluster) == 1:
+            test_payload = cluster[0].model_dump_json(indent=2)
+        else:
+            test_payload = json.dumps(
+                {
+                    "shared_signature": describe_cluster(cluster),
+                    "failed_tests": [test.model_dump() for test in cluster],
+                },
+                indent=2,
+            )
 
         # Create agent name with iteration
         agent_name = f"test_resolver_iter{iteration}_{idx}"
@@ -310,7 +737,7 @@ def resolve_failed_tests(
             format_issue_message(
                 adw_id,
                 agent_name,
-                f"🔧 Attempting to resolve: {test.test_name}\n```json\n{test_payload}\n```",
+                f"🔧 Attempting to resolve {len(cluster)} related test(s): {test_names}\n```json\n{test_payload}\n```",
             ),
         )
 
@@ -318,27 +745,27 @@ def resolve_failed_tests(
         response = execute_template(resolve_request)
 
         if response.success:
-            resolved_count += 1
+            resolved_count += len(cluster)
             make_issue_comment(
                 issue_number,
                 format_issue_message(
                     adw_id,
                     agent_name,
-                    f"✅ Successfully resolved: {test.test_name}",
+                    f"✅ Successfully resolved: {test_names}",
                 ),
             )
-            logger.info(f"Successfully resolved: {test.test_name}")
+            logger.info(f"Successfully resolved: {test_names}")
         else:
-            unresolved_count += 1
+            unresolved_count += len(cluster)
             make_issue_comment(
                 issue_number,
                 format_issue_message(
                     adw_id,
                     agent_name,
-                    f"❌ Failed to resolve: {test.test_name}",
+                    f"❌ Failed to resolve: {test_names}",
                 ),
             )
-            logger.error(f"Failed to resolve: {test.test_name}")
+            logger.error(f"Failed to resolve: {test_names}")
 
     return resolved_count, unresolved_count
 
@@ -382,9 +809,24 @@ def run_tests_with_resolution(
 
         # Parse test results
         results, passed_count, failed_count = parse_test_results(
-            test_response.output, logger
+            test_response.output, logger, adw_id, worktree_path
         )
 
+        # Retry suspected flakes cheaply and set aside quarantined tests
+        results, quarantined = triage_failed_tests(
+            results, adw_id, logger, worktree_path
+        )
+        passed_count, failed_count, _ = count_test_results(results)
+        if quarantined:
+            make_issue_comment(
+                issue_number,
+                format_issue_message(
+                    adw_id,
+                    AGENT_TESTER,
+                    f"⚠️ Ignoring {len(quarantined)} quarantined flaky tests: {', '.join(quarantined)}",
+                ),
+            )
+
         # If no failures or this is the last attempt, we're done
         if failed_count == 0:
             logger.info("All tests passed, stopping retry attempts")
@@ -404,8 +846,10 @@ def run_tests_with_resolution(
             ),
         )
 
-        # Get list of failed tests
-        failed_tests = [test for test in results if not test.passed]
+        # Get list of failed tests, leaving quarantined flakes alone
+        failed_tests = [
+            test for test in results if not test.passed and not test.quarantined
+        ]
 
         # Attempt resolution
         resolved, unresolved = resolve_failed_tests(
@@ -453,6 +897,67 @@ def run_tests_with_resolution(
     return results, passed_count, failed_count, test_response
 
 
+def resolve_failed_e2e_test(
+    test: E2ETestResult,
+    idx: int,
+    adw_id: str,
+    issue_number: str,
+    logger: logging.Logger,
+    worktree_path: str,
+    iteration: int = 1,
+) -> bool:
+    """Resolve one failed E2E test with /resolve_failed_e2e_test; returns success."""
+    # Create payload for the resolve command
+    test_payload = test.model_dump_json(indent=2)
+
+    # Create agent name with iteration
+    agent_name = f"e2e_test_resolver_iter{iteration}_{idx}"
+
+    # Create template request with worktree_path
+    resolve_request = AgentTemplateRequest(
+        agent_name=agent_name,
+        slash_command="/resolve_failed_e2e_test",
+        args=[test_payload],
+        adw_id=adw_id,
+        working_dir=worktree_path,
+    )
+
+    # Post to issue
+    make_issue_comment(
+        issue_number,
+        format_issue_message(
+            adw_id,
+            agent_name,
+            f"🔧 Attempting to resolve E2E test: {test.test_name}\n```json\n{test_payload}\n```",
+        ),
+    )
+
+    # Execute resolution
+    response = execute_template(resolve_request)
+
+    if response.success:
+        make_issue_comment(
+            issue_number,
+            format_issue_message(
+                adw_id,
+                agent_name,
+                f"✅ Successfully resolved E2E test: {test.test_name}",
+            ),
+        )
+        logger.info(f"Successfully resolved E2E test: {test.test_name}")
+    else:
+        make_issue_comment(
+            issue_number,
+            format_issue_message(
+                adw_id,
+                agent_name,
+                f"❌ Failed to resolve E2E test: {test.test_name}",
+            ),
+        )
+        logger.error(f"Failed to resolve E2E test: {test.test_name}")
+    return response.success
+
+
 def resolve_failed_e2e_tests(
     failed_tests: List[E2ETestResult],
     adw_id: str,
@@ -463,6 +968,9 @@ def resolve_failed_e2e_tests(
 ) -> Tuple[int, int]:
     """
     Attempt to resolve failed E2E tests using the resolve_failed_e2e_test command.
+
+    Each failed spec gets its own resolver session, one after another: they
+    all edit the same worktree and run the app on the same ports.
     Returns (resolved_count, unresolved_count).
     """
     resolved_count = 0
@@ -472,57 +980,12 @@ def resolve_failed_e2e_tests(
         logger.info(
             f"\n=== Resolving failed E2E test {idx + 1}/{len(failed_tests)}: {test.test_name} ==="
         )
-
-        # Create payload for the resolve command
-        test_payload = test.model_dump_json(indent=2)
-
-        # Create agent name with iteration
-        agent_name = f"e2e_test_resolver_iter{iteration}_{idx}"
-
-        # Create template request with worktree_path
-        resolve_request = AgentTemplateRequest(
-            agent_name=agent_name,
-            slash_command="/resolve_failed_e2e_test",
-            args=[test_payload],
-            adw_id=adw_id,
-            working_dir=worktree_path,
-        )
-
-        # Post to issue
-        make_issue_comment(
-            issue_number,
-            format_issue_message(
-                adw_id,
-                agent_name,
-                f"🔧 Attempting to resolve E2E test: {test.test_name}\n```json\n{test_payload}\n```",
-            ),
-        )
-
-        # Execute resolution
-        response = execute_template(resolve_request)
-
-        if response.success:
+        if resolve_failed_e2e_test(
+            test, idx, adw_id, issue_number, logger, worktree_path, iteration
+        ):
             resolved_count += 1
-            make_issue_comment(
-                issue_number,
-                format_issue_message(
-                    adw_id,
-                    agent_name,
-                    f"✅ Successfully resolved E2E test: {test.test_name}",
-                ),
-            )
-            logger.info(f"Successfully resolved E2E test: {test.test_name}")
         else:
             unresolved_count += 1
-            make_issue_comment(
-                issue_number,
-                format_issue_message(
-                    adw_id,
-                    agent_name,
-                    f"❌ Failed to resolve E2E test: {test.test_name}",
-                ),
-            )
-            logger.error(f"Failed to resolve E2E test: {test.test_name}")
 
     return resolved_count, unresolved_count
 
@@ -537,35 +1000,58 @@ def run_e2e_tests_with_resolution(
     """
     Run E2E tests with automatic resolution and retry logic.
     Returns (results, passed_count, failed_count).
+
+    When spec files are found in the worktree they are sharded across parallel
+    workers; otherwise the whole suite runs in a single /test_e2e session.
     """
     attempt = 0
     results = []
     passed_count = 0
     failed_count = 0
 
+    test_paths = discover_e2e_test_files(worktree_path)
+    state = ADWState.load(adw_id)
+    if state and state.get("backend_port") and state.get("frontend_port"):
+        ports = (state.get("backend_port"), state.get("frontend_port"))
+    else:
+        ports = get_ports_for_adw(adw_id)
+
     while attempt < max_attempts:
         attempt += 1
         logger.info(f"\n=== E2E Test Run Attempt {attempt}/{max_attempts} ===")
 
-        # Run E2E tests (will auto-detect ports from .ports.env in worktree)
-        e2e_response = run_e2e_tests(adw_id, logger, worktree_path)
-
-        if not e2e_response.success:
-            logger.error(f"Error running E2E tests: {e2e_response.output}")
-            make_issue_comment(
-                issue_number,
-                format_issue_message(
-                    adw_id,
-                    AGENT_E2E_TESTER,
-                    f"❌ Error running E2E tests: {e2e_response.output}",
-                ),
+        if test_paths:
+            results = run_e2e_tests_parallel(
+                test_paths, adw_id, logger, worktree_path, ports, iteration=attempt
+            )
+            passed_count = sum(1 for test in results if test.passed)
+            failed_count = len(results) - passed_count
+        else:
+            # Run E2E tests (will auto-detect ports from .ports.env in worktree)
+            e2e_response = run_e2e_tests(adw_id, logger, worktree_path)
+
+            if not e2e_response.success:
+                logger.error(f"Error running E2E tests: {e2e_response.output}")
+                make_issue_comment(
+                    issue_number,
+                    format_issue_message(
+                        adw_id,
+                        AGENT_E2E_TESTER,
+                        f"❌ Error running E2E tests: {e2e_response.output}",
+                    ),
+                )
+                break
+
+            # Parse E2E results
+            results, passed_count, failed_count = parse_e2e_test_results(
+                e2e_response.output, logger, adw_id, worktree_path
             )
-            break
 
-        # Parse E2E results
-        results, passed_count, failed_count = parse_e2e_test_results(
-            e2e_response.output, logger
+        # Retry suspected flaky specs before resolvers; quarantined ones don't block
+        results, _ = triage_failed_e2e_tests(
+            results, adw_id, logger, worktree_path, ports, iteration=attempt
         )
+        passed_count, failed_count, _ = count_test_results(results)
 
         if not results:
             logger.warning("No E2E test results to process")
@@ -592,8 +1078,10 @@ def run_e2e_tests_with_resolution(
             ),
         )
 
-        # Get list of failed tests
-        failed_tests = [test for test in results if not test.passed]
+        # Get list of failed tests, leaving quarantined flakes alone
+        failed_tests = [
+            test for test in results if not test.passed and not test.quarantined
+        ]
 
         # Attempt resolution
         resolved, unresolved = resolve_failed_e2e_tests(
@@ -645,10 +1133,11 @@ def run_e2e_tests_with_resolution(
     return results, passed_count, failed_count
 
 
+@traced_phase
 def main():
     """Main entry point."""
     # Load environment variables
-    load_dotenv()
+    load_env()
     
     # Check for --skip-e2e flag in args
     skip_e2e = "--skip-e2e" in sys.argv
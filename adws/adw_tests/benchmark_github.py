@@ -0,0 +1,278 @@
+#!/usr/bin/env uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = [
+#     "fastapi",
+#     "uvicorn",
+#     "schedule",
+#     "python-dotenv",
+#     "pydantic",
+# ]
+# ///
+
+"""
+GitHub Trigger Benchmarks
+
+Usage:
+uv run adws/adw_tests/benchmark_github.py cron [--sizes 1000,10000,50000] [--latency-ms 50]
+    [--comments 1] [--triggering 5] [--cycles 1] [--json]
+uv run adws/adw_tests/benchmark_github.py webhook [--burst 50] [--latency-ms 50]
+    [--agent-time-scale 1.0] [--json]
+
+Both run the real trigger code against github_simulator.py through the gh shim.
+
+cron: one check_and_process_issues() cycle of trigger_cron.py per open-issue
+count. Reports cycle time, the GitHub requests it made, how many issues it
+actually examined, and the request rate that implies at the 20s poll
+interval. Workflow launches are recorded instead of run.
+
+webhook: serves trigger_webhook.py's app in-process, then has the simulator
+deliver a burst of `adw_plan_iso` comment webhooks at once. Reports delivery
+response time (GitHub gives up after 10s) and dispatch latency from delivery
+to workflow launch. The /classify_adw call goes to fake_claude.py, and
+workflow launches are recorded instead of run. Webhook runs write the usual
+agents/{adw_id}/ state and logs.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+from contextlib import redirect_stdout
+from types import SimpleNamespace
+from typing import Dict, List
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adw_modules.accounting import percentile
+from adw_modules.tracing import EXPORTER_ENV
+from adw_tests.fake_claude import write_launcher
+from adw_tests.github_simulator import GitHubSimulator
+
+REPO = "sim-org/sim-repo"
+CRON_INTERVAL_SECONDS = 20
+
+
+def make_sandbox(workdir: str) -> str:
+    """A git repo whose origin points at the simulated repository."""
+    repo_dir = os.path.join(workdir, "repo")
+    os.makedirs(repo_dir)
+    subprocess.run(["git", "init", "-q"], cwd=repo_dir, check=True)
+    subprocess.run(
+        ["git", "remote", "add", "origin", f"https://github.com/{REPO}.git"],
+        cwd=repo_dir, check=True,
+    )
+    return repo_dir
+
+
+def use_simulator(simulator: GitHubSimulator, shim_dir: str, base_path: str) -> None:
+    """Route gh to this simulator."""
+    os.environ["PATH"] = simulator.write_gh_shim(shim_dir) + os.pathsep + base_path
+
+
+def stats(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"p50_seconds": None, "p95_seconds": None, "max_seconds": None}
+    return {
+        "p50_seconds": round(percentile(values, 50), 3),
+        "p95_seconds": round(percentile(values, 95), 3),
+        "max_seconds": round(max(values), 3),
+    }
+
+
+def run_cron(args, workdir: str) -> List[Dict]:
+    """Time trigger_cron poll cycles against each open-issue count."""
+    from adw_triggers import trigger_cron
+
+    launched: List[int] = []
+    trigger_cron.trigger_adw_workflow = lambda issue_number: launched.append(issue_number) or True
+    base_path = os.environ["PATH"]
+
+    rows = []
+    for size in [int(size) for size in args.sizes.split(",")]:
+        simulator = GitHubSimulator(
+            repo=REPO, latency_ms=args.latency_ms, rate_limit=args.rate_limit
+        )
+        simulator.seed_issues(size, comments_per_issue=args.comments, triggering=args.triggering)
+        with simulator:
+            use_simulator(simulator, os.path.join(workdir, f"shim_{size}"), base_path)
+            for cycle in range(args.cycles):
+                trigger_cron.processed_issues.clear()
+                trigger_cron.issue_last_comment.clear()
+                launched.clear()
+                requests_before = dict(simulator.requests)
+                total_before = simulator.total_requests
+
+                started = time.monotonic()
+                with redirect_stdout(io.StringIO()):
+                    trigger_cron.check_and_process_issues()
+                seconds = time.monotonic() - started
+
+                requests = simulator.total_requests - total_before
+                checked = simulator.requests.get("list_comments", 0) - requests_before.get("list_comments", 0)
+                rows.append({
+                    "open_issues": size,
+                    "cycle": cycle + 1,
+                    "cycle_seconds": round(seconds, 2),
+                    "requests": requests,
+                    "issues_checked": checked,
+                    "triggered": len(launched),
+                    "requests_per_hour": requests * 3600 // CRON_INTERVAL_SECONDS,
+                    "rate_limit_remaining": simulator.rate_limit - simulator._rate_used,
+                })
+        os.environ["PATH"] = base_path
+    return rows
+
+
+class RecordingPopen:
+    """Stands in for subprocess.Popen in trigger_webhook: records launches."""
+
+    launches: Dict[str, float] = {}
+
+    def __init__(self, cmd, **kwargs):
+        # cmd is ["uv", "run", script, issue_number, adw_id]
+        RecordingPopen.launches[str(cmd[3])] = time.monotonic()
+
+    def poll(self):
+        return 0
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def run_webhook(args, workdir: str) -> Dict:
+    """Deliver a burst of triggering webhooks and time dispatch."""
+    import uvicorn
+
+    config_path = os.path.join(workdir, "fake_claude.json")
+    classification = {"adw_slash_command": "/adw_plan_iso", "adw_id": None, "model_set": "base"}
+    with open(config_path, "w") as f:
+        json.dump({"commands": {"/classify_adw": {
+            "output": json.dumps(classification), "cost_usd": 0, "turns": 1,
+        }}}, f)
+    os.environ["CLAUDE_CODE_PATH"] = write_launcher(
+        os.path.join(workdir, "bin"), config_path=config_path, time_scale=args.agent_time_scale
+    )
+
+    with redirect_stdout(io.StringIO()):
+        from adw_triggers import trigger_webhook
+    trigger_webhook.subprocess = SimpleNamespace(Popen=RecordingPopen)
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(
+        trigger_webhook.app, host="127.0.0.1", port=port, lifespan="off", log_level="warning",
+    ))
+    server_thread = threading.Thread(target=server.run, daemon=True)
+    server_thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    simulator = GitHubSimulator(
+        repo=REPO, latency_ms=args.latency_ms, rate_limit=args.rate_limit,
+        webhook_url=f"http://127.0.0.1:{port}/gh-webhook",
+    )
+    numbers = [simulator.add_issue(f"Burst issue {i + 1}") for i in range(args.burst)]
+    try:
+        with simulator, redirect_stdout(io.StringIO()):
+            use_simulator(simulator, os.path.join(workdir, "shim"), os.environ["PATH"])
+            started = time.monotonic()
+            for number in numbers:
+                simulator.add_comment(number, "adw_plan_iso")
+
+            deadline = started + args.timeout
+            while len(RecordingPopen.launches) < args.burst and time.monotonic() < deadline:
+                time.sleep(0.05)
+            last_launch = max(RecordingPopen.launches.values(), default=time.monotonic())
+            simulator.wait_for_deliveries(timeout=max(deadline - time.monotonic(), 1))
+    finally:
+        server.should_exit = True
+        server_thread.join(timeout=10)
+
+    burst = [d for d in simulator.deliveries if d["body"] == "adw_plan_iso"]
+    dispatch = [
+        RecordingPopen.launches[str(d["issue"])] - d["sent_at"]
+        for d in burst if str(d["issue"]) in RecordingPopen.launches
+    ]
+    return {
+        "burst": args.burst,
+        "launched": len(RecordingPopen.launches),
+        "burst_seconds": round(last_launch - started, 2),
+        "delivery": stats([d["seconds"] for d in burst]),
+        "dispatch": stats(dispatch),
+        # GitHub marks deliveries without a response in 10s as failed
+        "failed_deliveries": sum(1 for d in burst if d.get("status") != 200),
+        "bot_comment_deliveries": len(simulator.deliveries) - len(burst),
+        "github_requests": simulator.total_requests,
+    }
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark ADW triggers against a simulated GitHub")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Simulated GitHub API latency")
+    parser.add_argument("--rate-limit", type=int, default=5000, help="Simulated requests per hour")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    subparsers = parser.add_subparsers(dest="mode", required=True)
+
+    cron = subparsers.add_parser("cron", help="Time trigger_cron poll cycles")
+    cron.add_argument("--sizes", default="1000,10000,50000", help="Open issue counts")
+    cron.add_argument("--comments", type=int, default=1, help="Comments per issue")
+    cron.add_argument("--triggering", type=int, default=5, help="Issues whose last comment is 'adw'")
+    cron.add_argument("--cycles", type=int, default=1, help="Poll cycles per size")
+
+    webhook = subparsers.add_parser("webhook", help="Time webhook dispatch under a burst")
+    webhook.add_argument("--burst", type=int, default=50, help="Webhooks delivered at once")
+    webhook.add_argument("--agent-time-scale", type=float, default=1.0,
+                         help="Scale the fake /classify_adw latency (~0.8s at 1.0)")
+    webhook.add_argument("--timeout", type=float, default=600, help="Seconds to wait for dispatch")
+    args = parser.parse_args()
+
+    # Trigger and gh spans would otherwise fill agents/traces/
+    os.environ[EXPORTER_ENV] = "none"
+    original_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        # get_repo_url() reads the origin remote of the working directory
+        os.chdir(make_sandbox(workdir))
+        try:
+            result = run_cron(args, workdir) if args.mode == "cron" else run_webhook(args, workdir)
+        finally:
+            os.chdir(original_cwd)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    if args.mode == "cron":
+        print(f"⏱️  trigger_cron poll cycle, GitHub latency {args.latency_ms:g}ms\n")
+        print(f"{'open':>7} {'cycle':>9} {'requests':>9} {'checked':>8} {'triggered':>9} {'req/hour':>9}")
+        for row in result:
+            print(
+                f"{row['open_issues']:>7} {row['cycle_seconds']:>8.2f}s {row['requests']:>9} "
+                f"{row['issues_checked']:>8} {row['triggered']:>9} {row['requests_per_hour']:>9}"
+            )
+        return
+
+    print(f"⏱️  Webhook burst of {result['burst']}, GitHub latency {args.latency_ms:g}ms\n")
+    print(f"Launched {result['launched']}/{result['burst']} workflows in {result['burst_seconds']}s")
+    for name in ("delivery", "dispatch"):
+        row = result[name]
+        if row["p50_seconds"] is not None:
+            print(
+                f"{name:<9} p50 {row['p50_seconds']:.2f}s  p95 {row['p95_seconds']:.2f}s  "
+                f"max {row['max_seconds']:.2f}s"
+            )
+    print(f"Failed deliveries (>10s or error): {result['failed_deliveries']}")
+
+
+if __name__ == "__main__":
+    main()
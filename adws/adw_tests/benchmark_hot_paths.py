@@ -0,0 +1,407 @@
+#!/usr/bin/env uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = [
+#     "python-dotenv",
+#     "pydantic",
+# ]
+# ///
+
+"""
+Benchmarks for ADW Hot Paths
+
+Usage:
+uv run adws/adw_tests/benchmark_hot_paths.py [--only parse_jsonl_output,state_round_trip]
+    [--sizes-mb 1,10,100] [--repeat 5] [--threshold 0.25] [--save-baseline] [--json]
+
+Times the code every phase runs between agent calls:
+- agent.parse_jsonl_output and agent.truncate_output on 1MB-100MB transcripts
+- utils.parse_json into List[TestResult]
+- ADWState save/load round trips
+- workflow_ops.find_plan_for_issue with 10k agent directories
+- workflow_ops.find_existing_branch_for_issue with 5k branches
+- orchestrator phase-hop overhead: a fresh interpreter importing the phase
+  modules and round-tripping state, plus `uv run` startup when uv is installed
+
+Cases run in a worker process against a throwaway copy of adw_modules/, so
+agents/ fixtures are created in a temp directory instead of the real one.
+
+Each case's median is compared with adw_tests/benchmark_baselines.json;
+the run exits 1 if any case is slower than its baseline by more than
+--threshold (and by at least --min-delta seconds, to ignore timer noise).
+Baselines are machine-specific: record them with --save-baseline on the
+machine that will run the comparison.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+ADWS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(ADWS_DIR, "adw_tests", "benchmark_baselines.json")
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_MIN_DELTA = 0.002
+
+# A case returns a zero-argument callable to time; setup happens before
+Case = Callable[[str], Callable[[], object]]
+
+
+# --- Fixtures -----------------------------------------------------------------
+
+def write_transcript(path: str, size_bytes: int) -> None:
+    """Write a stream-json transcript of about size_bytes ending in a result."""
+    assistant = json.dumps({
+        "type": "assistant",
+        "message": {
+            "role": "assistant",
+            "content": [
+                {"type": "text", "text": "Running the tests again after the fix. " * 8},
+                {"type": "tool_use", "id": "toolu_0123456789", "name": "Bash",
+                 "input": {"command": "uv run pytest tests/ -x -q 2>&1 | tail -40"}},
+            ],
+            "usage": {"input_tokens": 1200, "output_tokens": 150},
+        },
+        "session_id": "bench-session",
+    })
+    tool_result = json.dumps({
+        "type": "user",
+        "message": {"role": "user", "content": [
+            {"type": "tool_result", "tool_use_id": "toolu_0123456789",
+             "content": "tests/test_app.py::test_case PASSED\n" * 20},
+        ]},
+        "session_id": "bench-session",
+    })
+    pair = f"{assistant}\n{tool_result}\n"
+    with open(path, "w") as f:
+        f.write(json.dumps({"type": "system", "subtype": "init", "session_id": "bench-session"}) + "\n")
+        f.write(pair * max(size_bytes // len(pair), 1))
+        f.write(json.dumps({
+            "type": "result", "subtype": "success", "is_error": False,
+            "result": "All tests pass.", "session_id": "bench-session",
+            "total_cost_usd": 1.23, "num_turns": 42,
+        }) + "\n")
+
+
+def test_results_text(count: int = 1000) -> str:
+    """A /test response: a fenced JSON array of TestResult objects."""
+    results = [
+        {"test_name": f"test_case_{i}", "passed": i % 10 != 0,
+         "execution_command": f"uv run pytest tests/test_{i}.py",
+         "test_purpose": "Checks one behaviour of the application " * 2,
+         "error": None if i % 10 else "AssertionError: expected 1 == 2\n" * 5}
+        for i in range(count)
+    ]
+    return "Here are the results:\n```json\n" + json.dumps(results, indent=2) + "\n```\n"
+
+
+def make_branches(repo_dir: str, count: int, issue_number: str) -> None:
+    """A git repo with count ADW-style branches; the match sorts last."""
+    os.makedirs(repo_dir)
+    git = lambda *args, **kwargs: subprocess.run(
+        ["git", *args], cwd=repo_dir, check=True, capture_output=True, **kwargs
+    )
+    git("init", "-q")
+    git("-c", "user.name=bench", "-c", "user.email=bench@example.com",
+        "commit", "-q", "--allow-empty", "-m", "init")
+    head = git("rev-parse", "HEAD", text=True).stdout.strip()
+    refs = "".join(
+        f"create refs/heads/feature-issue-{i}-adw-{i:08x}-change {head}\n" for i in range(count)
+    )
+    refs += f"create refs/heads/zz-feature-issue-{issue_number}-adw-deadbeef-target {head}\n"
+    git("update-ref", "--stdin", input=refs, text=True)
+
+
+# --- Cases (run in the worker, with the sandbox copy importable) ---------------
+
+def case_parse_jsonl_output(size_mb: int) -> Case:
+    def setup(workdir: str):
+        from adw_modules.agent import parse_jsonl_output
+
+        path = os.path.join(workdir, f"transcript_{size_mb}mb.jsonl")
+        if not os.path.exists(path):
+            write_transcript(path, size_mb * 1024 * 1024)
+        return lambda: parse_jsonl_output(path)
+    return setup
+
+
+def case_truncate_output(size_mb: int) -> Case:
+    def setup(workdir: str):
+        from adw_modules.agent import truncate_output
+
+        path = os.path.join(workdir, f"transcript_{size_mb}mb.jsonl")
+        if not os.path.exists(path):
+            write_transcript(path, size_mb * 1024 * 1024)
+        with open(path, "r") as f:
+            text = f.read()
+        return lambda: truncate_output(text, max_length=800)
+    return setup
+
+
+def case_parse_json_test_results(workdir: str):
+    from typing import List as ListType
+    from adw_modules.data_types import TestResult
+    from adw_modules.utils import parse_json
+
+    text = test_results_text()
+    return lambda: parse_json(text, ListType[TestResult])
+
+
+def case_state_round_trip(workdir: str):
+    from adw_modules.state import ADWState
+
+    state = ADWState("bench001")
+    state.update(
+        adw_id="bench001", issue_number="42", branch_name="feature-issue-42-adw-bench001-x",
+        plan_file="specs/issue-42-adw-bench001-plan.md", issue_class="/feature",
+        worktree_path="/tmp/trees/bench001", backend_port=9100, frontend_port=9200,
+    )
+
+    def round_trips():
+        for _ in range(100):
+            state.save("benchmark")
+            ADWState.load("bench001")
+    return round_trips
+
+
+def case_find_plan_for_issue(workdir: str):
+    from adw_modules.workflow_ops import find_plan_for_issue
+
+    # Worst case: 10k runs, none with a planner plan, so every dir is checked
+    agents_dir = os.path.join(os.path.dirname(workdir_adws()), "agents")
+    for i in range(10_000):
+        os.makedirs(os.path.join(agents_dir, f"{i:08x}", "sdlc_implementor"), exist_ok=True)
+    return lambda: find_plan_for_issue("42")
+
+
+def case_find_existing_branch(workdir: str):
+    from adw_modules.workflow_ops import find_existing_branch_for_issue
+
+    repo_dir = os.path.join(workdir, "branches_repo")
+    make_branches(repo_dir, 5_000, "424242")
+    return lambda: find_existing_branch_for_issue("424242", cwd=repo_dir)
+
+
+def case_phase_hop(workdir: str):
+    from adw_modules.state import ADWState
+
+    ADWState("hop00001").save("benchmark")
+    code = (
+        "import sys; sys.path.insert(0, sys.argv[1]);"
+        "from adw_modules.state import ADWState;"
+        "from adw_modules import agent, git_ops, github, workflow_ops, worktree_ops;"
+        "state = ADWState.load('hop00001'); state.save('hop')"
+    )
+    cmd = [sys.executable, "-c", code, workdir_adws()]
+    return lambda: subprocess.run(cmd, check=True, capture_output=True)
+
+
+def case_phase_hop_uv(workdir: str):
+    script = os.path.join(workdir, "hop_uv.py")
+    with open(script, "w") as f:
+        f.write(
+            "# /// script\n# dependencies = [\"python-dotenv\", \"pydantic\"]\n# ///\n"
+            "import sys; sys.path.insert(0, sys.argv[1])\n"
+            "from adw_modules.state import ADWState\n"
+            "from adw_modules import agent, git_ops, github, workflow_ops, worktree_ops\n"
+            "state = ADWState.load('hop00001') or ADWState('hop00001'); state.save('hop')\n"
+        )
+    cmd = ["uv", "run", "--quiet", script, workdir_adws()]
+    subprocess.run(cmd, check=True, capture_output=True)  # Warm uv's cache
+    return lambda: subprocess.run(cmd, check=True, capture_output=True)
+
+
+def workdir_adws() -> str:
+    """adws/ of the sandbox copy this worker imports from."""
+    import adw_modules
+
+    return os.path.dirname(os.path.dirname(os.path.abspath(adw_modules.__file__)))
+
+
+def build_cases(sizes_mb: List[int]) -> Dict[str, Case]:
+    cases: Dict[str, Case] = {}
+    for size in sizes_mb:
+        cases[f"parse_jsonl_output_{size}mb"] = case_parse_jsonl_output(size)
+    for size in sizes_mb:
+        cases[f"truncate_output_{size}mb"] = case_truncate_output(size)
+    cases["parse_json_test_results"] = case_parse_json_test_results
+    cases["state_round_trip_x100"] = case_state_round_trip
+    cases["find_plan_for_issue_10k_dirs"] = case_find_plan_for_issue
+    cases["find_existing_branch_5k_branches"] = case_find_existing_branch
+    cases["phase_hop"] = case_phase_hop
+    if shutil.which("uv"):
+        cases["phase_hop_uv"] = case_phase_hop_uv
+    return cases
+
+
+def run_worker(args) -> None:
+    """Run the selected cases and print {case: timings} as JSON."""
+    sys.path.insert(0, args.worker)
+    os.environ["ADW_TRACE_EXPORTER"] = "none"
+    import logging
+
+    logging.disable(logging.CRITICAL)
+
+    cases = build_cases([int(size) for size in args.sizes_mb.split(",")])
+    selected = select_cases(cases, args.only)
+    results = {}
+    workdir = os.path.join(os.path.dirname(args.worker), "work")
+    os.makedirs(workdir, exist_ok=True)
+    for name in selected:
+        func = cases[name](workdir)
+        func()  # Warm-up
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        results[name] = {
+            "median_seconds": statistics.median(timings),
+            "min_seconds": min(timings),
+            "runs": len(timings),
+        }
+        print(f"  {name}: {results[name]['median_seconds']:.4f}s", file=sys.stderr)
+    print(json.dumps(results))
+
+
+# --- Runner -------------------------------------------------------------------
+
+def select_cases(cases: Dict[str, Case], only: Optional[str]) -> List[str]:
+    if not only:
+        return list(cases)
+    prefixes = [prefix.strip() for prefix in only.split(",") if prefix.strip()]
+    return [name for name in cases if any(name.startswith(prefix) for prefix in prefixes)]
+
+
+def compare(
+    results: Dict[str, Dict],
+    baseline: Dict[str, Dict],
+    threshold: float = DEFAULT_THRESHOLD,
+    min_delta: float = DEFAULT_MIN_DELTA,
+) -> List[Tuple[str, float, Optional[float], Optional[float], str]]:
+    """Compare medians with the baseline.
+
+    Returns (case, median, baseline_median, change, status) rows where status
+    is "ok", "regressed", "improved" or "new".
+    """
+    rows = []
+    for name, result in results.items():
+        median = result["median_seconds"]
+        base = baseline.get(name, {}).get("median_seconds")
+        if base is None:
+            rows.append((name, median, None, None, "new"))
+            continue
+        change = (median - base) / base if base else 0.0
+        if change > threshold and median - base >= min_delta:
+            status = "regressed"
+        elif change < -threshold and base - median >= min_delta:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append((name, median, base, change, status))
+    return rows
+
+
+def load_baseline(path: str) -> Dict[str, Dict]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f).get("cases", {})
+
+
+def save_baseline(path: str, results: Dict[str, Dict]) -> None:
+    """Merge results into the baseline file (other cases are kept)."""
+    data = {"cases": {}}
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            data = json.load(f)
+    data["cases"].update(results)
+    data["machine"] = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "recorded_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def run_in_sandbox(args) -> Dict[str, Dict]:
+    """Copy adw_modules/ to a temp project and run the cases there."""
+    with tempfile.TemporaryDirectory() as tmp:
+        sandbox_adws = os.path.join(tmp, "adws")
+        shutil.copytree(
+            os.path.join(ADWS_DIR, "adw_modules"),
+            os.path.join(sandbox_adws, "adw_modules"),
+            ignore=shutil.ignore_patterns("__pycache__"),
+        )
+        cmd = [
+            sys.executable, os.path.abspath(__file__), "--worker", sandbox_adws,
+            "--sizes-mb", args.sizes_mb, "--repeat", str(args.repeat),
+        ]
+        if args.only:
+            cmd.extend(["--only", args.only])
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, text=True, cwd=tmp)
+        if result.returncode != 0:
+            sys.exit(f"Benchmark worker failed with exit code {result.returncode}")
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark ADW hot paths")
+    parser.add_argument("--only", help="Comma-separated case name prefixes")
+    parser.add_argument("--sizes-mb", default="1,10,100", help="Transcript sizes in MB")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON path")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown as a fraction of the baseline")
+    parser.add_argument("--min-delta", type=float, default=DEFAULT_MIN_DELTA,
+                        help="Ignore slowdowns smaller than this many seconds")
+    parser.add_argument("--save-baseline", action="store_true", help="Record results as the baseline")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    print(f"⏱️  Running hot path benchmarks ({args.repeat} runs each)...", file=sys.stderr)
+    results = run_in_sandbox(args)
+    rows = compare(results, load_baseline(args.baseline), args.threshold, args.min_delta)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"📁 Saved baseline to {args.baseline}", file=sys.stderr)
+
+    if args.json:
+        print(json.dumps({
+            name: {"median_seconds": median, "baseline_seconds": base, "change": change, "status": status}
+            for name, median, base, change, status in rows
+        }, indent=2))
+    else:
+        print(f"\n{'case':<36} {'median':>10} {'baseline':>10} {'change':>8}  status")
+        for name, median, base, change, status in rows:
+            base_text = f"{base:.4f}s" if base is not None else "-"
+            change_text = f"{change:+.0%}" if change is not None else "-"
+            icon = {"regressed": "❌", "improved": "🚀", "new": "🆕"}.get(status, "✅")
+            print(f"{name:<36} {median:>9.4f}s {base_text:>10} {change_text:>8}  {icon} {status}")
+
+    regressed = [row[0] for row in rows if row[4] == "regressed"]
+    if regressed and not args.save_baseline:
+        print(f"\n❌ {len(regressed)} case(s) regressed beyond {args.threshold:.0%}: {', '.join(regressed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
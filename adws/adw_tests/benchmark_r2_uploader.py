@@ -0,0 +1,231 @@
+#!/usr/bin/env uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = [
+#     "boto3>=1.26.0",
+#     "pydantic",
+# ]
+# ///
+
+"""
+Benchmark for R2Uploader
+
+Usage:
+uv run adws/adw_tests/benchmark_r2_uploader.py [--count 20] [--sizes 50k,500k,5m]
+    [--duplicates 0.25] [--concurrency 1,4,8,16] [--latency-ms 80]
+    [--bandwidth-mbps 100] [--failure-rate 0.1] [--backend memory|local] [--json]
+
+Uploads N generated screenshots through R2Uploader for each concurrency level,
+against an offline storage backend with injected latency, bandwidth limits and
+transient failures. The screenshots are real PNGs of roughly the given sizes
+(flat UI regions plus incompressible "content" rows, saved with fast zlib like
+a browser capture), and a --duplicates share of them repeats earlier ones, as
+review retries do, so hashing, recompression (ADW_SCREENSHOT_FORMAT, needs
+Pillow) and dedupe are part of the measured time. Reports wall time,
+throughput, per-file latency (including retries), objects and bytes stored,
+and how many files still failed, so concurrency and retry settings can be
+tuned without a network.
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import random
+import shutil
+import struct
+import logging
+import argparse
+import tempfile
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adw_modules import r2_uploader, screenshot_prep
+from adw_modules.accounting import percentile
+from adw_modules.r2_uploader import R2Uploader
+from adw_modules.storage_backends import LocalStorageClient, MemoryStorageClient
+
+
+class TimedUploader(R2Uploader):
+    """R2Uploader that records each screenshot's end-to-end upload time."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.latencies = []
+
+    def upload_screenshot(self, file_path):
+        started = time.monotonic()
+        url = super().upload_screenshot(file_path)
+        self.latencies.append(time.monotonic() - started)
+        return url
+
+
+def parse_size(text: str) -> int:
+    """Parse sizes like 50k, 2m or 1024 into bytes."""
+    text = text.strip().lower()
+    multiplier = {"k": 1024, "m": 1024 * 1024}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * multiplier)
+
+
+def png_chunk(kind: bytes, data: bytes) -> bytes:
+    return (
+        struct.pack(">I", len(data)) + kind + data
+        + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+    )
+
+
+def write_png(path: str, size: int, seed: int, width: int = 1280) -> None:
+    """Write an RGB PNG of about size bytes that looks like a UI screenshot.
+
+    Most rows are flat background or panel colours; enough rows of random
+    pixels (text, images) are spread through the page to reach the size.
+    """
+    rng = random.Random(seed)
+    row_bytes = width * 3
+    height = max(720, size // row_bytes + 1)
+    noisy_rows = min(size // row_bytes, height)
+    background = bytes(rng.choice([(255, 255, 255), (246, 247, 249)])) * width
+    panel = bytes(rng.randrange(256) for _ in range(3))
+
+    rows = []
+    for y in range(height):
+        # Spread the noisy rows evenly, Bresenham-style
+        if (y + 1) * noisy_rows // height > y * noisy_rows // height:
+            row = rng.randbytes(row_bytes)
+        elif y < 64:
+            row = panel * width  # Header bar
+        else:
+            row = background
+        rows.append(b"\x00" + row)  # Filter type 0 (None), like a fast encoder
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(png_chunk(b"IHDR", header))
+        f.write(png_chunk(b"IDAT", zlib.compress(b"".join(rows), 1)))
+        f.write(png_chunk(b"IEND", b""))
+
+
+def make_files(directory: str, count: int, sizes: list, duplicates: float, seed: int) -> list:
+    """Write count PNG screenshots cycling through sizes; a duplicates share
+    of them are byte-for-byte copies of earlier ones."""
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"screenshot_{i:03d}.png")
+        # Spread the duplicates evenly through the run
+        if paths and int((i + 1) * duplicates) > int(i * duplicates):
+            shutil.copyfile(rng.choice(paths), path)
+        else:
+            write_png(path, sizes[i % len(sizes)], seed=seed * 100003 + i)
+        paths.append(path)
+    return paths
+
+
+def run_once(args, paths: list, concurrency: int, workdir: str) -> dict:
+    """Upload every file once at the given concurrency."""
+    if args.backend == "local":
+        client = LocalStorageClient(os.path.join(workdir, f"store_{concurrency}"))
+    else:
+        client = MemoryStorageClient(
+            latency_ms=args.latency_ms,
+            bandwidth_mbps=args.bandwidth_mbps,
+            failure_rate=args.failure_rate,
+            seed=args.seed,
+        )
+    logger = logging.getLogger("benchmark_r2_uploader")
+    uploader = TimedUploader(logger, client, "benchmark")
+    # Fresh manifest per run so nothing is skipped as already uploaded
+    uploader.manifest_path = os.path.join(workdir, f"manifest_{concurrency}.jsonl")
+
+    started = time.monotonic()
+    results = uploader.upload_screenshot_files(paths, max_workers=concurrency)
+    wall = time.monotonic() - started
+
+    total_bytes = sum(os.path.getsize(path) for path in paths)
+    stored = client.list_objects_v2(Bucket="benchmark", Prefix="")["Contents"]
+    return {
+        "concurrency": concurrency,
+        "files": len(paths),
+        "bytes": total_bytes,
+        "objects": len(stored),
+        "stored_bytes": sum(obj["Size"] for obj in stored),
+        "wall_seconds": round(wall, 3),
+        "throughput_mb_s": round(total_bytes / 1024 / 1024 / wall, 2) if wall else None,
+        "p50_seconds": round(percentile(uploader.latencies, 50), 3),
+        "p95_seconds": round(percentile(uploader.latencies, 95), 3),
+        "max_seconds": round(max(uploader.latencies), 3),
+        "failed_files": sum(1 for url in results.values() if not url),
+        "injected_failures": getattr(client, "failures", 0),
+    }
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark R2Uploader offline")
+    parser.add_argument("--count", type=int, default=20, help="Screenshots per run")
+    parser.add_argument("--sizes", default="50k,500k,2m", help="Comma-separated PNG sizes")
+    parser.add_argument(
+        "--duplicates", type=float, default=0.25, help="Share of screenshots that repeat one"
+    )
+    parser.add_argument(
+        "--concurrency", default="1,4,8,16", help="Comma-separated concurrency levels"
+    )
+    parser.add_argument("--backend", choices=["memory", "local"], default="memory")
+    parser.add_argument("--latency-ms", type=float, default=80, help="Per-request latency")
+    parser.add_argument(
+        "--bandwidth-mbps", type=float, default=100, help="Per-request bandwidth (0 = unlimited)"
+    )
+    parser.add_argument(
+        "--failure-rate", type=float, default=0.0, help="Probability an upload attempt fails"
+    )
+    parser.add_argument("--attempts", type=int, help="Override ADW_R2_UPLOAD_ATTEMPTS")
+    parser.add_argument("--retry-delay", type=float, help="Base retry backoff in seconds")
+    parser.add_argument("--seed", type=int, default=0, help="Image and failure injection seed")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    if args.attempts:
+        os.environ["ADW_R2_UPLOAD_ATTEMPTS"] = str(args.attempts)
+    if args.retry_delay is not None:
+        r2_uploader.UPLOAD_RETRY_BASE_DELAY = args.retry_delay
+    # Keep benchmark spans and logs out of the way
+    os.environ["ADW_TRACE_EXPORTER"] = "none"
+    logging.getLogger("benchmark_r2_uploader").setLevel(logging.CRITICAL)
+
+    sizes = [parse_size(size) for size in args.sizes.split(",")]
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        paths = make_files(workdir, args.count, sizes, args.duplicates, args.seed)
+        rows = [run_once(args, paths, level, workdir) for level in levels]
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    recompress = screenshot_prep.get_screenshot_format()
+    if not screenshot_prep._pillow_available():
+        recompress += ", no Pillow: uploaded as-is"
+    print(
+        f"📦 {args.count} PNGs ({args.sizes}, {args.duplicates:.0%} duplicates, {recompress}) "
+        f"via {args.backend}, latency {args.latency_ms:g}ms, "
+        f"bandwidth {args.bandwidth_mbps:g}Mbps, failure rate {args.failure_rate:g}\n"
+    )
+    print(
+        f"{'workers':>7} {'wall':>8} {'MB/s':>8} {'p50':>7} {'p95':>7} {'max':>7} "
+        f"{'objects':>7} {'stored MB':>9} {'failed':>6} {'injected':>8}"
+    )
+    for row in rows:
+        print(
+            f"{row['concurrency']:>7} {row['wall_seconds']:>7.2f}s {row['throughput_mb_s']:>8.2f} "
+            f"{row['p50_seconds']:>6.2f}s {row['p95_seconds']:>6.2f}s {row['max_seconds']:>6.2f}s "
+            f"{row['objects']:>7} {row['stored_bytes'] / 1024 / 1024:>9.2f} "
+            f"{row['failed_files']:>6} {row['injected_failures']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = [
+#     "pydantic",
+# ]
+# ///
+
+"""
+Cost Report for ADW Agent Calls
+
+Usage:
+uv run adws/adw_tests/cost_report.py [--adw-id <id>] [--group-by slash_command,model] [--json]
+
+Aggregates agents/cost_ledger.jsonl into total cost, token counts and
+latency percentiles (p50/p90/p99) per group, most expensive first.
+Group by any of: adw_id, phase, agent_name, slash_command, model.
+"""
+
+import os
+import sys
+import json
+import argparse
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adw_modules.accounting import GROUP_FIELDS, load_ledger, summarize_ledger
+
+
+def format_ms(value):
+    """Format a latency in milliseconds as seconds."""
+    return "-" if value is None else f"{value / 1000:.1f}s"
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="ADW agent cost and latency report")
+    parser.add_argument("--adw-id", help="Only include calls from this ADW run")
+    parser.add_argument(
+        "--group-by",
+        default="slash_command,model",
+        help=f"Comma-separated fields to group by ({', '.join(GROUP_FIELDS)})",
+    )
+    parser.add_argument("--ledger", help="Path to a cost ledger (default: agents/cost_ledger.jsonl)")
+    parser.add_argument("--json", action="store_true", help="Print rows as JSON")
+    args = parser.parse_args()
+
+    group_by = [field.strip() for field in args.group_by.split(",") if field.strip()]
+    records = load_ledger(adw_id=args.adw_id, path=args.ledger)
+    try:
+        rows = summarize_ledger(records, group_by)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(2)
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    if not rows:
+        print("No agent calls recorded")
+        return
+
+    total_cost = sum(row["total_cost_usd"] for row in rows)
+    print(f"💰 {len(records)} calls, ${total_cost:.2f} total\n")
+
+    header = " | ".join(group_by) + " | calls | fail | cost | share | p50 | p90 | p99"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        share = row["total_cost_usd"] / total_cost * 100 if total_cost else 0
+        print(
+            " | ".join(str(row[field]) for field in group_by)
+            + f" | {row['calls']} | {row['failures']}"
+            + f" | ${row['total_cost_usd']:.2f} | {share:.0f}%"
+            + f" | {format_ms(row['p50_ms'])} | {format_ms(row['p90_ms'])}"
+            + f" | {format_ms(row['p99_ms'])}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+Fake Claude Code CLI for Offline ADW Load Testing
+
+Usage:
+CLAUDE_CODE_PATH=adws/adw_tests/fake_claude.py uv run adws/adw_sdlc_iso.py <issue-number>
+
+Drop-in stand-in for the `claude` binary as invoked by adw_modules/agent.py
+(-p [prompt] --model <model> --output-format stream-json --verbose [--resume <id>],
+with the prompt on stdin when it isn't an argument).
+It streams realistic stream-json JSONL: a system init message, assistant
+messages with tool uses and tool results, and a final result message with
+session_id, total_cost_usd, duration and token usage. Each slash command
+returns output the ADW phases can parse (plan file paths, test result JSON,
+review JSON, ...) and scripted edits are written into the working directory.
+
+Behaviour is configured per slash command with a JSON file named by
+ADW_FAKE_CLAUDE_CONFIG:
+
+{
+  "seed": 1,
+  "time_scale": 0.5,
+  "default": {"latency_ms": 1000, "jitter_ms": 200, "cost_usd": 0.05},
+  "commands": {
+    "/implement": {"latency_ms": 5000, "failure_rate": 0.1, "failure": "rate_limit",
+                   "edits": [{"path": "app/{adw_id}.txt", "content": "change\\n"}]},
+    "/test": {"fail_first": 1, "failure": "error_during_execution"}
+  }
+}
+
+Failures (each maps to the RetryCode agent.py will assign):
+- rate_limit: 429 on stderr, exit 1 (rate_limit_error)
+- overloaded: 529 on stderr, exit 1 (overloaded_error)
+- crash: generic stderr, exit 1 (claude_code_error)
+- error_during_execution: error result message, exit 0 (error_during_execution)
+- api_error: non-retryable is_error result, exit 0 (none)
+- hang: stops writing output until killed (timeout_error)
+
+failure_rate fails attempts at random; fail_first fails the first N calls of
+a command in a working directory (counted under ADW_FAKE_CLAUDE_STATE_DIR).
+
+agent.py runs the CLI with an allowlisted environment that leaves these
+variables out, so harnesses point CLAUDE_CODE_PATH at a launcher from
+write_launcher(), which sets them on the fake's own environment.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import random
+import shlex
+import hashlib
+import tempfile
+from typing import Any, Dict, List, Optional
+
+VERSION = "1.0.0 (Fake Claude Code)"
+
+# Baseline latency per command in milliseconds, before time_scale
+DEFAULT_LATENCY_MS = {
+    "/classify_issue": 800,
+    "/classify_adw": 800,
+    "/generate_branch_name": 800,
+    "/chore": 3000,
+    "/bug": 3000,
+    "/feature": 4000,
+    "/implement": 6000,
+    "/test": 3000,
+    "/test_e2e": 4000,
+    "/resolve_failed_test": 3000,
+    "/resolve_failed_e2e_test": 3000,
+    "/review": 4000,
+    "/patch": 2000,
+    "/document": 2500,
+    "/commit": 800,
+    "/pull_request": 1500,
+    "/install_worktree": 1500,
+    "/track_agentic_kpis": 800,
+}
+
+DEFAULT_PROFILE: Dict[str, Any] = {
+    "latency_ms": 1000,
+    "jitter_ms": 0,
+    "failure_rate": 0.0,
+    "failure": "crash",
+    "fail_first": 0,
+    "cost_usd": 0.05,
+    "turns": 3,
+    "edits": None,
+    "output": None,
+}
+
+STATE_DIR = os.getenv(
+    "ADW_FAKE_CLAUDE_STATE_DIR", os.path.join(tempfile.gettempdir(), "adw_fake_claude")
+)
+
+
+def write_launcher(
+    directory: str,
+    config_path: Optional[str] = None,
+    time_scale: Optional[float] = None,
+    state_dir: Optional[str] = None,
+) -> str:
+    """Write an executable `claude` in directory that runs this fake with the
+    given ADW_FAKE_CLAUDE_* settings, and return its path."""
+    settings = {
+        "ADW_FAKE_CLAUDE_CONFIG": config_path and os.path.abspath(config_path),
+        "ADW_FAKE_CLAUDE_TIME_SCALE": None if time_scale is None else str(time_scale),
+        "ADW_FAKE_CLAUDE_STATE_DIR": state_dir and os.path.abspath(state_dir),
+    }
+    lines = ["#!/bin/sh"]
+    lines += [
+        f"export {key}={shlex.quote(value)}" for key, value in settings.items() if value
+    ]
+    lines.append(
+        f'exec {shlex.quote(sys.executable)} {shlex.quote(os.path.abspath(__file__))} "$@"'
+    )
+
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, "claude")
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    os.chmod(path, 0o755)
+    return path
+
+
+def parse_args(argv: List[str]) -> Dict[str, Any]:
+    """Parse the subset of claude CLI flags that agent.py passes."""
+    args: Dict[str, Any] = {"prompt": "", "model": "sonnet", "resume": None, "version": False}
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in ("--version", "-v"):
+            args["version"] = True
+        elif arg in ("-p", "--print"):
+            # Without a prompt argument the prompt comes on stdin
+            if i + 1 < len(argv) and not argv[i + 1].startswith("-"):
+                args["prompt"] = argv[i + 1]
+                i += 1
+            else:
+                args["prompt"] = None
+        elif arg == "--model" and i + 1 < len(argv):
+            args["model"] = argv[i + 1]
+            i += 1
+        elif arg == "--resume" and i + 1 < len(argv):
+            args["resume"] = argv[i + 1]
+            i += 1
+        elif arg in ("--output-format", "--mcp-config") and i + 1 < len(argv):
+            i += 1
+        i += 1
+    return args
+
+
+def load_profile(command: str) -> Dict[str, Any]:
+    """Merge built-in defaults, the config default and the command's entry."""
+    config: Dict[str, Any] = {}
+    path = os.getenv("ADW_FAKE_CLAUDE_CONFIG")
+    if path and os.path.exists(path):
+        with open(path, "r") as f:
+            config = json.load(f)
+
+    profile = dict(DEFAULT_PROFILE)
+    profile["latency_ms"] = DEFAULT_LATENCY_MS.get(command, DEFAULT_PROFILE["latency_ms"])
+    profile.update(config.get("default", {}))
+    profile.update(config.get("commands", {}).get(command, {}))
+    profile["time_scale"] = float(
+        os.getenv("ADW_FAKE_CLAUDE_TIME_SCALE", config.get("time_scale", 1.0))
+    )
+    profile["seed"] = config.get("seed")
+    return profile
+
+
+def split_prompt(prompt: str):
+    """Split '/command arg1 arg2' into the command and the argument text."""
+    match = re.match(r"(/[\w-]+)\s*(.*)", prompt.strip(), re.DOTALL)
+    if not match:
+        return "", prompt
+    return match.group(1), match.group(2)
+
+
+def find_adw_id(arg_text: str, cwd: str) -> str:
+    """ADW id from the worktree directory or the prompt arguments."""
+    if os.path.basename(os.path.dirname(cwd)) == "trees":
+        return os.path.basename(cwd)
+    match = re.search(r"adw[-_]([a-z0-9]{8})", arg_text) or re.search(
+        r"\b([a-z0-9]{8})\b", arg_text
+    )
+    return match.group(1) if match else "fake0000"
+
+
+def find_issue_number(arg_text: str) -> str:
+    match = re.search(r'"number":\s*(\d+)', arg_text) or re.match(r"\s*(\d+)", arg_text)
+    return match.group(1) if match else "1"
+
+
+def fill_placeholders(text: str, adw_id: str, issue: str) -> str:
+    """Substitute {adw_id} and {issue} in scripted edit paths and content."""
+    return text.replace("{adw_id}", adw_id).replace("{issue}", issue)
+
+
+def write_file(cwd: str, relative_path: str, content: str) -> str:
+    path = os.path.join(cwd, relative_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+    return path
+
+
+def default_edits(command: str, adw_id: str, issue: str) -> List[Dict[str, str]]:
+    """Files each command writes when the config doesn't script any."""
+    if command in ("/chore", "/bug", "/feature"):
+        return [{
+            "path": f"specs/issue-{issue}-adw-{adw_id}-fake-plan.md",
+            "content": f"# Fake plan for issue {issue}\n\n## Step by Step Tasks\n- Make the change\n",
+        }]
+    if command == "/patch":
+        return [{
+            "path": f"specs/patch/patch-adw-{adw_id}-fake.md",
+            "content": "# Fake patch plan\n\n- Fix the review issue\n",
+        }]
+    if command == "/document":
+        return [{
+            "path": f"app_docs/feature-{adw_id}-fake.md",
+            "content": f"# Fake documentation for {adw_id}\n",
+        }]
+    if command in ("/implement", "/resolve_failed_test", "/resolve_failed_e2e_test"):
+        return [{
+            "path": f"fake_changes/{adw_id}.md",
+            "content": f"Change from {command} at {time.time():.0f}\n",
+        }]
+    return []
+
+
+def command_output(command: str, arg_text: str, adw_id: str, issue: str, written: List[str]) -> str:
+    """Result text the ADW phase expects from this command."""
+    if command == "/classify_issue":
+        return "/feature"
+    if command == "/classify_adw":
+        return json.dumps({"adw_slash_command": "/adw_sdlc_iso", "adw_id": adw_id, "model_set": "base"})
+    if command == "/generate_branch_name":
+        kind = arg_text.split()[0].strip("/") if arg_text.split() else "feature"
+        return f"{kind}-issue-{issue}-adw-{adw_id}-fake-change"
+    if command in ("/chore", "/bug", "/feature", "/patch", "/document"):
+        return written[0] if written else ""
+    if command == "/commit":
+        return f"feat: fake change for adw {adw_id}"
+    if command == "/pull_request":
+        return f"https://github.com/fake/repo/pull/{issue}"
+    if command == "/test":
+        return json.dumps([
+            {"test_name": name, "passed": True, "execution_command": f"uv run pytest -k {name}",
+             "test_purpose": f"Fake {name} check"}
+            for name in ("python_syntax_check", "backend_tests", "frontend_build")
+        ])
+    if command == "/test_e2e":
+        return json.dumps([
+            {"test_name": "fake_e2e", "status": "passed",
+             "test_path": ".claude/commands/e2e/test_fake.md", "screenshots": []}
+        ])
+    if command == "/review":
+        return json.dumps({
+            "success": True,
+            "review_summary": "The fake implementation matches the spec.",
+            "review_issues": [],
+            "screenshots": [],
+        })
+    return f"Completed {command or 'prompt'}"
+
+
+def should_fail(profile: Dict[str, Any], command: str, cwd: str, rng: random.Random) -> bool:
+    """Apply fail_first (per command and cwd) and failure_rate."""
+    if profile["fail_first"]:
+        os.makedirs(STATE_DIR, exist_ok=True)
+        key = hashlib.sha1(f"{cwd}:{command}".encode()).hexdigest()[:16]
+        counter = os.path.join(STATE_DIR, key)
+        calls = 0
+        if os.path.exists(counter):
+            with open(counter, "r") as f:
+                calls = int(f.read() or 0)
+        with open(counter, "w") as f:
+            f.write(str(calls + 1))
+        if calls < profile["fail_first"]:
+            return True
+    return rng.random() < profile["failure_rate"]
+
+
+class Emitter:
+    """Writes stream-json lines to stdout, spreading latency across them."""
+
+    def __init__(self, session_id: str, model: str, total_seconds: float, steps: int):
+        self.session_id = session_id
+        self.model = model
+        self.step_delay = total_seconds / max(steps, 1)
+
+    def emit(self, message: Dict[str, Any], delay: bool = True) -> None:
+        if delay and self.step_delay:
+            time.sleep(self.step_delay)
+        message.setdefault("session_id", self.session_id)
+        sys.stdout.write(json.dumps(message) + "\n")
+        sys.stdout.flush()
+
+    def assistant(self, content: List[Dict[str, Any]]) -> None:
+        self.emit({
+            "type": "assistant",
+            "message": {
+                "id": f"msg_{uuid.uuid4().hex[:24]}",
+                "type": "message",
+                "role": "assistant",
+                "model": self.model,
+                "content": content,
+                "stop_reason": None,
+                "usage": {"input_tokens": 1200, "output_tokens": 150},
+            },
+        })
+
+    def tool_result(self, tool_use_id: str, text: str) -> None:
+        self.emit({
+            "type": "user",
+            "message": {
+                "role": "user",
+                "content": [{"type": "tool_result", "tool_use_id": tool_use_id, "content": text}],
+            },
+        }, delay=False)
+
+
+def result_message(
+    session_id: str, text: str, started: float, turns: int, cost: float,
+    is_error: bool = False, subtype: str = "success",
+) -> Dict[str, Any]:
+    duration_ms = int((time.monotonic() - started) * 1000)
+    message = {
+        "type": "result",
+        "subtype": subtype,
+        "is_error": is_error,
+        "duration_ms": duration_ms,
+        "duration_api_ms": int(duration_ms * 0.9),
+        "num_turns": turns,
+        "session_id": session_id,
+        "total_cost_usd": cost,
+        "usage": {
+            "input_tokens": 1200 * turns,
+            "output_tokens": 150 * turns,
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 800 * turns,
+        },
+    }
+    if subtype == "success":
+        message["result"] = text
+    elif is_error and text:
+        message["result"] = text
+    return message
+
+
+def run(argv: List[str]) -> int:
+    args = parse_args(argv)
+    if args["version"]:
+        print(VERSION)
+        return 0
+    if args["prompt"] is None:
+        args["prompt"] = sys.stdin.read()
+
+    started = time.monotonic()
+    cwd = os.getcwd()
+    command, arg_text = split_prompt(args["prompt"])
+    profile = load_profile(command)
+    seed = profile["seed"]
+    rng = random.Random(None if seed is None else f"{seed}:{cwd}:{args['prompt']}")
+
+    latency = (profile["latency_ms"] + rng.uniform(0, profile["jitter_ms"])) / 1000
+    latency *= profile["time_scale"]
+    turns = max(int(profile["turns"]), 1)
+    session_id = args["resume"] or str(uuid.uuid4())
+    emitter = Emitter(session_id, args["model"], latency, turns + 1)
+
+    emitter.emit({
+        "type": "system",
+        "subtype": "init",
+        "cwd": cwd,
+        "session_id": session_id,
+        "model": args["model"],
+        "tools": ["Bash", "Read", "Edit", "Write", "Glob", "Grep"],
+    }, delay=False)
+
+    failure: Optional[str] = None
+    if should_fail(profile, command, cwd, rng):
+        failure = profile["failure"]
+
+    adw_id = find_adw_id(arg_text, cwd)
+    issue = find_issue_number(arg_text)
+
+    # Exploration turn
+    tool_id = f"toolu_{uuid.uuid4().hex[:24]}"
+    emitter.assistant([
+        {"type": "text", "text": f"I'll start by looking at the repository for {command}."},
+        {"type": "tool_use", "id": tool_id, "name": "Bash", "input": {"command": "git status --short"}},
+    ])
+    emitter.tool_result(tool_id, "")
+
+    if failure == "hang":
+        # No more output; the supervisor's idle watchdog or timeout kills us
+        while True:
+            time.sleep(60)
+    if failure == "rate_limit":
+        sys.stderr.write('API Error: 429 {"type":"error","error":{"type":"rate_limit_error","message":"Rate limited"}} retry-after: 1\n')
+        return 1
+    if failure == "overloaded":
+        sys.stderr.write('API Error: 529 {"type":"error","error":{"type":"overloaded_error","message":"Overloaded"}}\n')
+        return 1
+    if failure == "crash":
+        sys.stderr.write("Fatal: fake Claude Code crashed\n")
+        return 1
+
+    # Edit turns
+    edits = profile["edits"]
+    if edits is None:
+        edits = default_edits(command, adw_id, issue)
+    written = []
+    for edit in edits:
+        relative = fill_placeholders(edit["path"], adw_id, issue)
+        content = fill_placeholders(edit.get("content", ""), adw_id, issue)
+        path = write_file(cwd, relative, content)
+        written.append(relative)
+        tool_id = f"toolu_{uuid.uuid4().hex[:24]}"
+        emitter.assistant([
+            {"type": "tool_use", "id": tool_id, "name": "Write",
+             "input": {"file_path": path, "content": content}},
+        ])
+        emitter.tool_result(tool_id, f"File created successfully at: {path}")
+
+    for _ in range(max(turns - 1 - len(edits), 0)):
+        tool_id = f"toolu_{uuid.uuid4().hex[:24]}"
+        emitter.assistant([
+            {"type": "tool_use", "id": tool_id, "name": "Read", "input": {"file_path": os.path.join(cwd, "README.md")}},
+        ])
+        emitter.tool_result(tool_id, "# README")
+
+    output = profile["output"] or command_output(command, arg_text, adw_id, issue, written)
+    emitter.assistant([{"type": "text", "text": output}])
+
+    if failure == "error_during_execution":
+        emitter.emit(result_message(
+            session_id, "", started, turns, profile["cost_usd"],
+            is_error=True, subtype="error_during_execution",
+        ), delay=False)
+        return 0
+    if failure == "api_error":
+        emitter.emit(result_message(
+            session_id, "API Error: 400 invalid_request_error: fake bad request",
+            started, turns, profile["cost_usd"], is_error=True, subtype="success",
+        ), delay=False)
+        return 0
+
+    emitter.emit(result_message(session_id, output, started, turns, profile["cost_usd"]), delay=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run(sys.argv[1:]))
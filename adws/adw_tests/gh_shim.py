@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+gh CLI Shim for the GitHub Simulator
+
+Usage:
+ADW_GH_SIMULATOR_URL=http://127.0.0.1:8765 python adws/adw_tests/gh_shim.py issue list --repo o/r --json number
+
+Implements the gh commands ADW runs (issue view/list/comment/edit, pr
+list/view/create/review/merge, auth status, --version) on top of the REST API
+served by github_simulator.py, printing the same --json shapes gh does. Use
+GitHubSimulator.write_gh_shim() to get a `gh` executable for PATH.
+"""
+
+import os
+import sys
+import json
+import argparse
+import urllib.error
+import urllib.request
+from typing import Any, Dict, List, Optional, Tuple
+
+BASE_URL = os.getenv("ADW_GH_SIMULATOR_URL", "http://127.0.0.1:8765")
+VIEWER = "adw-bot"
+
+
+class GhError(Exception):
+    pass
+
+
+def api(method: str, path: str, body: Optional[Dict[str, Any]] = None) -> Tuple[Any, Dict[str, str]]:
+    """Call the simulator; returns (payload, headers) or raises GhError like gh does."""
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(
+        path if path.startswith("http") else BASE_URL + path,
+        data=data,
+        method=method,
+        headers={"Content-Type": "application/json", "Accept": "application/vnd.github+json"},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return json.loads(response.read() or b"null"), dict(response.headers)
+    except urllib.error.HTTPError as e:
+        try:
+            message = json.loads(e.read()).get("message", e.reason)
+        except (json.JSONDecodeError, AttributeError):
+            message = e.reason
+        raise GhError(f"HTTP {e.code}: {message} ({path})")
+    except urllib.error.URLError as e:
+        raise GhError(f"error connecting to {BASE_URL}: {e.reason}")
+
+
+def paginate(path: str, limit: int) -> List[Any]:
+    """Follow Link rel="next" until limit items are collected."""
+    items: List[Any] = []
+    separator = "&" if "?" in path else "?"
+    url: Optional[str] = f"{path}{separator}per_page={min(limit, 100)}"
+    while url and len(items) < limit:
+        page, headers = api("GET", url)
+        items.extend(page)
+        url = None
+        for part in headers.get("Link", "").split(","):
+            if 'rel="next"' in part:
+                url = part.split(";")[0].strip()[1:-1]
+    return items[:limit]
+
+
+# --- REST to gh --json field conversion ----------------------------------
+
+def gh_user(rest_user: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": f"U_{rest_user['id']}",
+        "login": rest_user["login"],
+        "name": "",
+        "is_bot": rest_user.get("type") == "Bot",
+    }
+
+
+def gh_label(label: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": label["node_id"], "name": label["name"],
+        "color": label["color"], "description": label.get("description") or "",
+    }
+
+
+def gh_comment(comment: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": comment["node_id"],
+        "author": gh_user(comment["user"]),
+        "body": comment["body"],
+        "createdAt": comment["created_at"],
+        "updatedAt": comment["updated_at"],
+        "url": comment["html_url"],
+    }
+
+
+def gh_issue(issue: Dict[str, Any], fields: List[str], repo: str) -> Dict[str, Any]:
+    converters = {
+        "number": lambda: issue["number"],
+        "title": lambda: issue["title"],
+        "body": lambda: issue["body"] or "",
+        "state": lambda: issue["state"].upper(),
+        "author": lambda: gh_user(issue["user"]),
+        "assignees": lambda: [gh_user(u) for u in issue["assignees"]],
+        "labels": lambda: [gh_label(label) for label in issue["labels"]],
+        "milestone": lambda: issue["milestone"],
+        "comments": lambda: [
+            gh_comment(c) for c in paginate(f"/repos/{repo}/issues/{issue['number']}/comments", 10**6)
+        ],
+        "createdAt": lambda: issue["created_at"],
+        "updatedAt": lambda: issue["updated_at"],
+        "closedAt": lambda: issue["closed_at"],
+        "url": lambda: issue["html_url"],
+    }
+    unknown = [field for field in fields if field not in converters]
+    if unknown:
+        raise GhError(f"Unknown JSON field: {unknown[0]!r}")
+    return {field: converters[field]() for field in fields}
+
+
+def gh_pull(pull: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    converters = {
+        "number": lambda: pull["number"],
+        "url": lambda: pull["html_url"],
+        "title": lambda: pull["title"],
+        "state": lambda: "MERGED" if pull["merged"] else pull["state"].upper(),
+        "headRefName": lambda: pull["head"]["ref"],
+        "mergeable": lambda: "MERGEABLE" if pull["mergeable"] else "CONFLICTING",
+        "mergeStateStatus": lambda: pull["mergeable_state"].upper(),
+    }
+    unknown = [field for field in fields if field not in converters]
+    if unknown:
+        raise GhError(f"Unknown JSON field: {unknown[0]!r}")
+    return {field: converters[field]() for field in fields}
+
+
+# --- Commands ---------------------------------------------------------------
+
+def repo_parser(prog: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog=prog, add_help=False)
+    parser.add_argument("-R", "--repo", required=True)
+    parser.add_argument("--json")
+    return parser
+
+
+def issue_command(args: List[str]) -> Any:
+    action, rest = args[0], args[1:]
+    parser = repo_parser(f"gh issue {action}")
+    if action == "list":
+        parser.add_argument("--state", default="open")
+        parser.add_argument("-L", "--limit", type=int, default=30)
+        opts = parser.parse_args(rest)
+        fields = opts.json.split(",") if opts.json else ["number", "title"]
+        issues = paginate(f"/repos/{opts.repo}/issues?state={opts.state}", opts.limit)
+        return [gh_issue(issue, fields, opts.repo) for issue in issues]
+
+    parser.add_argument("number")
+    if action == "view":
+        opts = parser.parse_args(rest)
+        issue, _ = api("GET", f"/repos/{opts.repo}/issues/{opts.number}")
+        fields = opts.json.split(",") if opts.json else ["number", "title", "body"]
+        return gh_issue(issue, fields, opts.repo)
+    if action == "comment":
+        parser.add_argument("-b", "--body", required=True)
+        opts = parser.parse_args(rest)
+        comment, _ = api("POST", f"/repos/{opts.repo}/issues/{opts.number}/comments", {"body": opts.body})
+        return comment["html_url"]
+    if action == "edit":
+        parser.add_argument("--add-label", action="append", default=[])
+        parser.add_argument("--add-assignee", action="append", default=[])
+        opts = parser.parse_args(rest)
+        if opts.add_label:
+            api("POST", f"/repos/{opts.repo}/issues/{opts.number}/labels", {"labels": opts.add_label})
+        if opts.add_assignee:
+            assignees = [VIEWER if login == "@me" else login for login in opts.add_assignee]
+            api("POST", f"/repos/{opts.repo}/issues/{opts.number}/assignees", {"assignees": assignees})
+        issue, _ = api("GET", f"/repos/{opts.repo}/issues/{opts.number}")
+        return issue["html_url"]
+    raise GhError(f"unsupported command: gh issue {action}")
+
+
+def pr_command(args: List[str]) -> Any:
+    action, rest = args[0], args[1:]
+    parser = repo_parser(f"gh pr {action}")
+    if action == "list":
+        parser.add_argument("-H", "--head")
+        parser.add_argument("-L", "--limit", type=int, default=30)
+        opts = parser.parse_args(rest)
+        owner = opts.repo.split("/")[0]
+        path = f"/repos/{opts.repo}/pulls?state=open"
+        if opts.head:
+            path += f"&head={owner}:{opts.head}"
+        fields = opts.json.split(",") if opts.json else ["number", "title"]
+        return [gh_pull(pull, fields) for pull in paginate(path, opts.limit)]
+    if action == "create":
+        parser.add_argument("-t", "--title", required=True)
+        parser.add_argument("-b", "--body", default="")
+        parser.add_argument("-H", "--head", required=True)
+        parser.add_argument("-B", "--base", default="main")
+        opts = parser.parse_args(rest)
+        pull, _ = api("POST", f"/repos/{opts.repo}/pulls", {
+            "title": opts.title, "body": opts.body, "head": opts.head, "base": opts.base,
+        })
+        return pull["html_url"]
+
+    parser.add_argument("number")
+    if action == "view":
+        opts = parser.parse_args(rest)
+        pull, _ = api("GET", f"/repos/{opts.repo}/pulls/{opts.number}")
+        return gh_pull(pull, opts.json.split(",") if opts.json else ["number", "title", "url"])
+    if action == "review":
+        parser.add_argument("--approve", action="store_true")
+        parser.add_argument("-b", "--body", default="")
+        opts = parser.parse_args(rest)
+        event = "APPROVE" if opts.approve else "COMMENT"
+        api("POST", f"/repos/{opts.repo}/pulls/{opts.number}/reviews", {"event": event, "body": opts.body})
+        return None
+    if action == "merge":
+        parser.add_argument("--merge", dest="method", action="store_const", const="merge")
+        parser.add_argument("--squash", dest="method", action="store_const", const="squash")
+        parser.add_argument("--rebase", dest="method", action="store_const", const="rebase")
+        parser.add_argument("-b", "--body", default="")
+        opts = parser.parse_args(rest)
+        api("PUT", f"/repos/{opts.repo}/pulls/{opts.number}/merge", {
+            "merge_method": opts.method or "merge", "commit_message": opts.body,
+        })
+        return None
+    raise GhError(f"unsupported command: gh pr {action}")
+
+
+def run(argv: List[str]) -> int:
+    if not argv or argv[0] in ("--version", "version"):
+        print("gh version 2.0.0-sim (ADW GitHub simulator shim)")
+        return 0
+    try:
+        if argv[0] == "auth" and argv[1:2] == ["status"]:
+            api("GET", "/user")
+            print(f"Logged in to github.com account {VIEWER} (simulator {BASE_URL})")
+            return 0
+        if argv[0] == "issue" and len(argv) > 1:
+            result = issue_command(argv[1:])
+        elif argv[0] == "pr" and len(argv) > 1:
+            result = pr_command(argv[1:])
+        else:
+            raise GhError(f"unsupported command: gh {' '.join(argv[:2])}")
+    except GhError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    except SystemExit as e:
+        # argparse usage errors
+        return int(e.code or 1)
+
+    if isinstance(result, (dict, list)):
+        print(json.dumps(result))
+    elif result:
+        print(result)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run(sys.argv[1:]))
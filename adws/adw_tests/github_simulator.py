@@ -0,0 +1,626 @@
+#!/usr/bin/env python3
+"""
+Local GitHub API Simulator for ADW
+
+Usage:
+python adws/adw_tests/github_simulator.py [--port 8765] [--issues 1000]
+    [--latency-ms 30] [--rate-limit 5000] [--webhook-url http://localhost:8001/gh-webhook]
+
+An in-memory stand-in for the parts of the GitHub REST API that github.py,
+git_ops.py and the triggers use: issues, comments, labels, assignees, pull
+requests, reviews and merges. Every response carries X-RateLimit-* headers
+and requests beyond the limit get GitHub's 403 "API rate limit exceeded".
+Latency can be injected per request. Issue and comment creation emit
+`issues`/`issue_comment` webhooks (signed with X-Hub-Signature-256 when a
+secret is set) to a webhook URL, the way GitHub delivers them.
+
+ADW talks to GitHub through the gh CLI, whose GraphQL calls need a TLS
+GitHub host. write_gh_shim() instead writes a `gh` executable backed by
+adw_tests/gh_shim.py, which translates the gh commands ADW runs into REST
+calls against the simulator; put its directory first on PATH.
+"""
+
+import os
+import re
+import sys
+import hmac
+import json
+import time
+import uuid
+import random
+import hashlib
+import argparse
+import threading
+import urllib.request
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+GH_SHIM = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gh_shim.py")
+BOT_LOGIN = "adw-bot"
+EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def timestamp(offset_seconds: float) -> str:
+    return (EPOCH + timedelta(seconds=offset_seconds)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def user(login: str) -> Dict[str, Any]:
+    return {
+        "login": login,
+        "id": int(hashlib.sha1(login.encode()).hexdigest()[:6], 16),
+        "type": "Bot" if login.endswith("-bot") else "User",
+    }
+
+
+class SimulatorError(Exception):
+    """Returned to the client as a GitHub-style error response."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class GitHubSimulator:
+    """In-memory GitHub REST API for one repository, served over HTTP.
+
+    Args:
+        repo: owner/name of the simulated repository
+        latency_ms: Delay added to every request
+        jitter_ms: Random extra delay, up to this much
+        rate_limit: Requests allowed per rate_window seconds
+        rate_window: Rate-limit window in seconds
+        webhook_url: Where issue and comment webhooks are delivered (None = off)
+        webhook_secret: Signs deliveries with X-Hub-Signature-256
+        seed: Seed for the latency jitter
+    """
+
+    def __init__(
+        self,
+        repo: str = "sim-org/sim-repo",
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        rate_limit: int = 5000,
+        rate_window: float = 3600.0,
+        webhook_url: Optional[str] = None,
+        webhook_secret: Optional[str] = None,
+        seed: Optional[int] = None,
+    ):
+        self.repo = repo
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.webhook_url = webhook_url
+        self.webhook_secret = webhook_secret
+        self.issues: Dict[int, Dict[str, Any]] = {}
+        self.comments: Dict[int, List[Dict[str, Any]]] = {}
+        self.pulls: Dict[int, Dict[str, Any]] = {}
+        self.labels: Dict[str, Dict[str, Any]] = {}
+        self.requests: Dict[str, int] = {}  # Per endpoint handler name
+        self.deliveries: List[Dict[str, Any]] = []
+        self._next_number = 1
+        self._next_id = 1000
+        self._rate_used = 0
+        self._rate_reset = time.time() + rate_window
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._delivery_threads: List[threading.Thread] = []
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._routes = self._build_routes()
+
+    # --- Lifecycle -------------------------------------------------------
+
+    def start(self, port: int = 0) -> str:
+        """Serve on 127.0.0.1 in a background thread; returns the base URL."""
+        simulator = self
+
+        class Handler(SimulatorHandler):
+            pass
+
+        Handler.simulator = simulator
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "GitHubSimulator":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def write_gh_shim(self, directory: str) -> str:
+        """Write a `gh` executable for this simulator into directory; returns it."""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, "gh")
+        with open(path, "w") as f:
+            f.write(
+                "#!/bin/sh\n"
+                f"ADW_GH_SIMULATOR_URL='{self.url}' exec '{sys.executable}' '{GH_SHIM}' \"$@\"\n"
+            )
+        os.chmod(path, 0o755)
+        return directory
+
+    # --- Seeding (no webhooks) -------------------------------------------
+
+    def _new_id(self) -> int:
+        self._next_id += 1
+        return self._next_id
+
+    def _new_number(self) -> int:
+        number = self._next_number
+        self._next_number += 1
+        return number
+
+    def add_issue(
+        self, title: str, body: str = "", labels: Tuple[str, ...] = (),
+        author: str = "octocat", comments: Tuple[str, ...] = (),
+    ) -> int:
+        """Create an open issue directly, without emitting webhooks."""
+        with self._lock:
+            number = self._new_number()
+            issue_id = self._new_id()
+            self.issues[number] = {
+                "id": issue_id,
+                "node_id": f"I_sim{issue_id}",
+                "number": number,
+                "title": title,
+                "body": body,
+                "state": "open",
+                "user": user(author),
+                "labels": [self._label(name) for name in labels],
+                "assignees": [],
+                "milestone": None,
+                "comments": 0,
+                "created_at": timestamp(number),
+                "updated_at": timestamp(number),
+                "closed_at": None,
+                "html_url": f"https://github.com/{self.repo}/issues/{number}",
+            }
+            self.comments[number] = []
+        for body_text in comments:
+            self._add_comment(number, body_text, author, emit=False)
+        return number
+
+    def seed_issues(
+        self, count: int, comments_per_issue: int = 1, triggering: int = 0
+    ) -> None:
+        """Add count issues; the last `triggering` of them end with an 'adw' comment."""
+        for i in range(count):
+            comments = tuple(f"Comment {c + 1}" for c in range(comments_per_issue))
+            if i >= count - triggering:
+                comments = comments + ("adw",)
+            self.add_issue(f"Issue {i + 1}", f"Body of issue {i + 1}", comments=comments)
+
+    def _label(self, name: str) -> Dict[str, Any]:
+        if name not in self.labels:
+            label_id = self._new_id()
+            self.labels[name] = {
+                "id": label_id, "node_id": f"LA_sim{label_id}", "name": name,
+                "color": "ededed", "description": None,
+            }
+        return self.labels[name]
+
+    # --- Mutations that emit webhooks ------------------------------------
+
+    def open_issue(self, title: str, body: str = "", author: str = "octocat") -> int:
+        """Create an issue and deliver an `issues` opened webhook."""
+        number = self.add_issue(title, body, author=author)
+        self.emit_webhook("issues", {"action": "opened", "issue": self.issues[number]})
+        return number
+
+    def add_comment(self, number: int, body: str, author: str = "octocat") -> Dict[str, Any]:
+        """Comment on an issue and deliver an `issue_comment` created webhook."""
+        return self._add_comment(number, body, author, emit=True)
+
+    def _add_comment(self, number: int, body: str, author: str, emit: bool) -> Dict[str, Any]:
+        with self._lock:
+            issue = self.issues.get(number)
+            if issue is None:
+                raise SimulatorError(404, "Not Found")
+            comment_id = self._new_id()
+            comment = {
+                "id": comment_id,
+                "node_id": f"IC_sim{comment_id}",
+                "user": user(author),
+                "body": body,
+                "created_at": timestamp(number + comment_id),
+                "updated_at": timestamp(number + comment_id),
+                "html_url": f"{issue['html_url']}#issuecomment-{comment_id}",
+            }
+            self.comments[number].append(comment)
+            issue["comments"] += 1
+            issue["updated_at"] = comment["created_at"]
+        if emit:
+            self.emit_webhook(
+                "issue_comment", {"action": "created", "issue": issue, "comment": comment}
+            )
+        return comment
+
+    # --- Webhooks ---------------------------------------------------------
+
+    def emit_webhook(self, event: str, payload: Dict[str, Any]) -> None:
+        """Deliver a webhook asynchronously, recording its latency in deliveries."""
+        if not self.webhook_url:
+            return
+        payload = {
+            **payload,
+            "repository": {"full_name": self.repo, "name": self.repo.split("/")[1]},
+            "sender": payload.get("comment", payload.get("issue", {})).get("user", user("octocat")),
+        }
+        thread = threading.Thread(target=self._deliver, args=(event, payload), daemon=True)
+        with self._lock:
+            self._delivery_threads.append(thread)
+        thread.start()
+
+    def _deliver(self, event: str, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload).encode()
+        headers = {
+            "Content-Type": "application/json",
+            "User-Agent": "GitHub-Hookshot/sim",
+            "X-GitHub-Event": event,
+            "X-GitHub-Delivery": str(uuid.uuid4()),
+        }
+        if self.webhook_secret:
+            digest = hmac.new(self.webhook_secret.encode(), body, hashlib.sha256).hexdigest()
+            headers["X-Hub-Signature-256"] = f"sha256={digest}"
+
+        delivery = {
+            "event": event,
+            "action": payload.get("action"),
+            "issue": payload.get("issue", {}).get("number"),
+            "body": payload.get("comment", payload.get("issue", {})).get("body", ""),
+            "sent_at": time.monotonic(),
+        }
+        request = urllib.request.Request(self.webhook_url, data=body, headers=headers, method="POST")
+        try:
+            # GitHub gives up on a delivery after 10 seconds
+            with urllib.request.urlopen(request, timeout=10) as response:
+                delivery["status"] = response.status
+                delivery["response"] = response.read().decode(errors="replace")
+        except Exception as e:
+            delivery["status"] = getattr(e, "code", None)
+            delivery["error"] = str(e)
+        delivery["seconds"] = time.monotonic() - delivery["sent_at"]
+        with self._lock:
+            self.deliveries.append(delivery)
+
+    def wait_for_deliveries(self, timeout: float = 60.0) -> None:
+        """Wait until every webhook emitted so far has been delivered."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                pending = [t for t in self._delivery_threads if t.is_alive()]
+                self._delivery_threads = pending
+            if not pending or time.monotonic() >= deadline:
+                return
+            pending[0].join(max(deadline - time.monotonic(), 0))
+
+    # --- HTTP handling ----------------------------------------------------
+
+    def _build_routes(self) -> List[Tuple[str, "re.Pattern", Callable]]:
+        repo = r"/repos/(?P<owner>[^/]+)/(?P<name>[^/]+)"
+        routes = [
+            ("GET", r"/rate_limit", self.get_rate_limit),
+            ("GET", r"/user", self.get_user),
+            ("GET", repo + r"/issues", self.list_issues),
+            ("POST", repo + r"/issues", self.create_issue),
+            ("GET", repo + r"/issues/(?P<number>\d+)", self.get_issue),
+            ("PATCH", repo + r"/issues/(?P<number>\d+)", self.update_issue),
+            ("GET", repo + r"/issues/(?P<number>\d+)/comments", self.list_comments),
+            ("POST", repo + r"/issues/(?P<number>\d+)/comments", self.create_comment),
+            ("POST", repo + r"/issues/(?P<number>\d+)/labels", self.add_labels),
+            ("POST", repo + r"/issues/(?P<number>\d+)/assignees", self.add_assignees),
+            ("GET", repo + r"/pulls", self.list_pulls),
+            ("POST", repo + r"/pulls", self.create_pull),
+            ("GET", repo + r"/pulls/(?P<number>\d+)", self.get_pull),
+            ("POST", repo + r"/pulls/(?P<number>\d+)/reviews", self.create_review),
+            ("PUT", repo + r"/pulls/(?P<number>\d+)/merge", self.merge_pull),
+        ]
+        return [(method, re.compile(pattern + "$"), handler) for method, pattern, handler in routes]
+
+    def handle(
+        self, method: str, path: str, body: Optional[Dict[str, Any]]
+    ) -> Tuple[int, Any, Dict[str, str]]:
+        """Route one request; returns (status, payload, extra headers)."""
+        delay = self.latency_ms + (self._random.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+        if delay:
+            time.sleep(delay / 1000)
+
+        parsed = urlparse(path)
+        query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+        with self._lock:
+            now = time.time()
+            if now >= self._rate_reset:
+                self._rate_used, self._rate_reset = 0, now + self.rate_window
+            limited = self._rate_used >= self.rate_limit
+            if not limited:
+                self._rate_used += 1
+            headers = self._rate_headers()
+
+        if limited:
+            return 403, {
+                "message": "API rate limit exceeded for user ID 1.",
+                "documentation_url": "https://docs.github.com/rest/overview/resources-in-the-rest-api#rate-limiting",
+            }, headers
+
+        for route_method, pattern, handler in self._routes:
+            match = pattern.match(parsed.path)
+            if match and route_method == method:
+                with self._lock:
+                    self.requests[handler.__name__] = self.requests.get(handler.__name__, 0) + 1
+                params = match.groupdict()
+                if params.get("owner") and f"{params['owner']}/{params['name']}" != self.repo:
+                    return 404, {"message": "Not Found"}, headers
+                try:
+                    status, payload, extra = handler(params, query, body or {})
+                except SimulatorError as e:
+                    return e.status, {"message": e.message}, headers
+                return status, payload, {**headers, **extra}
+        return 404, {"message": "Not Found"}, headers
+
+    def _rate_headers(self) -> Dict[str, str]:
+        return {
+            "X-RateLimit-Limit": str(self.rate_limit),
+            "X-RateLimit-Remaining": str(max(self.rate_limit - self._rate_used, 0)),
+            "X-RateLimit-Used": str(self._rate_used),
+            "X-RateLimit-Reset": str(int(self._rate_reset)),
+            "X-RateLimit-Resource": "core",
+        }
+
+    @property
+    def total_requests(self) -> int:
+        return sum(self.requests.values())
+
+    def _paginate(self, items: List[Any], query: Dict[str, str], path: str):
+        per_page = min(int(query.get("per_page", 30)), 100)
+        page = max(int(query.get("page", 1)), 1)
+        last = max((len(items) + per_page - 1) // per_page, 1)
+        links = []
+        if page < last:
+            links.append(f'<{self.url}{path}?per_page={per_page}&page={page + 1}>; rel="next"')
+            links.append(f'<{self.url}{path}?per_page={per_page}&page={last}>; rel="last"')
+        headers = {"Link": ", ".join(links)} if links else {}
+        return items[(page - 1) * per_page: page * per_page], headers
+
+    def _issue(self, params: Dict[str, str]) -> Dict[str, Any]:
+        issue = self.issues.get(int(params["number"]))
+        if issue is None:
+            raise SimulatorError(404, "Not Found")
+        return issue
+
+    def _pull(self, params: Dict[str, str]) -> Dict[str, Any]:
+        pull = self.pulls.get(int(params["number"]))
+        if pull is None:
+            raise SimulatorError(404, "Not Found")
+        return pull
+
+    # --- Endpoints --------------------------------------------------------
+
+    def get_rate_limit(self, params, query, body):
+        with self._lock:
+            core = {
+                "limit": self.rate_limit,
+                "remaining": max(self.rate_limit - self._rate_used, 0),
+                "used": self._rate_used,
+                "reset": int(self._rate_reset),
+            }
+        return 200, {"resources": {"core": core}, "rate": core}, {}
+
+    def get_user(self, params, query, body):
+        return 200, user(BOT_LOGIN), {}
+
+    def list_issues(self, params, query, body):
+        state = query.get("state", "open")
+        with self._lock:
+            issues = [
+                issue for issue in self.issues.values()
+                if state == "all" or issue["state"] == state
+            ]
+        # GitHub's default order: newest first
+        issues.sort(key=lambda issue: issue["number"], reverse=True)
+        page, headers = self._paginate(issues, query, f"/repos/{self.repo}/issues")
+        return 200, page, headers
+
+    def create_issue(self, params, query, body):
+        if not body.get("title"):
+            raise SimulatorError(422, "Validation Failed")
+        number = self.open_issue(body["title"], body.get("body", ""), author=BOT_LOGIN)
+        return 201, self.issues[number], {}
+
+    def get_issue(self, params, query, body):
+        return 200, self._issue(params), {}
+
+    def update_issue(self, params, query, body):
+        issue = self._issue(params)
+        with self._lock:
+            for key in ("title", "body", "state"):
+                if key in body:
+                    issue[key] = body[key]
+            if body.get("state") == "closed":
+                issue["closed_at"] = timestamp(time.time() - EPOCH.timestamp())
+        return 200, issue, {}
+
+    def list_comments(self, params, query, body):
+        self._issue(params)
+        with self._lock:
+            comments = list(self.comments[int(params["number"])])
+        page, headers = self._paginate(
+            comments, query, f"/repos/{self.repo}/issues/{params['number']}/comments"
+        )
+        return 200, page, headers
+
+    def create_comment(self, params, query, body):
+        if not body.get("body"):
+            raise SimulatorError(422, "Validation Failed")
+        comment = self.add_comment(int(params["number"]), body["body"], author=BOT_LOGIN)
+        return 201, comment, {}
+
+    def add_labels(self, params, query, body):
+        issue = self._issue(params)
+        with self._lock:
+            names = {label["name"] for label in issue["labels"]}
+            for name in body.get("labels", []):
+                if name not in names:
+                    issue["labels"].append(self._label(name))
+        return 200, issue["labels"], {}
+
+    def add_assignees(self, params, query, body):
+        issue = self._issue(params)
+        with self._lock:
+            logins = {assignee["login"] for assignee in issue["assignees"]}
+            for login in body.get("assignees", []):
+                if login not in logins:
+                    issue["assignees"].append(user(login))
+        return 201, issue, {}
+
+    def list_pulls(self, params, query, body):
+        state = query.get("state", "open")
+        head = query.get("head")
+        with self._lock:
+            pulls = [
+                pull for pull in self.pulls.values()
+                if (state == "all" or pull["state"] == state)
+                and (not head or pull["head"]["label"] == head)
+            ]
+        pulls.sort(key=lambda pull: pull["number"], reverse=True)
+        page, headers = self._paginate(pulls, query, f"/repos/{self.repo}/pulls")
+        return 200, page, headers
+
+    def create_pull(self, params, query, body):
+        if not body.get("head") or not body.get("title"):
+            raise SimulatorError(422, "Validation Failed")
+        owner = self.repo.split("/")[0]
+        with self._lock:
+            number = self._new_number()
+            self.pulls[number] = {
+                "id": self._new_id(),
+                "number": number,
+                "title": body["title"],
+                "body": body.get("body", ""),
+                "state": "open",
+                "merged": False,
+                "mergeable": True,
+                "mergeable_state": "clean",
+                "head": {"ref": body["head"], "label": f"{owner}:{body['head']}"},
+                "base": {"ref": body.get("base", "main")},
+                "user": user(BOT_LOGIN),
+                "reviews": [],
+                "html_url": f"https://github.com/{self.repo}/pull/{number}",
+            }
+        return 201, self.pulls[number], {}
+
+    def get_pull(self, params, query, body):
+        return 200, self._pull(params), {}
+
+    def create_review(self, params, query, body):
+        pull = self._pull(params)
+        with self._lock:
+            review = {"id": self._new_id(), "state": body.get("event", "COMMENT"), "body": body.get("body", "")}
+            pull["reviews"].append(review)
+        return 200, review, {}
+
+    def merge_pull(self, params, query, body):
+        pull = self._pull(params)
+        with self._lock:
+            if pull["merged"] or not pull["mergeable"]:
+                raise SimulatorError(405, "Pull Request is not mergeable")
+            pull.update(merged=True, state="closed", merge_method=body.get("merge_method", "merge"))
+        return 200, {"merged": True, "message": "Pull Request successfully merged"}, {}
+
+
+class SimulatorHandler(BaseHTTPRequestHandler):
+    """HTTP front end; the simulator is attached by GitHubSimulator.start()."""
+
+    simulator: GitHubSimulator
+    protocol_version = "HTTP/1.1"
+
+    def _dispatch(self, method: str) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = None
+        if length:
+            try:
+                body = json.loads(self.rfile.read(length))
+            except json.JSONDecodeError:
+                self._send(400, {"message": "Problems parsing JSON"}, {})
+                return
+        status, payload, headers = self.simulator.handle(method, self.path, body)
+        self._send(status, payload, headers)
+
+    def _send(self, status: int, payload: Any, headers: Dict[str, str]) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_PATCH(self):
+        self._dispatch("PATCH")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Serve a local GitHub API simulator")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--repo", default="sim-org/sim-repo")
+    parser.add_argument("--issues", type=int, default=100, help="Open issues to seed")
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--rate-limit", type=int, default=5000)
+    parser.add_argument("--webhook-url", help="Deliver issue/comment webhooks here")
+    parser.add_argument("--webhook-secret", help="Sign deliveries with this secret")
+    parser.add_argument("--shim-dir", help="Write a `gh` shim for this server into this directory")
+    args = parser.parse_args()
+
+    simulator = GitHubSimulator(
+        repo=args.repo,
+        latency_ms=args.latency_ms,
+        rate_limit=args.rate_limit,
+        webhook_url=args.webhook_url,
+        webhook_secret=args.webhook_secret,
+    )
+    simulator.seed_issues(args.issues)
+    url = simulator.start(args.port)
+    print(f"GitHub simulator for {args.repo} on {url} ({args.issues} open issues)")
+    if args.shim_dir:
+        print(f"gh shim: export PATH={simulator.write_gh_shim(args.shim_dir)}:$PATH")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        simulator.stop()
+
+
+if __name__ == "__main__":
+    main()
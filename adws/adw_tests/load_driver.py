@@ -0,0 +1,186 @@
+#!/usr/bin/env uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = [
+#     "pydantic",
+# ]
+# ///
+
+"""
+Load Driver for ADW Pipelines
+
+Usage:
+uv run adws/adw_tests/load_driver.py --issues 101,102,103 [--pipelines 3]
+    [--workflow adw_sdlc_iso] [--fake-config <json>] [--time-scale 0.1] [--with-e2e] [--json]
+
+Starts M pipelines at once with CLAUDE_CODE_PATH pointing at a launcher for
+adw_tests/fake_claude.py, waits for them, then reports throughput and
+per-phase latency. Phase wall time comes from the phase:* spans in
+agents/traces/, agent time from agents/cost_ledger.jsonl; the difference is
+orchestration overhead (uv startup, state, git, gh, worktree setup).
+
+Agent calls are simulated but git and gh are not: run it against a sandbox
+repository and issues you don't mind ADW commenting on. Issues are reused
+round-robin when --pipelines exceeds the number of issues.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from collections import defaultdict
+from typing import Dict, List
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adw_modules.accounting import load_ledger, percentile
+from adw_modules.tracing import find_traces, load_trace
+from adw_modules.utils import make_adw_id
+from adw_tests.fake_claude import write_launcher
+
+ADWS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_pipeline(
+    workflow: str, issue_number: str, adw_id: str, env: Dict[str, str], log_dir: str,
+    extra_args: List[str],
+) -> subprocess.Popen:
+    """Launch one pipeline in the background, logging to log_dir/{adw_id}.log."""
+    script = os.path.join(ADWS_DIR, f"{workflow}.py")
+    log_file = open(os.path.join(log_dir, f"{adw_id}.log"), "w")
+    return subprocess.Popen(
+        ["uv", "run", script, issue_number, adw_id, *extra_args],
+        stdout=log_file,
+        stderr=subprocess.STDOUT,
+        env=env,
+        cwd=os.path.dirname(ADWS_DIR),
+    )
+
+
+def phase_timings(adw_id: str) -> Dict[str, float]:
+    """Wall seconds per phase from the run's phase:* spans."""
+    timings: Dict[str, float] = defaultdict(float)
+    for trace_id in find_traces(adw_id):
+        for span in load_trace(trace_id):
+            if span["name"].startswith("phase:") and span.get("end_ns"):
+                phase = span["name"][len("phase:"):]
+                timings[phase] += (span["end_ns"] - span["start_ns"]) / 1e9
+    return dict(timings)
+
+
+def agent_timings(adw_id: str) -> Dict[str, float]:
+    """Agent seconds per phase from the cost ledger."""
+    timings: Dict[str, float] = defaultdict(float)
+    for record in load_ledger(adw_id):
+        timings[record.phase] += (record.latency_ms or 0) / 1000
+    return dict(timings)
+
+
+def summarize(runs: List[Dict], wall_seconds: float) -> Dict:
+    """Throughput and per-phase latency percentiles across runs."""
+    phase_walls: Dict[str, List[float]] = defaultdict(list)
+    phase_overheads: Dict[str, List[float]] = defaultdict(list)
+    for run in runs:
+        for phase, seconds in run["phases"].items():
+            phase_walls[phase].append(seconds)
+            phase_overheads[phase].append(seconds - run["agent"].get(phase, 0.0))
+
+    succeeded = sum(1 for run in runs if run["returncode"] == 0)
+    return {
+        "pipelines": len(runs),
+        "succeeded": succeeded,
+        "wall_seconds": round(wall_seconds, 1),
+        "pipelines_per_hour": round(succeeded / wall_seconds * 3600, 1) if wall_seconds else None,
+        "pipeline_p50_seconds": percentile([run["seconds"] for run in runs], 50),
+        "pipeline_p95_seconds": percentile([run["seconds"] for run in runs], 95),
+        "phases": {
+            phase: {
+                "p50_seconds": percentile(walls, 50),
+                "p95_seconds": percentile(walls, 95),
+                "max_seconds": max(walls),
+                "overhead_p50_seconds": percentile(phase_overheads[phase], 50),
+            }
+            for phase, walls in sorted(phase_walls.items())
+        },
+        "runs": runs,
+    }
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Run concurrent ADW pipelines against a fake Claude")
+    parser.add_argument("--issues", required=True, help="Comma-separated issue numbers")
+    parser.add_argument("--pipelines", type=int, help="Concurrent pipelines (default: one per issue)")
+    parser.add_argument("--workflow", default="adw_sdlc_iso", help="Workflow script to run")
+    parser.add_argument("--fake-config", help="JSON config for fake_claude.py")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="Scale fake agent latency")
+    parser.add_argument("--with-e2e", action="store_true", help="Don't pass --skip-e2e to SDLC workflows")
+    parser.add_argument("--timeout", type=float, default=3600, help="Seconds before pipelines are killed")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args()
+
+    issues = [issue.strip() for issue in args.issues.split(",") if issue.strip()]
+    count = args.pipelines or len(issues)
+
+    run_id = make_adw_id()
+    log_dir = os.path.join(os.path.dirname(ADWS_DIR), "agents", "load_tests", run_id)
+    os.makedirs(log_dir, exist_ok=True)
+
+    env = os.environ.copy()
+    # Phases pass agents an allowlisted env, so the fake's settings ride in its launcher
+    env["CLAUDE_CODE_PATH"] = write_launcher(
+        log_dir, config_path=args.fake_config, time_scale=args.time_scale
+    )
+    # Phase spans are needed for the per-phase breakdown
+    env.setdefault("ADW_TRACE_EXPORTER", "json")
+    extra_args = [] if args.with_e2e or not args.workflow.startswith("adw_sdlc") else ["--skip-e2e"]
+
+    started = time.monotonic()
+    pipelines = {}
+    for i in range(count):
+        adw_id = make_adw_id()
+        issue = issues[i % len(issues)]
+        process = start_pipeline(args.workflow, issue, adw_id, env, log_dir, extra_args)
+        pipelines[adw_id] = (issue, process, time.monotonic())
+    print(f"🚀 Started {count} {args.workflow} pipelines (logs: {log_dir})", file=sys.stderr)
+
+    runs = []
+    for adw_id, (issue, process, launched) in pipelines.items():
+        remaining = max(args.timeout - (time.monotonic() - started), 0)
+        try:
+            returncode = process.wait(timeout=remaining)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            returncode = process.wait()
+        runs.append({
+            "adw_id": adw_id,
+            "issue_number": issue,
+            "returncode": returncode,
+            "seconds": round(time.monotonic() - launched, 1),
+            "phases": phase_timings(adw_id),
+            "agent": agent_timings(adw_id),
+        })
+    summary = summarize(runs, time.monotonic() - started)
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    print(
+        f"\n{summary['succeeded']}/{summary['pipelines']} pipelines succeeded in "
+        f"{summary['wall_seconds']}s ({summary['pipelines_per_hour']} per hour)"
+    )
+    print(f"Pipeline p50 {summary['pipeline_p50_seconds']:.1f}s, p95 {summary['pipeline_p95_seconds']:.1f}s\n")
+    print(f"{'phase':<24} {'p50':>8} {'p95':>8} {'max':>8} {'overhead p50':>13}")
+    for phase, stats in summary["phases"].items():
+        print(
+            f"{phase:<24} {stats['p50_seconds']:>7.1f}s {stats['p95_seconds']:>7.1f}s "
+            f"{stats['max_seconds']:>7.1f}s {stats['overhead_p50_seconds']:>12.1f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = []
+# ///
+
+"""
+Profile Summary for an ADW Run
+
+Usage:
+uv run adws/adw_tests/profile_summary.py <adw-id> [--top 15] [--collapsed out.folded] [--json]
+
+Merges the profiles written under agents/<adw-id>/ by a run with
+ADW_PROFILE=cpu|wall|mem. For cpu and wall profiles, prints where the time
+went (Python overhead, subprocess spawning, waiting on agents), time per
+phase or agent directory and the hottest functions or frames. For mem
+profiles, prints peak traced memory per directory and the top allocation
+sites. --collapsed writes the merged wall stacks in the folded format
+flamegraph.pl and speedscope read.
+"""
+
+import os
+import sys
+import json
+import argparse
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adw_modules.profiling import summarize_profiles
+
+
+def format_bytes(value: int) -> str:
+    return f"{value / (1024 * 1024):.1f}MB"
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Merge an ADW run's profiles")
+    parser.add_argument("adw_id", help="ADW run to summarize")
+    parser.add_argument("--top", type=int, default=15, help="Rows in the top functions/frames tables")
+    parser.add_argument("--collapsed", help="Write merged wall stacks in folded format to this file")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args()
+
+    summary = summarize_profiles(args.adw_id, top=args.top)
+    if not summary["profiles"]:
+        print(f"No profiles found for {args.adw_id} (run with ADW_PROFILE=cpu|wall|mem)", file=sys.stderr)
+        sys.exit(1)
+
+    stacks = summary.pop("stacks", {})
+    if args.collapsed and stacks:
+        with open(args.collapsed, "w") as f:
+            for stack, count in sorted(stacks.items()):
+                f.write(f"{stack} {count}\n")
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    print(f"🔬 {summary['profiles']} profiles for {args.adw_id} ({', '.join(summary['kinds'])})\n")
+
+    breakdown = summary.get("breakdown_seconds")
+    if breakdown:
+        total = sum(breakdown.values()) or 1
+        print("Where the time went:")
+        labels = {
+            "python": "Python overhead",
+            "subprocess": "Subprocesses (git, gh, uv)",
+            "agent": "Waiting on agents",
+        }
+        for key, label in labels.items():
+            print(f"  {label:<28} {breakdown[key]:>9.2f}s {100 * breakdown[key] / total:>5.1f}%")
+
+        print("\nBy phase / agent:")
+        for name, seconds in summary["seconds_by_name"].items():
+            print(f"  {name:<40} {seconds:>9.2f}s")
+
+    if summary.get("top_functions"):
+        print("\nTop functions by own time (cpu):")
+        for row in summary["top_functions"]:
+            print(f"  {row['tottime']:>9.3f}s {row['cumtime']:>9.3f}s cum {row['calls']:>8}  {row['function']}")
+
+    if summary.get("top_frames"):
+        print("\nTop frames by own time (wall samples):")
+        for row in summary["top_frames"]:
+            print(f"  {row['seconds']:>9.3f}s  {row['frame']}")
+
+    if summary.get("peak_bytes_by_name"):
+        print("\nPeak traced memory:")
+        for name, peak in summary["peak_bytes_by_name"].items():
+            print(f"  {name:<40} {format_bytes(peak):>9}")
+        print("\nTop allocation sites:")
+        for row in summary.get("top_allocations", []):
+            print(f"  {format_bytes(row['size_bytes']):>9}  {row['location']}")
+
+    if args.collapsed and stacks:
+        print(f"\nWrote folded stacks to {args.collapsed}")
+
+
+if __name__ == "__main__":
+    main()
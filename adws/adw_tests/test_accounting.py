@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""Test cost and latency accounting for agent calls."""
+
+import sys
+import os
+import copy
+import tempfile
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+
+from adw_modules import accounting, agent, metrics
+from adw_modules.data_types import (
+    AgentCallRecord,
+    AgentPromptRequest,
+    AgentPromptResponse,
+    RetryCode,
+)
+from adw_modules.accounting import load_ledger, percentile, summarize_ledger
+from adw_modules.agent import extract_accounting
+from adw_modules.retry_policy import RetryPolicy
+
+
+def make_record(command: str, model: str, cost: float, duration_ms: int) -> AgentCallRecord:
+    """Build a ledger record."""
+    return AgentCallRecord(
+        timestamp="2025-01-01T00:00:00",
+        adw_id="abc12345",
+        phase="adw_build_iso",
+        agent_name="sdlc_implementor",
+        slash_command=command,
+        model=model,
+        success=True,
+        total_cost_usd=cost,
+        duration_ms=duration_ms,
+    )
+
+
+def test_extract_accounting():
+    """Cost, latency and tokens are read from the result message."""
+    print("Testing extract_accounting...")
+
+    fields = extract_accounting(
+        {
+            "type": "result",
+            "total_cost_usd": 0.42,
+            "duration_ms": 5000,
+            "duration_api_ms": 4000,
+            "num_turns": 7,
+            "usage": {"input_tokens": 10, "output_tokens": 20, "server_tool_use": {}},
+        }
+    )
+    assert fields["total_cost_usd"] == 0.42
+    assert fields["num_turns"] == 7
+    assert fields["usage"].output_tokens == 20
+    assert extract_accounting({})["usage"] is None
+
+    print("✅ Accounting fields extracted")
+
+
+def test_percentile():
+    """Percentiles interpolate between ranks."""
+    print("\nTesting percentile...")
+
+    assert percentile([], 50) is None
+    assert percentile([10], 99) == 10
+    assert percentile([1, 2, 3, 4], 50) == 2.5
+    assert percentile(list(range(101)), 90) == 90
+
+    print("✅ Percentiles correct")
+
+
+def test_summarize_ledger():
+    """Groups are totalled and sorted by spend."""
+    print("\nTesting summarize_ledger...")
+
+    records = [
+        make_record("/review", "sonnet", 0.10, 1000),
+        make_record("/implement", "opus", 2.00, 60000),
+        make_record("/review", "sonnet", 0.30, 3000),
+        make_record("/implement", "opus", 1.00, 30000),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cost_ledger.jsonl")
+        with open(path, "w") as f:
+            for record in records:
+                f.write(record.model_dump_json() + "\n")
+            f.write("not json\n")
+        loaded = load_ledger(path=path)
+    assert len(loaded) == 4
+
+    rows = summarize_ledger(loaded, ["slash_command", "model"])
+    assert [row["slash_command"] for row in rows] == ["/implement", "/review"]
+    assert rows[0]["total_cost_usd"] == 3.0
+    assert rows[0]["p50_ms"] == 45000
+    assert rows[1]["calls"] == 2
+
+    try:
+        summarize_ledger(loaded, ["prompt"])
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+    print("✅ Ledger summarized")
+
+
+def test_killed_attempts_count_toward_latency():
+    """Attempts with no result message are timed by the retry loop."""
+    print("\nTesting wall-clock latency of killed attempts...")
+
+    attempts = []
+
+    def fake_prompt(request):
+        attempts.append(request)
+        if len(attempts) == 1:
+            time.sleep(0.3)
+            # Killed by the supervisor: no result message, so no duration_ms
+            return AgentPromptResponse(
+                output="Claude Code error: Command timed out",
+                success=False,
+                retry_code=RetryCode.TIMEOUT_ERROR,
+            )
+        return AgentPromptResponse(output="done", success=True, duration_ms=50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger_path = os.path.join(tmp, "cost_ledger.jsonl")
+        saved = (agent.prompt_claude_code, accounting.get_ledger_path, metrics.get_metrics_dir)
+        agent.prompt_claude_code = fake_prompt
+        accounting.get_ledger_path = lambda: ledger_path
+        metrics.get_metrics_dir = lambda: tmp
+        # Leave this process' metrics as they were for the other tests
+        metric_values = {
+            metric: copy.deepcopy(metric.values)
+            for metric in metrics.REGISTRY.metrics.values()
+            if hasattr(metric, "values")
+        }
+        try:
+            response = agent.prompt_claude_code_with_retry(
+                AgentPromptRequest(
+                    prompt="/implement",
+                    adw_id="abc12345",
+                    agent_name="sdlc_implementor",
+                    model="sonnet",
+                    dangerously_skip_permissions=True,
+                    output_file=os.path.join(tmp, "raw_output.jsonl"),
+                ),
+                policy=RetryPolicy(max_retries=1, fixed_delays=[0]),
+            )
+        finally:
+            agent.prompt_claude_code, accounting.get_ledger_path, metrics.get_metrics_dir = saved
+            for metric, values in metric_values.items():
+                metric.values = values
+        records = load_ledger(path=ledger_path)
+
+    assert response.success and len(attempts) == 2
+    assert [r.duration_ms for r in records] == [None, 50]
+    assert records[0].wall_ms >= 300 and records[0].latency_ms == records[0].wall_ms
+    # The hung attempt sets the tail instead of vanishing from it
+    row = summarize_ledger(records, ["agent_name"])[0]
+    assert row["p99_ms"] > 250, row
+
+    print(f"✅ Killed attempt counted at {records[0].wall_ms}ms")
+
+
+def main():
+    """Run all tests."""
+    print("ADW Accounting Tests")
+    print("=" * 50)
+
+    test_extract_accounting()
+    test_percentile()
+    test_summarize_ledger()
+    test_killed_attempts_count_toward_latency()
+
+    print("\n" + "=" * 50)
+    print("✅ All tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""Test agent backend selection and the in-process backends."""
+
+import sys
+import os
+import json
+import types
+import asyncio
+import tempfile
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adw_modules import agent, agent_backends
+from adw_modules.agent_backends import (
+    AGENT_BACKEND_ENV,
+    AGENT_BACKENDS_ENV,
+    CLIBackend,
+    FakeBackend,
+    get_backend,
+    get_backend_name,
+    register_backend,
+    sdk_message_to_dict,
+)
+from adw_modules.data_types import AgentPromptRequest, AgentPromptResponse, RetryCode
+
+
+def set_env(values: Dict[str, Any]) -> Dict[str, Any]:
+    """Set (or unset, for None) env vars; returns the previous values."""
+    saved = {key: os.environ.get(key) for key in values}
+    for key, value in values.items():
+        if value is None:
+            os.environ.pop(key, None)
+        else:
+            os.environ[key] = value
+    return saved
+
+
+def make_request(tmp: str, prompt: str, slash_command=None) -> AgentPromptRequest:
+    return AgentPromptRequest(
+        prompt=prompt,
+        adw_id="back1234",
+        agent_name="tester",
+        model="sonnet",
+        dangerously_skip_permissions=True,
+        output_file=os.path.join(tmp, "raw_output.jsonl"),
+        working_dir=tmp,
+        slash_command=slash_command,
+    )
+
+
+def test_backend_selection():
+    """Per-command map, ADW_AGENT_BACKENDS overrides, ADW_AGENT_BACKEND forces."""
+    print("Testing backend selection...")
+
+    saved = set_env({AGENT_BACKEND_ENV: None, AGENT_BACKENDS_ENV: None})
+    try:
+        assert get_backend_name("/classify_issue") == "sdk"
+        assert get_backend_name("/implement") == "cli"
+        assert get_backend_name(None) == "cli"
+
+        os.environ[AGENT_BACKENDS_ENV] = "/implement=fake, /classify_issue=cli"
+        assert get_backend_name("/implement") == "fake"
+        assert get_backend_name("/classify_issue") == "cli"
+        assert get_backend_name("/generate_branch_name") == "sdk"
+
+        os.environ[AGENT_BACKEND_ENV] = "cli"
+        assert get_backend_name("/implement") == "cli"
+        os.environ[AGENT_BACKEND_ENV] = "nonsense"
+        assert isinstance(get_backend("/implement"), CLIBackend)
+
+        # Without claude-code-sdk installed, sdk calls run on the CLI
+        os.environ.pop(AGENT_BACKEND_ENV)
+        os.environ.pop(AGENT_BACKENDS_ENV)
+        if not agent_backends.SDKBackend.available():
+            assert isinstance(get_backend("/classify_issue"), CLIBackend)
+        assert get_backend("/implement") is get_backend("/commit")
+    finally:
+        set_env(saved)
+
+    print("✅ Backends selected per slash command")
+
+
+def test_fake_backend():
+    """The fake backend serves scripted outputs and writes a stream-json transcript."""
+    print("\nTesting fake backend...")
+
+    fake = FakeBackend(
+        {
+            "/classify_issue": "/feature",
+            "/implement": lambda request: AgentPromptResponse(
+                output="Claude Code error: 529 overloaded",
+                success=False,
+                retry_code=RetryCode.OVERLOADED_ERROR,
+            ),
+        },
+        default="done",
+    )
+    saved_backend = agent_backends._backends.get("fake")
+    register_backend("fake", fake)
+    saved = set_env({AGENT_BACKEND_ENV: "fake"})
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            classified = agent.prompt_claude_code(make_request(tmp, "/classify_issue 12 body"))
+            with open(os.path.join(tmp, "raw_output.json")) as f:
+                transcript = json.load(f)
+            failed = agent.prompt_claude_code(make_request(tmp, "resume", slash_command="/implement"))
+            other = asyncio.run(agent.prompt_claude_code_async(make_request(tmp, "/commit x")))
+    finally:
+        set_env(saved)
+        if saved_backend is None:
+            agent_backends._backends.pop("fake", None)
+        else:
+            register_backend("fake", saved_backend)
+
+    assert (classified.output, classified.success, classified.session_id) == ("/feature", True, "fake-1")
+    assert [entry["type"] for entry in transcript] == ["prompt", "system", "assistant", "result"]
+    assert transcript[0]["prompt"] == "/classify_issue 12 body"
+    assert transcript[-1]["result"] == "/feature"
+    assert (failed.success, failed.retry_code) == (False, RetryCode.OVERLOADED_ERROR)
+    assert other.output == "done"
+    assert [call.prompt for call in fake.calls] == ["/classify_issue 12 body", "resume", "/commit x"]
+
+    print(f"✅ Served {len(fake.calls)} calls without a process")
+
+
+@dataclass
+class TextBlock:
+    text: str
+
+
+@dataclass
+class ToolUseBlock:
+    id: str
+    name: str
+    input: Dict[str, Any]
+
+
+@dataclass
+class SystemMessage:
+    subtype: str
+    data: Dict[str, Any]
+
+
+@dataclass
+class AssistantMessage:
+    content: List[Any] = field(default_factory=list)
+    model: str = "sonnet"
+
+
+@dataclass
+class ResultMessage:
+    subtype: str
+    duration_ms: int
+    duration_api_ms: int
+    is_error: bool
+    num_turns: int
+    session_id: str
+    total_cost_usd: float
+    usage: Dict[str, Any]
+    result: str
+
+
+def test_sdk_messages_match_cli_transcript():
+    """SDK messages become the stream-json lines the CLI writes, so the parsers agree."""
+    print("\nTesting SDK message conversion...")
+
+    init = sdk_message_to_dict(SystemMessage("init", {"session_id": "s-1", "model": "sonnet"}), None)
+    assistant = sdk_message_to_dict(
+        AssistantMessage([TextBlock("Reading"), ToolUseBlock("t1", "Read", {"file_path": "a.py"})]),
+        "s-1",
+    )
+    result = sdk_message_to_dict(
+        ResultMessage("success", 1200, 900, False, 2, "s-1", 0.02, {"input_tokens": 10, "output_tokens": 5}, "/chore"),
+        "s-1",
+    )
+
+    assert init == {"type": "system", "subtype": "init", "session_id": "s-1", "model": "sonnet"}
+    assert assistant["message"]["content"] == [
+        {"type": "text", "text": "Reading"},
+        {"type": "tool_use", "id": "t1", "name": "Read", "input": {"file_path": "a.py"}},
+    ]
+    assert assistant["session_id"] == "s-1"
+
+    response = agent.response_from_result_message(result)
+    assert (response.output, response.success, response.session_id) == ("/chore", True, "s-1")
+    assert response.total_cost_usd == 0.02 and response.usage.output_tokens == 5
+
+    print("✅ SDK messages converted")
+
+
+def test_sdk_options_match_cli():
+    """The SDK launches the configured CLI with the same filtered environment."""
+    print("\nTesting SDK options...")
+
+    # Stand-in for claude_code_sdk, whose options are keyword arguments
+    saved_module = sys.modules.get("claude_code_sdk")
+    sys.modules["claude_code_sdk"] = types.SimpleNamespace(ClaudeCodeOptions=dict)
+    original_path = agent.CLAUDE_PATH
+    agent.CLAUDE_PATH = "/opt/claude/bin/claude"
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            request = make_request(tmp, "/classify_issue 12 body")
+            request.resume_session_id = "s-1"
+            options = agent_backends.SDKBackend().build_options(request)
+    finally:
+        agent.CLAUDE_PATH = original_path
+        if saved_module is None:
+            sys.modules.pop("claude_code_sdk", None)
+        else:
+            sys.modules["claude_code_sdk"] = saved_module
+
+    assert options["cli_path"] == "/opt/claude/bin/claude"
+    assert options["env"] == agent.get_claude_env()
+    assert (options["cwd"], options["resume"]) == (tmp, "s-1")
+    assert options["permission_mode"] == "bypassPermissions"
+
+    print("✅ SDK options match the CLI launch")
+
+
+def main():
+    """Run all tests."""
+    print("ADW Agent Backend Tests")
+    print("=" * 50)
+
+    test_backend_selection()
+    test_fake_backend()
+    test_sdk_messages_match_cli_transcript()
+    test_sdk_options_match_cli()
+
+    print("\n" + "=" * 50)
+    print("✅ All tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Test the hot path benchmark runner's baseline comparison."""
+
+import sys
+import os
+import tempfile
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adw_tests.benchmark_hot_paths import compare, load_baseline, save_baseline
+
+
+def result(seconds: float) -> dict:
+    return {"median_seconds": seconds, "min_seconds": seconds, "runs": 5}
+
+
+def test_compare():
+    """Slowdowns beyond the threshold and the noise floor are regressions."""
+    print("Testing baseline comparison...")
+
+    baseline = {
+        "slow": result(1.0),
+        "fast": result(1.0),
+        "steady": result(1.0),
+        "tiny": result(0.0001),
+    }
+    results = {
+        "slow": result(1.5),
+        "fast": result(0.5),
+        "steady": result(1.1),
+        # 3x slower but well under the 2ms noise floor
+        "tiny": result(0.0003),
+        "added": result(0.2),
+    }
+    statuses = {row[0]: row[4] for row in compare(results, baseline, threshold=0.25)}
+
+    assert statuses == {
+        "slow": "regressed",
+        "fast": "improved",
+        "steady": "ok",
+        "tiny": "ok",
+        "added": "new",
+    }
+
+    print("✅ Statuses assigned correctly")
+
+
+def test_baseline_round_trip():
+    """Saving merges into the existing baseline file."""
+    print("\nTesting baseline save/load...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "baselines.json")
+        assert load_baseline(path) == {}
+        save_baseline(path, {"a": result(1.0)})
+        save_baseline(path, {"b": result(2.0)})
+        assert set(load_baseline(path)) == {"a", "b"}
+
+    print("✅ Baseline merged")
+
+
+def main():
+    """Run all tests."""
+    print("ADW Hot Path Benchmark Tests")
+    print("=" * 50)
+
+    test_compare()
+    test_baseline_round_trip()
+
+    print("\n" + "=" * 50)
+    print("✅ All tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""Test E2E spec discovery, sharding, parallel workers and resolution."""
+
+import sys
+import os
+import json
+import logging
+import tempfile
+import threading
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import adw_test_iso
+from adw_modules import test_history
+from adw_modules.data_types import AgentPromptResponse, E2ETestResult
+from adw_modules.worktree_ops import (
+    WORKER_BACKEND_PORT_BASE,
+    WORKER_PORTS_PER_SLOT,
+    allocate_worker_ports,
+    is_port_listening,
+)
+
+SPECS = ["test_basic_query", "test_complex_query", "test_sql_injection", "test_upload", "test_export"]
+
+# Serves both ports from .ports.env in the current directory, like scripts/start.sh
+START_SCRIPT = """#!/bin/bash
+[ -f ".ports.env" ] && source .ports.env
+python3 -m http.server "$BACKEND_PORT" --bind 127.0.0.1 >/dev/null 2>&1 &
+python3 -m http.server "$FRONTEND_PORT" --bind 127.0.0.1 >/dev/null 2>&1 &
+wait
+"""
+
+logger = logging.getLogger("test_e2e_parallel")
+
+
+def make_worktree(tmp: str) -> str:
+    worktree = os.path.join(tmp, "worktree")
+    os.makedirs(os.path.join(worktree, ".claude", "commands", "e2e"))
+    os.makedirs(os.path.join(worktree, "scripts"))
+    for name in reversed(SPECS):
+        with open(os.path.join(worktree, ".claude", "commands", "e2e", f"{name}.md"), "w") as f:
+            f.write(f"# {name}\n")
+    with open(os.path.join(worktree, ".claude", "commands", "e2e", "README.txt"), "w") as f:
+        f.write("not a spec\n")
+    with open(os.path.join(worktree, "scripts", "start.sh"), "w") as f:
+        f.write(START_SCRIPT)
+    return worktree
+
+
+class Patched:
+    """Swap module attributes for the duration of a test."""
+
+    def __init__(self, **patches):
+        self.patches = patches
+        self.saved = {}
+
+    def __enter__(self):
+        for name, value in self.patches.items():
+            module_name, attr = name.split("__")
+            module = {"iso": adw_test_iso, "history": test_history}[module_name]
+            self.saved[name] = (module, attr, getattr(module, attr))
+            setattr(module, attr, value)
+        return self
+
+    def __exit__(self, *exc):
+        for module, attr, value in self.saved.values():
+            setattr(module, attr, value)
+
+
+def test_discover_and_shard():
+    """Specs are found sorted and split round-robin into non-empty shards."""
+    print("Testing discovery and sharding...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = adw_test_iso.discover_e2e_test_files(make_worktree(tmp))
+        assert adw_test_iso.discover_e2e_test_files(os.path.join(tmp, "missing")) == []
+
+    assert paths == sorted(os.path.join(".claude", "commands", "e2e", f"{name}.md") for name in SPECS)
+    shards = adw_test_iso.shard_e2e_tests(paths, 2)
+    assert shards == [paths[0::2], paths[1::2]]
+    assert adw_test_iso.shard_e2e_tests(paths[:2], 4) == [[paths[0]], [paths[1]]]
+    assert adw_test_iso.shard_e2e_tests(paths, 0) == [paths]
+
+    print(f"✅ {len(paths)} specs sharded")
+
+
+def test_worker_ports_stay_in_own_block():
+    """Worker ports come from the worktree's own block outside 9100-9214."""
+    print("\nTesting worker port allocation...")
+
+    first = allocate_worker_ports((9100, 9200), 4)
+    last = allocate_worker_ports((9114, 9214), 4)
+    blocks = [
+        {WORKER_BACKEND_PORT_BASE + slot * WORKER_PORTS_PER_SLOT + i for i in range(WORKER_PORTS_PER_SLOT)}
+        for slot in (0, 14)
+    ]
+    assert {backend for backend, _ in first} <= blocks[0]
+    assert {backend for backend, _ in last} <= blocks[1]
+    assert all(frontend - backend == 100 for backend, frontend in first + last)
+    assert len(allocate_worker_ports((9114, 9214), 2)) <= 2
+    # Ports outside the worktree range have no block
+    assert allocate_worker_ports((8000, 5173), 4) == []
+
+    print(f"✅ Worker ports {sorted(first)[:1]}... and {sorted(last)[:1]}...")
+
+
+def test_parallel_run_aggregates_in_order():
+    """Each worker gets a live app on its ports; results come back in spec order."""
+    print("\nTesting parallel E2E run...")
+
+    calls = []
+    lock = threading.Lock()
+
+    def fake_execute_template(request):
+        payload = json.loads(request.args[0])
+        with lock:
+            calls.append(
+                (payload["backend_port"], payload["frontend_port"], is_port_listening(payload["frontend_port"]))
+            )
+        # Agents echo spec paths in whatever form they like
+        spellings = [
+            lambda path: path,
+            lambda path: os.path.join(".", path),
+            lambda path: os.path.join(worktree, path),
+        ]
+        results = [
+            E2ETestResult(
+                test_name=os.path.basename(path),
+                status="failed" if "injection" in path else "passed",
+                test_path=spellings[i % len(spellings)](path),
+                error="boom" if "injection" in path else None,
+            ).model_dump()
+            for i, path in enumerate(payload["test_files"])
+            if "export" not in path  # Never reported; must come back failed
+        ]
+        return AgentPromptResponse(output=json.dumps(results), success=True)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        worktree = make_worktree(tmp)
+        paths = adw_test_iso.discover_e2e_test_files(worktree)
+        with Patched(
+            iso__execute_template=fake_execute_template,
+            iso__get_worker_app_dir=lambda adw_id, idx: os.path.join(tmp, f"app_w{idx}"),
+            history__get_agents_dir=lambda: tmp,
+        ):
+            results = adw_test_iso.run_e2e_tests_parallel(
+                paths, "e2e12345", logger, worktree, (9113, 9213), max_workers=2
+            )
+        worker_pairs = {(backend, frontend) for backend, frontend, _ in calls}
+
+    assert [result.test_path for result in results] == paths
+    assert [result.passed for result in results] == [True, True, False, False, True]
+    assert results[2].error == "No result reported for this spec"
+    assert results[3].error == "boom"
+    assert len(calls) == 2 and all(listening for _, _, listening in calls), calls
+    assert all(9300 <= backend < 9360 for backend, _ in worker_pairs)
+    # Apps are stopped once the workers are done
+    time.sleep(0.2)
+    assert not any(is_port_listening(frontend) for _, frontend in worker_pairs)
+
+    print(f"✅ {len(results)} specs across {len(calls)} workers with their own apps")
+
+
+def test_resolution_is_sequential():
+    """Failed specs are resolved one at a time, since resolvers share the worktree."""
+    print("\nTesting E2E resolution...")
+
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def fake_execute_template(request):
+        with lock:
+            running.append(request.agent_name)
+            peak.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.remove(request.agent_name)
+        test = json.loads(request.args[0])
+        return AgentPromptResponse(output="done", success=test["test_name"] != "stuck")
+
+    failed = [
+        E2ETestResult(test_name=name, status="failed", test_path=f"{name}.md")
+        for name in ("a", "b", "stuck", "c")
+    ]
+    comments = []
+    with Patched(
+        iso__execute_template=fake_execute_template,
+        iso__make_issue_comment=lambda issue, body: comments.append(body),
+    ):
+        resolved, unresolved = adw_test_iso.resolve_failed_e2e_tests(
+            failed, "e2e12345", "1", logger, "/tmp"
+        )
+
+    assert (resolved, unresolved) == (3, 1)
+    assert max(peak) == 1, peak
+    assert len(comments) == 8
+
+    print(f"✅ Resolved {resolved}/{len(failed)} one at a time")
+
+
+def test_suspected_flakes_retried_before_resolution():
+    """Suspected flaky specs are re-run on their own; others are left alone."""
+    print("\nTesting E2E flake triage...")
+
+    retried = []
+    lock = threading.Lock()
+
+    def fake_execute_template(request):
+        payload = json.loads(request.args[0])
+        with lock:
+            retried.append((request.agent_name, payload["test_files"]))
+        results = [
+            E2ETestResult(
+                test_name=os.path.basename(path), status="passed", test_path=path
+            ).model_dump()
+            for path in payload["test_files"]
+        ]
+        return AgentPromptResponse(output=json.dumps(results), success=True)
+
+    results = [
+        E2ETestResult(test_name="a.md", status="passed", test_path="a.md"),
+        E2ETestResult(test_name="flaky.md", status="failed", test_path="flaky.md", error="timeout"),
+        E2ETestResult(test_name="broken.md", status="failed", test_path="broken.md", error="boom"),
+        E2ETestResult(test_name="quarantined.md", status="failed", test_path="quarantined.md"),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        with Patched(
+            iso__execute_template=fake_execute_template,
+            iso__get_worker_app_dir=lambda adw_id, idx: os.path.join(tmp, f"app_w{idx}"),
+            iso__get_flakiness_scores=lambda kind: {"flaky.md": 0.3, "quarantined.md": 0.6},
+            iso__get_quarantined_tests=lambda kind: {"quarantined.md"},
+            history__get_agents_dir=lambda: tmp,
+        ):
+            triaged, quarantined = adw_test_iso.triage_failed_e2e_tests(
+                results, "e2e12345", logger, tmp, (9113, 9213)
+            )
+
+    assert [files for _, files in retried] == [["flaky.md"]], retried
+    assert retried[0][0].startswith(adw_test_iso.AGENT_E2E_FLAKE_RETRIER)
+    assert [test.passed for test in triaged] == [True, True, False, False]
+    assert triaged[2].error == "boom"
+    assert quarantined == ["quarantined.md"]
+    assert adw_test_iso.count_test_results(triaged) == (2, 1, 1)
+
+    print("✅ Suspected flake passed on retry without a resolver")
+
+
+def main():
+    """Run all tests."""
+    print("ADW Parallel E2E Tests")
+    print("=" * 50)
+
+    test_discover_and_shard()
+    test_worker_ports_stay_in_own_block()
+    test_parallel_run_aggregates_in_order()
+    test_resolution_is_sequential()
+    test_suspected_flakes_retried_before_resolution()
+
+    print("\n" + "=" * 50)
+    print("✅ All tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
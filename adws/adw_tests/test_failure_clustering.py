@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Test clustering of failed tests by shared root cause."""
+
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adw_modules.failure_clustering import (
+    cluster_failed_tests,
+    normalize_error,
+    extract_stack_frame,
+)
+from adw_modules.data_types import TestResult
+
+
+def make_test(name: str, error: str, command: str = "pytest") -> TestResult:
+    """Build a failed TestResult."""
+    return TestResult(
+        test_name=name,
+        passed=False,
+        execution_command=command,
+        test_purpose=name,
+        error=error,
+    )
+
+
+def test_normalize_error():
+    """Volatile details are stripped from the signature line."""
+    print("Testing normalize_error...")
+
+    error = (
+        "Traceback (most recent call last):\n"
+        '  File "tests/test_a.py", line 12, in test_a\n'
+        "ImportError: cannot import name 'load_data' from 'core' (0x7f3a2b)"
+    )
+    assert normalize_error(error) == (
+        "ImportError: cannot import name 'load_data' from 'core' (0x?)"
+    )
+    assert normalize_error(None) == ""
+
+    print("✅ Error signatures normalized")
+
+
+def test_extract_stack_frame():
+    """Frames outside test files are preferred."""
+    print("\nTesting extract_stack_frame...")
+
+    error = (
+        '  File "tests/test_a.py", line 3, in test_a\n'
+        '  File "app/server/core.py", line 40, in load_data\n'
+        "KeyError: 'id'"
+    )
+    assert extract_stack_frame(error) == "app/server/core.py:load_data"
+    assert extract_stack_frame("at loadData (src/core.ts:12:5)") == "src/core.ts:loadData"
+
+    print("✅ Stack frames extracted")
+
+
+def test_cluster_failed_tests():
+    """Shared causes cluster together; unrelated assertions stay apart."""
+    print("\nTesting cluster_failed_tests...")
+
+    renamed = "ImportError: cannot import name 'load_data' from 'core'"
+    failures = [
+        make_test("test_one", renamed, "pytest tests/test_one.py"),
+        make_test("test_assert_a", "AssertionError: assert 1 == 2", "pytest tests/test_a.py"),
+        make_test("test_two", renamed, "pytest tests/test_two.py"),
+        make_test("test_assert_b", "AssertionError: assert 1 == 2", "pytest tests/test_b.py"),
+        make_test("test_three", renamed, "pytest tests/test_three.py"),
+    ]
+
+    clusters = cluster_failed_tests(failures)
+    names = [[test.test_name for test in cluster] for cluster in clusters]
+    assert names == [
+        ["test_one", "test_two", "test_three"],
+        ["test_assert_a"],
+        ["test_assert_b"],
+    ], names
+
+    print("✅ 5 failures resolved in 3 sessions instead of 5")
+
+
+def main():
+    """Run all tests."""
+    print("ADW Failure Clustering Tests")
+    print("=" * 50)
+
+    test_normalize_error()
+    test_extract_stack_frame()
+    test_cluster_failed_tests()
+
+    print("\n" + "=" * 50)
+    print("✅ All tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
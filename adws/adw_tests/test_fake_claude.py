@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Test that the fake Claude CLI drives agent.prompt_claude_code like the real one."""
+
+import sys
+import os
+import json
+import tempfile
+from contextlib import contextmanager
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adw_modules import agent
+from adw_modules.data_types import AgentPromptRequest, RetryCode, TestResult
+from adw_modules.utils import parse_json
+from adw_tests.fake_claude import write_launcher
+
+
+@contextmanager
+def fake_claude(tmp: str, commands: dict):
+    """Point agent.py at the fake CLI with a fast, per-test config."""
+    config_path = os.path.join(tmp, "fake_claude.json")
+    with open(config_path, "w") as f:
+        json.dump({"seed": 1, "time_scale": 0.01, "commands": commands}, f)
+
+    original_path = agent.CLAUDE_PATH
+    agent.CLAUDE_PATH = write_launcher(
+        os.path.join(tmp, "bin"), config_path=config_path, state_dir=os.path.join(tmp, "state")
+    )
+    try:
+        yield
+    finally:
+        agent.CLAUDE_PATH = original_path
+
+
+def make_request(tmp: str, prompt: str) -> AgentPromptRequest:
+    return AgentPromptRequest(
+        prompt=prompt,
+        adw_id="fake1234",
+        agent_name="tester",
+        model="sonnet",
+        dangerously_skip_permissions=True,
+        output_file=os.path.join(tmp, "raw_output.jsonl"),
+        working_dir=tmp,
+    )
+
+
+def test_success_output():
+    """A successful call parses and carries session and accounting data."""
+    print("Testing successful fake Claude call...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with fake_claude(tmp, {}):
+            response = agent.prompt_claude_code(make_request(tmp, "/test fake1234"))
+
+    assert response.success, response.output
+    assert response.session_id
+    assert response.total_cost_usd and response.total_cost_usd > 0
+    results = parse_json(response.output, list)
+    assert results and all(TestResult(**item) for item in results)
+
+    print(f"✅ Parsed {len(results)} test results from session {response.session_id[:8]}")
+
+
+def test_edits_written():
+    """Scripted edits land in the working directory."""
+    print("\nTesting scripted edits...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        edits = [{"path": "app/{adw_id}.txt", "content": "change for {adw_id}\n"}]
+        with fake_claude(tmp, {"/implement": {"edits": edits}}):
+            response = agent.prompt_claude_code(make_request(tmp, "/implement fake1234 specs/plan.md"))
+
+        assert response.success, response.output
+        with open(os.path.join(tmp, "app", "fake1234.txt")) as f:
+            assert f.read() == "change for fake1234\n"
+
+    print("✅ Edit written to app/fake1234.txt")
+
+
+def test_failure_retry_codes():
+    """Each injected failure maps to the RetryCode the real CLI would get."""
+    print("\nTesting injected failures...")
+
+    expected = {
+        "rate_limit": RetryCode.RATE_LIMIT_ERROR,
+        "overloaded": RetryCode.OVERLOADED_ERROR,
+        "error_during_execution": RetryCode.ERROR_DURING_EXECUTION,
+        "api_error": RetryCode.NONE,
+    }
+    for failure, retry_code in expected.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            with fake_claude(tmp, {"/chore": {"fail_first": 1, "failure": failure}}):
+                first = agent.prompt_claude_code(make_request(tmp, "/chore fake1234 issue"))
+                second = agent.prompt_claude_code(make_request(tmp, "/chore fake1234 issue"))
+
+        assert not first.success, failure
+        assert first.retry_code == retry_code, f"{failure}: {first.retry_code}"
+        assert second.success, f"{failure} should only fail the first call"
+        print(f"  {failure} -> {retry_code.value}")
+
+    print("✅ Failures mapped to retry codes")
+
+
+def main():
+    """Run all tests."""
+    print("ADW Fake Claude Tests")
+    print("=" * 50)
+
+    test_success_output()
+    test_edits_written()
+    test_failure_retry_codes()
+
+    print("\n" + "=" * 50)
+    print("✅ All tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""Test flakiness scoring and quarantine from the persistent test history."""
+
+import sys
+import os
+import logging
+import tempfile
+import subprocess
+from datetime import datetime
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import adw_test_iso
+from adw_modules import test_history
+from adw_modules.data_types import E2ETestResult, TestResult, TestRunRecord
+
+
+def make_records(outcomes, states=None):
+    """Build history records from pass/fail booleans and (commit, tree) states."""
+    states = states or [(None, None)] * len(outcomes)
+    return [
+        TestRunRecord(
+            test_name="test_example",
+            kind="unit",
+            passed=passed,
+            commit=commit,
+            tree=tree,
+            adw_id="test1234",
+            timestamp=datetime.now().isoformat(),
+        )
+        for passed, (commit, tree) in zip(outcomes, states)
+    ]
+
+
+def test_flakiness_score():
+    """Stable tests score 0, alternating tests score 1."""
+    print("Testing flakiness_score...")
+
+    assert test_history.flakiness_score(make_records([True] * 5)) == 0.0
+    assert test_history.flakiness_score(make_records([False] * 5)) == 0.0
+    assert test_history.flakiness_score(make_records([True, False] * 3)) == 1.0
+    # Too little history is never scored as flaky
+    assert test_history.flakiness_score(make_records([True, False])) == 0.0
+
+    print("✅ flakiness_score behaves as expected")
+
+
+def test_fixed_regression_is_not_flaky():
+    """Fail, fix, pass across code changes never reaches quarantine."""
+    print("\nTesting fixed regressions...")
+
+    # Breaks at c2, the resolver edits the tree, the fix is committed as c3
+    outcomes = [True, True, False, True, True, True]
+    states = [("c1", None), ("c1", None), ("c2", None), ("c2", "fix"), ("c2", "fix"), ("c3", None)]
+    assert test_history.flakiness_score(make_records(outcomes, states)) == 0.0
+    assert test_history.flakiness_score(
+        make_records([True, False, True], [("c1", None), ("c2", None), ("c2", "fix")])
+    ) == 0.0
+
+    # Flipping with the code unchanged still counts, including the retry
+    flaky = [("c1", None)] * 2 + [("c2", None)] * 2
+    assert test_history.flakiness_score(make_records([True, False, False, True], flaky)) == 1.0
+
+    print("✅ Only runs of the same code are compared")
+
+
+def test_tree_state():
+    """Uncommitted and untracked changes give a tree hash; a clean tree none."""
+    print("\nTesting working tree state...")
+
+    with tempfile.TemporaryDirectory() as repo:
+        git = ["git", "-c", "user.name=t", "-c", "user.email=t@t", "-C", repo]
+        subprocess.run(["git", "init", "-q", repo], check=True)
+        with open(os.path.join(repo, "app.py"), "w") as f:
+            f.write("x = 1\n")
+        subprocess.run(git + ["add", "."], check=True)
+        subprocess.run(git + ["commit", "-qm", "init"], check=True)
+
+        clean = test_history.get_tree_state(repo)
+        with open(os.path.join(repo, "app.py"), "w") as f:
+            f.write("x = 2\n")
+        edited = test_history.get_tree_state(repo)
+        with open(os.path.join(repo, "new.py"), "w") as f:
+            f.write("y = 1\n")
+        untracked = test_history.get_tree_state(repo)
+
+    assert clean is None
+    assert edited and untracked and edited != untracked
+
+    print("✅ Tree state tracks uncommitted changes")
+
+
+def test_history_round_trip_and_quarantine():
+    """Recorded results feed scores and the automatic quarantine list."""
+    print("\nTesting history recording and quarantine...")
+
+    original_agents_dir = test_history.get_agents_dir
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        test_history.get_agents_dir = lambda: tmp_dir
+        try:
+            for passed in [True, False, True, False, True]:
+                flaky = TestResult(
+                    test_name="test_flaky",
+                    passed=passed,
+                    execution_command="true",
+                    test_purpose="flaky",
+                )
+                stable = TestResult(
+                    test_name="test_stable",
+                    passed=True,
+                    execution_command="true",
+                    test_purpose="stable",
+                )
+                test_history.record_test_results(
+                    [flaky, stable], "test1234", "unit", tmp_dir
+                )
+
+            scores = test_history.get_flakiness_scores("unit")
+            assert scores["test_flaky"] == 1.0
+            assert scores["test_stable"] == 0.0
+            assert test_history.get_quarantined_tests("unit") == {"test_flaky"}
+            assert test_history.get_quarantined_tests("e2e") == set()
+        finally:
+            test_history.get_agents_dir = original_agents_dir
+
+    print("✅ History drives scores and quarantine")
+
+
+def test_retry_flaky_test():
+    """A cheap retry uses the test's own execution command."""
+    print("\nTesting retry_flaky_test...")
+
+    failing = TestResult(
+        test_name="test_retry",
+        passed=False,
+        execution_command="exit 0",
+        test_purpose="retry",
+        error="boom",
+    )
+    retried = test_history.retry_flaky_test(failing)
+    assert retried.passed
+    assert retried.error is None
+    assert retried.duration_ms is not None
+
+    print("✅ Suspected flake retried without an agent")
+
+
+def test_quarantined_results_counted_apart():
+    """Quarantined failures are neither passed nor failed in every report."""
+    print("\nTesting quarantined result counts...")
+
+    logger = logging.getLogger("test_flaky_detection")
+    results = [
+        TestResult(test_name=name, passed=passed, execution_command="true", test_purpose="x")
+        for name, passed in [("test_ok", True), ("test_broken", False), ("test_flaky", False)]
+    ]
+    results, quarantined = adw_test_iso.mark_quarantined(results, {"test_flaky", "test_ok"}, logger)
+    e2e_results, _ = adw_test_iso.mark_quarantined(
+        [E2ETestResult(test_name="e2e_flaky", status="failed", test_path="flaky.md")],
+        {"e2e_flaky"},
+        logger,
+    )
+
+    assert quarantined == ["test_flaky"]
+    assert adw_test_iso.count_test_results(results) == (1, 1, 1)
+    assert adw_test_iso.count_test_results(e2e_results) == (0, 0, 1)
+
+    comment = adw_test_iso.format_test_results_comment(results, 1, 1)
+    assert "## ⚠️ Quarantined Tests" in comment
+    assert "- **Failed**: 1" in comment and "- **Quarantined**: 1" in comment
+
+    posted = []
+    original_comment = adw_test_iso.make_issue_comment
+    adw_test_iso.make_issue_comment = lambda issue, body: posted.append(body)
+    try:
+        adw_test_iso.post_comprehensive_test_summary("1", "test1234", results, e2e_results, logger)
+    finally:
+        adw_test_iso.make_issue_comment = original_comment
+
+    summary = posted[0]
+    assert "- ❌ test_broken" in summary and "- ⚠️ test_flaky" in summary
+    assert "- ⚠️ e2e_flaky" in summary and "- ❌ e2e_flaky" not in summary
+    assert "Total failures: 1" in summary
+
+    print("✅ Quarantined tests reported separately")
+
+
+def main():
+    """Run all tests."""
+    print("ADW Flaky Test Detection Tests")
+    print("=" * 50)
+
+    test_flakiness_score()
+    test_fixed_regression_is_not_flaky()
+    test_tree_state()
+    test_history_round_trip_and_quarantine()
+    test_retry_flaky_test()
+    test_quarantined_results_counted_apart()
+
+    print("\n" + "=" * 50)
+    print("✅ All tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
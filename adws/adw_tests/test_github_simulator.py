@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""Test github.py and the gh shim against the local GitHub simulator."""
+
+import sys
+import os
+import hmac
+import json
+import hashlib
+import tempfile
+import subprocess
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adw_modules import metrics
+from adw_modules.github import fetch_issue, fetch_issue_comments, fetch_open_issues
+from adw_modules.tracing import EXPORTER_ENV
+from adw_tests.github_simulator import GitHubSimulator
+
+REPO = "sim-org/sim-repo"
+
+
+@contextmanager
+def simulator_on_path(simulator: GitHubSimulator):
+    """Start the simulator and put its gh shim first on PATH."""
+    saved = {key: os.environ.get(key) for key in ("PATH", EXPORTER_ENV)}
+    # gh metrics would otherwise be dumped to the project's agents/metrics/ at exit
+    gh_metrics = [metrics.GH_REQUEST_DURATION, metrics.GH_ERRORS]
+    saved_metrics = [dict(metric.values) for metric in gh_metrics]
+    with simulator, tempfile.TemporaryDirectory() as tmp:
+        shim_dir = simulator.write_gh_shim(tmp)
+        os.environ["PATH"] = shim_dir + os.pathsep + os.environ.get("PATH", "")
+        # Keep gh spans out of the project's agents/traces/
+        os.environ[EXPORTER_ENV] = "none"
+        try:
+            yield
+        finally:
+            for metric, values in zip(gh_metrics, saved_metrics):
+                metric.values = values
+            for key, value in saved.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+
+
+def gh(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(["gh", *args], capture_output=True, text=True)
+
+
+def test_issue_reads():
+    """github.py parses issues and comments served through the shim."""
+    print("Testing issue reads...")
+
+    simulator = GitHubSimulator(repo=REPO)
+    simulator.seed_issues(250, comments_per_issue=2, triggering=1)
+    with simulator_on_path(simulator):
+        issues = fetch_open_issues(REPO)
+        issue = fetch_issue("250", REPO)
+        comments = fetch_issue_comments(REPO, 250)
+
+    # Paged 100 at a time, newest first
+    assert len(issues) == 250 and issues[0].number == 250
+    assert issue.author.login == "octocat" and issue.state == "OPEN"
+    assert [comment.body for comment in issue.comments] == ["Comment 1", "Comment 2", "adw"]
+    assert comments[-1]["body"] == "adw"
+    assert simulator.requests["list_issues"] == 3
+
+    print(f"✅ Read {len(issues)} issues in {simulator.total_requests} requests")
+
+
+def test_writes_and_pull_requests():
+    """Comments, labels, assignees, reviews and merges update the simulator."""
+    print("\nTesting writes and pull requests...")
+
+    simulator = GitHubSimulator(repo=REPO)
+    number = simulator.add_issue("Add export", "adw_plan_iso")
+    with simulator_on_path(simulator):
+        assert gh("issue", "comment", str(number), "-R", REPO, "--body", "hello").returncode == 0
+        assert gh("issue", "edit", str(number), "-R", REPO, "--add-label", "in_progress").returncode == 0
+        assert gh("issue", "edit", str(number), "-R", REPO, "--add-assignee", "@me").returncode == 0
+
+        url = gh("pr", "create", "-R", REPO, "--title", "Export", "--head", "feat-export").stdout.strip()
+        pr_number = url.rsplit("/", 1)[1]
+        listed = json.loads(gh("pr", "list", "--repo", REPO, "--head", "feat-export", "--json", "number").stdout)
+        status = json.loads(gh("pr", "view", pr_number, "--repo", REPO, "--json", "mergeable,mergeStateStatus").stdout)
+        assert gh("pr", "review", pr_number, "--repo", REPO, "--approve", "--body", "ok").returncode == 0
+        assert gh("pr", "merge", pr_number, "--repo", REPO, "--squash", "--body", "done").returncode == 0
+        again = gh("pr", "merge", pr_number, "--repo", REPO, "--squash")
+
+    issue = simulator.issues[number]
+    assert simulator.comments[number][0]["body"] == "hello"
+    assert [label["name"] for label in issue["labels"]] == ["in_progress"]
+    assert issue["assignees"][0]["login"] == "adw-bot"
+    assert listed == [{"number": int(pr_number)}]
+    assert status == {"mergeable": "MERGEABLE", "mergeStateStatus": "CLEAN"}
+    assert simulator.pulls[int(pr_number)]["merge_method"] == "squash"
+    assert again.returncode == 1 and "not mergeable" in again.stderr
+
+    print("✅ Writes applied")
+
+
+def test_rate_limit():
+    """Requests past the limit get GitHub's 403 with rate-limit headers."""
+    print("\nTesting rate limiting...")
+
+    simulator = GitHubSimulator(repo=REPO, rate_limit=2)
+    simulator.seed_issues(5)
+    with simulator_on_path(simulator):
+        assert gh("issue", "view", "1", "-R", REPO, "--json", "number").returncode == 0
+        assert gh("issue", "view", "2", "-R", REPO, "--json", "number").returncode == 0
+        limited = gh("issue", "view", "3", "-R", REPO, "--json", "number")
+        status, payload, headers = simulator.handle("GET", "/rate_limit", None)
+
+    assert limited.returncode == 1 and "rate limit exceeded" in limited.stderr
+    assert status == 403 and headers["X-RateLimit-Remaining"] == "0"
+
+    print("✅ Rate limit enforced")
+
+
+def test_webhook_emission():
+    """Comments are delivered as signed issue_comment webhooks."""
+    print("\nTesting webhook emission...")
+
+    received = []
+
+    class Receiver(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            received.append(({k.lower(): v for k, v in self.headers.items()}, body))
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Receiver)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        simulator = GitHubSimulator(
+            repo=REPO,
+            webhook_url=f"http://127.0.0.1:{server.server_address[1]}/gh-webhook",
+            webhook_secret="s3cret",
+        )
+        number = simulator.add_issue("Bug")
+        simulator.add_comment(number, "adw_plan_iso")
+        simulator.wait_for_deliveries(timeout=10)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert len(received) == 1 and simulator.deliveries[0]["status"] == 200
+    headers, body = received[0]
+    assert headers["x-github-event"] == "issue_comment"
+    expected = "sha256=" + hmac.new(b"s3cret", body, hashlib.sha256).hexdigest()
+    assert headers["x-hub-signature-256"] == expected
+    payload = json.loads(body)
+    assert payload["action"] == "created" and payload["comment"]["body"] == "adw_plan_iso"
+
+    print("✅ Webhook delivered and signed")
+
+
+def main():
+    """Run all tests."""
+    print("ADW GitHub Simulator Tests")
+    print("=" * 50)
+
+    test_issue_reads()
+    test_writes_and_pull_requests()
+    test_rate_limit()
+    test_webhook_emission()
+
+    print("\n" + "=" * 50)
+    print("✅ All tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""Test cached background health checks and the deep check cache."""
+
+import sys
+import os
+import io
+import json
+import time
+import importlib.util
+from contextlib import redirect_stdout
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adw_modules.data_types import CheckResult, HealthCheckResult
+from adw_modules.health import HealthMonitor, aggregate_checks, run_checks_parallel
+
+
+def test_ttl_cache():
+    """Checks only re-run once their TTL has expired."""
+    print("Testing per-check TTL cache...")
+
+    calls = {"fast": 0, "slow": 0}
+
+    def fast():
+        calls["fast"] += 1
+        return CheckResult(success=True)
+
+    def slow():
+        calls["slow"] += 1
+        return CheckResult(success=True, warning="still on the default remote")
+
+    monitor = HealthMonitor(checks={"fast": fast, "slow": slow}, ttls={"fast": 0, "slow": 60})
+    assert not monitor.is_ready(), "Checks that never ran must not report ready"
+
+    monitor.refresh()
+    monitor.refresh()
+    assert calls == {"fast": 2, "slow": 1}
+
+    snapshot = monitor.snapshot()
+    assert snapshot.success
+    assert snapshot.warnings == ["still on the default remote"]
+    assert snapshot.checks["fast"].checked_at is not None
+    assert snapshot.checks["fast"].duration_ms is not None
+
+    print("✅ TTLs respected")
+
+
+def test_failing_check_not_ready():
+    """A raising or failing check makes the monitor unready."""
+    print("\nTesting failing checks...")
+
+    def broken():
+        raise RuntimeError("gh exploded")
+
+    monitor = HealthMonitor(checks={"broken": broken})
+    monitor.refresh()
+    snapshot = monitor.snapshot()
+
+    assert not monitor.is_ready()
+    assert snapshot.errors == ["broken failed: gh exploded"]
+
+    result = aggregate_checks(
+        {
+            "environment": CheckResult(
+                success=False,
+                error="Missing required environment variables",
+                details={"missing_required": ["ANTHROPIC_API_KEY"]},
+            ),
+            "claude_code": CheckResult(success=False, details={"skipped": True}),
+        }
+    )
+    assert result.errors == [
+        "Missing required environment variables",
+        "Missing required env var: ANTHROPIC_API_KEY",
+    ]
+
+    print("✅ Failures reported")
+
+
+def test_background_thread_and_deep_cache():
+    """The monitor refreshes on its own and the deep check is reused."""
+    print("\nTesting background refresh and deep check cache...")
+
+    deep_calls = []
+
+    def deep():
+        deep_calls.append(1)
+        return aggregate_checks({"claude_code": CheckResult(success=True)})
+
+    monitor = HealthMonitor(
+        checks={"ok": lambda: CheckResult(success=True)}, interval=0.05, deep_check=deep
+    )
+    monitor.start()
+    try:
+        deadline = time.time() + 2
+        while not monitor.is_ready() and time.time() < deadline:
+            time.sleep(0.05)
+        assert monitor.is_ready()
+    finally:
+        monitor.stop()
+
+    assert monitor.run_deep().success
+    monitor.run_deep()
+    assert len(deep_calls) == 1
+    monitor.run_deep(max_age=0)
+    assert len(deep_calls) == 2
+
+    print("✅ Background refresh and deep cache work")
+
+
+def test_parallel_checks_with_timeouts():
+    """Checks run concurrently and overrunning checks time out."""
+    print("\nTesting parallel checks with timeouts...")
+
+    def sleeper(seconds):
+        def check():
+            time.sleep(seconds)
+            return CheckResult(success=True)
+
+        return check
+
+    started = time.monotonic()
+    results = run_checks_parallel(
+        {"a": sleeper(0.3), "b": sleeper(0.3), "c": sleeper(0.3), "hung": sleeper(5)},
+        timeouts={"a": 2, "b": 2, "c": 2, "hung": 0.5},
+    )
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 1.5, f"Checks should overlap, took {elapsed:.2f}s"
+    assert list(results) == ["a", "b", "c", "hung"]
+    assert all(results[name].success for name in "abc")
+    assert not results["hung"].success
+    assert results["hung"].error == "hung check timed out after 0.5 seconds"
+
+    print("✅ Checks ran in parallel")
+
+
+def test_json_output_with_issue_comment():
+    """--json with an issue number prints only the result JSON on stdout."""
+    print("\nTesting --json with an issue comment...")
+
+    spec = importlib.util.spec_from_file_location(
+        "health_check", os.path.join(os.path.dirname(os.path.abspath(__file__)), "health_check.py")
+    )
+    health_check = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(health_check)
+
+    posted = []
+
+    def fake_comment(issue_id, text):
+        posted.append((issue_id, text))
+        print(f"Successfully posted comment to issue #{issue_id}")
+
+    health_check.run_health_check = lambda: HealthCheckResult(
+        success=True, timestamp="2025-01-01T00:00:00", checks={"git": CheckResult(success=True)}
+    )
+    health_check.make_issue_comment = fake_comment
+    health_check.load_env = lambda: None
+
+    saved_argv = sys.argv
+    sys.argv = ["health_check.py", "--json", "123"]
+    stdout = io.StringIO()
+    try:
+        with redirect_stdout(stdout):
+            health_check.main()
+    except SystemExit as e:
+        exit_code = e.code
+    finally:
+        sys.argv = saved_argv
+
+    assert exit_code == 0
+    assert posted and posted[0][0] == "123"
+    assert json.loads(stdout.getvalue())["success"] is True
+
+    print("✅ stdout parsed as JSON")
+
+
+def main():
+    """Run all tests."""
+    print("ADW Health Monitor Tests")
+    print("=" * 50)
+
+    test_ttl_cache()
+    test_failing_check_not_ready()
+    test_background_thread_and_deep_cache()
+    test_parallel_checks_with_timeouts()
+    test_json_output_with_issue_comment()
+
+    print("\n" + "=" * 50)
+    print("✅ All tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Audit phase-script startup with `python -X importtime`.
+
+Each phase script is imported in a fresh interpreter. The test fails when a
+script pulls in a module that should only load on use (boto3, urllib, ...)
+or when its import takes longer than the budget. Set ADW_IMPORT_BUDGET_MS
+to adjust the budget for slower machines.
+"""
+
+import sys
+import os
+import glob
+import subprocess
+from typing import Dict, List, Tuple
+
+# Add parent directory to path for imports
+ADWS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ADWS_DIR)
+
+# Cumulative import time of one phase script, best of IMPORT_ATTEMPTS runs
+IMPORT_BUDGET_MS = float(os.getenv("ADW_IMPORT_BUDGET_MS", "400"))
+IMPORT_ATTEMPTS = 3
+
+# Loaded on first use only (R2 uploads, OTLP export, profiling, triggers)
+LAZY_MODULES = [
+    "boto3", "botocore", "s3transfer", "urllib.request", "pstats", "fastapi", "uvicorn",
+    "asyncio", "claude_code_sdk", "dotenv",
+]
+
+
+def phase_scripts() -> List[str]:
+    return sorted(
+        os.path.splitext(os.path.basename(path))[0]
+        for path in glob.glob(os.path.join(ADWS_DIR, "adw_*_iso.py"))
+    )
+
+
+def import_profile(module: str) -> Tuple[float, Dict[str, float]]:
+    """(cumulative ms for module, cumulative ms per imported module)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=ADWS_DIR,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    imported = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            imported[name.strip()] = int(cumulative) / 1000
+    return imported[module], imported
+
+
+def test_lazy_modules_not_imported():
+    """Phase scripts start without boto3, urllib, pstats or the web stack."""
+    print("Testing lazily imported modules...")
+
+    for script in phase_scripts():
+        _, imported = import_profile(script)
+        eager = [
+            name for name in imported
+            if any(name == lazy or name.startswith(lazy + ".") for lazy in LAZY_MODULES)
+        ]
+        assert not eager, f"{script} imports {sorted(eager)[:5]} at startup"
+
+    print(f"✅ {len(phase_scripts())} scripts start without {', '.join(LAZY_MODULES)}")
+
+
+def test_import_budget():
+    """Each phase script imports within IMPORT_BUDGET_MS."""
+    print("\nTesting import time budget...")
+
+    slowest = (0.0, "")
+    for script in phase_scripts():
+        attempts = []
+        for _ in range(IMPORT_ATTEMPTS):
+            total, imported = import_profile(script)
+            attempts.append(total)
+            if total <= IMPORT_BUDGET_MS:
+                break
+        best = min(attempts)
+        heaviest = sorted(
+            (name for name in imported if "." not in name and name != script),
+            key=lambda name: -imported[name],
+        )[:5]
+        assert best <= IMPORT_BUDGET_MS, (
+            f"{script} imports in {best:.0f}ms (budget {IMPORT_BUDGET_MS:.0f}ms); heaviest: "
+            + ", ".join(f"{name} {imported[name]:.0f}ms" for name in heaviest)
+        )
+        slowest = max(slowest, (best, script))
+
+    print(f"✅ All within {IMPORT_BUDGET_MS:.0f}ms (slowest {slowest[1]} at {slowest[0]:.0f}ms)")
+
+
+def main():
+    """Run all tests."""
+    print("ADW Import Time Tests")
+    print("=" * 50)
+
+    test_lazy_modules_not_imported()
+    test_import_budget()
+
+    print("\n" + "=" * 50)
+    print("✅ All tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""Test the shared job queue's leases and the adw_queue_worker loop."""
+
+import sys
+import os
+import json
+import time
+import shutil
+import tempfile
+import threading
+import subprocess
+
+# Add parent directory to path for imports
+ADWS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ADWS_DIR)
+
+from adw_modules.job_queue import SQLiteJobQueue, get_job_queue
+from adw_modules.state import ADWState
+from adw_modules.utils import make_adw_id
+
+QUEUE_WORKER = os.path.join(ADWS_DIR, "adw_triggers", "adw_queue_worker.py")
+
+SLEEP_SCRIPT = """
+import sys, time
+time.sleep(float(sys.argv[-1]))
+"""
+
+ECHO_SCRIPT = """
+import sys
+print("args", *sys.argv[1:])
+sys.exit(int(sys.argv[-1]))
+"""
+
+
+def test_claim_heartbeat_complete():
+    """Jobs are claimed oldest first and only the lease holder can renew or finish them."""
+    print("Testing claims and leases...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = get_job_queue(f"sqlite://{tmp}/queue.db")
+        first = queue.enqueue("adw_plan_iso", "1", "aaaa1111", state={"model_set": "heavy"})
+        queue.enqueue("adw_plan_iso", "2", "bbbb2222", args=["--flag"])
+        assert queue.depth() == 2
+
+        job = queue.claim("host-a:1")
+        assert (job.id, job.status, job.attempts) == (first, "running", 1)
+        assert job.state == {"model_set": "heavy"}
+        assert queue.depth() == 1
+        assert queue.heartbeat(job.id, "host-a:1")
+        assert not queue.heartbeat(job.id, "host-b:1")
+        assert not queue.complete(job.id, "host-b:1", 0)
+
+        assert queue.complete(job.id, "host-a:1", 0, result={"artifacts_synced": 3})
+        done = queue.get(job.id)
+        assert (done.status, done.returncode, done.result) == ("succeeded", 0, {"artifacts_synced": 3})
+        assert done.lease_expires_at is None
+
+        second = queue.claim("host-a:1")
+        assert second.args == ["--flag"]
+        queue.complete(second.id, "host-a:1", 2, error="exited with 2")
+        assert [j.status for j in queue.list_jobs()] == ["failed", "succeeded"]
+        assert queue.claim("host-a:1") is None
+
+    print("✅ Leases held and released")
+
+
+def test_expired_leases_requeue():
+    """A job whose worker stops heartbeating goes to another worker, then fails after max_attempts."""
+    print("\nTesting expired leases...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = SQLiteJobQueue(os.path.join(tmp, "queue.db"))
+        job_id = queue.enqueue("adw_sdlc_iso", "7", "cccc3333", max_attempts=2)
+
+        assert queue.claim("host-a:1", lease_seconds=0.05).id == job_id
+        time.sleep(0.1)
+        taken_over = queue.claim("host-b:1", lease_seconds=0.05)
+        assert (taken_over.id, taken_over.attempts, taken_over.worker_id) == (job_id, 2, "host-b:1")
+        assert taken_over.error == "lease expired; requeued"
+        # The dead worker can no longer touch the job
+        assert not queue.heartbeat(job_id, "host-a:1")
+        assert not queue.complete(job_id, "host-a:1", 0)
+
+        time.sleep(0.1)
+        assert queue.claim("host-c:1") is None
+        failed = queue.get(job_id)
+        assert failed.status == "failed"
+        assert "last allowed attempt" in failed.error
+
+    print("✅ Requeued once, then failed")
+
+
+def test_concurrent_claims():
+    """Workers racing on the queue never claim the same job twice."""
+    print("\nTesting concurrent claims...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "queue.db")
+        queue = SQLiteJobQueue(path)
+        for issue in range(40):
+            queue.enqueue("adw_plan_iso", str(issue), make_adw_id())
+
+        claimed = []
+        lock = threading.Lock()
+
+        def worker(name: str):
+            own_queue = SQLiteJobQueue(path)
+            while True:
+                job = own_queue.claim(name)
+                if job is None:
+                    return
+                with lock:
+                    claimed.append(job.id)
+
+        threads = [threading.Thread(target=worker, args=(f"host-{i}:1",)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert sorted(claimed) == list(range(1, 41)), claimed
+    print(f"✅ {len(claimed)} jobs claimed once each by {len(threads)} workers")
+
+
+def test_queue_worker_runs_jobs():
+    """adw_queue_worker.py --once runs queued workflows, syncs agents/{adw_id} and records results."""
+    print("\nTesting adw_queue_worker...")
+
+    adw_ids = [make_adw_id() for _ in range(4)]
+    agents_dir = os.path.dirname(os.path.dirname(ADWState(adw_ids[0]).get_state_path()))
+    had_agents_dir = os.path.isdir(agents_dir)
+    with tempfile.TemporaryDirectory() as tmp:
+        scripts_dir = os.path.join(tmp, "adws")
+        os.makedirs(scripts_dir)
+        for workflow in ("adw_echo_iso", "adw_build_iso"):
+            with open(os.path.join(scripts_dir, f"{workflow}.py"), "w") as f:
+                f.write(ECHO_SCRIPT)
+        # State another host synced for adw_ids[2]
+        remote_run = os.path.join(tmp, "store", "adw-test", "runs", adw_ids[2])
+        os.makedirs(remote_run)
+        with open(os.path.join(remote_run, "adw_state.json"), "w") as f:
+            json.dump({"adw_id": adw_ids[2], "issue_number": "8", "issue_class": "/bug"}, f)
+
+        queue_url = f"sqlite://{tmp}/queue.db"
+        queue = get_job_queue(queue_url)
+        ok = queue.enqueue("adw_echo_iso", "5", adw_ids[0], args=["0"], state={"model_set": "heavy"})
+        failing = queue.enqueue("adw_echo_iso", "6", adw_ids[1], args=["3"])
+        unknown = queue.enqueue("not_a_workflow", "7", make_adw_id())
+        pulled = queue.enqueue("adw_echo_iso", "8", adw_ids[2], args=["0"])
+        # A follow-up workflow with no state anywhere has no worktree to run in
+        orphan = queue.enqueue("adw_build_iso", "9", adw_ids[3], args=["0"])
+
+        env = dict(
+            os.environ,
+            ADW_WORKER="off",
+            ADW_STORAGE_BACKEND="local",
+            ADW_LOCAL_STORAGE_DIR=os.path.join(tmp, "store"),
+            CLOUDFLARE_R2_BUCKET_NAME="adw-test",
+            ADW_TRACE_EXPORTER="none",
+        )
+        try:
+            result = subprocess.run(
+                [sys.executable, QUEUE_WORKER, "--queue-url", queue_url, "--scripts-dir", scripts_dir,
+                 "--once", "--poll-interval", "0.1", "--worker-id", "test-host:1"],
+                capture_output=True, text=True, env=env, timeout=120,
+            )
+            synced = [
+                os.path.relpath(os.path.join(root, name), os.path.join(tmp, "store"))
+                for root, _, files in os.walk(os.path.join(tmp, "store"))
+                for name in files
+            ]
+        finally:
+            for adw_id in adw_ids:
+                shutil.rmtree(os.path.join(agents_dir, adw_id), ignore_errors=True)
+            if not had_agents_dir:
+                shutil.rmtree(agents_dir, ignore_errors=True)
+
+        assert result.returncode == 0, result.stderr
+        jobs = {job.id: job for job in queue.list_jobs()}
+        assert queue.depth() == 0
+
+    assert (jobs[ok].status, jobs[ok].returncode) == ("succeeded", 0)
+    assert jobs[ok].result["state"]["model_set"] == "heavy"
+    assert jobs[ok].result["artifacts_synced"] >= 1
+    assert any(path.endswith(f"runs/{adw_ids[0]}/adw_state.json") for path in synced), synced
+    assert (jobs[failing].status, jobs[failing].returncode) == ("failed", 3)
+    assert jobs[unknown].error == "Unknown workflow: not_a_workflow"
+    assert (jobs[pulled].status, jobs[pulled].result["state"]["issue_class"]) == ("succeeded", "/bug")
+    assert jobs[orphan].status == "failed" and jobs[orphan].returncode == 1
+    assert jobs[orphan].error == f"No state for {adw_ids[3]} on this host or in the store"
+
+    print(f"✅ Ran {len(jobs)} jobs and synced {len(synced)} files")
+
+
+def run_job_directly(queue, job, scripts_dir: str, lease_seconds: float) -> float:
+    """Run adw_queue_worker.run_job in-process with the local worker off; returns seconds."""
+    from adw_triggers import adw_queue_worker
+
+    saved = os.environ.get("ADW_WORKER")
+    os.environ["ADW_WORKER"] = "off"
+    agents_dir = os.path.dirname(os.path.dirname(ADWState(job.adw_id).get_state_path()))
+    had_agents_dir = os.path.isdir(agents_dir)
+    started = time.monotonic()
+    try:
+        adw_queue_worker.run_job(queue, job, "host-a:1", scripts_dir, lease_seconds)
+    finally:
+        shutil.rmtree(os.path.join(agents_dir, job.adw_id), ignore_errors=True)
+        if not had_agents_dir:
+            shutil.rmtree(agents_dir, ignore_errors=True)
+        if saved is None:
+            os.environ.pop("ADW_WORKER", None)
+        else:
+            os.environ["ADW_WORKER"] = saved
+    return time.monotonic() - started
+
+
+def test_lease_held_for_whole_job():
+    """The lease is renewed while state is pulled, not just while the workflow runs."""
+    print("\nTesting leases across job setup...")
+
+    from adw_triggers import adw_queue_worker
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, "adw_echo_iso.py"), "w") as f:
+            f.write(ECHO_SCRIPT)
+        queue = SQLiteJobQueue(os.path.join(tmp, "queue.db"))
+        job_id = queue.enqueue("adw_echo_iso", "5", make_adw_id(), args=["0"])
+        job = queue.claim("host-a:1", lease_seconds=0.3)
+
+        # A slow pull (or worktree restore) outlasting several leases
+        stolen = []
+        original_pull = adw_queue_worker.pull_state
+
+        def slow_pull(adw_id):
+            for _ in range(4):
+                time.sleep(0.3)
+                stolen.append(queue.claim("host-b:1", lease_seconds=0.3))
+            return 0
+
+        adw_queue_worker.pull_state = slow_pull
+        try:
+            run_job_directly(queue, job, tmp, lease_seconds=0.3)
+        finally:
+            adw_queue_worker.pull_state = original_pull
+        done = {j.id: j for j in queue.list_jobs()}[job_id]
+
+    assert stolen == [None] * 4
+    assert (done.status, done.worker_id) == ("succeeded", "host-a:1")
+
+    print("✅ Lease held through a slow pull")
+
+
+def test_lost_lease_aborts_run():
+    """A failed heartbeat kills the workflow and leaves the job to its new owner."""
+    print("\nTesting lost leases...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, "adw_sleep_iso.py"), "w") as f:
+            f.write(SLEEP_SCRIPT)
+        queue = SQLiteJobQueue(os.path.join(tmp, "queue.db"))
+        job_id = queue.enqueue("adw_sleep_iso", "5", make_adw_id(), args=["30"])
+        job = queue.claim("host-a:1", lease_seconds=0.3)
+        # Another worker takes the job over once host-a's lease lapses
+        time.sleep(0.4)
+        assert queue.claim("host-b:1", lease_seconds=60).id == job_id
+
+        seconds = run_job_directly(queue, job, tmp, lease_seconds=0.3)
+        taken_over = {j.id: j for j in queue.list_jobs()}[job_id]
+
+    assert seconds < 10, seconds
+    assert (taken_over.status, taken_over.worker_id) == ("running", "host-b:1")
+
+    print(f"✅ Run abandoned after {seconds:.1f}s")
+
+
+def main():
+    """Run all tests."""
+    print("ADW Job Queue Tests")
+    print("=" * 50)
+
+    test_claim_heartbeat_complete()
+    test_expired_leases_requeue()
+    test_concurrent_claims()
+    test_lease_held_for_whole_job()
+    test_lost_lease_aborts_run()
+    test_queue_worker_runs_jobs()
+
+    print("\n" + "=" * 50)
+    print("✅ All tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
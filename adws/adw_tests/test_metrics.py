@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Test the Prometheus metrics registry and cross-process merging."""
+
+import sys
+import os
+import json
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adw_modules import metrics
+from adw_modules.metrics import Counter, Histogram, Registry
+
+
+def test_render_prometheus_text():
+    """Counters and histograms render in the exposition format."""
+    print("Testing Prometheus rendering...")
+
+    registry = Registry()
+    retries = registry.register(Counter("adw_test_retries_total", "Retries", ["retry_code"]))
+    latency = registry.register(
+        Histogram("adw_test_duration_seconds", "Latency", ["command"], buckets=(1, 10))
+    )
+    retries.inc(retry_code="rate_limit_error")
+    retries.inc(retry_code="rate_limit_error")
+    latency.observe(0.5, command="issue")
+    latency.observe(5, command="issue")
+    latency.observe(50, command="issue")
+
+    text = registry.render()
+    assert "# TYPE adw_test_retries_total counter" in text
+    assert 'adw_test_retries_total{retry_code="rate_limit_error"} 2.0' in text
+    assert 'adw_test_duration_seconds_bucket{command="issue",le="1"} 1' in text
+    assert 'adw_test_duration_seconds_bucket{command="issue",le="10"} 2' in text
+    assert 'adw_test_duration_seconds_bucket{command="issue",le="+Inf"} 3' in text
+    assert 'adw_test_duration_seconds_count{command="issue"} 3' in text
+
+    print("✅ Exposition format correct")
+
+
+def test_merge_process_dumps():
+    """Dumps of exited processes are archived and still counted."""
+    print("\nTesting cross-process merge...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        original_dir = metrics.get_metrics_dir
+        metrics.get_metrics_dir = lambda: tmp
+        try:
+            # A phase process that has exited
+            dead_pid = 2**22 + 12345
+            with open(os.path.join(tmp, f"{dead_pid}.json"), "w") as f:
+                json.dump(
+                    {"adw_agent_retries_total": {json.dumps(["timeout_error"]): 3.0}}, f
+                )
+
+            for _ in range(2):  # Second scrape reads from the archive
+                text = metrics.render_all()
+                assert 'adw_agent_retries_total{retry_code="timeout_error"} 3.0' in text
+
+            assert os.listdir(tmp) == [metrics.ARCHIVE_FILENAME]
+        finally:
+            metrics.get_metrics_dir = original_dir
+
+    print("✅ Process dumps merged")
+
+
+def test_concurrent_scrapes_fold_once():
+    """Concurrent scrapes never fold a dead process' dump twice."""
+    print("\nTesting concurrent folding...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        original_dir = metrics.get_metrics_dir
+        metrics.get_metrics_dir = lambda: tmp
+        try:
+            for i in range(20):
+                with open(os.path.join(tmp, f"{2**22 + 20000 + i}.json"), "w") as f:
+                    json.dump({"adw_agent_retries_total": {json.dumps(["timeout_error"]): 1.0}}, f)
+            # Left behind by a scrape that died mid-fold
+            with open(os.path.join(tmp, f"{2**22 + 30000}.json.folding"), "w") as f:
+                json.dump({"adw_agent_retries_total": {json.dumps(["timeout_error"]): 1.0}}, f)
+
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                list(pool.map(lambda _: metrics.render_all(), range(16)))
+
+            with open(os.path.join(tmp, metrics.ARCHIVE_FILENAME)) as f:
+                archive = json.load(f)
+            assert archive["adw_agent_retries_total"] == {json.dumps(["timeout_error"]): 21.0}, archive
+            assert os.listdir(tmp) == [metrics.ARCHIVE_FILENAME]
+        finally:
+            metrics.get_metrics_dir = original_dir
+
+    print("✅ Each dump folded exactly once")
+
+
+def main():
+    """Run all tests."""
+    print("ADW Metrics Tests")
+    print("=" * 50)
+
+    test_render_prometheus_text()
+    test_merge_process_dumps()
+    test_concurrent_scrapes_fold_once()
+
+    print("\n" + "=" * 50)
+    print("✅ All tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Test cost- and latency-aware model routing."""
+
+import sys
+import os
+import json
+import tempfile
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adw_modules.data_types import AgentCallRecord
+from adw_modules import model_router
+from adw_modules.model_router import fingerprint_args, load_recent_records, route_model
+
+RESOLVE_CONFIG = {"base": "sonnet", "heavy": "opus"}
+
+
+def make_record(
+    adw_id: str,
+    model: str,
+    fingerprint: str,
+    success: bool = True,
+    cost: float = 0.1,
+    duration_ms: int = 60000,
+) -> AgentCallRecord:
+    """Build a /resolve_failed_test ledger record."""
+    return AgentCallRecord(
+        timestamp="2025-01-01T00:00:00",
+        adw_id=adw_id,
+        phase="adw_test_iso",
+        agent_name="test_resolver_iter1_0",
+        slash_command="/resolve_failed_test",
+        model=model,
+        input_fingerprint=fingerprint,
+        success=success,
+        total_cost_usd=cost,
+        duration_ms=duration_ms,
+    )
+
+
+def route(records, fingerprint="fp", model_set="base", static="sonnet"):
+    """Route a /resolve_failed_test call for ADW 'current'."""
+    return route_model(
+        adw_id="current",
+        slash_command="/resolve_failed_test",
+        input_fingerprint=fingerprint,
+        model_set=model_set,
+        model_config=RESOLVE_CONFIG,
+        static_model=static,
+        records=records,
+    )
+
+
+def test_fingerprint_args():
+    """Failing-test payloads are keyed by test names, not error text."""
+    print("Testing fingerprint_args...")
+
+    first = json.dumps({"test_name": "test_login", "error": "assert 1 == 2"})
+    second = json.dumps({"test_name": "test_login", "error": "assert 1 == 3"})
+    other = json.dumps({"test_name": "test_logout", "error": "assert 1 == 2"})
+    command = "/resolve_failed_test"
+    assert fingerprint_args(command, [first]) == fingerprint_args(command, [second])
+    assert fingerprint_args(command, [first]) != fingerprint_args(command, [other])
+    assert fingerprint_args("/implement", ["plan.md"]) != fingerprint_args(
+        "/implement", ["other.md"]
+    )
+
+    print("✅ Fingerprints match on the same input")
+
+
+def test_escalates_after_cheap_attempt():
+    """A second run on the same input in the same ADW escalates to opus."""
+    print("\nTesting escalation...")
+
+    assert route([])[0] == "sonnet"
+
+    records = [make_record("current", "sonnet", "fp")]
+    model, reason = route(records)
+    assert model == "opus", reason
+    # Different input or another ADW doesn't escalate
+    assert route(records, fingerprint="other")[0] == "sonnet"
+    assert route([make_record("previous", "sonnet", "fp")])[0] == "sonnet"
+    # Heavy model set keeps the static map
+    assert route(records, model_set="heavy", static="opus")[0] == "opus"
+    # Settings are read per call, so .env values loaded after import apply
+    saved = os.environ.get("ADW_MODEL_ROUTER")
+    os.environ["ADW_MODEL_ROUTER"] = "false"
+    try:
+        assert route(records) == ("sonnet", "router disabled")
+    finally:
+        os.environ.pop("ADW_MODEL_ROUTER")
+        if saved is not None:
+            os.environ["ADW_MODEL_ROUTER"] = saved
+
+    print("✅ Escalation after failed cheap attempt")
+
+
+def test_history_prefers_strong_model():
+    """Opus goes first when sonnet rarely succeeds and escalation costs more."""
+    print("\nTesting history-based routing...")
+
+    records = []
+    for i in range(10):
+        # Every sonnet attempt was followed by a re-run in its ADW
+        records.append(make_record(f"adw{i}", "sonnet", "fp", cost=0.5))
+        records.append(make_record(f"adw{i}", "opus", "fp", cost=1.0))
+    model, reason = route(records, fingerprint="new")
+    assert model == "opus", reason
+
+    records = []
+    for i in range(10):
+        records.append(make_record(f"adw{i}", "sonnet", f"fp{i}", cost=0.2))
+        records.append(make_record(f"adw{i}", "opus", f"fp{i}b", cost=1.0))
+    assert route(records, fingerprint="new")[0] == "sonnet"
+
+    print("✅ History drives the starting model")
+
+
+def test_ledger_read_incrementally():
+    """Only appended lines are parsed, and only the tail is kept."""
+    print("\nTesting incremental ledger reads...")
+
+    def append(path, *chunks):
+        with open(path, "a") as f:
+            for chunk in chunks:
+                f.write(chunk)
+
+    line = lambda i: make_record(f"adw{i}", "sonnet", "fp").model_dump_json() + "\n"
+    original_tail = model_router.LEDGER_TAIL_RECORDS
+    model_router.LEDGER_TAIL_RECORDS = 3
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cost_ledger.jsonl")
+            assert load_recent_records(path) == []
+
+            append(path, line(0), line(1))
+            assert [r.adw_id for r in load_recent_records(path)] == ["adw0", "adw1"]
+
+            # A half-written line waits until the writer finishes it
+            partial = line(2)
+            append(path, partial[:20])
+            assert len(load_recent_records(path)) == 2
+            append(path, partial[20:], "not json\n", line(3))
+            assert [r.adw_id for r in load_recent_records(path)] == ["adw1", "adw2", "adw3"]
+
+            # The file is not re-parsed when nothing was appended
+            with open(path, "r+") as f:
+                f.seek(0)
+                f.write(" " * 10)
+            assert len(load_recent_records(path)) == 3
+
+            # A rotated ledger is read from the start
+            os.unlink(path)
+            append(path, line(9))
+            assert [r.adw_id for r in load_recent_records(path)] == ["adw9"]
+    finally:
+        model_router.LEDGER_TAIL_RECORDS = original_tail
+
+    print("✅ Ledger tail cached")
+
+
+def main():
+    """Run all tests."""
+    print("ADW Model Router Tests")
+    print("=" * 50)
+
+    test_fingerprint_args()
+    test_escalates_after_cheap_attempt()
+    test_history_prefers_strong_model()
+    test_ledger_read_incrementally()
+
+    print("\n" + "=" * 50)
+    print("✅ All tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Test that prompts reach the CLI over argv, stdin or a temp file."""
+
+import sys
+import os
+import json
+import tempfile
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adw_modules import agent
+from adw_modules.data_types import AgentPromptRequest
+from adw_modules.prompt_transport import (
+    ARGV_MAX_BYTES,
+    PIPE_MAX_BYTES,
+    PROMPT_TRANSPORT_ENV,
+    choose_transport,
+)
+from adw_modules.transcript import read_messages
+
+# Reports how the prompt arrived instead of running an agent
+ECHO_CLI = """#!/usr/bin/env python3
+import json, sys
+if "--version" in sys.argv:
+    print("1.0.0 (echo)")
+    sys.exit(0)
+i = sys.argv.index("-p")
+on_argv = i + 1 < len(sys.argv) and not sys.argv[i + 1].startswith("-")
+prompt = sys.argv[i + 1] if on_argv else sys.stdin.read()
+report = {"length": len(prompt), "on_argv": on_argv, "tail": prompt[-12:]}
+print(json.dumps({"type": "system", "subtype": "init", "session_id": "echo-1"}))
+print(json.dumps({"type": "result", "subtype": "success", "is_error": False,
+                  "result": json.dumps(report), "session_id": "echo-1"}))
+"""
+
+
+def run_prompt(tmp: str, prompt: str) -> dict:
+    """Run prompt through agent.run_claude_code with the echo CLI."""
+    cli = os.path.join(tmp, "echo_claude.py")
+    with open(cli, "w") as f:
+        f.write(ECHO_CLI)
+    os.chmod(cli, 0o755)
+
+    original_path = agent.CLAUDE_PATH
+    agent.CLAUDE_PATH = cli
+    try:
+        response = agent.run_claude_code(
+            AgentPromptRequest(
+                prompt=prompt,
+                adw_id="tran1234",
+                agent_name="tester",
+                model="sonnet",
+                output_file=os.path.join(tmp, "raw_output.jsonl"),
+                working_dir=tmp,
+                timeout_seconds=60,
+            )
+        )
+    finally:
+        agent.CLAUDE_PATH = original_path
+    assert response.success, response.output
+    return json.loads(response.output)
+
+
+def test_choose_by_size():
+    """Short prompts stay on argv; larger ones go over stdin, then a temp file."""
+    print("Testing transport selection...")
+
+    saved = os.environ.pop(PROMPT_TRANSPORT_ENV, None)
+    try:
+        assert choose_transport("/classify_issue 12") == "argv"
+        assert choose_transport("x" * (ARGV_MAX_BYTES + 1)) == "stdin"
+        assert choose_transport("x" * (PIPE_MAX_BYTES + 1)) == "file"
+        # Sizes are in bytes, not characters
+        assert choose_transport("é" * (ARGV_MAX_BYTES // 2 + 1)) == "stdin"
+        os.environ[PROMPT_TRANSPORT_ENV] = "file"
+        assert choose_transport("/commit") == "file"
+    finally:
+        os.environ.pop(PROMPT_TRANSPORT_ENV, None)
+        if saved is not None:
+            os.environ[PROMPT_TRANSPORT_ENV] = saved
+
+    print("✅ Transports chosen by size")
+
+
+def test_prompts_reach_the_cli():
+    """Each transport delivers the whole prompt, which the transcript also records."""
+    print("\nTesting prompt delivery...")
+
+    saved = os.environ.pop(PROMPT_TRANSPORT_ENV, None)
+    try:
+        results = {}
+        # 1 MiB is well past the kernel's 128 KiB limit for a single argument
+        for name, size in (("argv", 100), ("stdin", 20_000), ("file", 1024 * 1024)):
+            prompt = "/resolve_failed_test " + "t" * size + " end-of-prompt"
+            with tempfile.TemporaryDirectory() as tmp:
+                report = run_prompt(tmp, prompt)
+                first = read_messages(os.path.join(tmp, "raw_output.jsonl"))[0]
+            results[name] = (report, first, prompt)
+    finally:
+        if saved is not None:
+            os.environ[PROMPT_TRANSPORT_ENV] = saved
+
+    for name, (report, first, prompt) in results.items():
+        assert report["length"] == len(prompt), (name, report)
+        assert report["tail"] == prompt[-12:]
+        assert report["on_argv"] == (name == "argv")
+        assert (first["type"], first["transport"], first["prompt"]) == ("prompt", name, prompt)
+
+    print(f"✅ Delivered over {', '.join(results)}")
+
+
+def main():
+    """Run all tests."""
+    print("ADW Prompt Transport Tests")
+    print("=" * 50)
+
+    test_choose_by_size()
+    test_prompts_reach_the_cli()
+
+    print("\n" + "=" * 50)
+    print("✅ All tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
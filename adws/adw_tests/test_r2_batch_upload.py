@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""Test concurrent R2 batch uploads, retries and content dedup without a network."""
+
+import sys
+import os
+import time
+import logging
+import functools
+import tempfile
+from contextlib import contextmanager
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adw_modules import r2_uploader, screenshot_prep
+from adw_modules.r2_uploader import R2Uploader
+from adw_modules.storage_backends import LocalStorageClient, MemoryStorageClient
+from adw_modules.tracing import EXPORTER_ENV
+
+
+@contextmanager
+def traces_disabled():
+    """Keep upload spans out of the project's agents/traces/."""
+    previous = os.environ.get(EXPORTER_ENV)
+    os.environ[EXPORTER_ENV] = "none"
+    try:
+        yield
+    finally:
+        if previous is None:
+            os.environ.pop(EXPORTER_ENV, None)
+        else:
+            os.environ[EXPORTER_ENV] = previous
+
+
+def make_uploader(client: MemoryStorageClient, manifest_dir: str) -> R2Uploader:
+    uploader = R2Uploader(logging.getLogger("test_r2_batch_upload"), client, "bucket")
+    uploader.public_domain = "imgs.example.com"
+    uploader.manifest_path = os.path.join(manifest_dir, "r2_manifest.jsonl")
+    return uploader
+
+
+def write_file(directory: str, name: str, content: bytes) -> str:
+    path = os.path.join(directory, name)
+    with open(path, "wb") as f:
+        f.write(content)
+    return path
+
+
+@traces_disabled()
+def test_concurrent_batch():
+    """A batch takes about as long as one upload, not the sum."""
+    print("Testing concurrent batch upload...")
+
+    client = MemoryStorageClient(latency_ms=200)
+    with tempfile.TemporaryDirectory() as tmp:
+        uploader = make_uploader(client, tmp)
+        # Not images, so they are uploaded as-is
+        paths = [write_file(tmp, f"shot_{i}.bin", f"shot {i}".encode()) for i in range(20)]
+
+        started = time.monotonic()
+        urls = uploader.upload_screenshots(paths, "abc12345")
+        elapsed = time.monotonic() - started
+
+    assert client.uploads == 20
+    assert elapsed < 2.0, f"20 uploads of 0.2s took {elapsed:.2f}s"
+    assert all(url.startswith("https://imgs.example.com/adw/screenshots/") for url in urls.values())
+    obj = next(iter(client.objects.values()))
+    assert obj["extra_args"]["CacheControl"] == r2_uploader.IMMUTABLE_CACHE_CONTROL
+
+    print(f"✅ 20 uploads in {elapsed:.2f}s")
+
+
+@traces_disabled()
+def test_retries_and_fallback():
+    """Transient failures are retried; missing files keep their local path."""
+    print("\nTesting retries and fallback...")
+
+    original_delay = r2_uploader.UPLOAD_RETRY_BASE_DELAY
+    r2_uploader.UPLOAD_RETRY_BASE_DELAY = 0.01
+    try:
+        # Seed 4: the first attempt fails, the second succeeds
+        client = MemoryStorageClient(failure_rate=0.5, seed=4)
+        with tempfile.TemporaryDirectory() as tmp:
+            uploader = make_uploader(client, tmp)
+            path = write_file(tmp, "shot.bin", b"shot")
+            urls = uploader.upload_screenshots([path, "/missing/shot.png"], "abc12345")
+    finally:
+        r2_uploader.UPLOAD_RETRY_BASE_DELAY = original_delay
+
+    assert urls[path].startswith("https://imgs.example.com/")
+    assert (client.uploads, client.failures) == (2, 1)
+    assert urls["/missing/shot.png"] == "/missing/shot.png"
+
+    print("✅ Retried and fell back correctly")
+
+
+@traces_disabled()
+def test_content_dedup():
+    """Identical content maps to one key and is only uploaded once."""
+    print("\nTesting content-addressed dedup...")
+
+    client = MemoryStorageClient()
+    with tempfile.TemporaryDirectory() as tmp:
+        first = write_file(tmp, "attempt1.bin", b"same pixels")
+        second = write_file(tmp, "attempt2.bin", b"same pixels")
+        other = write_file(tmp, "other.bin", b"different pixels")
+
+        uploader = make_uploader(client, tmp)
+        url_1 = uploader.upload_screenshot(first)
+        url_2 = uploader.upload_screenshot(second)
+        assert url_1 == url_2
+        assert uploader.upload_screenshot(other) != url_1
+        assert client.uploads == 2
+
+        # A new process reads the manifest instead of uploading again
+        fresh = make_uploader(client, tmp)
+        assert fresh.upload_screenshot(first) == url_1
+        assert client.uploads == 2
+
+        # Objects uploaded elsewhere are found with a HEAD request
+        os.remove(fresh.manifest_path)
+        headless = make_uploader(client, tmp)
+        assert headless.upload_screenshot(other)
+        assert client.uploads == 2
+
+    print("✅ Duplicate content skipped")
+
+
+@traces_disabled()
+def test_local_backend():
+    """The local backend stores objects as files with file:// URLs."""
+    print("\nTesting local storage backend...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        uploader = make_uploader(LocalStorageClient(os.path.join(tmp, "store")), tmp)
+        path = write_file(tmp, "shot.bin", b"local pixels")
+        url = uploader.upload_screenshot(path)
+
+        assert url.startswith("file://")
+        with open(url[len("file://"):], "rb") as f:
+            assert f.read() == b"local pixels"
+        assert uploader.client.head_object(Bucket="bucket", Key=url.split("/bucket/")[1])
+
+    print("✅ Local backend stored the object")
+
+
+@traces_disabled()
+def test_download_prefix():
+    """Run artifacts uploaded under a prefix come back with their relative paths."""
+    print("\nTesting prefix download...")
+
+    for name, client_factory in (
+        ("memory", lambda tmp: MemoryStorageClient()),
+        ("local", lambda tmp: LocalStorageClient(os.path.join(tmp, "store"))),
+    ):
+        with tempfile.TemporaryDirectory() as tmp:
+            uploader = make_uploader(client_factory(tmp), tmp)
+            os.makedirs(os.path.join(tmp, "run", "planner"))
+            uploads = [
+                (write_file(os.path.join(tmp, "run"), "adw_state.json", b"{}"), "runs/abc/adw_state.json"),
+                (write_file(os.path.join(tmp, "run", "planner"), "raw.jsonl", b"x"), "runs/abc/planner/raw.jsonl"),
+                (write_file(tmp, "other.json", b"{}"), "runs/abcd/adw_state.json"),
+            ]
+            uploader.upload_files(uploads)
+
+            dest = os.path.join(tmp, "pulled")
+            assert uploader.download_prefix("runs/abc/", dest) == 2, name
+            pulled = sorted(
+                os.path.relpath(os.path.join(root, f), dest) for root, _, files in os.walk(dest) for f in files
+            )
+            assert pulled == ["adw_state.json", os.path.join("planner", "raw.jsonl")], (name, pulled)
+            assert uploader.download_prefix("runs/missing/", dest) == 0
+
+    print("✅ Prefix downloaded from memory and local backends")
+
+
+@traces_disabled()
+def test_fallback_keys_match_content():
+    """When WebP re-encoding fails, the PNG is uploaded as .png / image/png."""
+    print("\nTesting fallback keys...")
+
+    original = screenshot_prep._pillow_available
+    # Claims Pillow, but the encoder import fails as it would for a broken install
+    screenshot_prep._pillow_available = lambda: True
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = write_file(tmp, "shot.png", b"\x89PNG not really")
+            prepared = screenshot_prep.prepare_screenshot(path, fmt="webp")
+            planned = prepared.object_key
+            upload_path = screenshot_prep.compress(prepared, fmt="webp")
+
+            # Upload with ADW_SCREENSHOT_FORMAT=webp; the .png object already exists
+            client = MemoryStorageClient()
+            uploader = make_uploader(client, tmp)
+            client.objects[f"bucket/{prepared.object_key}"] = {"data": b"\x89PNG not really", "extra_args": {}}
+            r2_uploader.prepare_screenshot = functools.partial(screenshot_prep.prepare_screenshot, fmt="webp")
+            r2_uploader.compress = functools.partial(screenshot_prep.compress, fmt="webp")
+            url = uploader.upload_screenshot(path)
+            heads = client.heads
+    finally:
+        screenshot_prep._pillow_available = original
+        r2_uploader.prepare_screenshot = screenshot_prep.prepare_screenshot
+        r2_uploader.compress = screenshot_prep.compress
+
+    assert planned.endswith(f"/{prepared.digest}-q{screenshot_prep.get_webp_quality()}.webp")
+    assert upload_path == path
+    assert prepared.object_key.endswith(f"/{prepared.digest}.png")
+    assert prepared.content_type == "image/png"
+    # The fallback key is checked too, so the existing .png is reused
+    assert url.endswith(f"/{prepared.digest}.png") and client.uploads == 0 and heads == 2
+
+    print("✅ Fallback uploads keep the source's extension")
+
+
+@traces_disabled()
+def test_stand_in_manifest_kept_apart():
+    """Keys stored by a stand-in backend are not skipped after switching to R2."""
+    print("\nTesting backend switch...")
+
+    settings = {"ADW_STORAGE_BACKEND": "memory", "CLOUDFLARE_R2_BUCKET_NAME": "prod-bucket"}
+    saved_env = {name: os.environ.get(name) for name in settings}
+    original_path = r2_uploader.get_manifest_path
+    logger = logging.getLogger("test_r2_batch_upload")
+    with tempfile.TemporaryDirectory() as tmp:
+        r2_uploader.get_manifest_path = lambda backend="r2": os.path.join(
+            tmp, os.path.basename(original_path(backend))
+        )
+        os.environ.update(settings)
+        try:
+            stand_in = R2Uploader(logger)
+            path = write_file(tmp, "shot.bin", b"review pixels")
+            assert stand_in.upload_screenshot(path)
+
+            # Back on R2, with the same bucket name
+            os.environ["ADW_STORAGE_BACKEND"] = "r2"
+            real = R2Uploader(logger)
+            real.client, real.enabled, real.public_domain = MemoryStorageClient(), True, "imgs.example.com"
+            url = real.upload_screenshot(path)
+            uploads = real.client.uploads
+        finally:
+            r2_uploader.get_manifest_path = original_path
+            for name, value in saved_env.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+    assert stand_in.bucket_name == real.bucket_name == "prod-bucket"
+    assert os.path.basename(stand_in.manifest_path) == "r2_manifest.memory.jsonl"
+    assert os.path.basename(real.manifest_path) == "r2_manifest.jsonl"
+    assert url and uploads == 1
+
+    print("✅ Stand-in uploads don't count as uploaded to R2")
+
+
+def main():
+    """Run all tests."""
+    print("ADW R2 Batch Upload Tests")
+    print("=" * 50)
+
+    test_concurrent_batch()
+    test_retries_and_fallback()
+    test_content_dedup()
+    test_local_backend()
+    test_download_prefix()
+    test_fallback_keys_match_content()
+    test_stand_in_manifest_kept_apart()
+
+    print("\n" + "=" * 50)
+    print("✅ All tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
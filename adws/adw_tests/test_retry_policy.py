@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""Test retry classification, backoff, budgets and the circuit breaker."""
+
+import sys
+import os
+import tempfile
+from collections import Counter
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adw_modules import agent
+from adw_modules.data_types import AgentPromptRequest, RetryCode
+from adw_modules.retry_policy import (
+    RetryPolicy,
+    CircuitBreaker,
+    classify_failure,
+)
+
+
+def test_classify_failure():
+    """Throttling, non-transient and generic errors are told apart."""
+    print("Testing classify_failure...")
+
+    assert classify_failure("API Error: 429 rate_limit_error")[0] == RetryCode.RATE_LIMIT_ERROR
+    assert classify_failure('{"type":"overloaded_error"}')[0] == RetryCode.OVERLOADED_ERROR
+    assert classify_failure("error: unknown option '--bogus'")[0] == RetryCode.NONE
+    assert classify_failure("segfault")[0] == RetryCode.CLAUDE_CODE_ERROR
+    assert classify_failure("429 Too Many Requests, retry-after: 30") == (
+        RetryCode.RATE_LIMIT_ERROR,
+        30.0,
+    )
+
+    # Status codes count only where an error or status is being reported
+    assert classify_failure('API Error: 529 {"type":"error"}')[0] == RetryCode.OVERLOADED_ERROR
+    assert classify_failure("HTTP/1.1 503")[0] == RetryCode.OVERLOADED_ERROR
+    assert classify_failure('{"status_code": 429}')[0] == RetryCode.RATE_LIMIT_ERROR
+    assert classify_failure("Error: 401")[0] == RetryCode.NONE
+    for noise in (
+        "FAILED tests/test_api.py:429 - AssertionError: 503 != 200",
+        "expected 401 but got 200 in test_login",
+        "Processed 529 files, crashed on item 503",
+    ):
+        assert classify_failure(noise)[0] == RetryCode.CLAUDE_CODE_ERROR, noise
+
+    print("✅ Failures classified")
+
+
+def test_backoff_and_fixed_delays():
+    """Backoff grows exponentially; fixed delays are never mutated."""
+    print("\nTesting get_delay...")
+
+    policy = RetryPolicy(jitter=False)
+    delays = [policy.get_delay(RetryCode.CLAUDE_CODE_ERROR, n) for n in range(4)]
+    assert delays == [1.0, 2.0, 4.0, 8.0], delays
+    assert policy.get_delay(RetryCode.RATE_LIMIT_ERROR, 0) == 10.0
+    assert policy.get_delay(RetryCode.RATE_LIMIT_ERROR, 0, retry_after=3) == 3
+    # An hour-long Retry-After is capped at throttle_max_delay
+    assert policy.get_delay(RetryCode.RATE_LIMIT_ERROR, 0, retry_after=3600) == 120.0
+    assert 120.0 <= RetryPolicy().get_delay(RetryCode.OVERLOADED_ERROR, 0, retry_after=3600) <= 121.0
+
+    jittered = RetryPolicy()
+    for n in range(4):
+        delay = jittered.get_delay(RetryCode.CLAUDE_CODE_ERROR, n)
+        assert delays[n] / 2 <= delay <= delays[n]
+
+    caller_delays = [1, 3]
+    fixed = RetryPolicy(max_retries=4, fixed_delays=caller_delays)
+    assert [fixed.get_delay(RetryCode.CLAUDE_CODE_ERROR, n) for n in range(4)] == [1, 3, 5, 7]
+    assert caller_delays == [1, 3]
+
+    print("✅ Backoff delays correct")
+
+
+def test_budgets():
+    """Per-class budgets and max_retries bound the retries."""
+    print("\nTesting should_retry budgets...")
+
+    policy = RetryPolicy(max_retries=3)
+    attempts = Counter({RetryCode.TIMEOUT_ERROR: 1})
+    assert policy.should_retry(RetryCode.TIMEOUT_ERROR, attempts, 0)
+    attempts[RetryCode.TIMEOUT_ERROR] += 1
+    assert not policy.should_retry(RetryCode.TIMEOUT_ERROR, attempts, 1)
+
+    # Throttling retries don't consume the max_retries budget
+    attempts = Counter({RetryCode.RATE_LIMIT_ERROR: 4})
+    assert policy.should_retry(RetryCode.RATE_LIMIT_ERROR, attempts, 3)
+    attempts = Counter({RetryCode.CLAUDE_CODE_ERROR: 1})
+    assert not policy.should_retry(RetryCode.CLAUDE_CODE_ERROR, attempts, 3)
+
+    print("✅ Budgets enforced")
+
+
+def test_circuit_breaker():
+    """Breaker opens on consecutive degraded failures and half-opens later."""
+    print("\nTesting CircuitBreaker...")
+
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0)
+    breaker.record_result(False, RetryCode.OVERLOADED_ERROR)
+    assert breaker.state == "closed"
+    breaker.record_result(False, RetryCode.OVERLOADED_ERROR)
+    assert breaker.state == "half_open"  # reset_timeout=0 elapses immediately
+    assert breaker.allow_request()
+    assert not breaker.allow_request()  # Only one trial call at a time
+    breaker.record_result(True, RetryCode.NONE)
+    assert breaker.state == "closed"
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    breaker.record_result(False, RetryCode.RATE_LIMIT_ERROR)
+    assert breaker.state == "open"
+    assert not breaker.allow_request()
+
+    print("✅ Circuit breaker transitions correct")
+
+
+# Narrates a rate limit in prose, then crashes without a CLI error
+PROSE_CLI = """#!/usr/bin/env python3
+import json, sys
+if "--version" in sys.argv:
+    print("1.0.0 (prose)")
+    sys.exit(0)
+print(json.dumps({"type": "system", "subtype": "init", "session_id": "prose-1"}))
+print(json.dumps({"type": "assistant", "session_id": "prose-1", "message": {
+    "content": [{"type": "text",
+                 "text": "The rate limit handler failed with an invalid value"}]}}))
+sys.stderr.write("Segmentation fault\\n")
+sys.exit(1)
+"""
+
+
+def test_assistant_prose_not_classified():
+    """Assistant text is reported but never changes the retry code."""
+    print("\nTesting classification ignores assistant prose...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cli = os.path.join(tmp, "prose_claude.py")
+        with open(cli, "w") as f:
+            f.write(PROSE_CLI)
+        os.chmod(cli, 0o755)
+
+        original_path = agent.CLAUDE_PATH
+        agent.CLAUDE_PATH = cli
+        try:
+            response = agent.run_claude_code(
+                AgentPromptRequest(
+                    prompt="/implement plan.md",
+                    adw_id="pros1234",
+                    agent_name="tester",
+                    model="sonnet",
+                    output_file=os.path.join(tmp, "raw_output.jsonl"),
+                    working_dir=tmp,
+                    timeout_seconds=60,
+                )
+            )
+        finally:
+            agent.CLAUDE_PATH = original_path
+
+    assert not response.success
+    assert "rate limit handler failed" in response.output, response.output
+    assert response.retry_code == RetryCode.CLAUDE_CODE_ERROR, response.retry_code
+    assert response.retry_after_seconds is None
+
+    print("✅ Assistant prose left out of classification")
+
+
+def main():
+    """Run all tests."""
+    print("ADW Retry Policy Tests")
+    print("=" * 50)
+
+    test_classify_failure()
+    test_backoff_and_fixed_delays()
+    test_budgets()
+    test_circuit_breaker()
+    test_assistant_prose_not_classified()
+
+    print("\n" + "=" * 50)
+    print("✅ All tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""Test the agent subprocess supervisor (timeouts, watchdog, group kill)."""
+
+import sys
+import os
+import tempfile
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adw_modules import supervisor
+from adw_modules.supervisor import run_supervised
+
+# Check quickly so the tests stay fast
+supervisor.POLL_INTERVAL = 0.1
+supervisor.KILL_GRACE_PERIOD = 1.0
+
+
+def assert_dead(pid_file: str) -> None:
+    """The process whose pid is in pid_file is gone (or an unreaped zombie)."""
+    with open(pid_file) as f:
+        pid = int(f.read())
+    try:
+        os.kill(pid, 0)
+        # Reaped zombies may linger briefly; check the process state
+        with open(f"/proc/{pid}/stat") as f:
+            assert f.read().rsplit(")", 1)[1].split()[0] == "Z", "child survived the kill"
+    except (ProcessLookupError, FileNotFoundError):
+        pass
+
+
+def test_completes_normally():
+    """Output and stderr are captured for a process that finishes."""
+    print("Testing normal completion...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output_file = os.path.join(tmp, "raw_output.jsonl")
+        result = run_supervised(
+            ["sh", "-c", "echo '{\"type\": \"result\"}'; echo oops >&2; exit 3"],
+            output_file,
+            timeout=10,
+            idle_timeout=10,
+        )
+        assert not result.killed
+        assert result.returncode == 3
+        assert result.stderr.strip() == "oops"
+        with open(output_file) as f:
+            assert f.read().strip() == '{"type": "result"}'
+
+    print("✅ Normal completion captured")
+
+
+def test_wall_clock_timeout():
+    """A process that keeps writing is still killed at the wall-clock limit."""
+    print("\nTesting wall-clock timeout...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        result = run_supervised(
+            ["sh", "-c", "while true; do echo '{}'; sleep 0.1; done"],
+            os.path.join(tmp, "raw_output.jsonl"),
+            timeout=0.5,
+            idle_timeout=10,
+        )
+        assert result.kill_reason == "timeout"
+        assert result.elapsed < 5
+
+    print("✅ Timed out process killed")
+
+
+def test_inactivity_watchdog_kills_group():
+    """A silent process and its children are killed by the watchdog."""
+    print("\nTesting inactivity watchdog...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pid_file = os.path.join(tmp, "child.pid")
+        result = run_supervised(
+            ["sh", "-c", f"sleep 30 & echo $! > {pid_file}; echo '{{}}'; wait"],
+            os.path.join(tmp, "raw_output.jsonl"),
+            timeout=30,
+            idle_timeout=0.5,
+        )
+        assert result.kill_reason == "inactivity"
+        assert result.elapsed < 5
+
+        assert_dead(pid_file)
+
+    print("✅ Silent process group killed")
+
+
+def test_kill_reaches_children_that_outlive_the_leader():
+    """Children ignoring SIGTERM are SIGKILLed after the leader has exited."""
+    print("\nTesting stubborn children...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pid_file = os.path.join(tmp, "child.pid")
+        result = run_supervised(
+            ["sh", "-c", f"(trap '' TERM; exec sleep 30) & echo $! > {pid_file}; echo '{{}}'; wait"],
+            os.path.join(tmp, "raw_output.jsonl"),
+            timeout=30,
+            idle_timeout=0.5,
+        )
+        assert result.kill_reason == "inactivity"
+        assert result.elapsed < 5
+        assert_dead(pid_file)
+
+    print("✅ Stubborn child killed")
+
+
+def test_resource_limits():
+    """Limits are in place in the command itself, without a preexec_fn."""
+    print("\nTesting resource limits...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output_file = os.path.join(tmp, "raw_output.jsonl")
+        script = "import resource; print(resource.getrlimit(resource.RLIMIT_CPU)[0])"
+        result = run_supervised([sys.executable, "-c", script], output_file, cpu_limit_seconds=7)
+        assert result.returncode == 0, result.stderr
+        with open(output_file) as f:
+            assert f.read().strip() == "7"
+
+        result = run_supervised(
+            [sys.executable, "-c", "x = bytearray(256 * 1024 * 1024)"], output_file, memory_limit_mb=64
+        )
+        assert result.returncode != 0 and "MemoryError" in result.stderr
+
+    print("✅ Limits applied")
+
+
+def main():
+    """Run all tests."""
+    print("ADW Supervisor Tests")
+    print("=" * 50)
+
+    test_completes_normally()
+    test_wall_clock_timeout()
+    test_inactivity_watchdog_kills_group()
+    test_kill_reaches_children_that_outlive_the_leader()
+    test_resource_limits()
+
+    print("\n" + "=" * 50)
+    print("✅ All tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""Test span recording, context propagation and trace export formats."""
+
+import sys
+import os
+import time
+import tempfile
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adw_modules import tracing
+from adw_modules.tracing import (
+    TRACE_PARENT_ENV,
+    load_trace,
+    parse_traceparent,
+    prune_traces,
+    start_span,
+    to_chrome_trace,
+    to_otlp,
+    traced_run,
+)
+from adw_modules.utils import get_safe_subprocess_env
+
+
+def test_nested_spans_and_propagation():
+    """Child spans and child processes join the parent's trace."""
+    print("Testing nested spans and propagation...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        original_dir = tracing.get_traces_dir
+        tracing.get_traces_dir = lambda: tmp
+        try:
+            with start_span("phase:adw_test_iso", adw_id="abc12345") as root:
+                env = get_safe_subprocess_env()
+                assert parse_traceparent(env[TRACE_PARENT_ENV]) == (
+                    root.trace_id,
+                    root.span_id,
+                )
+                result = traced_run(["git", "--version"], capture_output=True, text=True)
+                assert result.returncode == 0
+
+            spans = {span["name"]: span for span in load_trace(root.trace_id)}
+        finally:
+            tracing.get_traces_dir = original_dir
+
+    assert set(spans) == {"phase:adw_test_iso", "exec:git --version"}
+    assert spans["exec:git --version"]["parent_id"] == root.span_id
+    assert spans["exec:git --version"]["attributes"]["returncode"] == 0
+    assert spans["phase:adw_test_iso"]["parent_id"] is None
+
+    print("✅ Spans nested and context propagated")
+
+
+def test_error_status():
+    """Exceptions mark the span as failed and propagate."""
+    print("\nTesting error status...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        original_dir = tracing.get_traces_dir
+        tracing.get_traces_dir = lambda: tmp
+        try:
+            try:
+                with start_span("agent:/implement") as span:
+                    raise RuntimeError("boom")
+            except RuntimeError:
+                pass
+        finally:
+            tracing.get_traces_dir = original_dir
+
+    assert span.status == "error"
+    assert span.error == "RuntimeError: boom"
+
+    print("✅ Errors recorded")
+
+
+def test_leaf_spans_need_a_trace():
+    """git/gh calls and R2 requests outside a trace write no trace files."""
+    print("\nTesting leaf spans outside a trace...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        original_dir = tracing.get_traces_dir
+        tracing.get_traces_dir = lambda: tmp
+        saved_parent = os.environ.pop(TRACE_PARENT_ENV, None)
+        try:
+            for _ in range(3):
+                traced_run(["git", "--version"], capture_output=True)
+            with start_span("r2:head", new_trace=False, object_key="k"):
+                pass
+            assert os.listdir(tmp) == []
+
+            with start_span("trigger:cron_poll") as root:
+                traced_run(["git", "--version"], capture_output=True)
+            assert os.listdir(tmp) == [f"{root.trace_id}.jsonl"]
+        finally:
+            tracing.get_traces_dir = original_dir
+            if saved_parent is not None:
+                os.environ[TRACE_PARENT_ENV] = saved_parent
+
+    print("✅ Only traced work is recorded")
+
+
+def test_prune_traces():
+    """Old traces and the oldest beyond the file limit are deleted."""
+    print("\nTesting trace retention...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        original_dir = tracing.get_traces_dir
+        tracing.get_traces_dir = lambda: tmp
+        try:
+            now = time.time()
+            ages_days = {"a" * 32: 30, "b" * 32: 3, "c" * 32: 2, "d" * 32: 1}
+            for trace_id, age in ages_days.items():
+                for suffix in (".jsonl", ".chrome.json"):
+                    path = os.path.join(tmp, trace_id + suffix)
+                    open(path, "w").close()
+                    os.utime(path, (now - age * 86400, now - age * 86400))
+
+            # Limits are read when pruning, so .env values loaded after import apply
+            os.environ["ADW_TRACE_MAX_FILES"] = "2"
+            os.environ["ADW_TRACE_RETENTION_DAYS"] = "7"
+            removed = prune_traces()
+            remaining = sorted(os.listdir(tmp))
+        finally:
+            tracing.get_traces_dir = original_dir
+            os.environ.pop("ADW_TRACE_MAX_FILES", None)
+            os.environ.pop("ADW_TRACE_RETENTION_DAYS", None)
+
+    assert removed == 2
+    assert remaining == sorted(
+        trace_id + suffix for trace_id in ("c" * 32, "d" * 32) for suffix in (".jsonl", ".chrome.json")
+    )
+
+    print(f"✅ Pruned {removed} traces")
+
+
+def test_export_formats():
+    """Spans convert to Chrome trace events and OTLP JSON."""
+    print("\nTesting export formats...")
+
+    span = {
+        "name": "exec:git push",
+        "trace_id": "a" * 32,
+        "span_id": "b" * 16,
+        "parent_id": "c" * 16,
+        "start_ns": 2_000_000,
+        "end_ns": 5_000_000,
+        "attributes": {"returncode": 1},
+        "status": "error",
+        "error": "exit code 1",
+        "pid": 42,
+        "tid": 7,
+    }
+
+    event = to_chrome_trace([span])["traceEvents"][0]
+    assert event["ph"] == "X"
+    assert event["ts"] == 2000 and event["dur"] == 3000
+    assert event["cat"] == "exec"
+    assert event["args"]["error"] == "exit code 1"
+
+    otlp_span = to_otlp([span])["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert otlp_span["parentSpanId"] == "c" * 16
+    assert otlp_span["status"]["code"] == 2
+
+    print("✅ Chrome and OTLP formats correct")
+
+
+def main():
+    """Run all tests."""
+    print("ADW Tracing Tests")
+    print("=" * 50)
+
+    test_nested_spans_and_propagation()
+    test_error_status()
+    test_leaf_spans_need_a_trace()
+    test_prune_traces()
+    test_export_formats()
+
+    print("\n" + "=" * 50)
+    print("✅ All tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
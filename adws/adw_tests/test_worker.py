@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""Test the adw_worker fork server and worker_client's uv fallback."""
+
+import sys
+import os
+import json
+import time
+import shutil
+import tempfile
+import subprocess
+from contextlib import contextmanager
+
+# Add parent directory to path for imports
+ADWS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ADWS_DIR)
+
+from adw_modules.worker_client import WORKER_SOCKET_ENV, ping, run_phase, submit_job
+
+WORKER = os.path.join(ADWS_DIR, "adw_triggers", "adw_worker.py")
+
+ECHO_SCRIPT = """
+import os, sys
+print("preloaded" if "adw_modules.agent" in sys.modules else "cold")
+print("args", *sys.argv[1:])
+print("cwd", os.getcwd())
+print("env", os.environ.get("ADW_WORKER_TEST"))
+print("to stderr", file=sys.stderr)
+sys.exit(int(sys.argv[-1]))
+"""
+
+# An orchestrator: its phase goes back through the worker
+NESTED_SCRIPT = """
+import os, sys
+sys.path.insert(0, {adws_dir!r})
+from adw_modules.worker_client import run_phase
+phase = run_phase(["uv", "run", os.path.join(os.path.dirname(__file__), "adw_echo_iso.py"), "nested", "0"])
+sys.exit(phase.returncode)
+"""
+
+SLEEP_SCRIPT = """
+import sys, time
+print("sleeping", flush=True)
+time.sleep(float(sys.argv[1]))
+"""
+
+# Phases call load_env() on startup; in the worker it must still read .env
+DOTENV_SCRIPT = """
+import os
+from adw_modules.utils import load_env
+load_env()
+print("dotenv", os.environ.get("ADW_DOTENV_ONLY"))
+print("job", os.environ.get("ADW_WORKER_TEST"))
+"""
+
+
+@contextmanager
+def running_worker(tmp: str, worker: str = WORKER):
+    """Start adw_worker.py on a socket in tmp, serving scripts from tmp."""
+    socket_path = os.path.join(tmp, "worker.sock")
+    jobs_log = os.path.join(tmp, "jobs.jsonl")
+    saved = os.environ.get(WORKER_SOCKET_ENV)
+    os.environ[WORKER_SOCKET_ENV] = socket_path
+    worker = subprocess.Popen(
+        [sys.executable, worker, "--socket", socket_path, "--scripts-dir", tmp, "--jobs-log", jobs_log],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while ping() is None:
+            assert worker.poll() is None and time.monotonic() < deadline, "worker did not start"
+            time.sleep(0.1)
+        yield jobs_log
+    finally:
+        worker.terminate()
+        worker.wait(timeout=10)
+        if saved is None:
+            os.environ.pop(WORKER_SOCKET_ENV, None)
+        else:
+            os.environ[WORKER_SOCKET_ENV] = saved
+
+
+def write_scripts(tmp: str) -> str:
+    with open(os.path.join(tmp, "adw_echo_iso.py"), "w") as f:
+        f.write(ECHO_SCRIPT)
+    with open(os.path.join(tmp, "adw_nested_iso.py"), "w") as f:
+        f.write(NESTED_SCRIPT.format(adws_dir=ADWS_DIR))
+    return os.path.join(tmp, "adw_echo_iso.py")
+
+
+def test_worker_runs_jobs():
+    """Jobs run preloaded with their argv, cwd and env; exit codes come back."""
+    print("Testing worker jobs...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = os.path.realpath(tmp)
+        echo = write_scripts(tmp)
+        sleeper = os.path.join(tmp, "adw_sleep_iso.py")
+        with open(sleeper, "w") as f:
+            f.write(SLEEP_SCRIPT)
+        with running_worker(tmp) as jobs_log:
+            assert "adw_modules.agent" in ping()["preloaded"]
+
+            env = dict(os.environ, ADW_WORKER_TEST="from-job")
+            result = run_phase(["uv", "run", echo, "123", "3"], capture_output=True, text=True, cwd="/", env=env)
+            nested = run_phase(["uv", "run", os.path.join(tmp, "adw_nested_iso.py")], capture_output=True, text=True)
+
+            # A job that outlives its timeout is killed, as by subprocess.run
+            started = time.monotonic()
+            try:
+                run_phase(["uv", "run", sleeper, "30"], capture_output=True, text=True, timeout=1)
+                assert False, "expected TimeoutExpired"
+            except subprocess.TimeoutExpired as e:
+                timed_out = (time.monotonic() - started, e.stdout, e.timeout)
+
+            chunks = []
+            job = submit_job(echo, ["async", "0"], on_output=lambda stream, data: chunks.append(data))
+            assert job.wait(timeout=30) == 0
+
+            # Only adw_* scripts in the scripts directory run
+            try:
+                submit_job(WORKER, [])
+                assert False, "expected WorkerError"
+            except Exception as e:
+                assert "not an ADW script" in str(e)
+            # run_phase falls back to a direct run when the worker rejects a job
+            outside = os.path.join(tmp, "elsewhere")
+            os.makedirs(outside)
+            rejected = run_phase(
+                [sys.executable, shutil.copy(echo, outside), "9", "4"], capture_output=True, text=True
+            )
+
+            with open(jobs_log) as f:
+                jobs = [json.loads(line) for line in f]
+
+    assert result.returncode == 3
+    assert result.stdout.splitlines() == ["preloaded", "args 123 3", "cwd /", "env from-job"]
+    assert result.stderr == "to stderr\n"
+    assert nested.returncode == 0 and "args nested 0" in nested.stdout
+    assert timed_out[0] < 10 and timed_out[1:] == ("sleeping\n", 1), timed_out
+    assert "args async 0" in "".join(chunks)
+    assert rejected.returncode == 4 and rejected.stdout.splitlines()[:2] == ["cold", "args 9 4"]
+    assert [(job["script"], job["returncode"]) for job in jobs] == [
+        ("adw_echo_iso.py", 3),
+        ("adw_echo_iso.py", 0),
+        ("adw_nested_iso.py", 0),
+        ("adw_sleep_iso.py", -9),
+        ("adw_echo_iso.py", 0),
+    ]
+
+    print(f"✅ {len(jobs)} jobs ran in the worker")
+
+
+def test_jobs_see_dotenv():
+    """Jobs get .env settings on top of their own env, not just the worker's."""
+    print("\nTesting .env in worker jobs...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = os.path.realpath(tmp)
+        # A copy of adws/ with its own .env, which load_env() finds from adw_modules/
+        adws_copy = os.path.join(tmp, "adws")
+        shutil.copytree(
+            os.path.join(ADWS_DIR, "adw_modules"),
+            os.path.join(adws_copy, "adw_modules"),
+            ignore=shutil.ignore_patterns("__pycache__"),
+        )
+        os.makedirs(os.path.join(adws_copy, "adw_triggers"))
+        worker = shutil.copy(WORKER, os.path.join(adws_copy, "adw_triggers"))
+        with open(os.path.join(adws_copy, ".env"), "w") as f:
+            f.write("ADW_DOTENV_ONLY=from-dotenv\nADW_WORKER_TEST=from-dotenv\n")
+        script = os.path.join(tmp, "adw_dotenv_iso.py")
+        with open(script, "w") as f:
+            f.write(DOTENV_SCRIPT)
+
+        # Not in the job env, as with get_safe_subprocess_env()
+        env = {k: v for k, v in os.environ.items() if k != "ADW_DOTENV_ONLY"}
+        env["ADW_WORKER_TEST"] = "from-job"
+        with running_worker(tmp, worker):
+            result = run_phase(["uv", "run", script], capture_output=True, text=True, env=env)
+
+    assert result.returncode == 0, result.stderr
+    # .env fills in what the job lacks without overriding what it sets
+    assert result.stdout.splitlines() == ["dotenv from-dotenv", "job from-job"]
+
+    print("✅ Jobs read .env")
+
+
+def test_fallback_without_worker():
+    """With no worker listening, run_phase runs the command directly."""
+    print("\nTesting fallback without a worker...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        echo = write_scripts(tmp)
+        saved = os.environ.get(WORKER_SOCKET_ENV)
+        os.environ[WORKER_SOCKET_ENV] = os.path.join(tmp, "missing.sock")
+        try:
+            assert ping() is None
+            result = run_phase([sys.executable, echo, "7", "5"], capture_output=True, text=True)
+        finally:
+            if saved is None:
+                os.environ.pop(WORKER_SOCKET_ENV, None)
+            else:
+                os.environ[WORKER_SOCKET_ENV] = saved
+
+    assert result.returncode == 5
+    assert result.stdout.splitlines()[:2] == ["cold", "args 7 5"]
+
+    print("✅ Ran as a subprocess")
+
+
+def main():
+    """Run all tests."""
+    print("ADW Worker Tests")
+    print("=" * 50)
+
+    test_worker_runs_jobs()
+    test_jobs_see_dotenv()
+    test_fallback_without_worker()
+
+    print("\n" + "=" * 50)
+    print("✅ All tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+#!/usr/bin/env uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = []
+# ///
+
+"""
+Trace Export for ADW Runs
+
+Usage:
+uv run adws/adw_tests/trace_export.py --adw-id <adw_id> [--format chrome|json|otlp] [--output <file>]
+uv run adws/adw_tests/trace_export.py --trace-id <trace_id> [--format chrome|json|otlp]
+
+Exports the spans recorded in agents/traces/ for one run. The chrome format
+opens in chrome://tracing or https://ui.perfetto.dev as a single flame graph
+covering the trigger, every phase process, agent calls and git/gh commands.
+Without --output, prints the slowest spans instead.
+"""
+
+import os
+import sys
+import json
+import argparse
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adw_modules.tracing import find_traces, load_trace, to_chrome_trace, to_otlp
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Export ADW traces")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--adw-id", help="Export every trace containing this ADW id")
+    group.add_argument("--trace-id", help="Export a single trace")
+    parser.add_argument("--format", choices=["chrome", "json", "otlp"], default="chrome")
+    parser.add_argument("--output", help="File to write (default: print slowest spans)")
+    parser.add_argument("--top", type=int, default=15, help="Spans to list without --output")
+    args = parser.parse_args()
+
+    trace_ids = [args.trace_id] if args.trace_id else find_traces(args.adw_id)
+    spans = [span for trace_id in trace_ids for span in load_trace(trace_id)]
+    if not spans:
+        print("No spans found", file=sys.stderr)
+        sys.exit(1)
+
+    if args.output:
+        if args.format == "chrome":
+            data = to_chrome_trace(spans)
+        elif args.format == "otlp":
+            data = to_otlp(spans)
+        else:
+            data = spans
+        with open(args.output, "w") as f:
+            json.dump(data, f)
+        print(f"Wrote {len(spans)} spans from {len(trace_ids)} trace(s) to {args.output}")
+        return
+
+    finished = [span for span in spans if span.get("end_ns")]
+    finished.sort(key=lambda span: span["end_ns"] - span["start_ns"], reverse=True)
+    print(f"🔎 {len(spans)} spans in {len(trace_ids)} trace(s)\n")
+    for span in finished[: args.top]:
+        seconds = (span["end_ns"] - span["start_ns"]) / 1e9
+        status = "❌" if span["status"] == "error" else "✅"
+        print(f"{status} {seconds:8.1f}s  {span['name']}")
+
+
+if __name__ == "__main__":
+    main()
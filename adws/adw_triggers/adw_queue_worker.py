@@ -0,0 +1,353 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = ["python-dotenv", "pydantic", "boto3>=1.26.0", "pillow"]
+# ///
+
+"""
+ADW Queue Worker - runs workflows claimed from the shared job queue
+
+Usage: uv run adw_queue_worker.py [--queue-url URL] [--concurrency 2] [--once]
+
+Run one per build machine, each in its own checkout of the repository.
+The worker claims jobs from ADW_QUEUE_URL (see adw_modules/job_queue.py)
+and runs each workflow here, so its worktrees (trees/), ports and agents/
+directory stay on this host. From claim until the job is completed, the
+worker heartbeats its lease from a background thread, through state pulls,
+worktree restores and artifact syncs as well as the run itself; if another
+worker has taken the job over (this one stalled past the lease), the run is
+killed and the rest of the job abandoned. Jobs held by a worker that dies
+are requeued once their lease expires.
+
+When a run exits, agents/{adw_id}/ is synced to the central store through
+R2Uploader (ADW_STORAGE_BACKEND) under runs/{adw_id}/, and the final ADW
+state is recorded in the job result. Before a run, a host without that
+state pulls it back from the store, and if the ADW's worktree lives on
+another host it is checked out here from the pushed branch and set up with
+/install_worktree. Follow-up workflows that need a worktree (build, test,
+review, document, ship) are failed rather than run when neither works.
+
+Runs go through the local adw_worker when it is running.
+"""
+
+import os
+import sys
+import time
+import signal
+import socket
+import argparse
+import threading
+import subprocess
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add parent directory to path for imports
+ADWS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ADWS_DIR)
+
+from adw_modules.agent import execute_template
+from adw_modules.data_types import AgentTemplateRequest, QueuedJob
+from adw_modules.job_queue import DEFAULT_LEASE_SECONDS, JobQueue, get_job_queue
+from adw_modules.r2_uploader import R2Uploader
+from adw_modules.state import ADWState
+from adw_modules.utils import get_safe_subprocess_env, load_env, setup_logger
+from adw_modules.worker_client import WorkerError, echo_output, submit_job
+from adw_modules.worktree_ops import (
+    get_ports_for_adw,
+    get_worktree_path,
+    setup_worktree_environment,
+    validate_worktree,
+)
+
+# Workflows that run in a worktree created by an earlier plan/patch run
+DEPENDENT_WORKFLOWS = {
+    "adw_build_iso",
+    "adw_test_iso",
+    "adw_review_iso",
+    "adw_document_iso",
+    "adw_ship_iso",
+}
+
+# Graceful shutdown flag
+shutdown_requested = False
+
+
+def signal_handler(signum, frame):
+    """Stop claiming jobs; running jobs finish first."""
+    global shutdown_requested
+    print(f"\nINFO: Received signal {signum}, finishing running jobs...")
+    shutdown_requested = True
+
+
+def pull_state(adw_id: str) -> int:
+    """Download runs/{adw_id}/ into agents/{adw_id}/ unless this host has its state."""
+    state_path = ADWState(adw_id).get_state_path()
+    if os.path.exists(state_path):
+        return 0
+    uploader = R2Uploader(setup_logger(adw_id, "queue_worker"))
+    return uploader.download_prefix(f"runs/{adw_id}/", os.path.dirname(state_path))
+
+
+def git(args: List[str], cwd: str) -> subprocess.CompletedProcess:
+    return subprocess.run(["git", *args], capture_output=True, text=True, cwd=cwd)
+
+
+def restore_worktree(adw_id: str, repo_root: str) -> Optional[str]:
+    """Check out the ADW's branch here if its worktree is on another host.
+
+    Returns None when a valid worktree is in place, else the reason there is none.
+    """
+    state = ADWState.load(adw_id)
+    if state is None:
+        return f"No state for {adw_id} on this host or in the store"
+    if validate_worktree(adw_id, state)[0]:
+        return None
+    branch_name = state.get("branch_name")
+    if not branch_name:
+        return f"No branch_name in state for {adw_id}"
+
+    logger = setup_logger(adw_id, "queue_worker")
+    worktree_path = get_worktree_path(adw_id)
+    if not os.path.exists(worktree_path):
+        fetch = git(["fetch", "origin", branch_name], repo_root)
+        if fetch.returncode != 0:
+            return f"Branch {branch_name} is not on origin: {fetch.stderr.strip()}"
+        # Creates a local branch tracking origin/{branch_name} if there is none
+        add = git(["worktree", "add", worktree_path, branch_name], repo_root)
+        if add.returncode != 0:
+            return f"Failed to check out {branch_name}: {add.stderr.strip()}"
+    logger.info(f"Restored worktree for {adw_id} at {worktree_path} from {branch_name}")
+
+    default_ports = get_ports_for_adw(adw_id)
+    backend_port = state.get("backend_port") or default_ports[0]
+    frontend_port = state.get("frontend_port") or default_ports[1]
+    setup_worktree_environment(worktree_path, backend_port, frontend_port, logger)
+    install = execute_template(
+        AgentTemplateRequest(
+            agent_name="ops",
+            slash_command="/install_worktree",
+            args=[worktree_path, str(backend_port), str(frontend_port)],
+            adw_id=adw_id,
+            working_dir=worktree_path,
+        )
+    )
+    if not install.success:
+        return f"Failed to set up restored worktree: {install.output}"
+
+    state.update(
+        worktree_path=worktree_path, backend_port=backend_port, frontend_port=frontend_port
+    )
+    state.save("queue_worker")
+    return None
+
+
+def seed_state(job: QueuedJob) -> None:
+    """Write the job's enqueue-time state here unless this host already has it."""
+    state = ADWState(job.adw_id)
+    if job.state and not os.path.exists(state.get_state_path()):
+        state.update(**job.state)
+        state.save("queue_worker")
+
+
+def launch(script: str, argv: List[str], cwd: str):
+    """Start a workflow through adw_worker, or as a subprocess in its own session."""
+    env = get_safe_subprocess_env()
+    try:
+        process = submit_job(script, argv, cwd=cwd, env=env, on_output=echo_output)
+        if process is not None:
+            return process
+    except WorkerError as e:
+        print(f"WARNING: adw_worker rejected {script}, launching directly: {e}")
+    return subprocess.Popen(
+        [sys.executable, script, *argv], cwd=cwd, env=env, start_new_session=True
+    )
+
+
+def sync_artifacts(adw_id: str) -> Tuple[Dict[str, Any], int]:
+    """Upload agents/{adw_id}/ to the central store; returns (state, files synced)."""
+    state = ADWState.load(adw_id)
+    run_dir = os.path.dirname(ADWState(adw_id).get_state_path())
+    if not os.path.isdir(run_dir):
+        return (state.data if state else {}), 0
+
+    uploads = []
+    for root, _, files in os.walk(run_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            relpath = os.path.relpath(path, run_dir).replace(os.sep, "/")
+            uploads.append((path, f"runs/{adw_id}/{relpath}"))
+
+    uploader = R2Uploader(setup_logger(adw_id, "queue_worker"))
+    urls = uploader.upload_files(uploads)
+    return (state.data if state else {}), sum(1 for url in urls.values() if url)
+
+
+class LeaseKeeper:
+    """Heartbeats a job's lease from a background thread until stopped.
+
+    Sets `lost` and calls on_lost once the queue says the job is no longer
+    ours, or heartbeats have failed for a whole lease.
+    """
+
+    def __init__(self, queue: JobQueue, job_id: int, worker_id: str, lease_seconds: float):
+        self.queue = queue
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.lost = threading.Event()
+        self.on_lost: Optional[Any] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"lease-{job_id}", daemon=True)
+
+    def __enter__(self) -> "LeaseKeeper":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        last_renewed = time.monotonic()
+        while not self._stop.wait(self.lease_seconds / 3):
+            try:
+                renewed = self.queue.heartbeat(self.job_id, self.worker_id, self.lease_seconds)
+            except Exception as e:
+                print(f"WARNING: Job {self.job_id} heartbeat failed: {e}")
+                # Retry until the lease we hold would have run out
+                renewed = time.monotonic() - last_renewed < self.lease_seconds
+            else:
+                last_renewed = time.monotonic() if renewed else last_renewed
+            if not renewed:
+                self.lost.set()
+                if self.on_lost:
+                    self.on_lost()
+                return
+
+
+def kill_group(process) -> None:
+    """SIGTERM a launched workflow's process group."""
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except OSError:
+        pass
+
+
+def run_job(
+    queue: JobQueue, job: QueuedJob, worker_id: str, scripts_dir: str, lease_seconds: float
+) -> None:
+    """Run one claimed job to completion, heartbeating its lease throughout.
+
+    If the lease is lost, the remaining local work is abandoned: the workflow
+    is killed, and neither artifacts nor a result are written over those of
+    the worker that took the job over.
+    """
+    with LeaseKeeper(queue, job.id, worker_id, lease_seconds) as lease:
+        _run_leased_job(queue, job, worker_id, scripts_dir, lease)
+
+
+def _run_leased_job(
+    queue: JobQueue, job: QueuedJob, worker_id: str, scripts_dir: str, lease: LeaseKeeper
+) -> None:
+    def lease_lost(stage: str) -> bool:
+        if lease.lost.is_set():
+            print(f"ERROR: Job {job.id} lease lost {stage}; abandoning {job.workflow}")
+            return True
+        return False
+
+    script = os.path.join(scripts_dir, f"{job.workflow}.py")
+    if not job.workflow.startswith("adw_") or not os.path.isfile(script):
+        queue.complete(job.id, worker_id, 1, error=f"Unknown workflow: {job.workflow}")
+        return
+
+    print(f"INFO: Job {job.id}: {job.workflow} #{job.issue_number} ({job.adw_id}), attempt {job.attempts}")
+    pulled = pull_state(job.adw_id)
+    if pulled:
+        print(f"INFO: Job {job.id}: pulled {pulled} files for {job.adw_id} from the store")
+    if lease_lost("while pulling state"):
+        return
+    seed_state(job)
+    repo_root = os.path.dirname(scripts_dir)
+    state = ADWState.load(job.adw_id)
+    if job.workflow in DEPENDENT_WORKFLOWS or (state and state.get("branch_name")):
+        error = restore_worktree(job.adw_id, repo_root)
+        if lease_lost("while restoring the worktree"):
+            return
+        if error and job.workflow in DEPENDENT_WORKFLOWS:
+            print(f"ERROR: Job {job.id}: {error}")
+            queue.complete(job.id, worker_id, 1, error=error)
+            return
+        if error:
+            print(f"WARNING: Job {job.id}: {error}; {job.workflow} will create a new worktree")
+
+    process = launch(script, [job.issue_number, job.adw_id, *job.args], repo_root)
+    # Stop the run as soon as the lease is gone, not at the next poll
+    lease.on_lost = lambda: kill_group(process)
+    if lease.lost.is_set():
+        kill_group(process)
+    returncode = process.wait()
+    if lease_lost(f"while running (exit {returncode})"):
+        return
+
+    state, synced = sync_artifacts(job.adw_id)
+    if lease_lost("while syncing artifacts"):
+        return
+    result = {
+        "state": state,
+        "artifacts_synced": synced,
+        "artifact_prefix": f"runs/{job.adw_id}/",
+        "worker_id": worker_id,
+        "host": socket.gethostname(),
+    }
+    error = None if returncode == 0 else f"{job.workflow} exited with {returncode}"
+    if not queue.complete(job.id, worker_id, returncode, result=result, error=error):
+        print(f"WARNING: Job {job.id} finished after its lease was taken over")
+    print(f"INFO: Job {job.id} finished with {returncode}; synced {synced} files")
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="ADW shared-queue worker")
+    parser.add_argument("--queue-url", help="Queue URL (default: ADW_QUEUE_URL or agents/job_queue.db)")
+    parser.add_argument("--worker-id", default=f"{socket.gethostname()}:{os.getpid()}",
+                        help="Name recorded on claimed jobs (default: host:pid)")
+    parser.add_argument("--concurrency", type=int, default=2, help="Workflows running at once")
+    parser.add_argument("--lease-seconds", type=float, default=DEFAULT_LEASE_SECONDS,
+                        help="Lease length; heartbeats renew it every third of this")
+    parser.add_argument("--poll-interval", type=float, default=5.0, help="Seconds between claims when idle")
+    parser.add_argument("--scripts-dir", default=ADWS_DIR, help="Directory of adw_*.py workflow scripts")
+    parser.add_argument("--once", action="store_true", help="Exit when the queue is empty")
+    args = parser.parse_args()
+
+    load_env()
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+
+    queue = get_job_queue(args.queue_url)
+    scripts_dir = os.path.realpath(args.scripts_dir)
+    print(f"ADW queue worker {args.worker_id} started (concurrency {args.concurrency})")
+
+    active: List[threading.Thread] = []
+    while not shutdown_requested:
+        active = [t for t in active if t.is_alive()]
+        job: Optional[QueuedJob] = None
+        if len(active) < args.concurrency:
+            job = queue.claim(args.worker_id, args.lease_seconds)
+        if job:
+            thread = threading.Thread(
+                target=run_job,
+                args=(queue, job, args.worker_id, scripts_dir, args.lease_seconds),
+                name=f"job-{job.id}",
+            )
+            thread.start()
+            active.append(thread)
+            continue
+        if args.once and not active:
+            break
+        time.sleep(args.poll_interval if not active else min(args.poll_interval, 1.0))
+
+    for thread in active:
+        thread.join()
+    print(f"ADW queue worker {args.worker_id} stopped; {queue.depth()} jobs queued")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = ["python-dotenv", "pydantic", "boto3>=1.26.0", "pillow"]
+# ///
+
+"""
+ADW Worker - preloaded fork server for workflow and phase scripts
+
+Usage: uv run adw_worker.py [--socket PATH] [--max-jobs 64] [--no-preload]
+
+Imports adw_modules once, then listens on a Unix socket
+(ADW_WORKER_SOCKET, default agents/adw_worker.sock). Each job is one
+adw_*.py script run in a freshly forked child that already has the modules
+loaded, so it skips `uv run` environment resolution and interpreter and
+module startup. The child runs the script as __main__ with the job's argv,
+cwd and environment, and its stdout/stderr are streamed back to the client
+as JSON lines (see adw_modules/worker_client.py for the protocol). Exit codes
+are appended to agents/worker/jobs.jsonl.
+
+trigger_webhook.py, trigger_cron.py and the orchestrator scripts submit to
+the worker when it is running and fall back to `uv run` otherwise.
+
+The preloaded modules read their settings (CLAUDE_CODE_PATH, ADW_AGENT_*
+limits, ADW_MODEL_ROUTER, trace retention, ...) when they are used, not at
+import, so each job sees its own environment plus .env and changes need no
+worker restart. Trace context is likewise taken from each job.
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import atexit
+import codecs
+import signal
+import runpy
+import argparse
+import importlib
+import selectors
+import traceback
+import socketserver
+from datetime import datetime
+from typing import Any, Dict
+
+# Add parent directory to path for imports
+ADWS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ADWS_DIR)
+
+from adw_modules.utils import load_env
+from adw_modules.worker_client import get_worker_socket_path
+
+# Everything a phase imports at startup; the R2 uploader's boto3 stays lazy
+PRELOAD_MODULES = [
+    "adw_modules.data_types",
+    "adw_modules.state",
+    "adw_modules.tracing",
+    "adw_modules.github",
+    "adw_modules.git_ops",
+    "adw_modules.agent",
+    "adw_modules.workflow_ops",
+    "adw_modules.worktree_ops",
+    "adw_modules.r2_uploader",
+    "adw_modules.test_history",
+    "adw_modules.failure_clustering",
+    "adw_modules.worker_client",
+]
+
+OUTPUT_CHUNK = 65536
+
+
+def get_jobs_log_path() -> str:
+    """Get the agents/worker/jobs.jsonl path."""
+    project_root = os.path.dirname(ADWS_DIR)
+    return os.path.join(project_root, "agents", "worker", "jobs.jsonl")
+
+
+def run_job_child(request: Dict[str, Any], stdout_fd: int, stderr_fd: int) -> None:
+    """In the forked child: become the job and never return."""
+    code = 1
+    try:
+        os.setsid()  # Own process group, like start_new_session=True
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.dup2(stdout_fd, 1)
+        os.dup2(stderr_fd, 2)
+        sys.stdout.reconfigure(line_buffering=True)
+        sys.stderr.reconfigure(line_buffering=True)
+
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+        # The worker already loaded .env into the environment we just replaced;
+        # load it again so .env-only settings (R2 keys, ADW_* knobs) reach the job
+        from adw_modules import utils
+
+        utils._env_loaded = False
+        utils.load_env()
+        from adw_modules.tracing import inherit_trace_context
+
+        inherit_trace_context()
+
+        sys.argv = [request["script"], *request["args"]]
+        sys.path[0] = os.path.dirname(request["script"])
+        runpy.run_path(request["script"], run_name="__main__")
+        code = 0
+    except SystemExit as e:
+        if e.code is None:
+            code = 0
+        elif isinstance(e.code, int):
+            code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    finally:
+        # Metrics dumps and OTLP flushes normally run at interpreter exit
+        try:
+            atexit._run_exitfuncs()
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(code)
+
+
+class JobHandler(socketserver.StreamRequestHandler):
+    """One connection: a ping or a job run (in a forked server child)."""
+
+    def send(self, event: Dict[str, Any]) -> None:
+        if self.client_gone:
+            return
+        try:
+            self.wfile.write((json.dumps(event) + "\n").encode())
+            self.wfile.flush()
+        except OSError:
+            # Client went away; keep draining the job and record its exit
+            self.client_gone = True
+
+    def handle(self) -> None:
+        self.client_gone = False
+        try:
+            request = json.loads(self.rfile.readline())
+        except ValueError:
+            self.send({"event": "error", "error": "invalid request"})
+            return
+
+        if request.get("op") == "ping":
+            self.send({
+                "event": "pong",
+                "pid": os.getppid(),
+                "uptime_seconds": round(time.time() - self.server.started_at, 1),
+                "preloaded": self.server.preloaded,
+            })
+            return
+
+        script = os.path.realpath(request.get("script", ""))
+        if (
+            request.get("op") != "run"
+            or os.path.dirname(script) != self.server.scripts_dir
+            or not os.path.basename(script).startswith("adw_")
+            or not os.path.isfile(script)
+        ):
+            self.send({"event": "error", "error": f"not an ADW script: {request.get('script')}"})
+            return
+        request["script"] = script
+        self.run(request)
+
+    def run(self, request: Dict[str, Any]) -> None:
+        job_id = uuid.uuid4().hex[:8]
+        started = time.monotonic()
+        stdout_r, stdout_w = os.pipe()
+        stderr_r, stderr_w = os.pipe()
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        pid = os.fork()
+        if pid == 0:
+            self.server.socket.close()
+            self.connection.close()
+            os.close(stdout_r)
+            os.close(stderr_r)
+            run_job_child(request, stdout_w, stderr_w)
+        os.close(stdout_w)
+        os.close(stderr_w)
+
+        self.send({"event": "started", "job_id": job_id, "pid": pid})
+        streams = {stdout_r: "stdout", stderr_r: "stderr"}
+        # Chunks can end mid-character
+        decoders = {fd: codecs.getincrementaldecoder("utf-8")(errors="replace") for fd in streams}
+        selector = selectors.DefaultSelector()
+        for fd in streams:
+            selector.register(fd, selectors.EVENT_READ)
+        while streams:
+            for key, _ in selector.select():
+                data = os.read(key.fd, OUTPUT_CHUNK)
+                text = decoders[key.fd].decode(data, final=not data)
+                if text:
+                    self.send({"event": "output", "stream": streams[key.fd], "data": text})
+                if not data:
+                    selector.unregister(key.fd)
+                    os.close(key.fd)
+                    del streams[key.fd]
+
+        _, status = os.waitpid(pid, 0)
+        returncode = os.waitstatus_to_exitcode(status)
+        seconds = round(time.monotonic() - started, 3)
+        self.record(job_id, pid, request, returncode, seconds)
+        self.send({"event": "exit", "job_id": job_id, "returncode": returncode, "seconds": seconds})
+
+    def record(
+        self, job_id: str, pid: int, request: Dict[str, Any], returncode: int, seconds: float
+    ) -> None:
+        entry = {
+            "job_id": job_id,
+            "pid": pid,
+            "script": os.path.basename(request["script"]),
+            "args": request["args"],
+            "returncode": returncode,
+            "seconds": seconds,
+            "finished_at": datetime.now().isoformat(),
+        }
+        os.makedirs(os.path.dirname(self.server.jobs_log), exist_ok=True)
+        with open(self.server.jobs_log, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+        print(f"Job {job_id} {entry['script']} {' '.join(entry['args'])} -> {returncode} in {seconds}s")
+
+
+class ForkingUnixStreamServer(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    # Orchestrator jobs wait on their phase jobs, so don't block new forks early
+    max_children = 64
+    block_on_close = False
+
+
+def preload() -> list:
+    """Import adw_modules so forked jobs start with them loaded."""
+    loaded = []
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+            loaded.append(name)
+        except ImportError as e:
+            print(f"WARNING: Could not preload {name}: {e}")
+    return loaded
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="ADW preloaded fork server")
+    parser.add_argument("--socket", help="Unix socket path (default: ADW_WORKER_SOCKET or agents/adw_worker.sock)")
+    parser.add_argument("--max-jobs", type=int, default=64, help="Jobs running at once, orchestrators included")
+    parser.add_argument("--scripts-dir", default=ADWS_DIR, help="Directory of runnable adw_*.py scripts")
+    parser.add_argument("--jobs-log", help="Exit code log (default: agents/worker/jobs.jsonl)")
+    parser.add_argument("--no-preload", action="store_true", help="Skip importing adw_modules up front")
+    args = parser.parse_args()
+
+    load_env()
+    socket_path = args.socket or get_worker_socket_path()
+    os.makedirs(os.path.dirname(socket_path) or ".", exist_ok=True)
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+
+    started = time.monotonic()
+    preloaded = [] if args.no_preload else preload()
+    print(f"Preloaded {len(preloaded)} modules in {time.monotonic() - started:.2f}s")
+
+    ForkingUnixStreamServer.max_children = args.max_jobs
+    server = ForkingUnixStreamServer(socket_path, JobHandler)
+    os.chmod(socket_path, 0o600)
+    server.scripts_dir = os.path.realpath(args.scripts_dir)
+    server.jobs_log = args.jobs_log or get_jobs_log_path()
+    server.preloaded = preloaded
+    server.started_at = time.time()
+
+    def shutdown(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, shutdown)
+    print(f"ADW worker {os.getpid()} listening on {socket_path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Shutting down ADW worker")
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,28 +15,30 @@ This script polls GitHub every 20 seconds to detect:
 1. New issues without comments
 2. Issues where the latest comment contains 'adw'
 
-When a qualifying issue is found, it triggers the existing manual workflow script.
+When a qualifying issue is found, it triggers the existing manual workflow script,
+or enqueues it for adw_queue_worker.py hosts when ADW_QUEUE_URL is set.
 """
 
 import os
 import signal
-import subprocess
 import sys
 import time
 from pathlib import Path
 from typing import Dict, Set, Optional
 
 import schedule
-from dotenv import load_dotenv
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from adw_modules.utils import get_safe_subprocess_env
+from adw_modules.utils import get_safe_subprocess_env, load_env, make_adw_id
+from adw_modules.worker_client import run_phase
+from adw_modules.job_queue import get_job_queue, get_queue_url
+from adw_modules.tracing import start_span
 
 from adw_modules.github import fetch_open_issues, fetch_issue_comments, get_repo_url, extract_repo_path
 
 # Load environment variables from current or parent directories
-load_dotenv()
+load_env()
 
 # Optional environment variables
 GITHUB_PAT = os.getenv("GITHUB_PAT")
@@ -101,17 +103,25 @@ def trigger_adw_workflow(issue_number: int) -> bool:
         script_path = Path(__file__).parent.parent / "adw_plan_build_iso.py"
         
         print(f"INFO: Triggering ADW workflow for issue #{issue_number}")
+
+        if get_queue_url():
+            job_id = get_job_queue().enqueue(
+                "adw_plan_build_iso", str(issue_number), make_adw_id()
+            )
+            print(f"INFO: Enqueued workflow for issue #{issue_number} as job {job_id}")
+            return True
         
         cmd = [sys.executable, str(script_path), str(issue_number)]
         
         # Run the manual trigger script with filtered environment
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            cwd=script_path.parent,
-            env=get_safe_subprocess_env()
-        )
+        with start_span("trigger:cron", issue=issue_number):
+            result = run_phase(
+                cmd,
+                capture_output=True,
+                text=True,
+                cwd=script_path.parent,
+                env=get_safe_subprocess_env()
+            )
         
         if result.returncode == 0:
             print(f"INFO: Successfully triggered workflow for issue #{issue_number}")
@@ -136,6 +146,14 @@ def check_and_process_issues():
     start_time = time.time()
     print(f"INFO: Starting issue check cycle")
     
+    # A leaf span: idle polls record nothing, each triggered workflow gets its
+    # own trace from trigger:cron
+    with start_span("trigger:cron_poll", new_trace=False):
+        poll_issues(start_time)
+
+
+def poll_issues(start_time: float):
+    """Fetch open issues and trigger workflows for the qualifying ones."""
     try:
         # Fetch all open issues
         issues = fetch_open_issues(REPO_PATH)
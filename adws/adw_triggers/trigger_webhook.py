@@ -14,27 +14,36 @@ Usage: uv run trigger_webhook.py
 
 Environment Requirements:
 - PORT: Server port (default: 8001)
+- ADW_QUEUE_URL: Enqueue workflows for adw_queue_worker.py hosts instead of running them here
 - All workflow requirements (GITHUB_PAT, ANTHROPIC_API_KEY, etc.)
 """
 
 import os
+import asyncio
 import subprocess
 import sys
-from typing import Optional
+from typing import List, Optional
 from fastapi import FastAPI, Request
-from dotenv import load_dotenv
+from fastapi.responses import JSONResponse, PlainTextResponse
 import uvicorn
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from adw_modules.utils import make_adw_id, setup_logger, get_safe_subprocess_env
+from adw_modules.utils import make_adw_id, setup_logger, get_safe_subprocess_env, load_env
 from adw_modules.github import make_issue_comment, ADW_BOT_IDENTIFIER
 from adw_modules.workflow_ops import extract_adw_info, AVAILABLE_ADW_WORKFLOWS
 from adw_modules.state import ADWState
+from adw_modules.tracing import start_span
+from adw_modules.health import HealthMonitor
+from adw_modules.data_types import HealthCheckResult
+from adw_modules.worktree_ops import count_worktrees, count_ports_in_use
+from adw_modules.worker_client import WorkerError, echo_output, submit_job
+from adw_modules.job_queue import get_job_queue, get_queue_url
+from adw_modules import metrics
 
 # Load environment variables
-load_dotenv()
+load_env()
 
 # Configuration
 PORT = int(os.getenv("PORT", "8001"))
@@ -49,6 +58,30 @@ DEPENDENT_WORKFLOWS = [
     "adw_ship_iso",
 ]
 
+# Workflow processes (or worker jobs) launched by this server, polled for the active gauge
+launched_processes: List[subprocess.Popen] = []
+
+
+def count_active_workflows() -> int:
+    """Number of launched workflow processes still running."""
+    launched_processes[:] = [p for p in launched_processes if p.poll() is None]
+    return len(launched_processes)
+
+
+metrics.WORKFLOWS_ACTIVE.collect = count_active_workflows
+metrics.WORKTREES_IN_USE.collect = count_worktrees
+metrics.PORTS_IN_USE.collect = count_ports_in_use
+# With ADW_QUEUE_URL set, workflows wait in the shared queue for adw_queue_worker.py
+job_queue = get_job_queue() if get_queue_url() else None
+if job_queue is not None:
+    metrics.QUEUE_DEPTH.collect = job_queue.depth
+else:
+    # Workflows start immediately; nothing waits in a queue
+    metrics.QUEUE_DEPTH.set(0)
+
+# Cheap checks refreshed in the background; probes read the cache
+health_monitor = HealthMonitor()
+
 # Create FastAPI app
 app = FastAPI(
     title="ADW Webhook Trigger", description="GitHub webhook endpoint for ADW"
@@ -60,6 +93,17 @@ print(f"Starting ADW Webhook Trigger on port {PORT}")
 @app.post("/gh-webhook")
 async def github_webhook(request: Request):
     """Handle GitHub webhook events."""
+    event_type = request.headers.get("X-GitHub-Event", "")
+    with start_span("trigger:webhook", event=event_type) as span:
+        response = await handle_github_webhook(request)
+        for key in ("status", "issue", "adw_id", "workflow"):
+            if key in response:
+                span.set_attribute(key, response[key])
+        return response
+
+
+async def handle_github_webhook(request: Request) -> dict:
+    """Process a GitHub webhook event and launch the requested workflow."""
     try:
         # Get event type from header
         event_type = request.headers.get("X-GitHub-Event", "")
@@ -71,6 +115,7 @@ async def github_webhook(request: Request):
         action = payload.get("action", "")
         issue = payload.get("issue", {})
         issue_number = issue.get("number")
+        metrics.WEBHOOK_DELIVERIES.inc(event=event_type, action=action)
 
         print(
             f"Received webhook: event={event_type}, action={action}, issue_number={issue_number}"
@@ -207,13 +252,49 @@ async def github_webhook(request: Request):
             print(f"Command: {' '.join(cmd)} (reason: {trigger_reason})")
             print(f"Working directory: {repo_root}")
 
-            # Launch in background using Popen with filtered environment
-            process = subprocess.Popen(
-                cmd,
-                cwd=repo_root,  # Run from repository root where .claude/commands/ is located
-                env=get_safe_subprocess_env(),  # Pass only required environment variables
-                start_new_session=True,
-            )
+            if job_queue is not None:
+                job_id = job_queue.enqueue(
+                    workflow, str(issue_number), adw_id, state=state.data
+                )
+                metrics.WORKFLOWS_LAUNCHED.inc(workflow=workflow)
+                logger.info(f"Enqueued {workflow} as job {job_id}")
+                print(f"Enqueued {workflow} for issue #{issue_number} as job {job_id}")
+                return {
+                    "status": "accepted",
+                    "issue": issue_number,
+                    "adw_id": adw_id,
+                    "workflow": workflow,
+                    "message": f"ADW {workflow} queued for issue #{issue_number}",
+                    "reason": trigger_reason,
+                    "job_id": job_id,
+                }
+
+            # Hand the run to the preloaded adw_worker when it is running
+            process = None
+            try:
+                # Submitting blocks until the worker forks the job; keep the loop free
+                process = await asyncio.to_thread(
+                    submit_job,
+                    trigger_script,
+                    [str(issue_number), adw_id],
+                    cwd=repo_root,
+                    env=get_safe_subprocess_env(),
+                    on_output=echo_output,
+                )
+            except WorkerError as e:
+                print(f"ADW worker rejected {workflow}, launching directly: {e}")
+            if process is None:
+                # Launch in background using Popen with filtered environment
+                process = subprocess.Popen(
+                    cmd,
+                    cwd=repo_root,  # Run from repository root where .claude/commands/ is located
+                    env=get_safe_subprocess_env(),  # Pass only required environment variables
+                    start_new_session=True,
+                )
+            else:
+                print(f"Submitted to ADW worker as job {process.job_id}")
+            launched_processes.append(process)
+            metrics.WORKFLOWS_LAUNCHED.inc(workflow=workflow)
 
             print(
                 f"Background process started for issue #{issue_number} with ADW ID: {adw_id}"
@@ -245,89 +326,77 @@ async def github_webhook(request: Request):
         return {"status": "error", "message": "Internal error processing webhook"}
 
 
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus metrics for this server and all ADW workflow processes."""
+    # render_all reads every process's metrics dump; keep that off the event loop
+    body = await asyncio.to_thread(metrics.render_all)
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+
+@app.on_event("startup")
+def start_health_monitor():
+    """Begin refreshing cached health checks in the background."""
+    health_monitor.start()
+
+
+@app.on_event("shutdown")
+def stop_health_monitor():
+    health_monitor.stop()
+
+
+def health_response(result: HealthCheckResult) -> dict:
+    """Render a HealthCheckResult in the /health response shape."""
+    return {
+        "status": "healthy" if result.success else "unhealthy",
+        "service": "adw-webhook-trigger",
+        "health_check": {
+            "success": result.success,
+            "warnings": result.warnings,
+            "errors": result.errors,
+            "details": {
+                name: check.model_dump() for name, check in result.checks.items()
+            },
+        },
+    }
+
+
+@app.get("/health/live")
+async def health_live():
+    """Liveness probe - the server process is up and serving requests."""
+    return {
+        "status": "alive",
+        "service": "adw-webhook-trigger",
+        "uptime_seconds": round(health_monitor.uptime(), 1),
+    }
+
+
+@app.get("/health/ready")
+async def health_ready():
+    """Readiness probe - cached background checks all pass (503 otherwise)."""
+    result = health_monitor.snapshot()
+    return JSONResponse(
+        health_response(result), status_code=200 if result.success else 503
+    )
+
+
 @app.get("/health")
 async def health():
-    """Health check endpoint - runs comprehensive system health check."""
-    try:
-        # Run the health check script
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        # Health check is in adw_tests, not adw_triggers
-        health_check_script = os.path.join(
-            os.path.dirname(script_dir), "adw_tests", "health_check.py"
-        )
+    """Health check endpoint - serves the cached background check results."""
+    return health_response(health_monitor.snapshot())
 
-        # Run health check with timeout
-        result = subprocess.run(
-            ["uv", "run", health_check_script],
-            capture_output=True,
-            text=True,
-            timeout=30,
-            cwd=os.path.dirname(script_dir),  # Run from adws directory
-        )
 
-        # Print the health check output for debugging
-        print("=== Health Check Output ===")
-        print(result.stdout)
-        if result.stderr:
-            print("=== Health Check Errors ===")
-            print(result.stderr)
-
-        # Parse the output - look for the overall status
-        output_lines = result.stdout.strip().split("\n")
-        is_healthy = result.returncode == 0
-
-        # Extract key information from output
-        warnings = []
-        errors = []
-
-        capturing_warnings = False
-        capturing_errors = False
-
-        for line in output_lines:
-            if "⚠️  Warnings:" in line:
-                capturing_warnings = True
-                capturing_errors = False
-                continue
-            elif "❌ Errors:" in line:
-                capturing_errors = True
-                capturing_warnings = False
-                continue
-            elif "📝 Next Steps:" in line:
-                break
-
-            if capturing_warnings and line.strip().startswith("-"):
-                warnings.append(line.strip()[2:])
-            elif capturing_errors and line.strip().startswith("-"):
-                errors.append(line.strip()[2:])
-
-        return {
-            "status": "healthy" if is_healthy else "unhealthy",
-            "service": "adw-webhook-trigger",
-            "health_check": {
-                "success": is_healthy,
-                "warnings": warnings,
-                "errors": errors,
-                "details": "Run health_check.py directly for full report",
-            },
-        }
-
-    except subprocess.TimeoutExpired:
-        return {
-            "status": "unhealthy",
-            "service": "adw-webhook-trigger",
-            "error": "Health check timed out",
-        }
-    except Exception as e:
-        return {
-            "status": "unhealthy",
-            "service": "adw-webhook-trigger",
-            "error": f"Health check failed: {str(e)}",
-        }
+@app.get("/health/deep")
+async def health_deep():
+    """Full health check including a live Claude Code prompt (cached ~60s)."""
+    result = await asyncio.to_thread(health_monitor.run_deep)
+    return health_response(result)
 
 
 if __name__ == "__main__":
     print(f"Starting server on http://0.0.0.0:{PORT}")
     print(f"Webhook endpoint: POST /gh-webhook")
-    print(f"Health check: GET /health")
+    print(f"Health check: GET /health (also /health/live, /health/ready, /health/deep)")
+    print(f"Metrics: GET /metrics")
 
     uvicorn.run(app, host="0.0.0.0", port=PORT)
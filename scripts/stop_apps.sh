@@ -38,6 +38,14 @@ for port in {9200..9214}; do
     fi
 done
 
+echo -e "${GREEN}Killing processes on parallel E2E worker ports (9300-9359, 9400-9459)...${NC}"
+for port in {9300..9359} {9400..9459}; do
+    pid=$(lsof -ti:$port 2>/dev/null)
+    if [ ! -z "$pid" ]; then
+        kill -9 $pid 2>/dev/null && echo -e "${YELLOW}  Killed process on port $port${NC}"
+    fi
+done
+
 # Kill any uvicorn or vite processes that might be hanging
 echo -e "${GREEN}Killing any remaining uvicorn processes...${NC}"
 pkill -f "uvicorn" 2>/dev/null